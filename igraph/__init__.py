@@ -46,12 +46,13 @@ from igraph.remote.nexus import *
 from igraph.statistics import *
 from igraph.summary import *
 from igraph.utils import *
+from igraph.view import *
 
 import os
 import math
 import gzip
+import random
 import sys
-import operator
 
 from collections import defaultdict
 from itertools import izip
@@ -480,6 +481,106 @@ class Graph(GraphBase):
         return VertexClustering(self, GraphBase.clusters(self, mode))
     components = clusters
 
+    def iter_components(self, mode=STRONG, minelements=1, views=False,
+                        callback=None, workers=None):
+        """iter_components(mode=STRONG, minelements=1, views=False,
+                           callback=None, workers=None)
+
+        Iterates over the (strong or weak) connected components of the graph
+        from the largest to the smallest.
+
+        Unlike L{decompose()}, this method does not copy the components.
+        The components are calculated once, and the list of vertex IDs or
+        the L{GraphView} of a component is created only when the iteration
+        reaches it. Components of the same size are returned in the order of
+        their smallest vertex IDs.
+
+        @param mode: must be either C{STRONG} or C{WEAK}, depending on the
+          components being sought. Optional, defaults to C{STRONG}.
+        @param minelements: minimum number of vertices in a component.
+          By setting this to 2, isolated vertices are not returned
+          as separate components.
+        @param views: whether to return read-only L{GraphView}s of the
+          components instead of the lists of their vertex IDs
+        @param callback: a function to call with each component (the list
+          of its vertex IDs or its view). If it is given, the callback is
+          called for all the components and the list of its results is
+          returned.
+        @param workers: the number of threads the callback is run on.
+          C{None} means the number of CPUs, 1 runs the callback in the
+          current thread. Only a few components are prepared ahead of the
+          threads. The threads can only run at the same time when the
+          callback releases the Python interpreter lock, e.g. while waiting
+          for I/O; the methods of igraph hold the lock while they run.
+        @return: an iterator of the components, or the list of the results
+          of the callback in the order of the components if a callback is
+          given.
+        """
+        clustering = VertexClustering(self, GraphBase.clusters(self, mode))
+        offsets, members = clustering._cluster_index()
+        sizes = [offsets[idx+1] - offsets[idx] for idx in xrange(len(clustering))]
+        order = sorted((idx for idx, size in enumerate(sizes)
+                        if size >= minelements),
+                       key=lambda idx: (-sizes[idx], members[offsets[idx]]))
+
+        def components():
+            for idx in order:
+                vids = members[offsets[idx]:offsets[idx+1]]
+                yield GraphView(self, vids) if views else vids
+
+        if callback is None:
+            return components()
+
+        if workers is None:
+            try:
+                from multiprocessing import cpu_count
+                workers = cpu_count()
+            except (ImportError, NotImplementedError):
+                workers = 1
+        workers = max(1, min(workers, len(order)))
+        if workers == 1:
+            return [callback(component) for component in components()]
+
+        from Queue import Queue
+        from threading import Thread
+
+        results = [None] * len(order)
+        errors = []
+        tasks = Queue(2 * workers)
+
+        def work():
+            while True:
+                task = tasks.get()
+                if task is None:
+                    return
+                if errors:
+                    continue
+                idx, component = task
+                try:
+                    results[idx] = callback(component)
+                except:
+                    errors.append(sys.exc_info())
+
+        threads = [Thread(target=work) for _ in xrange(workers)]
+        for thread in threads:
+            thread.daemon = True
+            thread.start()
+        try:
+            for task in enumerate(components()):
+                if errors:
+                    break
+                tasks.put(task)
+        finally:
+            for _ in threads:
+                tasks.put(None)
+            for thread in threads:
+                thread.join()
+
+        if errors:
+            exc_type, exc_value, exc_traceback = errors[0]
+            raise exc_type, exc_value, exc_traceback
+        return results
+
     def degree_distribution(self, bin_width = 1, *args, **kwds):
         """degree_distribution(bin_width=1, ...)
 
@@ -771,8 +872,8 @@ class Graph(GraphBase):
         """
         return Cut(self, *GraphBase.st_mincut(self, source, target, capacity))
 
-    def modularity(self, membership, weights=None):
-        """modularity(membership, weights=None)
+    def modularity(self, membership, weights=None, resolution=1):
+        """modularity(membership, weights=None, resolution=1)
 
         Calculates the modularity score of the graph with respect to a given
         clustering.
@@ -792,21 +893,40 @@ class Graph(GraphBase):
         total weight of edges adjacent to vertex M{j} and M{m} is the total
         edge weight in the graph.
 
+        The resolution parameter M{gamma} multiplies the M{ki*kj/(2m)} term
+        of the definition. Values larger than 1 favour smaller communities,
+        values smaller than 1 favour larger ones.
+
         @param membership: a membership list or a L{VertexClustering} object
         @param weights: optional edge weights or C{None} if all edges are
           weighed equally. Attribute names are also allowed.
+        @param resolution: the resolution parameter M{gamma}. 1 gives the
+          modularity as defined by Newman and Girvan.
         @return: the modularity score
 
         @newfield ref: Reference
         @ref: MEJ Newman and M Girvan: Finding and evaluating community
           structure in networks. Phys Rev E 69 026113, 2004.
+        @ref: J Reichardt and S Bornholdt: Statistical mechanics of community
+          detection. Phys Rev E 74 016110, 2006.
         """
         if isinstance(membership, VertexClustering):
             if membership.graph != self:
                 raise ValueError("clustering object belongs to another graph")
-            return GraphBase.modularity(self, membership.membership, weights)
-        else:
-            return GraphBase.modularity(self, membership, weights)
+            membership = membership.membership_view
+        result = GraphBase.modularity(self, membership, weights)
+        if resolution != 1:
+            # The core calculates the modularity for gamma = 1; correct the
+            # null model term using the total strength of each cluster
+            strength = self.strength(weights=weights, loops=True)
+            total_strength = float(sum(strength))
+            if total_strength > 0:
+                totals = defaultdict(float)
+                for cluster, value in izip(membership, strength):
+                    totals[cluster] += value
+                result += (1 - resolution) * sum((value / total_strength) ** 2
+                                                 for value in totals.itervalues())
+        return result
 
     def path_length_hist(self, directed=True):
         """path_length_hist(directed=True)
@@ -1196,6 +1316,66 @@ class Graph(GraphBase):
                     modularity_params=dict(weights=weights))
         return result
 
+    def community_multilevel_update(self, clustering, added=None,
+            removed=None, weights=None):
+        """Updates a community structure found by the multilevel algorithm
+        after some edges of the graph were added or removed.
+
+        Instead of running L{community_multilevel()} from scratch, the
+        vertices around the changed edges are moved between the existing
+        communities the same way as in the first phase of the multilevel
+        algorithm. A moving vertex lets its neighbors move again, so the
+        changes spread only as far as they increase the modularity. The
+        endpoints of removed edges that were within a community are first
+        taken out of their community so that the community can split.
+        Finally, the communities are contracted into single vertices and
+        merged by the multilevel algorithm where this increases the
+        modularity.
+
+        The graph must already contain the changes. Vertices may be added to
+        the graph before the update, but not deleted, since this would
+        change the IDs of the vertices.
+
+        @param clustering: the community structure before the changes, as a
+          L{VertexClustering} or a membership list. Vertices after the end
+          of the membership list, i.e. the ones added to the graph, start
+          in communities of their own.
+        @param added: the added edges as pairs of vertex IDs
+        @param removed: the removed edges as pairs of vertex IDs
+        @param weights: edge attribute name or a list containing edge
+          weights
+        @return: the updated community structure as a L{VertexClustering}
+          object with its modularity.
+        """
+        if self.is_directed():
+            raise ValueError("input graph must be undirected")
+
+        if isinstance(clustering, Clustering):
+            membership = clustering.membership
+        else:
+            membership = list(clustering)
+        n, old_n = self.vcount(), len(membership)
+        if old_n > n:
+            raise ValueError("clustering has more vertices than the graph")
+
+        seeds = set(xrange(old_n, n))
+        isolated = set(seeds)
+        membership.extend([0] * (n - old_n))
+        for u, v in added or ():
+            seeds.add(u)
+            seeds.add(v)
+        for u, v in removed or ():
+            seeds.add(u)
+            seeds.add(v)
+            if u < old_n and v < old_n and membership[u] == membership[v]:
+                isolated.add(u)
+                isolated.add(v)
+
+        membership, q = GraphBase._community_multilevel_update(self,
+                membership, sorted(seeds), sorted(isolated), weights)
+        return VertexClustering(self, membership, q,
+                modularity_params=dict(weights=weights))
+
     def community_optimal_modularity(self, *args, **kwds):
         """Calculates the optimal modularity score of the graph and the
         corresponding community structure.
@@ -1338,6 +1518,108 @@ class Graph(GraphBase):
         return VertexDendrogram(self, merges, optimal_count,
                 modularity_params=dict(weights=weights))
 
+    def community_consensus(self, method="label_propagation", runs=100,
+            workers=None, threshold=0.5, weights=None, max_iter=10, **kwds):
+        """Consensus community structure of many runs of a stochastic
+        community detection method.
+
+        The method is run on the graph many times, every time with the
+        vertices in a random order so that methods which depend on the
+        order of the vertices (like the multilevel algorithm) give
+        different results as well. The fraction of runs where the two
+        endpoints of an edge are in the same community is then used as the
+        weight of the edge in a consensus graph, leaving out the edges whose
+        fraction is below a threshold. The procedure is repeated on the
+        consensus graph until all the runs agree on all of its edges or
+        C{max_iter} rounds have passed, and the connected components of the
+        final consensus graph are returned as the communities.
+
+        Only the edges of the graph are considered when counting how often
+        two vertices are in the same community, so the consensus needs
+        memory proportional to the number of edges and not to the square of
+        the number of vertices.
+
+        The runs are distributed among worker processes since the igraph
+        library itself is not thread-safe. Every run is started with its own
+        random seed in the workers.
+
+        @param method: the name of the community detection method without
+          the C{community_} prefix, e.g. C{"label_propagation"},
+          C{"multilevel"}, C{"infomap"} or C{"spinglass"}. It must accept
+          edge weights. Methods returning a L{VertexDendrogram} are cut at
+          their optimal number of clusters. Note that the consensus graph
+          may be disconnected even if the original graph is connected,
+          which C{"spinglass"} does not handle.
+        @param runs: the number of times the method is run in every round
+        @param workers: the number of worker processes. C{None} means the
+          number of CPUs, 1 runs the method in the current process.
+        @param threshold: the fraction of runs in which the endpoints of an
+          edge must be in the same community for the edge to be kept in
+          the consensus graph
+        @param weights: name of an edge attribute or a list containing
+          edge weights, used in the first round
+        @param max_iter: the maximum number of rounds
+        @param kwds: additional keyword arguments passed to the method
+        @return: an appropriate L{VertexClustering} object.
+
+        @newfield ref: Reference
+        @ref: Lancichinetti A and Fortunato S: Consensus clustering in
+          complex networks. Scientific Reports 2:336, 2012.
+        """
+        if runs < 1:
+            raise ValueError("runs must be positive")
+        if not 0 < threshold <= 1:
+            raise ValueError("threshold must be between 0 and 1")
+        if not hasattr(self, "community_%s" % method):
+            raise ValueError("unknown community detection method: %r" % method)
+
+        if isinstance(weights, basestring):
+            consensus_weights = self.es[weights]
+        else:
+            consensus_weights = weights
+
+        if workers is None:
+            try:
+                from multiprocessing import cpu_count
+                workers = cpu_count()
+            except (ImportError, NotImplementedError):
+                workers = 1
+        workers = max(1, min(workers, runs))
+
+        graph = Graph(self.vcount(), self.get_edgelist(), self.is_directed())
+        pool = None
+        if workers > 1:
+            from multiprocessing import Pool
+            pool = Pool(workers)
+
+        try:
+            for _ in xrange(max_iter):
+                if pool is None:
+                    counts = _community_consensus_runs((graph, method,
+                        consensus_weights, kwds, [None] * runs))
+                else:
+                    seeds = [random.getrandbits(31) for _ in xrange(runs)]
+                    tasks = [(graph, method, consensus_weights, kwds,
+                              seeds[i::workers]) for i in xrange(workers)]
+                    counts = [sum(values) for values in
+                              izip(*pool.map(_community_consensus_runs, tasks))]
+
+                min_count = threshold * runs
+                kept = [i for i, count in enumerate(counts) if count >= min_count]
+                graph = graph.subgraph_edges(kept, delete_vertices=False)
+                consensus_weights = [counts[i] / float(runs) for i in kept]
+                if all(counts[i] == runs for i in kept):
+                    break
+            if pool is not None:
+                pool.close()
+        finally:
+            if pool is not None:
+                pool.terminate()
+                pool.join()
+
+        return VertexClustering(self, graph.clusters().membership,
+                modularity_params=dict(weights=weights))
+
     def k_core(self, *args):
         """Returns some k-cores of the graph.
 
@@ -1387,6 +1669,12 @@ class Graph(GraphBase):
           - C{auto}, C{automatic}: automatic layout
             (see L{Graph.layout_auto})
 
+          - C{bh}, C{barnes_hut}: force-directed layout with Barnes-Hut
+            approximation (see L{Graph.layout_barnes_hut})
+
+          - C{bh_3d}, C{bh3d}, C{barnes_hut_3d}: 3D force-directed layout
+            with Barnes-Hut approximation (see L{Graph.layout_barnes_hut})
+
           - C{bipartite}: bipartite layout (see L{Graph.layout_bipartite})
 
           - C{circle}, C{circular}: circular layout
@@ -1423,6 +1711,12 @@ class Graph(GraphBase):
 
           - C{mds}: multidimensional scaling layout (see L{Graph.layout_mds})
 
+          - C{multilevel}: multilevel force-directed layout for very large
+            graphs (see L{Graph.layout_multilevel})
+
+          - C{multilevel_3d}: 3D multilevel force-directed layout for very
+            large graphs (see L{Graph.layout_multilevel})
+
           - C{random}: random layout (see L{Graph.layout_random})
 
           - C{random_3d}: random 3D layout (see L{Graph.layout_random})
@@ -1493,8 +1787,11 @@ class Graph(GraphBase):
              Fruchterman-Reingold layout will be used (see
              L{Graph.layout_fruchterman_reingold()}).
 
-          5. If everything else above failed, the DrL layout algorithm
-             will be used (see L{Graph.layout_drl()}).
+          5. Otherwise, if the graph has at most 100000 vertices, the DrL
+             layout algorithm will be used (see L{Graph.layout_drl()}).
+
+          6. If everything else above failed, the multilevel force-directed
+             layout will be used (see L{Graph.layout_multilevel()}).
 
         All the arguments of this function except C{dim} are passed on
         to the chosen layout function (in case we have to call some layout
@@ -1530,10 +1827,60 @@ class Graph(GraphBase):
             algo = "kk"
         elif self.vcount() <= 1000:
             algo = "fr"
-        else:
+        elif self.vcount() <= 100000:
             algo = "drl"
+        else:
+            algo = "multilevel"
         return self.layout(algo, *args, **kwds)
 
+    def layout_incremental(self, layout, vertices=None, weights=None,
+                           niter=20, hops=1, theta=1.2, start_temp=1.0):
+        """Updates a layout of the graph after vertices or edges were added
+        to it, without recalculating the whole layout.
+
+        Vertices that are not in the previous layout (i.e. whose index is at
+        least the length of the layout) are placed at the center of their
+        neighbors first. Then the new vertices, the vertices given in
+        I{vertices} and every vertex at most I{hops} steps away from them
+        are moved by a few iterations of the force-directed algorithm of
+        L{Graph.layout_barnes_hut()}; all the other vertices stay where they
+        were. The running time therefore depends mostly on the size of the
+        touched region and not on the size of the graph.
+
+        The method also returns the largest distance a vertex moved. It is
+        close to zero if the touched region is close to an equilibrium, so
+        the layout can be refined by calling the method repeatedly with the
+        new layout until it drops below a threshold::
+
+            layout, displacement = graph.layout_incremental(layout, changed)
+            while displacement > 0.01:
+                layout, displacement = graph.layout_incremental(layout,
+                    changed)
+
+        @param layout: the previous layout of the graph. It may contain fewer
+          points than the number of vertices if vertices were added to the
+          graph since then.
+        @param vertices: the vertices whose edges changed since the previous
+          layout was calculated. C{None} means that only the new vertices
+          are considered to be changed.
+        @param weights: edge weights to be used. Can be a sequence or
+          iterable or even an edge attribute name.
+        @param niter: the number of force-directed iterations to perform.
+        @param hops: the number of steps from the new and changed vertices
+          within which the vertices are allowed to move.
+        @param theta: the opening angle of the Barnes-Hut approximation;
+          see L{Graph.layout_barnes_hut()}.
+        @param start_temp: the maximum distance a vertex is allowed to move
+          in the first iteration.
+        @return: a tuple containing the new L{Layout} and the largest
+          distance a vertex moved.
+        """
+        if isinstance(layout, Layout):
+            layout = layout.array
+        coords, displacement = GraphBase._layout_incremental(self, layout,
+                vertices, weights, niter, hops, theta, start_temp)
+        return Layout(coords), displacement
+
     def layout_grid_fruchterman_reingold(self, *args, **kwds):
         """layout_grid_fruchterman_reingold(*args, **kwds)
 
@@ -3093,8 +3440,8 @@ class Graph(GraphBase):
 
           - C{autocurve}: whether to use curves instead of straight lines for
             multiple edges on the graph plot. This argument may be C{True}
-            or C{False}; when omitted, C{True} is assumed for graphs with
-            less than 10.000 edges and C{False} otherwise.
+            or C{False}; when omitted, C{True} is assumed unless the
+            curvature of the edges is given explicitly.
 
           - C{drawer_factory}: a subclass of L{AbstractCairoGraphDrawer}
             which will be used to draw the graph. You may also provide
@@ -3105,6 +3452,20 @@ class Graph(GraphBase):
             It is safe to omit this keyword argument unless you need to use
             a specific graph drawer.
 
+          - C{fast}: whether to use the fast rendering mode of the default
+            graph drawer. In this mode, edges and vertices with the same
+            visual style are drawn in batches, and arrowheads and labels
+            smaller than the C{plotting.fast_min_size} configuration value
+            (in pixels) are skipped. When omitted, the fast mode is used for
+            graphs where the total number of vertices and edges is at least
+            the C{plotting.fast_threshold} configuration value.
+
+          - C{fit_layout}: whether to fit the layout into the bounding box
+            of the plot. C{False} means that the coordinates of the layout
+            are used as they are, in the coordinate system of the Cairo
+            context; the C{margin} and C{keep_aspect_ratio} arguments are
+            then ignored. The default is C{True}.
+
           - C{keep_aspect_ratio}: whether to keep the aspect ratio of the layout
             that igraph calculates to place the nodes. C{True} means that the
             layout will be scaled proportionally to fit into the bounding box
@@ -3145,6 +3506,16 @@ class Graph(GraphBase):
             current palette. C{None} as a color name will mean that the
             corresponding group is ignored.
 
+          - C{viewport}: the part of the drawing area that is actually
+            visible, e.g. when a zoomed view of a large graph is rendered.
+            Vertices, edges and labels that lie entirely outside the
+            viewport are not drawn at all, so the cost of drawing is
+            proportional to the visible part of the graph. It can be
+            anything accepted by the constructor of L{BoundingBox}, in the
+            coordinate system of the Cairo context, or C{True} to use the
+            current clip region of the context. C{None} (the default) draws
+            everything.
+
           - C{vertex_size}: size of the vertices. The corresponding vertex
             attribute is called C{size}. The default is 10. Vertex sizes
             are measured in the unit of the Cairo context on which igraph
@@ -3320,6 +3691,8 @@ class Graph(GraphBase):
     _layout_mapping = {
         "auto": "layout_auto",
         "automatic": "layout_auto",
+        "barnes_hut": "layout_barnes_hut",
+        "bh": "layout_barnes_hut",
         "bipartite": "layout_bipartite",
         "circle": "layout_circle",
         "circular": "layout_circle",
@@ -3339,6 +3712,7 @@ class Graph(GraphBase):
         "large": "layout_lgl",
         "large_graph": "layout_lgl",
         "mds": "layout_mds",
+        "multilevel": "layout_multilevel",
         "random": "layout_random",
         "rt": "layout_reingold_tilford",
         "tree": "layout_reingold_tilford",
@@ -3574,35 +3948,30 @@ class VertexSeq(_igraph.VertexSeq):
           >>> g.vs["bs"] = g.betweenness()
           >>> edges = g.vs.select(bs_gt=10, bs_lt=30)
 
+        Attributes that are used for selection frequently can be indexed
+        with L{create_index()}; the index is then used to find the candidate
+        vertices instead of scanning the whole sequence.
+
         @return: the new, filtered vertex sequence"""
         vs = _igraph.VertexSeq.select(self, *args)
 
-        operators = {
-            "lt": operator.lt, \
-            "gt": operator.gt, \
-            "le": operator.le, \
-            "ge": operator.ge, \
-            "eq": operator.eq, \
-            "ne": operator.ne, \
-            "in": lambda a, b: a in b, \
-            "notin": lambda a, b: a not in b }
+        # All the keyword criteria are evaluated by the C layer in a single
+        # pass over the vertices; only the values of Graph methods have to be
+        # calculated here in advance.
+        criteria = []
         for keyword, value in kwds.iteritems():
-            if "_" not in keyword or keyword.rindex("_") == 0:
-                keyword = keyword+"_eq"
-            attr, _, op = keyword.rpartition("_")
-            try:
-                func = operators[op]
-            except KeyError:
-                # No such operator, assume that it's part of the attribute name
-                attr, func = keyword, operators["eq"]
-
+            attr, op = _parse_select_keyword(keyword)
             if attr[0] == '_':
                 # Method call, not an attribute
                 values = getattr(vs.graph, attr[1:])(vs)
+                if not isinstance(values, list):
+                    values = list(values)
+                criteria.append((values, op, value))
             else:
-                values = vs[attr]
-            filtered_idxs=[i for i, v in enumerate(values) if func(v, value)]
-            vs = vs.select(filtered_idxs)
+                criteria.append((attr, op, value))
+
+        if criteria:
+            vs = vs._select_by_criteria(criteria)
 
         return vs
 
@@ -3855,99 +4224,61 @@ class EdgeSeq(_igraph.EdgeSeq):
 
         def _ensure_set(value):
             if isinstance(value, VertexSeq):
-                value = set(v.index for v in value)
+                value = set(value.indices)
             elif not isinstance(value, (set, frozenset)):
                 value = set(value)
             return value
 
-        operators = {
-            "lt": operator.lt, \
-            "gt": operator.gt, \
-            "le": operator.le, \
-            "ge": operator.ge, \
-            "eq": operator.eq, \
-            "ne": operator.ne, \
-            "in": lambda a, b: a in b, \
-            "notin": lambda a, b: a not in b }
+        # Endpoint selectors are evaluated by the C layer from the incidence
+        # lists of the given vertices and applied immediately; everything
+        # else is collected and evaluated by the C layer in a single pass
+        # over the remaining edges at the end.
+        pending = []
         for keyword, value in kwds.iteritems():
-            if "_" not in keyword or keyword.rindex("_") == 0:
-                keyword = keyword+"_eq"
-            pos = keyword.rindex("_")
-            attr, op = keyword[0:pos], keyword[pos+1:]
-            try:
-                func = operators[op]
-            except KeyError:
-                # No such operator, assume that it's part of the attribute name
-                attr = "%s_%s" % (attr,op)
-                func = operators["eq"]
+            attr, op = _parse_select_keyword(keyword)
 
-            if attr[0] == '_':
-                if attr == "_source" or attr == "_from":
-                    values = [e.source for e in es]
-                    if op == "in" or op == "notin":
-                        value = _ensure_set(value)
-                elif attr == "_target" or attr == "_to":
-                    values = [e.target for e in es]
-                    if op == "in" or op == "notin":
-                        value = _ensure_set(value)
-                elif attr == "_within":
-                    func = None          # ignoring function, filtering here
+            if attr in ("_source", "_from", "_target", "_to"):
+                if op == "eq":
+                    value = (value, )
+                elif op == "in":
                     value = _ensure_set(value)
-
-                    # Fetch all the edges that are incident on at least one of
-                    # the vertices specified
-                    candidates = set()
-                    for v in value:
-                        candidates.update(es.graph.incident(v))
-
-                    if not es.is_all():
-                        # Find those where both endpoints are OK
-                        filtered_idxs = [i for i, e in enumerate(es) if e.index in candidates
-                                and e.source in value and e.target in value]
-                    else:
-                        # Optimized version when the edge sequence contains all the edges
-                        # exactly once in increasing order of edge IDs
-                        filtered_idxs = [i for i in candidates
-                                if es[i].source in value and es[i].target in value]
-                elif attr == "_between":
-                    if len(value) != 2:
-                        raise ValueError("_between selector requires two vertex ID lists")
-                    func = None          # ignoring function, filtering here
-                    set1 = _ensure_set(value[0])
-                    set2 = _ensure_set(value[1])
-
-                    # Fetch all the edges that are incident on at least one of
-                    # the vertices specified
-                    candidates = set()
-                    for v in set1:
-                        candidates.update(es.graph.incident(v))
-                    for v in set2:
-                        candidates.update(es.graph.incident(v))
-
-                    if not es.is_all():
-                        # Find those where both endpoints are OK
-                        filtered_idxs = [i for i, e in enumerate(es)
-                                if (e.source in set1 and e.target in set2) or
-                                (e.target in set1 and e.source in set2)]
-                    else:
-                        # Optimized version when the edge sequence contains all the edges
-                        # exactly once in increasing order of edge IDs
-                        filtered_idxs = [i for i in candidates
-                                if (es[i].source in set1 and es[i].target in set2) or
-                                (es[i].target in set1 and es[i].source in set2)]
                 else:
-                    # Method call, not an attribute
-                    values = getattr(es.graph, attr[1:])(es)
+                    if op == "notin":
+                        value = _ensure_set(value)
+                    pending.append((attr, op, value))
+                    continue
+                if attr == "_source" or attr == "_from":
+                    es = es._select_by_endpoints(value, None, True)
+                else:
+                    es = es._select_by_endpoints(None, value, True)
+            elif attr == "_within":
+                value = _ensure_set(value)
+                es = es._select_by_endpoints(value, value)
+            elif attr == "_between":
+                if len(value) != 2:
+                    raise ValueError("_between selector requires two vertex ID lists")
+                es = es._select_by_endpoints(_ensure_set(value[0]),
+                                             _ensure_set(value[1]))
             else:
-                values = es[attr]
-
-            # If we have a function to apply on the values, do that; otherwise
-            # we assume that filtered_idxs has already been calculated.
-            if func is not None:
-                filtered_idxs=[i for i, v in enumerate(values) \
-                               if func(v, value)]
+                # Attributes and Graph methods; evaluated later
+                pending.append((attr, op, value))
+
+        criteria = []
+        for attr, op, value in pending:
+            if attr == "_source" or attr == "_from":
+                values = [e.source for e in es]
+            elif attr == "_target" or attr == "_to":
+                values = [e.target for e in es]
+            elif attr[0] == '_':
+                values = getattr(es.graph, attr[1:])(es)
+                if not isinstance(values, list):
+                    values = list(values)
+            else:
+                values = attr
+            criteria.append((values, op, value))
 
-            es = es.select(filtered_idxs)
+        if criteria:
+            es = es._select_by_criteria(criteria)
 
         return es
 
@@ -3959,6 +4290,28 @@ class EdgeSeq(_igraph.EdgeSeq):
         """
         return self.select(*args, **kwds)
 
+##############################################################
+# Keyword argument parsing for VertexSeq.select() and EdgeSeq.select()
+
+_SELECT_OPERATORS = frozenset(["lt", "gt", "le", "ge", "eq", "ne", "in", "notin"])
+
+def _parse_select_keyword(keyword):
+    """Splits a keyword argument of L{VertexSeq.select()} or
+    L{EdgeSeq.select()} into an attribute name and an operator name.
+
+    @param keyword: the keyword argument, e.g. C{weight_gt}
+    @return: a tuple containing the name of the attribute (or the name of
+      the special property if it starts with an underscore) and the name
+      of the operator
+    """
+    if "_" not in keyword or keyword.rindex("_") == 0:
+        return keyword, "eq"
+    attr, _, op = keyword.rpartition("_")
+    if op not in _SELECT_OPERATORS:
+        # No such operator, assume that it's part of the attribute name
+        return keyword, "eq"
+    return attr, op
+
 ##############################################################
 # Additional methods of VertexSeq and EdgeSeq that call Graph methods
 
@@ -4047,6 +4400,8 @@ def _layout_method_wrapper(func):
     @return: a new method
     """
     def result(*args, **kwds):
+        if isinstance(kwds.get("seed"), Layout):
+            kwds["seed"] = kwds["seed"].array
         layout = func(*args, **kwds)
         if not isinstance(layout, Layout):
             layout = Layout(layout)
@@ -4058,7 +4413,7 @@ def _layout_method_wrapper(func):
 for name in dir(Graph):
     if not name.startswith("layout_"):
         continue
-    if name in ("layout_auto", "layout_sugiyama"):
+    if name in ("layout_auto", "layout_incremental", "layout_sugiyama"):
         continue
     setattr(Graph, name, _layout_method_wrapper(getattr(Graph, name)))
 
@@ -4086,10 +4441,43 @@ Graph.layout_fruchterman_reingold_3d=_3d_version_for(Graph.layout_fruchterman_re
 Graph.layout_kamada_kawai_3d=_3d_version_for(Graph.layout_kamada_kawai)
 Graph.layout_random_3d=_3d_version_for(Graph.layout_random)
 Graph.layout_grid_3d=_3d_version_for(Graph.layout_grid)
+Graph.layout_multilevel_3d=_3d_version_for(Graph.layout_multilevel)
+Graph.layout_barnes_hut_3d=_3d_version_for(Graph.layout_barnes_hut)
 Graph.layout_sphere=_3d_version_for(Graph.layout_circle)
 
 ##############################################################
 
+def _community_consensus_runs(task):
+    """Runs a community detection method on a graph multiple times for
+    L{Graph.community_consensus()}.
+
+    @param task: the graph, the name of the method, the edge weights, the
+      additional keyword arguments of the method and the random seeds of the
+      runs in a tuple. A seed of C{None} means that the random number
+      generator is not reseeded before the run.
+    @return: the number of runs where the endpoints of each edge were in the
+      same community, in a list
+    """
+    graph, method, weights, kwds, seeds = task
+    kwds = dict(kwds)
+    kwds["edge_weights" if method == "infomap" else "weights"] = weights
+
+    counts = None
+    permutation = range(graph.vcount())
+    for seed in seeds:
+        if seed is not None:
+            random.seed(seed)
+        random.shuffle(permutation)
+        permuted = graph.permute_vertices(permutation)
+        result = getattr(permuted, "community_%s" % method)(**kwds)
+        if hasattr(result, "as_clustering"):
+            result = result.as_clustering()
+        membership = result.membership_view
+        counts = graph._co_membership_counts(
+            [membership[idx] for idx in permutation], counts)
+    return counts
+
+
 def autocurve(graph, attribute="curved", default=0):
     """Calculates curvature values for each of the edges in the graph to make
     sure that multiple edges are shown properly on a graph plot.
@@ -4113,39 +4501,7 @@ def autocurve(graph, attribute="curved", default=0):
       otherwise C{None}.
     """
 
-    # The following loop could be re-written in C if it turns out to be a
-    # bottleneck. Unfortunately we cannot use Graph.count_multiple() here
-    # because we have to ignore edge directions.
-    multiplicities = defaultdict(list)
-    for edge in graph.es:
-        u, v = edge.tuple
-        if u > v:
-            multiplicities[v, u].append(edge.index)
-        else:
-            multiplicities[u, v].append(edge.index)
-
-    result = [default] * graph.ecount()
-    for pair, eids in multiplicities.iteritems():
-        # Is it a single edge?
-        if len(eids) < 2:
-            continue
-
-        if len(eids) % 2 == 1:
-            # Odd number of edges; the last will be straight
-            result[eids.pop()] = 0
-
-        # Arrange the remaining edges
-        curve = 2.0 / (len(eids) + 2)
-        dcurve, sign = curve, 1
-        for idx, eid in enumerate(eids):
-            edge = graph.es[eid]
-            if edge.source > edge.target:
-                result[eid] = -sign*curve
-            else:
-                result[eid] = sign*curve
-            if idx % 2 == 1:
-                curve += dcurve
-            sign *= -1
+    result = GraphBase._autocurve(graph, default)
 
     if attribute is None:
         return result
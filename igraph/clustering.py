@@ -2,7 +2,8 @@
 # -*- coding: utf-8 -*-
 """Classes related to graph clustering.
 
-@undocumented: _handle_mark_groups_arg_for_clustering, _prepare_community_comparison"""
+@undocumented: _handle_mark_groups_arg_for_clustering, _prepare_community_comparison,
+  _ModularityState"""
 
 __license__ = u"""
 Copyright (C) 2006-2012  Tamás Nepusz <ntamas@gmail.com>
@@ -29,14 +30,14 @@ from itertools import izip
 from math import pi
 from cStringIO import StringIO
 
-from igraph import community_to_membership
 from igraph.compat import property
 from igraph.configuration import Configuration
-from igraph.datatypes import UniqueIdGenerator
+from igraph.datatypes import ListView, Matrix, UniqueIdGenerator
 from igraph.drawing.colors import ClusterColoringPalette
 from igraph.statistics import Histogram
 from igraph.summary import _get_wrapper_for_width
 from igraph.utils import str_to_orientation
+from igraph.view import GraphView
 
 class Clustering(object):
     """Class representing a clustering of an arbitrary ordered set.
@@ -77,9 +78,12 @@ class Clustering(object):
       >>> print cluster_list
       [[0, 1, 2, 3], [4, 5, 6], [7, 8, 9, 10]]
 
-    @undocumented: _formatted_cluster_iterator
+    @undocumented: _formatted_cluster_iterator, _cluster_index
     """
 
+    # Compressed inverted index of the membership list, see _cluster_index()
+    _index = None
+
     def __init__(self, membership, params = None):
         """Constructor.
 
@@ -104,17 +108,17 @@ class Clustering(object):
         @raise IndexError: if the index is out of bounds"""
         if idx < 0 or idx >= self._len:
             raise IndexError("cluster index out of range")
-        return [i for i, e in enumerate(self._membership) if e == idx]
+        offsets, members = self._cluster_index()
+        return members[offsets[idx]:offsets[idx+1]]
 
     def __iter__(self):
         """Iterates over the clusters in this clustering.
 
         This method will return a generator that generates the clusters
         one by one."""
-        clusters = [[] for _ in xrange(self._len)]
-        for idx, cluster in enumerate(self._membership):
-            clusters[cluster].append(idx)
-        return iter(clusters)
+        offsets, members = self._cluster_index()
+        return (members[offsets[idx]:offsets[idx+1]]
+                for idx in xrange(self._len))
 
     def __len__(self):
         """Returns the number of clusters.
@@ -126,6 +130,35 @@ class Clustering(object):
     def __str__(self):
         return self.summary(verbosity=1, width=78)
 
+    def _cluster_index(self):
+        """Returns the members of all the clusters in a compressed form.
+
+        The index is built when it is first needed and it is cached
+        afterwards. It consists of two lists: the members of all the clusters
+        in increasing order of their cluster indices and the offsets of the
+        clusters in this list, such that the members of cluster M{i} are
+        C{members[offsets[i]:offsets[i+1]]}.
+
+        @return: the offsets and the members in a tuple"""
+        if self._index is None:
+            membership = self._membership
+            offsets = [0] * (self._len + 1)
+            for cluster in membership:
+                if cluster is not None:
+                    offsets[cluster + 1] += 1
+            for idx in xrange(self._len):
+                offsets[idx + 1] += offsets[idx]
+
+            members = [0] * offsets[-1]
+            positions = offsets[:-1]
+            for item, cluster in enumerate(membership):
+                if cluster is not None:
+                    members[positions[cluster]] = item
+                    positions[cluster] += 1
+
+            self._index = offsets, members
+        return self._index
+
     def as_cover(self):
         """Returns a L{Cover} that contains the same clusters as this clustering."""
         return Cover(self._graph, self)
@@ -141,9 +174,21 @@ class Clustering(object):
 
     @property
     def membership(self):
-        """Returns the membership vector."""
+        """Returns a copy of the membership vector.
+
+        @see: L{membership_view} for a read-only view that does not copy
+          the membership vector"""
         return self._membership[:]
 
+    @property
+    def membership_view(self):
+        """Returns the membership vector as a read-only L{ListView}.
+
+        The view reflects the membership vector of the clustering without
+        copying it, which is cheaper than L{membership} for large
+        clusterings when the vector is only read."""
+        return ListView(self._membership)
+
     @property
     def n(self):
         """Returns the number of elements covered by this clustering."""
@@ -154,7 +199,10 @@ class Clustering(object):
 
         @param idx: the cluster in which we are interested.
         """
-        return len(self[idx])
+        if idx < 0 or idx >= self._len:
+            raise IndexError("cluster index out of range")
+        offsets, _ = self._cluster_index()
+        return offsets[idx+1] - offsets[idx]
 
     def sizes(self, *args):
         """Returns the size of given clusters.
@@ -162,9 +210,8 @@ class Clustering(object):
         The indices are given as positional arguments. If there are no
         positional arguments, the function will return the sizes of all clusters.
         """
-        counts = [0] * len(self)
-        for x in self._membership:
-            counts[x] += 1
+        offsets, _ = self._cluster_index()
+        counts = [offsets[idx+1] - offsets[idx] for idx in xrange(self._len)]
 
         if args:
             return [counts[idx] for idx in args]
@@ -231,6 +278,9 @@ class VertexClustering(Clustering):
     # Allow None to be passed to __plot__ as the "palette" keyword argument
     _default_palette = None
 
+    # Per-cluster degree sums used by move(), see _ModularityState
+    _modularity_state = None
+
     def __init__(self, graph, membership = None, modularity = None, \
                  params = None, modularity_params = None):
         """Creates a clustering object for a given graph.
@@ -246,6 +296,7 @@ class VertexClustering(Clustering):
           L{Graph.modularity} when the modularity is (re)calculated. If the
           original graph was weighted, you should pass a dictionary
           containing a C{weight} key with the appropriate value here.
+          A C{resolution} key sets the resolution parameter.
         """
         if membership is None:
             Clustering.__init__(self, [0]*graph.vcount(), params)
@@ -343,18 +394,19 @@ class VertexClustering(Clustering):
           the number of edges between the members of those clusters in the
           original graph.
 
+        The graph is constructed directly from the membership list without
+        copying the original graph, so only the attributes of the clusters
+        and of the edges between them are combined.
+
         @return: the new graph.
         """
-        result = self.graph.copy()
-        result.contract_vertices(self.membership, combine_vertices)
-        if combine_edges != False:
-            result.simplify(combine_edges=combine_edges)
-        return result
+        return self._graph._cluster_graph(self._membership, combine_vertices,
+                                          combine_edges)
 
     def crossing(self):
         """Returns a boolean vector where element M{i} is C{True} iff edge
         M{i} lies between clusters, C{False} otherwise."""
-        membership = self.membership
+        membership = self._membership
         return [membership[v1] != membership[v2] \
                 for v1, v2 in self.graph.get_edgelist()]
 
@@ -381,11 +433,54 @@ class VertexClustering(Clustering):
 
         @return: the new modularity score
         """
+        self._modularity_state = None
         self._modularity = self._graph.modularity(self._membership,
                 **self._modularity_params)
         self._modularity_dirty = False
         return self._modularity
 
+    def move(self, vertex, cluster):
+        """Moves a vertex to another cluster and updates the modularity
+        score of the clustering.
+
+        The first call calculates the total internal edge weight and the
+        total strength of every cluster; these sums are then updated by
+        every move, so each move takes time proportional to the degree of
+        the moved vertex. The weights and the resolution parameter are taken
+        from the C{modularity_params} of the clustering. This allows local
+        refinement heuristics to evaluate the effect of single moves without
+        recalculating the modularity from scratch.
+
+        Clusters that become empty are kept, so the IDs of the other clusters
+        do not change.
+
+        @param vertex: the ID of the vertex to move
+        @param cluster: the index of the new cluster of the vertex. It may
+          be equal to the number of clusters to place the vertex in a new
+          cluster.
+        @return: the change of the modularity score caused by the move
+        @precondition: the graph hasn't been modified since the moment the
+          clustering was constructed or L{recalculate_modularity()} was
+          last called.
+        """
+        if cluster < 0 or cluster > self._len:
+            raise ValueError("cluster index out of range")
+
+        if self._modularity_state is None:
+            if self._modularity_dirty:
+                self.recalculate_modularity()
+            params = self._modularity_params
+            self._modularity_state = _ModularityState(self._graph,
+                    self._membership, params.get("weights"),
+                    params.get("resolution", 1))
+
+        delta = self._modularity_state.move(self._membership, vertex, cluster)
+        if cluster == self._len:
+            self._len += 1
+        self._index = None
+        self._modularity += delta
+        return delta
+
     def _recalculate_modularity_safe(self):
         """Recalculates the stored modularity value and swallows all exceptions
         raised by the modularity function (if any).
@@ -400,41 +495,51 @@ class VertexClustering(Clustering):
         finally:
             self._modularity_dirty = False
 
-    def subgraph(self, idx):
+    def subgraph(self, idx, view=False):
         """Get the subgraph belonging to a given cluster.
 
         @param idx: the cluster index
-        @return: a copy of the subgraph
+        @param view: whether to return a read-only L{GraphView} of the
+          subgraph instead of a copy
+        @return: a copy or a view of the subgraph
         @precondition: the vertex set of the graph hasn't been modified since
           the moment the clustering was constructed.
         """
+        if view:
+            return GraphView(self._graph, self[idx])
         return self._graph.subgraph(self[idx])
 
 
-    def subgraphs(self):
+    def subgraphs(self, view=False):
         """Gets all the subgraphs belonging to each of the clusters.
 
-        @return: a list containing copies of the subgraphs
+        @param view: whether to return read-only L{GraphView}s of the
+          subgraphs instead of copies
+        @return: a list containing copies or views of the subgraphs
         @precondition: the vertex set of the graph hasn't been modified since
           the moment the clustering was constructed.
         """
+        if view:
+            return [GraphView(self._graph, cl) for cl in self]
         return [self._graph.subgraph(cl) for cl in self]
 
 
-    def giant(self):
+    def giant(self, view=False):
         """Returns the giant community of the clustered graph.
 
         The giant component a community for which no larger community exists.
         @note: there can be multiple giant communities, this method will return
           the copy of an arbitrary one if there are multiple giant communities.
 
-        @return: a copy of the giant community.
+        @param view: whether to return a read-only L{GraphView} of the
+          giant community instead of a copy
+        @return: a copy or a view of the giant community.
         @precondition: the vertex set of the graph hasn't been modified since
           the moment the clustering was constructed.
         """
         ss = self.sizes()
         max_size = max(ss)
-        return self.subgraph(ss.index(max_size))
+        return self.subgraph(ss.index(max_size), view)
 
     def __plot__(self, context, bbox, palette, *args, **kwds):
         """Plots the clustering to the given Cairo context in the given
@@ -598,25 +703,31 @@ class Dendrogram(object):
         they should be drawn so that no edges cross each other.
 
         @return: the result of the inorder traversal in a list."""
-        result = []
-        seen_nodes = set()
+        # The roots are the nodes that are not merged into anything else.
+        # They are traversed from the last one with an explicit stack, so
+        # large dendrograms do not hit the recursion limit, and a bytearray
+        # marks the merged nodes instead of a set of all the nodes seen
+        nitems = self._nitems
+        merged = bytearray(nitems + self._nmerges)
+        for i, j in self._merges:
+            merged[i] = merged[j] = 1
 
-        for node_index in reversed(xrange(self._nitems+self._nmerges)):
-            if node_index in seen_nodes:
+        result = []
+        for root in reversed(xrange(nitems + self._nmerges)):
+            if merged[root]:
                 continue
 
-            stack = [node_index]
+            stack = [root]
             while stack:
                 last = stack.pop()
-                seen_nodes.add(last)
-                if last < self._nitems:
+                if last < nitems:
                     # 'last' is a regular node so the traversal ends here, we
                     # can append it to the results
                     result.append(last)
                 else:
                     # 'last' is a merge node, so let us proceed with the entry
                     # where this merge node was created
-                    stack.extend(self._merges[last-self._nitems])
+                    stack.extend(self._merges[last-nitems])
 
         return result
 
@@ -947,11 +1058,13 @@ class VertexDendrogram(Dendrogram):
         @param modularity_params: arguments that should be passed to
           L{Graph.modularity} when the modularity is (re)calculated. If the
           original graph was weighted, you should pass a dictionary
-          containing a C{weight} key with the appropriate value here.
+          containing a C{weight} key with the appropriate value here. A
+          C{resolution} key sets the resolution parameter.
         """
         Dendrogram.__init__(self, merges)
         self._graph = graph
         self._optimal_count = optimal_count
+        self._modularities = None
         if modularity_params is None:
             self._modularity_params = {}
         else:
@@ -971,13 +1084,48 @@ class VertexDendrogram(Dendrogram):
         """
         if n is None:
             n = self.optimal_count
+        return self.as_clusterings([n])[0]
+
+    def as_clusterings(self, counts):
+        """Cuts the dendrogram at multiple levels and returns the corresponding
+        L{VertexClustering} objects.
+
+        The merges are replayed only once for all the levels, so this is
+        much faster than calling L{as_clustering()} for every level of a
+        large dendrogram.
+
+        @param counts: the desired numbers of clusters. Each of them is
+          treated the same way as the argument of L{as_clustering()}.
+        @return: a list of new L{VertexClustering} objects, one for each
+          number of clusters, in the order of C{counts}.
+        """
+        import igraph._igraph
+
         num_elts = self._graph.vcount()
-        idgen = UniqueIdGenerator()
-        membership = community_to_membership(self._merges, num_elts, \
-                                             num_elts - n)
-        membership = [idgen[m] for m in membership]
-        return VertexClustering(self._graph, membership,
-                modularity_params=self._modularity_params)
+        steps = [min(max(num_elts - n, 0), self._nmerges) for n in counts]
+        memberships = igraph._igraph._dendrogram_cuts(self._merges,
+                                                      num_elts, steps)
+        qs = self._modularities
+        return [VertexClustering(self._graph, membership,
+                                 None if qs is None else qs[step],
+                                 modularity_params=self._modularity_params)
+                for membership, step in izip(memberships, steps)]
+
+    def modularities(self):
+        """Returns the modularity of every level of the dendrogram.
+
+        The modularity is updated incrementally while the merges are
+        replayed once, instead of being calculated from scratch for every
+        level. The result is cached.
+
+        @return: a list whose M{i}th element is the modularity after the
+          first M{i} merges, i.e. when there are M{n-i} clusters where M{n}
+          is the number of vertices.
+        """
+        if self._modularities is None:
+            self._modularities = self._graph._modularity_sweep(self._merges,
+                    **self._modularity_params)
+        return list(self._modularities)
 
     @property
     def optimal_count(self):
@@ -992,13 +1140,12 @@ class VertexDendrogram(Dendrogram):
             return self._optimal_count
 
         n = self._graph.vcount()
+        qs = self.modularities()
         max_q, optimal_count = 0, 1
-        for step in xrange(min(n-1, len(self._merges))):
-            membs = community_to_membership(self._merges, n, step)
-            q = self._graph.modularity(membs, **self._modularity_params)
-            if q > max_q:
+        for step in xrange(len(qs)):
+            if qs[step] > max_q:
                 optimal_count = n-step
-                max_q = q
+                max_q = qs[step]
         self._optimal_count = optimal_count
         return optimal_count
 
@@ -1086,9 +1233,12 @@ class Cover(object):
       >>> list(clustering) == list(cover)
       True
 
-    @undocumented: _formatted_cluster_iterator
+    @undocumented: _formatted_cluster_iterator, _membership_index
     """
 
+    # Compressed inverted index of the clusters, see _membership_index()
+    _index = None
+
     def __init__(self, clusters, n=0):
         """Constructs a cover with the given clusters.
 
@@ -1127,6 +1277,34 @@ class Cover(object):
         """Returns a string representation of the cover."""
         return self.summary(verbosity=1, width=78)
 
+    def _membership_index(self):
+        """Returns the cluster indices of all the items in a compressed form.
+
+        The index is built when it is first needed and it is cached
+        afterwards. It consists of two lists: the cluster indices of all the
+        items in increasing order of the items and the offsets of the items
+        in this list, such that the clusters of item M{i} are
+        C{clusters[offsets[i]:offsets[i+1]]}.
+
+        @return: the offsets and the cluster indices in a tuple"""
+        if self._index is None:
+            offsets = [0] * (self._n + 1)
+            for cluster in self._clusters:
+                for item in cluster:
+                    offsets[item + 1] += 1
+            for item in xrange(self._n):
+                offsets[item + 1] += offsets[item]
+
+            clusters = [0] * offsets[-1]
+            positions = offsets[:-1]
+            for idx, cluster in enumerate(self._clusters):
+                for item in cluster:
+                    clusters[positions[item]] = idx
+                    positions[item] += 1
+
+            self._index = offsets, clusters
+        return self._index
+
     @property
     def membership(self):
         """Returns the membership vector of this cover.
@@ -1135,11 +1313,9 @@ class Cover(object):
         length I{n}, where element I{i} contains the cluster indices of the
         I{i}th item.
         """
-        result = [[] for _ in xrange(self._n)]
-        for idx, cluster in enumerate(self):
-            for item in cluster:
-                result[item].append(idx)
-        return result
+        offsets, clusters = self._membership_index()
+        return [clusters[offsets[item]:offsets[item+1]]
+                for item in xrange(self._n)]
 
     @property
     def n(self):
@@ -1238,7 +1414,9 @@ class VertexCover(Cover):
     def crossing(self):
         """Returns a boolean vector where element M{i} is C{True} iff edge
         M{i} lies between clusters, C{False} otherwise."""
-        membership = [frozenset(cluster) for cluster in self.membership]
+        offsets, clusters = self._membership_index()
+        membership = [frozenset(clusters[offsets[item]:offsets[item+1]])
+                      for item in xrange(self._n)]
         return [membership[v1].isdisjoint(membership[v2]) \
                 for v1, v2 in self.graph.get_edgelist()]
 
@@ -1466,6 +1644,83 @@ class CohesiveBlocks(VertexCover):
 
         return VertexCover.__plot__(self, context, bbox, palette, *args, **kwds)
 
+class _ModularityState(object):
+    """Internal and total degree sums of the clusters of a L{VertexClustering}
+    that allow updating its modularity when a single vertex is moved.
+
+    The modularity with resolution M{gamma} is the sum of
+    M{in_c/(2m) - gamma*(tot_c/(2m))^2} over the clusters, where M{in_c} is
+    twice the total weight of the edges within cluster M{c} and M{tot_c}
+    is the total strength of its vertices.
+    """
+
+    def __init__(self, graph, membership, weights=None, resolution=1):
+        if graph.is_directed():
+            raise ValueError("modularity is defined for undirected graphs")
+        if isinstance(weights, basestring):
+            weights = graph.es[weights]
+
+        self.edges = graph.get_edgelist()
+        self.inclist = graph.get_inclist()
+        self.weights = weights
+        self.resolution = resolution
+        self.strength = graph.strength(weights=weights, loops=True)
+        self.total_strength = float(sum(self.strength))
+
+        n = max(membership) + 1 if membership else 0
+        self.internal = [0.0] * n
+        self.total = [0.0] * n
+        if weights is None:
+            weights = [1] * len(self.edges)
+        for (source, target), weight in izip(self.edges, weights):
+            if membership[source] == membership[target]:
+                self.internal[membership[source]] += 2 * weight
+        for vertex, value in enumerate(self.strength):
+            self.total[membership[vertex]] += value
+
+    def term(self, cluster):
+        """Returns the contribution of the given cluster to the modularity."""
+        if not self.total_strength:
+            return 0.0
+        return self.internal[cluster] / self.total_strength - \
+                self.resolution * (self.total[cluster] / self.total_strength) ** 2
+
+    def move(self, membership, vertex, cluster):
+        """Moves the given vertex to the given cluster, updates the membership
+        list and the sums, and returns the change of the modularity."""
+        old = membership[vertex]
+        if old == cluster:
+            return 0.0
+        if cluster == len(self.total):
+            self.internal.append(0.0)
+            self.total.append(0.0)
+
+        before = self.term(old) + self.term(cluster)
+
+        edges, weights = self.edges, self.weights
+        to_old, to_new, loops = 0.0, 0.0, 0.0
+        for edge in self.inclist[vertex]:
+            source, target = edges[edge]
+            other = target if source == vertex else source
+            weight = 1 if weights is None else weights[edge]
+            if other == vertex:
+                # Loop edges appear twice in the incidence list
+                loops += weight
+            elif membership[other] == old:
+                to_old += weight
+            elif membership[other] == cluster:
+                to_new += weight
+
+        value = self.strength[vertex]
+        self.internal[old] -= 2 * to_old + loops
+        self.internal[cluster] += 2 * to_new + loops
+        self.total[old] -= value
+        self.total[cluster] += value
+        membership[vertex] = cluster
+
+        return self.term(old) + self.term(cluster) - before
+
+
 def _handle_mark_groups_arg_for_clustering(mark_groups, clustering):
     """Handles the mark_groups=... keyword argument in plotting methods of
     clusterings.
@@ -1536,9 +1791,7 @@ def _prepare_community_comparison(comm1, comm2, remove_none=False):
       compared.
     """
     def _ensure_list(obj):
-        if isinstance(obj, Clustering):
-            return obj.membership
-        return list(obj)
+        return list(obj.membership if isinstance(obj, Clustering) else obj)
 
     vec1, vec2 = _ensure_list(comm1), _ensure_list(comm2)
     if len(vec1) != len(vec2):
@@ -1604,6 +1857,55 @@ def compare_communities(comm1, comm2, method="vi", remove_none=False):
     return igraph._igraph._compare_communities(vec1, vec2, method)
 
 
+def compare_communities_matrix(partitions, method="vi", remove_none=False,
+                               threads=None):
+    """Compares every pair of the given community structures using one of
+    the distance measures of L{compare_communities()}.
+
+    Every community structure is converted only once to a compact
+    membership array, and the pairs are compared by native threads. This
+    is much faster than calling L{compare_communities()} for every pair
+    when there are many community structures to compare.
+
+    @param partitions: the community structures as membership lists or
+      L{Clustering} objects. All of them must be defined on the same set.
+    @param method: the measure to use; see L{compare_communities()} for the
+      possible values. C{"split-join"} gives the sum of the two projection
+      distances returned by L{split_join_distance()}.
+    @param remove_none: whether to remove C{None} entries from the membership
+      lists. If C{remove_none} is C{False}, a C{None} entry in any of the
+      community structures will result in an exception. If C{remove_none}
+      is C{True}, the elements that are C{None} in at least one of the
+      community structures are left out from all of them.
+    @param threads: the number of threads to use. C{None} means the number
+      of CPUs.
+
+    @return: the measures between all pairs of community structures in a
+      symmetric L{Matrix}. Row and column M{i} belong to the M{i}th
+      community structure.
+    """
+    import igraph._igraph
+
+    partitions = [list(obj.membership if isinstance(obj, Clustering) else obj)
+                  for obj in partitions]
+    if remove_none:
+        if len(set(len(vec) for vec in partitions)) > 1:
+            raise ValueError("the membership vectors must be equal in length")
+        idxs_to_keep = [i for i, values in enumerate(izip(*partitions))
+                        if None not in values]
+        partitions = [[vec[i] for i in idxs_to_keep] for vec in partitions]
+
+    if threads is None:
+        try:
+            from multiprocessing import cpu_count
+            threads = cpu_count()
+        except (ImportError, NotImplementedError):
+            threads = 1
+
+    return Matrix(igraph._igraph._compare_communities_matrix(partitions,
+                                                             method, threads))
+
+
 def split_join_distance(comm1, comm2, remove_none=False):
     """Calculates the split-join distance between two community structures.
 
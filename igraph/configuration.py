@@ -132,6 +132,13 @@ class Configuration(object):
     These settings specify the default values used by plotting functions.
     They are all stored in section C{plotting}.
 
+        - B{fast_min_size}: size of the smallest arrowhead or label (in
+          pixels) that is still drawn when a graph is plotted in fast mode.
+          Default: 4.
+
+        - B{fast_threshold}: the total number of vertices and edges above
+          which graphs are plotted in fast mode. Default: 100000.
+
         - B{layout}: default graph layout algorithm to be used.
 
         - B{mark_groups}: whether to mark the clusters by polygons when
@@ -252,6 +259,14 @@ class Configuration(object):
             "default": get_platform_image_viewer()
         },
 
+        "plotting.fast_min_size": {
+            "default": 4.0,
+            "type": "float"
+        },
+        "plotting.fast_threshold": {
+            "default": 100000,
+            "type": "int"
+        },
         "plotting.layout": {
             "default": "auto"
         },
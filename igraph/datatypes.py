@@ -652,6 +652,88 @@ class TriadCensus(tuple):
         return "\n".join(result)
 
 
+class ListView(object):
+    """Read-only view of a list.
+
+    The view reflects the current contents of the underlying list without
+    copying it, but it cannot be used to modify the list. Views compare
+    equal to lists (and to other views) with the same items, and they can
+    be passed anywhere where igraph expects a list of numbers:
+
+      >>> data = [0, 0, 1]
+      >>> view = ListView(data)
+      >>> view == [0, 0, 1]
+      True
+      >>> data[2] = 2
+      >>> view
+      [0, 0, 2]
+      >>> view[2] = 1
+      Traceback (most recent call last):
+        ...
+      TypeError: 'ListView' object does not support item assignment
+
+    Slicing a view or adding a list to it returns a new list.
+    """
+
+    __slots__ = ("_data", )
+
+    def __init__(self, data):
+        """Creates a view of the given list."""
+        self._data = data
+
+    def __add__(self, other):
+        return self._data + list(other)
+
+    def __contains__(self, item):
+        return item in self._data
+
+    def __eq__(self, other):
+        if isinstance(other, ListView):
+            other = other._data
+        if isinstance(other, list):
+            return self._data == other
+        return NotImplemented
+
+    def __getitem__(self, idx):
+        return self._data[idx]
+
+    def __iter__(self):
+        return iter(self._data)
+
+    def __len__(self):
+        return len(self._data)
+
+    def __ne__(self, other):
+        result = self.__eq__(other)
+        if result is NotImplemented:
+            return result
+        return not result
+
+    def __radd__(self, other):
+        return list(other) + self._data
+
+    def __reduce__(self):
+        return ListView, (list(self._data), )
+
+    def __repr__(self):
+        return repr(self._data)
+
+    def __reversed__(self):
+        return reversed(self._data)
+
+    __hash__ = None
+
+    def count(self, item):
+        """Returns the number of occurrences of the given item."""
+        return self._data.count(item)
+
+    def index(self, item, *args):
+        """Returns the index of the first occurrence of the given item.
+        Additional arguments limit the search to a slice of the view the
+        same way as for lists."""
+        return self._data.index(item, *args)
+
+
 class UniqueIdGenerator(object):
     """A dictionary-like class that can be used to assign unique IDs to
     names (say, vertex names).
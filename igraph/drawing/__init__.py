@@ -28,10 +28,12 @@ from igraph.compat import property, BytesIO
 from igraph.configuration import Configuration
 from igraph.drawing.colors import Palette, palettes
 from igraph.drawing.graph import DefaultGraphDrawer
+from igraph.drawing.tiles import TileRenderer
 from igraph.drawing.utils import BoundingBox, Point, Rectangle, find_cairo
 from igraph.utils import _is_running_in_ipython, named_temporary_file
 
-__all__ = ["BoundingBox", "DefaultGraphDrawer", "Plot", "Point", "Rectangle", "plot"]
+__all__ = ["BoundingBox", "DefaultGraphDrawer", "Plot", "Point", "Rectangle",
+           "TileRenderer", "plot"]
 
 __license__ = "GPL"
 
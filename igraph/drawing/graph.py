@@ -15,7 +15,7 @@ network from Cytoscape and convert it to igraph format.
 
 from collections import defaultdict
 from itertools import izip
-from math import atan2, cos, pi, sin, tan
+from math import atan2, cos, hypot, pi, sin, sqrt, tan
 from warnings import warn
 
 from igraph._igraph import convex_hull, VertexSeq
@@ -28,7 +28,7 @@ from igraph.drawing.edge import ArrowEdgeDrawer
 from igraph.drawing.text import TextAlignment, TextDrawer
 from igraph.drawing.metamagic import AttributeCollectorBase
 from igraph.drawing.shapes import PolygonDrawer
-from igraph.drawing.utils import find_cairo, Point
+from igraph.drawing.utils import BoundingBox, find_cairo, Point
 from igraph.drawing.vertex import DefaultVertexDrawer
 from igraph.layout import Layout
 
@@ -77,7 +77,7 @@ class AbstractGraphDrawer(AbstractDrawer):
         caller.
         """
         if isinstance(layout, Layout):
-            layout = Layout(layout.coords)
+            layout = layout.copy()
         elif isinstance(layout, str) or layout is None:
             layout = graph.layout(layout)
         else:
@@ -211,6 +211,278 @@ class DefaultGraphDrawer(AbstractCairoGraphDrawer):
 
         return vertex_order
 
+    def _use_fast_mode(self, graph, kwds):
+        """Returns whether the graph should be drawn in fast mode, assuming
+        that the relevant keyword argument (C{fast}) is given in C{kwds} as a
+        dictionary. If C{fast} is not given, the fast mode is used for large
+        graphs, but only if the default vertex and edge drawers are in use."""
+        fast = kwds.get("fast")
+        if fast is not None:
+            return bool(fast)
+
+        if self.vertex_drawer_factory is not DefaultVertexDrawer or \
+                self.edge_drawer_factory is not ArrowEdgeDrawer:
+            return False
+
+        threshold = Configuration.instance()["plotting.fast_threshold"]
+        return graph.vcount() + graph.ecount() >= threshold
+
+    def _determine_viewport(self, kwds):
+        """Returns the visible part of the drawing area as a L{BoundingBox},
+        assuming that the relevant keyword argument (C{viewport}) is given in
+        C{kwds} as a dictionary. C{True} means the clip region of the Cairo
+        context. Returns C{None} if the whole graph has to be drawn."""
+        viewport = kwds.get("viewport")
+        if viewport is None or viewport is False:
+            return None
+        if viewport is True:
+            viewport = self.context.clip_extents()
+        return BoundingBox(viewport)
+
+    @staticmethod
+    def _column_max(builder, attr_name):
+        """Returns the largest absolute value of the given visual attribute
+        in the given builder, or zero if the builder does not know the
+        attribute or all its values are C{None}. The column of the attribute
+        is not collected."""
+        try:
+            return builder.get_max(attr_name)
+        except AttributeError:
+            return 0.
+
+    def _label_extent(self, builder):
+        """Returns an upper bound on the distance that a label in the given
+        builder extends from its anchor point, or C{None} if there are no
+        labels at all. The width of a character is assumed to be at most
+        the font size."""
+        length = builder.get_max_length("label")
+        if length is None:
+            return None
+        return self._column_max(builder, "label_size") * max(length, 1)
+
+    def _cull_margins(self, vertex_builder, edge_builder):
+        """Determines how much the viewport has to be grown to make sure that
+        no vertex, edge or label that overlaps the viewport is culled.
+
+        The margins are derived from the largest vertex size, edge width,
+        arrowhead, curvature and label size, in the unit of the Cairo
+        context.
+
+        @return: the margin for vertices, vertex labels and edges, the margin
+          for edge labels and the bend of the edges, i.e. the distance of a
+          curved edge from the straight line between its endpoints relative
+          to the length of the edge. The margins for labels are C{None} if
+          there are no labels."""
+        max_size = self._column_max(vertex_builder, "size")
+        # Square and rectangle shapes reach beyond the inscribed circle of
+        # the vertex at their corners
+        vertex_margin = max_size * sqrt(2) / 2. + \
+                self._column_max(vertex_builder, "frame_width")
+
+        extent = self._label_extent(vertex_builder)
+        if extent is not None:
+            extent += max_size / 2. * \
+                    max(self._column_max(vertex_builder, "label_dist"), 1.)
+        vertex_label_margin = extent
+
+        edge_margin = 1.5 * max_size + \
+                self._column_max(edge_builder, "width") / 2. + \
+                15. * self._column_max(edge_builder, "arrow_size")
+        extent = self._label_extent(edge_builder)
+        if extent is not None:
+            extent += edge_margin
+        edge_label_margin = extent
+
+        bend = self._column_max(edge_builder, "curved") / 2.
+
+        return vertex_margin, vertex_label_margin, edge_margin, \
+               edge_label_margin, bend
+
+    def _cull(self, graph, layout, viewport, vertex_builder, edge_builder):
+        """Determines which vertices, edges and labels have to be drawn in
+        the given viewport.
+
+        The vertices are looked up in the spatial index of the layout and
+        the edges are tested against the viewport in native code. The
+        viewport is grown by the margins returned by L{_cull_margins()},
+        which do not collect the visual attributes of the builders.
+
+        @return: the sorted lists of the indices of the vertices, the
+          vertex labels, the edges and the edge labels to be drawn"""
+        lower, upper = viewport.coords[:2], viewport.coords[2:]
+        index = layout.spatial_index()
+        vertex_margin, vertex_label_margin, edge_margin, edge_label_margin, \
+                bend = self._cull_margins(vertex_builder, edge_builder)
+
+        def vertices_near(margin):
+            if margin is None:
+                return []
+            return index.within_box((lower[0]-margin, lower[1]-margin),
+                                    (upper[0]+margin, upper[1]+margin))
+
+        def edges_near(margin):
+            if margin is None:
+                return []
+            return graph._edges_in_box(layout.array, lower, upper, margin,
+                                       bend)
+
+        return vertices_near(vertex_margin), \
+               vertices_near(vertex_label_margin), \
+               edges_near(edge_margin), edges_near(edge_label_margin)
+
+    @staticmethod
+    def _restrict_order(order, visible):
+        """Restricts the given drawing order of vertices or edges to the
+        given sorted list of visible indices. C{None} as an order means the
+        natural order of the indices."""
+        if order is None:
+            return visible
+        visible = set(visible)
+        return [idx for idx in order if idx in visible]
+
+    @staticmethod
+    def _group_by_style(indices, builder, style, keep_order):
+        """Groups the given vertex or edge indices by the visual style returned
+        by the I{style} function for the corresponding items of I{builder}.
+
+        When I{keep_order} is C{True}, only consecutive items are grouped
+        together so the drawing order of the items is kept intact. Returns a
+        list of style-list pairs where each list contains index-visual item
+        pairs."""
+        groups, result = {}, []
+        last_key = object()
+        for idx in indices:
+            item = builder[idx]
+            key = style(item)
+            if keep_order:
+                if key != last_key:
+                    last_key = key
+                    result.append((key, []))
+                result[-1][1].append((idx, item))
+            else:
+                group = groups.get(key)
+                if group is None:
+                    group = groups[key] = []
+                    result.append((key, group))
+                group.append((idx, item))
+        return result
+
+    def _draw_edges_fast(self, graph, edge_builder, vertex_builder, layout,
+            edge_order, min_size, keep_order=None):
+        """Draws the edges of the given graph in fast mode.
+
+        Edges with the same color and width are drawn as a single Cairo path,
+        followed by a single filled path for their arrowheads. Arrowheads that
+        would be smaller than I{min_size} (in the unit of the Cairo context)
+        are skipped. When the order of the edges has to be kept (which is the
+        default if an explicit edge order is given), only consecutive edges
+        are batched."""
+        context = self.context
+        directed = graph.is_directed()
+        if keep_order is None:
+            keep_order = edge_order is not None
+        if edge_order is None:
+            edgelist = graph.get_edgelist()
+            edge_order = xrange(len(edgelist))
+        else:
+            edgelist = dict((edge.index, edge.tuple)
+                            for edge in graph.es.select(edge_order))
+
+        groups = self._group_by_style(edge_order, edge_builder,
+                lambda edge: (edge.color, edge.width), keep_order)
+        for (color, width), edges in groups:
+            arrowheads = []
+            for idx, visual_edge in edges:
+                src, dest = edgelist[idx]
+                (x1, y1), (x2, y2) = layout[src], layout[dest]
+
+                if src == dest:
+                    # Loop edges are drawn as small circles
+                    radius = vertex_builder[src].size * 1.5
+                    context.new_sub_path()
+                    context.arc(x1 + cos(pi/4) * radius / 2.,
+                                y1 - sin(pi/4) * radius / 2.,
+                                radius / 2., 0, pi * 2)
+                    continue
+
+                context.move_to(x1, y1)
+                curved = visual_edge.curved
+                if curved:
+                    aux1 = (2*x1+x2) / 3.0 - curved * 0.5 * (y2-y1), \
+                           (2*y1+y2) / 3.0 + curved * 0.5 * (x2-x1)
+                    aux2 = (x1+2*x2) / 3.0 - curved * 0.5 * (y2-y1), \
+                           (y1+2*y2) / 3.0 + curved * 0.5 * (x2-x1)
+                    context.curve_to(aux1[0], aux1[1], aux2[0], aux2[1], x2, y2)
+                else:
+                    context.line_to(x2, y2)
+
+                if not directed:
+                    continue
+
+                arrow_size = 15. * visual_edge.arrow_size
+                if arrow_size < min_size:
+                    continue
+
+                # The arrowhead points from the last control point of the
+                # curve (or the source vertex) towards the target vertex
+                if curved:
+                    x1, y1 = aux2
+                angle = atan2(y2 - y1, x2 - x1)
+                dest_vertex = vertex_builder[dest]
+                if curved:
+                    radius = dest_vertex.size / 2.0
+                    x, y = x2 - radius * cos(angle), y2 - radius * sin(angle)
+                else:
+                    x, y = dest_vertex.shape.intersection_point(
+                            x2, y2, x1, y1, dest_vertex.size)
+                arrow_width = pi / (10. / visual_edge.arrow_width)
+                arrowheads.append((x, y,
+                    x - arrow_size * cos(angle - arrow_width),
+                    y - arrow_size * sin(angle - arrow_width),
+                    x - arrow_size * cos(angle + arrow_width),
+                    y - arrow_size * sin(angle + arrow_width)))
+
+            context.set_source_rgba(*color)
+            context.set_line_width(width)
+            context.stroke()
+
+            if arrowheads:
+                for x, y, ax1, ay1, ax2, ay2 in arrowheads:
+                    context.move_to(x, y)
+                    context.line_to(ax1, ay1)
+                    context.line_to(ax2, ay2)
+                    context.close_path()
+                context.fill()
+
+    def _draw_vertices_fast(self, graph, vertex_builder, layout, vertex_order,
+            keep_order=None):
+        """Draws the vertices of the given graph in fast mode.
+
+        Vertices with the same shape, color and frame are drawn as a single
+        Cairo path that is filled and stroked only once. When the order of
+        the vertices has to be kept (which is the default if an explicit
+        vertex order is given), only consecutive vertices are batched."""
+        context = self.context
+        if keep_order is None:
+            keep_order = vertex_order is not None
+        if vertex_order is None:
+            vertex_order = xrange(graph.vcount())
+
+        groups = self._group_by_style(vertex_order, vertex_builder,
+                lambda vertex: (vertex.shape, vertex.color,
+                                vertex.frame_color, vertex.frame_width),
+                keep_order)
+        for (shape, color, frame_color, frame_width), vertices in groups:
+            for idx, visual_vertex in vertices:
+                x, y = layout[idx]
+                context.new_sub_path()
+                shape.draw_path(context, x, y, visual_vertex.size)
+            context.set_source_rgba(*color)
+            context.fill_preserve()
+            context.set_source_rgba(*frame_color)
+            context.set_line_width(frame_width)
+            context.stroke()
+
     # pylint: disable-msg=W0142,W0221,E1101
     # W0142: Used * or ** magic
     # W0221: argument number differs from overridden method
@@ -220,8 +492,15 @@ class DefaultGraphDrawer(AbstractCairoGraphDrawer):
         directed = graph.is_directed()
         context = self.context
 
-        # Calculate/get the layout of the graph
-        layout = self.ensure_layout(kwds.get("layout", None), graph)
+        # Calculate/get the layout of the graph. If only a part of a given
+        # layout is drawn without fitting it, its spatial index is built
+        # before the layout is copied so the copy and the next drawings
+        # of the same layout share it
+        layout = kwds.get("layout", None)
+        if isinstance(layout, Layout) and not kwds.get("fit_layout", True) \
+                and kwds.get("viewport") not in (None, False):
+            layout.spatial_index()
+        layout = self.ensure_layout(layout, graph)
 
         # Determine the size of the margin on each side
         margin = kwds.get("margin", 0)
@@ -234,14 +513,15 @@ class DefaultGraphDrawer(AbstractCairoGraphDrawer):
 
         # Contract the drawing area by the margin and fit the layout
         bbox = self.bbox.contract(margin)
-        layout.fit_into(bbox, keep_aspect_ratio=kwds.get("keep_aspect_ratio", False))
+        if kwds.get("fit_layout", True):
+            layout.fit_into(bbox,
+                    keep_aspect_ratio=kwds.get("keep_aspect_ratio", False))
 
         # Decide whether we need to calculate the curvature of edges
         # automatically -- and calculate them if needed.
         autocurve = kwds.get("autocurve", None)
         if autocurve or (autocurve is None and \
-                "edge_curved" not in kwds and "curved" not in graph.edge_attributes() \
-                and graph.ecount() < 10000):
+                "edge_curved" not in kwds and "curved" not in graph.edge_attributes()):
             from igraph import autocurve
             default = kwds.get("edge_curved", 0)
             if default is True:
@@ -258,10 +538,48 @@ class DefaultGraphDrawer(AbstractCairoGraphDrawer):
         # provided by the vertex_drawer and the edge_drawer
         vertex_builder = vertex_drawer.VisualVertexBuilder(graph.vs, kwds)
         edge_builder = edge_drawer.VisualEdgeBuilder(graph.es, kwds)
+        group_vertex_builder = vertex_builder
 
         # Determine the order in which we will draw the vertices and edges
         vertex_order = self._determine_vertex_order(graph, kwds)
         edge_order   = self._determine_edge_order(graph, kwds)
+        keep_vertex_order = vertex_order is not None
+        keep_edge_order = edge_order is not None
+
+        # Skip the vertices, edges and labels outside the viewport (if any)
+        viewport = self._determine_viewport(kwds)
+        if viewport is None:
+            vertex_label_order, edge_label_order = vertex_order, edge_order
+        else:
+            vertices, vertex_labels, edges, edge_labels = self._cull(graph,
+                    layout, viewport, vertex_builder, edge_builder)
+            vertex_label_order = self._restrict_order(vertex_order,
+                                                      vertex_labels)
+            edge_label_order = self._restrict_order(edge_order, edge_labels)
+            vertex_order = self._restrict_order(vertex_order, vertices)
+            edge_order = self._restrict_order(edge_order, edges)
+
+            # Collect the visual attributes of the visible items only; the
+            # endpoints of the visible edges are needed to draw the edges
+            edges = sorted(set(edges).union(edge_labels))
+            vertices = set(vertices)
+            vertices.update(vertex_labels)
+            if edges:
+                for edge in graph.es.select(edges):
+                    vertices.update(edge.tuple)
+            vertex_builder = vertex_drawer.VisualVertexBuilder(graph.vs, kwds,
+                                                               sorted(vertices))
+            edge_builder = edge_drawer.VisualEdgeBuilder(graph.es, kwds, edges)
+
+        # Decide whether to use the fast rendering mode. In this mode,
+        # arrowheads and labels smaller than a given number of pixels are
+        # not drawn at all.
+        fast = self._use_fast_mode(graph, kwds)
+        if fast:
+            min_size = Configuration.instance()["plotting.fast_min_size"]
+            min_size /= hypot(*context.user_to_device_distance(1, 0))
+        else:
+            min_size = 0
 
         # Draw the highlighted groups (if any)
         if "mark_groups" in kwds:
@@ -297,7 +615,8 @@ class DefaultGraphDrawer(AbstractCairoGraphDrawer):
                 hull = [group[i] for i in convex_hull([layout[idx] for idx in group])]
 
                 # Calculate the preferred rounding radius for the corners
-                corner_radius = 1.25 * max(vertex_builder[idx].size for idx in hull)
+                corner_radius = 1.25 * max(group_vertex_builder[idx].size
+                                           for idx in hull)
 
                 # Construct the polygon
                 polygon = [layout[idx] for idx in hull]
@@ -323,40 +642,48 @@ class DefaultGraphDrawer(AbstractCairoGraphDrawer):
                 context.set_source_rgba(*color)
                 context.stroke()
 
-        # Construct the iterator that we will use to draw the edges
-        es = graph.es
-        if edge_order is None:
-            # Default edge order
-            edge_coord_iter = izip(es, edge_builder)
-        else:
-            # Specified edge order
-            edge_coord_iter = ((es[i], edge_builder[i]) for i in edge_order)
-
-        # Draw the edges
-        if directed:
-            drawer_method = edge_drawer.draw_directed_edge
+        if fast:
+            # Draw the edges and the vertices in batches
+            self._draw_edges_fast(graph, edge_builder, vertex_builder, layout,
+                    edge_order, min_size, keep_edge_order)
+            context.set_line_width(1)
+            self._draw_vertices_fast(graph, vertex_builder, layout,
+                    vertex_order, keep_vertex_order)
         else:
-            drawer_method = edge_drawer.draw_undirected_edge
-        for edge, visual_edge in edge_coord_iter:
-            src, dest = edge.tuple
-            src_vertex, dest_vertex = vertex_builder[src], vertex_builder[dest]
-            drawer_method(visual_edge, src_vertex, dest_vertex)
+            # Construct the iterator that we will use to draw the edges
+            es = graph.es
+            if edge_order is None:
+                # Default edge order
+                edge_coord_iter = izip(es, edge_builder)
+            else:
+                # Specified edge order
+                edge_coord_iter = ((es[i], edge_builder[i]) for i in edge_order)
 
-        # Construct the iterator that we will use to draw the vertices
-        vs = graph.vs
-        if vertex_order is None:
-            # Default vertex order
-            vertex_coord_iter = izip(vs, vertex_builder, layout)
-        else:
-            # Specified vertex order
-            vertex_coord_iter = ((vs[i], vertex_builder[i], layout[i])
-                    for i in vertex_order)
+            # Draw the edges
+            if directed:
+                drawer_method = edge_drawer.draw_directed_edge
+            else:
+                drawer_method = edge_drawer.draw_undirected_edge
+            for edge, visual_edge in edge_coord_iter:
+                src, dest = edge.tuple
+                src_vertex, dest_vertex = vertex_builder[src], vertex_builder[dest]
+                drawer_method(visual_edge, src_vertex, dest_vertex)
+
+            # Construct the iterator that we will use to draw the vertices
+            vs = graph.vs
+            if vertex_order is None:
+                # Default vertex order
+                vertex_coord_iter = izip(vs, vertex_builder, layout)
+            else:
+                # Specified vertex order
+                vertex_coord_iter = ((vs[i], vertex_builder[i], layout[i])
+                        for i in vertex_order)
 
-        # Draw the vertices
-        drawer_method = vertex_drawer.draw
-        context.set_line_width(1)
-        for vertex, visual_vertex, coords in vertex_coord_iter:
-            drawer_method(visual_vertex, vertex, coords)
+            # Draw the vertices
+            drawer_method = vertex_drawer.draw
+            context.set_line_width(1)
+            for vertex, visual_vertex, coords in vertex_coord_iter:
+                drawer_method(visual_vertex, vertex, coords)
 
         # Decide whether the labels have to be wrapped
         wrap = kwds.get("wrap_labels")
@@ -365,17 +692,17 @@ class DefaultGraphDrawer(AbstractCairoGraphDrawer):
         wrap = bool(wrap)
 
         # Construct the iterator that we will use to draw the vertex labels
-        if vertex_order is None:
+        if vertex_label_order is None:
             # Default vertex order
             vertex_coord_iter = izip(vertex_builder, layout)
         else:
             # Specified vertex order
             vertex_coord_iter = ((vertex_builder[i], layout[i])
-                    for i in vertex_order)
+                    for i in vertex_label_order)
 
         # Draw the vertex labels
         for vertex, coords in vertex_coord_iter:
-            if vertex.label is None:
+            if vertex.label is None or vertex.label_size < min_size:
                 continue
 
             # Set the font family, size, color and text
@@ -441,16 +768,17 @@ class DefaultGraphDrawer(AbstractCairoGraphDrawer):
 
         # Construct the iterator that we will use to draw the edge labels
         es = graph.es
-        if edge_order is None:
+        if edge_label_order is None:
             # Default edge order
             edge_coord_iter = izip(es, edge_builder)
         else:
             # Specified edge order
-            edge_coord_iter = ((es[i], edge_builder[i]) for i in edge_order)
+            edge_coord_iter = ((es[i], edge_builder[i])
+                    for i in edge_label_order)
         
         # Draw the edge labels
         for edge, visual_edge in edge_coord_iter:
-            if visual_edge.label is None:
+            if visual_edge.label is None or visual_edge.label_size < min_size:
                 continue
 
             # Set the font family, size, color and text
@@ -61,11 +61,16 @@ this is inferred from the type of the default value itself.
 """
 
 from ConfigParser import NoOptionError
-from itertools import izip
+from functools import partial
+from itertools import imap, repeat
 
 from igraph.configuration import Configuration
 
-__all__ = ["AttributeSpecification", "AttributeCollectorBase"]
+__all__ = ["AttributeSpecification", "AttributeCollectorBase",
+           "ConstantColumn", "FunctionColumn"]
+
+# Types of raw attribute values whose extremes are found by min() and max()
+_NUMBER_TYPES = (int, long, float)
 
 # pylint: disable-msg=R0903
 # R0903: too few public methods
@@ -117,6 +122,60 @@ class AttributeSpecification(object):
             self.transform = type(self.default)
 
 
+class ConstantColumn(object):
+    """Read-only sequence of a given length that contains the same value
+    at every index.
+
+    Attribute collectors use this class to represent visual attributes that
+    are the same for all the vertices or edges without creating a list
+    that repeats the value for each of them.
+    """
+
+    __slots__ = ("value", "length")
+
+    def __init__(self, value, length):
+        self.value = value
+        self.length = length
+
+    def __getitem__(self, index):
+        return self.value
+
+    def __iter__(self):
+        return repeat(self.value, self.length)
+
+    def __len__(self):
+        return self.length
+
+
+class FunctionColumn(object):
+    """Read-only sequence of a given length whose items are derived by
+    calling a function with the index of the item."""
+
+    __slots__ = ("func", "length")
+
+    def __init__(self, func, length):
+        self.func = func
+        self.length = length
+
+    def __getitem__(self, index):
+        return self.func(int(index))
+
+    def __iter__(self):
+        func = self.func
+        return (func(index) for index in xrange(self.length))
+
+    def __len__(self):
+        return self.length
+
+
+def _element_setter(attr_name):
+    """Returns a function that overrides the value of the given attribute
+    of an element in the column of the attribute collector of the element."""
+    def setter(self, value):
+        self._collector._set_value_at(attr_name, int(self), value)
+    return setter
+
+
 class AttributeCollectorMeta(type):
     """Metaclass for attribute collector classes
     
@@ -172,6 +231,8 @@ class AttributeCollectorMeta(type):
                     attr_spec.alt_name = "%s%s" % (prefix, attr_spec.name)
 
         attrs["_attributes"] = attr_specs
+        attrs["_attributes_by_name"] = dict((attr_spec.name, attr_spec)
+                                            for attr_spec in attr_specs)
         attrs["Element"] = mcs.record_generator(
                 "%s.Element" % name,
                 (attr_spec.name for attr_spec in attr_specs)
@@ -182,17 +243,47 @@ class AttributeCollectorMeta(type):
 
     @classmethod
     def record_generator(mcs, name, slots):
-        """Generates a simple class that has the given slots and nothing else"""
-        class Element(object):
-            """A simple class that holds the attributes collected by the
-            attribute collector"""
-            __slots__ = tuple(slots)
-            def __init__(self, attrs=()):
-                for attr, value in attrs:
-                    setattr(self, attr, value)
+        """Generates a simple class that has the given attributes and nothing
+        else. The attributes are looked up in the columns of the attribute
+        collector that created the instance when they are accessed.
+
+        Instances of the class are integers holding the position of the
+        vertex or edge in the columns. Every collector derives its own
+        subclass with a C{_collector} class attribute (see
+        L{AttributeCollectorBase._bind_column()}); once a column is
+        collected, the property of the attribute in that subclass reads the
+        column directly so no Python code runs when the attribute is read.
+        """
+        class Element(int):
+            """A simple class that provides the attributes collected by the
+            attribute collector for a single vertex or edge"""
+            __slots__ = ()
+            _collector = None
+            def __eq__(self, other):
+                return self.__class__ is other.__class__ and \
+                       int(self) == int(other)
+            def __ne__(self, other):
+                return not self.__eq__(other)
+            def __hash__(self):
+                return hash((id(self._collector), int(self)))
+            def __nonzero__(self):
+                return True
+            def __repr__(self):
+                return "%s(%d)" % (self.__class__.__name__, self)
+        for slot in slots:
+            setattr(Element, slot, mcs._element_property(slot))
         Element.__name__ = name
         return Element
 
+    @staticmethod
+    def _element_property(attr_name):
+        """Returns a property that collects the column of the given attribute
+        when the attribute is read for the first time and writes the value
+        of the attribute in the column of the attribute collector"""
+        def getter(self):
+            return self._collector.get_column(attr_name)[self]
+        return property(getter, _element_setter(attr_name))
+
 
 class AttributeCollectorBase(object):
     """Base class for attribute collector subclasses. Classes that inherit
@@ -203,7 +294,7 @@ class AttributeCollectorBase(object):
 
     __metaclass__ = AttributeCollectorMeta
 
-    def __init__(self, seq, kwds = None):
+    def __init__(self, seq, kwds = None, indices = None):
         """Constructs a new attribute collector that uses the given
         vertex/edge sequence and the given dict as data sources.
 
@@ -211,18 +302,241 @@ class AttributeCollectorBase(object):
           that will be used as a data source for attributes.
         @param kwds: a Python dict that will be used to override the
           attributes collected from I{seq} if necessary.
+        @param indices: the indices of the items of I{seq} whose attributes
+          are needed, or C{None} if all of them are needed. The collector
+          is still indexed by the indices of I{seq} but it contains only
+          the given items; lists in I{kwds} are given for all the items of
+          I{seq} and they are restricted to the given items.
+
+        The attributes are not collected here; each attribute is collected
+        into a column when it is accessed for the first time, so attributes
+        that are never used by the drawer are never collected.
         """
-        elt = self.__class__.Element
-        self._cache = [elt() for _ in xrange(len(seq))]
-
+        self._full_length = len(seq)
+        if indices is None:
+            self._indices, self._positions = None, None
+        else:
+            self._indices = list(indices)
+            self._positions = dict((index, position) for position, index
+                                   in enumerate(self._indices))
+            seq = seq.select(self._indices)
         self.seq = seq
         self.kwds = kwds or {}
+        self._columns = {}
+        self._length = len(seq)
+        # pylint: disable-msg=E1101
+        # E1101: instance has no 'Element' member
+        self.Element = type(self.Element.__name__, (self.Element, ),
+                            dict(__slots__=(), _collector=self))
+
+    def get_column(self, attr_name):
+        """Returns the collected values of the given attribute for all the
+        vertices or edges of the collector, in the order of their indices.
+
+        The result is either a list or a read-only sequence such as a
+        L{ConstantColumn} when the attribute has the same value for all the
+        vertices or edges; it must not be modified by the caller.
+
+        @param attr_name: the name of the attribute
+        @return: a sequence containing the values of the attribute
+        """
+        try:
+            return self._columns[attr_name]
+        except KeyError:
+            pass
+
+        column = self._collect_attributes(self._get_spec(attr_name))
+        self._bind_column(attr_name, column)
+        return column
+
+    def get_max(self, attr_name):
+        """Returns the largest absolute value of the given numeric attribute
+        for the vertices or edges of the collector, or zero if there are no
+        values.
 
-        for attr_spec in self._attributes:
-            values = self._collect_attributes(attr_spec) 
-            attr_name = attr_spec.name
-            for cache_elt, val in izip(self._cache, values):
-                setattr(cache_elt, attr_name, val)
+        The column of the attribute is not collected; the largest and the
+        smallest raw value of each data source are looked up and only those
+        are transformed, assuming that the transformation of the attribute
+        is monotonic on numbers.
+
+        @param attr_name: the name of the attribute
+        @return: the largest absolute value of the attribute
+        """
+        sources, transform = self._get_sources(attr_name)
+        if isinstance(sources, ConstantColumn):
+            return abs(sources.value or 0.)
+
+        result = 0.
+        for values in sources:
+            # None and zero do not change the result
+            values = filter(None, values)
+            if not values:
+                continue
+            lower, upper = min(values), max(values)
+            if type(lower) in _NUMBER_TYPES and type(upper) in _NUMBER_TYPES:
+                values = (lower, upper)
+            if transform is not None:
+                values = imap(transform, values)
+            result = max(result, max(abs(value or 0.) for value in values))
+        return result
+
+    def get_max_length(self, attr_name):
+        """Returns the length of the longest value of the given attribute for
+        the vertices or edges of the collector, or C{None} if all the values
+        are C{None}. Values without a length are converted to strings.
+
+        The column of the attribute is not collected.
+
+        @param attr_name: the name of the attribute
+        @return: the length of the longest value or C{None}
+        """
+        sources, transform = self._get_sources(attr_name)
+        if isinstance(sources, ConstantColumn):
+            sources = [[sources.value]]
+
+        result = None
+        for values in sources:
+            if None in values:
+                values = [value for value in values if value is not None]
+            if transform is not None:
+                values = [transform(value) for value in values]
+            if not values:
+                continue
+            try:
+                length = max(imap(len, values))
+            except TypeError:
+                length = max(len(value if isinstance(value, basestring)
+                                 else str(value)) for value in values)
+            if result is None or length > result:
+                result = length
+        return result
+
+    def set_value(self, attr_name, index, value):
+        """Overrides the collected value of the given attribute for the
+        vertex or edge with the given index.
+
+        @param attr_name: the name of the attribute
+        @param index: the index of the vertex or edge
+        @param value: the new value of the attribute
+        """
+        self._set_value_at(attr_name, self._get_position(index), value)
+
+    def _set_value_at(self, attr_name, position, value):
+        """Overrides the collected value of the given attribute at the given
+        position of its column."""
+        column = self.get_column(attr_name)
+        if not isinstance(column, list):
+            column = list(column)
+            self._bind_column(attr_name, column)
+        column[position] = value
+
+    def _bind_column(self, attr_name, column):
+        """Stores the column of the given attribute and lets the elements of
+        the collector read the attribute directly from the column."""
+        self._columns[attr_name] = column
+        # pylint: disable-msg=E1101
+        # E1101: instance has no 'Element' member
+        if isinstance(column, ConstantColumn):
+            # getattr(column, "value", element) ignores the element, which
+            # is passed as the default value
+            getter = partial(getattr, column, "value")
+        else:
+            getter = column.__getitem__
+        setattr(self.Element, attr_name,
+                property(getter, _element_setter(attr_name)))
+
+    def _get_spec(self, attr_name):
+        """Returns the specification of the attribute with the given name."""
+        try:
+            return self._attributes_by_name[attr_name]
+        except KeyError:
+            raise AttributeError("no such attribute: %r" % attr_name)
+
+    def _get_position(self, index):
+        """Returns the position of the vertex or edge with the given index in
+        the columns of the collector."""
+        n = self._full_length
+        if index < 0:
+            index += n
+        if index < 0 or index >= n:
+            raise IndexError("index out of range")
+        if self._positions is None:
+            return index
+        try:
+            return self._positions[index]
+        except KeyError:
+            raise IndexError("index %d is not collected" % index)
+
+    def _get_sources(self, attr_name):
+        """Returns the raw values of the given attribute from the data sources
+        without collecting its column, following the same order of precedence
+        as L{_collect_attributes()}.
+
+        @return: a list of sequences that contain the raw values of the
+          attribute (plus the default value in a separate sequence if some
+          values are C{None}) and the transformation to be performed on
+          them, or a collected L{ConstantColumn} and C{None}
+        """
+        attr_spec = self._get_spec(attr_name)
+        if not self._length:
+            return [], None
+
+        column = self._columns.get(attr_name)
+        if column is None and attr_spec.func is not None:
+            column = self.get_column(attr_name)
+        if isinstance(column, ConstantColumn):
+            return column, None
+        if column is not None:
+            return [column], None
+
+        kwds = self.kwds
+        if attr_spec.name == "label":
+            if attr_spec.alt_name in kwds and kwds[attr_spec.alt_name] is None:
+                return ConstantColumn(None, self._length), None
+
+        try:
+            attrs = self.seq[attr_spec.name]
+        except KeyError:
+            attrs = None
+
+        result = self._restrict(kwds.get(attr_spec.alt_name, None))
+        values = result
+        if isinstance(values, str):
+            values = [values]
+        else:
+            try:
+                len(values)
+            except TypeError:
+                values = [values]
+
+        if attrs and not result:
+            sources = [attrs]
+        elif attrs and not all(values):
+            length = len(values)
+            sources = [[values[idx % length] or attrs[idx]
+                        for idx in xrange(len(attrs))]]
+        else:
+            sources = [values]
+
+        if any(None in values for values in sources):
+            sources.append([self._get_default(attr_spec)])
+        return sources, attr_spec.transform
+
+    def _restrict(self, value):
+        """Restricts a list of attribute values given for all the items of
+        the original vertex/edge sequence to the items of the collector.
+        Shorter lists are recycled; strings and other values without a length
+        are returned intact."""
+        if self._indices is None or isinstance(value, basestring) or \
+                not hasattr(value, "__getitem__"):
+            return value
+        try:
+            length = len(value)
+        except TypeError:
+            return value
+        if not length:
+            return value
+        return [value[index % length] for index in self._indices]
 
     def _collect_attributes(self, attr_spec, config=None):
         """Collects graph visualization attributes from various sources.
@@ -253,28 +567,27 @@ class AttributeCollectorBase(object):
         @param  config:    a L{Configuration} object to be used for determining the
                            defaults if all else fails. If C{None}, the global
                            igraph configuration will be used
-        @return: the collected attributes
+        @return: the collected attributes as a list, or as a L{ConstantColumn}
+                 if the attribute has the same value for all the items
         """
         kwds = self.kwds
         seq = self.seq
 
-        n = len(seq)
+        n = self._length
 
         # Special case if the attribute name is "label" 
         if attr_spec.name == "label":
             if attr_spec.alt_name in kwds and kwds[attr_spec.alt_name] is None:
-                return [None] * n
+                return ConstantColumn(None, n)
 
         # If the attribute uses an external callable to derive the attribute
-        # values, call it and store the results
+        # values, call it whenever a value is needed
         if attr_spec.func is not None:
-            func = attr_spec.func
-            result = [func(i) for i in xrange(n)]
-            return result
-
-        # Get the configuration object
-        if config is None:
-            config = Configuration.instance()
+            func, indices = attr_spec.func, self._indices
+            if indices is not None:
+                return FunctionColumn(lambda position: func(indices[position]),
+                                      n)
+            return FunctionColumn(func, n)
 
         # Fetch the defaults from the vertex/edge sequence
         try:
@@ -283,7 +596,7 @@ class AttributeCollectorBase(object):
             attrs = None
 
         # Override them from the keyword arguments (if any)
-        result = kwds.get(attr_spec.alt_name, None)
+        result = self._restrict(kwds.get(attr_spec.alt_name, None))
         if attrs:
             if not result:
                 result = attrs
@@ -294,22 +607,23 @@ class AttributeCollectorBase(object):
                     len(result)
                 except TypeError:
                     result = [result] * n
-                result = [result[idx] or attrs[idx] \
-                          for idx in xrange(len(result))]
+                length = len(result)
+                result = [result[idx % length] or attrs[idx] \
+                          for idx in xrange(n)]
 
         # Special case for string overrides, strings are not treated
-        # as sequences here
+        # as sequences here. Neither are other objects without a length;
+        # these are resolved only once instead of once for every item.
         if isinstance(result, str):
-            result = [result] * n
-
-        # If the result is still not a sequence, make it one
+            return self._collect_constant(attr_spec, result, config)
         try:
             len(result)
         except TypeError:
-            result = [result] * n
+            return self._collect_constant(attr_spec, result, config)
 
-        # If it is not a list, ensure that it is a list
-        if not hasattr(result, "extend"):
+        # If it is not a list, ensure that it is a list. Lists that are too
+        # short are copied so the list of the caller is not extended
+        if len(result) < n or not hasattr(result, "extend"):
             result = list(result)
 
         # Ensure that the length is n
@@ -320,19 +634,10 @@ class AttributeCollectorBase(object):
                 result.extend(result[0:(n-len(result))])
 
         # By now, the length of the result vector should be n as requested
-        # Get the configuration defaults
-        try:
-            default = config["plotting.%s" % attr_spec.alt_name]
-        except NoOptionError:
-            default = None
-
-        if default is None:
-            default = attr_spec.default
-
         # Fill the None values with the default values
-        for idx in xrange(len(result)):
-            if result[idx] is None:
-                result[idx] = default
+        if any(value is None for value in result):
+            default = self._get_default(attr_spec, config)
+            result = [default if value is None else value for value in result]
 
         # Finally, do the transformation
         if attr_spec.transform is not None:
@@ -341,16 +646,52 @@ class AttributeCollectorBase(object):
 
         return result
 
+    def _collect_constant(self, attr_spec, value, config=None):
+        """Returns a L{ConstantColumn} holding the given attribute value for
+        all the items, falling back to the default value if the value is
+        C{None} and performing the transformation of the attribute."""
+        if value is None:
+            value = self._get_default(attr_spec, config)
+        if attr_spec.transform is not None:
+            value = attr_spec.transform(value)
+        return ConstantColumn(value, self._length)
+
+    @staticmethod
+    def _get_default(attr_spec, config=None):
+        """Returns the default value of the given attribute from the given
+        configuration (or the global igraph configuration if C{config} is
+        C{None}), or the hard-wired default value of the attribute if the
+        configuration does not specify it."""
+        if config is None:
+            config = Configuration.instance()
+
+        try:
+            default = config["plotting.%s" % attr_spec.alt_name]
+        except NoOptionError:
+            default = None
+
+        if default is None:
+            default = attr_spec.default
+
+        return default
+
 
     def __getitem__(self, index):
         """Returns the collected attributes of the vertex/edge with the
         given index."""
         # pylint: disable-msg=E1101
-        # E1101: instance has no '_attributes' member
-        return self._cache[index]
+        # E1101: instance has no 'Element' member
+        if self._positions is None and 0 <= index < self._length:
+            return self.Element(index)
+        return self.Element(self._get_position(index))
+
+    def __iter__(self):
+        # pylint: disable-msg=E1101
+        # E1101: instance has no 'Element' member
+        return imap(self.Element, xrange(self._length))
 
     def __len__(self):
-        return len(self.seq)
+        return self._length
 
 
 
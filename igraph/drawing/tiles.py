@@ -0,0 +1,335 @@
+"""
+Rendering of large graphs as a pyramid of map tiles.
+
+This module contains the L{TileRenderer} class that renders a graph into
+fixed-size PNG images on multiple zoom levels, following the conventions of
+slippy maps: zoom level M{z} consists of M{2^z} times M{2^z} tiles, and the
+tile in column M{x} and row M{y} of zoom level M{z} is stored in
+C{z/x/y.png}.
+"""
+
+from multiprocessing import Pool
+
+import os
+
+from igraph.compat import property
+from igraph.configuration import Configuration
+from igraph.drawing.colors import Palette, palettes
+from igraph.drawing.graph import DefaultGraphDrawer
+from igraph.drawing.utils import BoundingBox
+from igraph.layout import Layout
+
+__all__ = ["TileRenderer"]
+__license__ = "GPL"
+
+#####################################################################
+
+class TileRenderer(object):
+    """Renders a graph into map tiles on multiple zoom levels.
+
+    The layout of the graph is scaled into a square whose side is
+    M{tile_size * 2^max_zoom} pixels; this is the whole graph on the highest
+    zoom level, and every lower zoom level shows the same square scaled down
+    by a factor of two. Vertex sizes, edge widths, font sizes and other
+    visual attributes are given in pixels on the highest zoom level and they
+    shrink together with the graph on the lower ones.
+
+    The level of detail depends on the zoom level. Unless the fast rendering
+    mode is turned off with C{fast=False}, labels and arrowheads smaller
+    than the C{plotting.fast_min_size} configuration value are not drawn,
+    and the vertices are hidden on zoom levels where even the largest vertex
+    would be smaller than that.
+
+    Every tile is drawn from a graph that contains only the vertices, edges
+    and labels that intersect the tile. These are looked up in a
+    L{SpatialIndex} of the layout and by a single native pass over the
+    edges, so the visual attributes are evaluated only for the elements of
+    the tile.
+
+    Keyword arguments of the constructor not listed there are passed on to
+    L{Graph.__plot__} for every tile, so the visual style can be set the
+    same way as for L{plot()}. Lists of vertex and edge attributes are
+    indexed by the IDs of the whole graph. C{mark_groups}, C{vertex_order}
+    and C{edge_order} are not supported, and automatic edge curvature is
+    turned off unless C{autocurve=True} is given.
+    """
+
+    def __init__(self, graph, layout=None, max_zoom=4, min_zoom=0,
+                 tile_size=256, palette=None, background="white", **kwds):
+        """Constructs a tile renderer for the given graph.
+
+        @param graph: the graph to render
+        @param layout: the layout of the graph. It is passed on to the
+          C{layout} method of the graph if it is not a L{Layout} object.
+          It is fitted into the square of the highest zoom level, keeping
+          its aspect ratio.
+        @param max_zoom: the highest zoom level to render
+        @param min_zoom: the lowest zoom level to render
+        @param tile_size: the width and height of the tiles in pixels
+        @param palette: the palette used for drawing the tiles. C{None}
+          means the default palette given by the C{plotting.palette}
+          configuration key.
+        @param background: the background color of the tiles, or C{None}
+          for transparent tiles
+        """
+        for key in ("mark_groups", "vertex_order", "edge_order"):
+            if key in kwds:
+                raise ValueError("%s is not supported by the tile renderer"
+                                 % key)
+        if min_zoom < 0 or max_zoom < min_zoom:
+            raise ValueError("zoom levels must satisfy "
+                             "0 <= min_zoom <= max_zoom")
+
+        if palette is None:
+            palette = Configuration.instance()["plotting.palette"]
+        if not isinstance(palette, Palette):
+            palette = palettes[palette]
+
+        kwds.setdefault("autocurve", False)
+        kwds.setdefault("fast", True)
+
+        self.graph = graph
+        self.max_zoom = max_zoom
+        self.min_zoom = min_zoom
+        self.tile_size = tile_size
+        self.palette = palette
+        self.background = background
+        self.kwds = kwds
+
+        # Determine how far the vertices, edges and labels may reach from
+        # the points of the layout; the builders look up the largest values
+        # of the visual attributes without collecting them
+        world = self.tile_bbox(0, 0, 0)
+        drawer = DefaultGraphDrawer(None, world)
+        layout = drawer.ensure_layout(layout, graph)
+        vertex_builder = drawer.vertex_drawer_factory(None, world, palette,
+                layout).VisualVertexBuilder(graph.vs, kwds)
+        edge_builder = drawer.edge_drawer_factory(None, palette). \
+                VisualEdgeBuilder(graph.es, kwds)
+        self._margins = drawer._cull_margins(vertex_builder, edge_builder)
+        self._max_sizes = [drawer._column_max(vertex_builder, "size"),
+                           drawer._column_max(vertex_builder, "label_size"),
+                           drawer._column_max(edge_builder, "label_size")]
+
+        if len(layout):
+            layout.fit_into(world.contract(self._margins[0]),
+                            keep_aspect_ratio=True)
+        self.layout = layout
+
+    @property
+    def spatial_index(self):
+        """The spatial index of the layout. It is cached by the layout, so
+        it is built only once unless the layout is modified."""
+        return self.layout.spatial_index()
+
+    def tile_bbox(self, zoom, x, y):
+        """Returns the bounding box of the given tile in the coordinate system
+        of the layout, i.e. in pixels on the highest zoom level.
+
+        @param zoom: the zoom level of the tile
+        @param x: the column of the tile
+        @param y: the row of the tile
+        @return: the bounding box as a L{BoundingBox} object
+        """
+        size = self.tile_size * 2 ** (self.max_zoom - zoom)
+        return BoundingBox(x * size, y * size, (x+1) * size, (y+1) * size)
+
+    def tiles(self):
+        """Returns an iterator over the zoom level, column and row of every
+        tile to be rendered, from the lowest zoom level to the highest."""
+        for zoom in xrange(self.min_zoom, self.max_zoom + 1):
+            count = 2 ** zoom
+            for x in xrange(count):
+                for y in xrange(count):
+                    yield zoom, x, y
+
+    def _restrict_kwds(self, vids, eids):
+        """Returns the keyword arguments of the renderer with the lists of
+        vertex and edge attributes restricted to the given vertex and edge
+        IDs. Shorter lists are recycled the same way as in L{plot()}."""
+        kwds = dict(self.kwds)
+        for key, value in self.kwds.iteritems():
+            if key.endswith("_order_by"):
+                continue
+            if key.startswith("vertex_"):
+                ids = vids
+            elif key.startswith("edge_"):
+                ids = eids
+            else:
+                continue
+            if isinstance(value, basestring) or \
+                    not hasattr(value, "__getitem__"):
+                continue
+            try:
+                length = len(value)
+            except TypeError:
+                continue
+            if length:
+                kwds[key] = [value[idx % length] for idx in ids]
+        return kwds
+
+    def _tile_graph(self, zoom, bbox):
+        """Constructs the graph of the vertices, edges and labels that
+        intersect the given bounding box on the given zoom level.
+
+        @return: the graph, its layout and the keyword arguments to draw it
+          with, or C{None} if the tile is empty"""
+        from igraph import Graph
+
+        vertex_margin, vertex_label_margin, edge_margin, \
+                edge_label_margin, bend = self._margins
+        max_size, max_vertex_label_size, max_edge_label_size = self._max_sizes
+        lower, upper = bbox.coords[:2], bbox.coords[2:]
+
+        # Decide what is too small to be drawn on this zoom level
+        if self.kwds["fast"]:
+            min_size = Configuration.instance()["plotting.fast_min_size"] * \
+                    2 ** (self.max_zoom - zoom)
+            hide_vertices = max_size < min_size
+            if max_vertex_label_size < min_size:
+                vertex_label_margin = None
+            if max_edge_label_size < min_size:
+                edge_label_margin = None
+        else:
+            hide_vertices = False
+
+        # Select the vertices and edges that may intersect the tile
+        index = self.spatial_index
+        vids = set()
+        for margin in (None if hide_vertices else vertex_margin,
+                       vertex_label_margin):
+            if margin is not None:
+                vids.update(index.within_box(
+                    (lower[0]-margin, lower[1]-margin),
+                    (upper[0]+margin, upper[1]+margin)))
+
+        if edge_label_margin is not None:
+            edge_margin = edge_label_margin
+        eids = self.graph._edges_in_box(self.layout.array, lower, upper,
+                                        edge_margin, bend)
+        es = self.graph.es.select(eids) if eids else None
+        edgelist = [edge.tuple for edge in es] if eids else []
+        for edge in edgelist:
+            vids.update(edge)
+
+        if not vids:
+            return None
+        vids = sorted(vids)
+
+        # Construct the graph of the tile with the attributes of the
+        # selected vertices and edges
+        index_of = dict((vid, idx) for idx, vid in enumerate(vids))
+        graph = Graph(len(vids), [(index_of[u], index_of[v])
+                                  for u, v in edgelist],
+                      self.graph.is_directed())
+        for name in self.graph.attributes():
+            graph[name] = self.graph[name]
+        vs = self.graph.vs.select(vids)
+        for name in self.graph.vs.attribute_names():
+            graph.vs[name] = vs[name]
+        if eids:
+            for name in self.graph.es.attribute_names():
+                graph.es[name] = es[name]
+
+        layout = Layout([self.layout[vid] for vid in vids])
+        kwds = self._restrict_kwds(vids, eids)
+        if hide_vertices:
+            kwds["vertex_shape"] = "hidden"
+        if vertex_label_margin is None:
+            kwds["vertex_label"] = None
+        if edge_label_margin is None:
+            kwds["edge_label"] = None
+
+        return graph, layout, kwds
+
+    def render_tile(self, zoom, x, y, target=None):
+        """Renders a single tile.
+
+        @param zoom: the zoom level of the tile
+        @param x: the column of the tile
+        @param y: the row of the tile
+        @param target: the name of the PNG file to save the tile to, or
+          C{None} if the tile should not be saved
+        @return: the L{Plot} object of the tile
+        """
+        from igraph.drawing import Plot
+
+        size = self.tile_size
+        result = Plot(target, (size, size), self.palette, self.background)
+
+        bbox = self.tile_bbox(zoom, x, y)
+        tile = self._tile_graph(zoom, bbox)
+        if tile is not None:
+            graph, layout, kwds = tile
+            result.add(_TileDrawing(graph, layout, bbox,
+                                    float(size) / bbox.width),
+                       result.bbox, **kwds)
+        result.redraw()
+
+        if target is not None:
+            result.save()
+        return result
+
+    def render(self, directory, processes=None):
+        """Renders all the tiles into the given directory.
+
+        The tile in column M{x} and row M{y} of zoom level M{z} is saved to
+        C{z/x/y.png} in the directory; the subdirectories are created as
+        needed.
+
+        @param directory: the name of the directory
+        @param processes: the number of worker processes to render the tiles
+          with. C{None} means the number of CPUs, 1 renders the tiles in the
+          current process.
+        """
+        def tasks():
+            for zoom, x, y in self.tiles():
+                dirname = os.path.join(directory, str(zoom), str(x))
+                if y == 0 and not os.path.isdir(dirname):
+                    os.makedirs(dirname)
+                yield zoom, x, y, os.path.join(dirname, "%d.png" % y)
+
+        if processes == 1:
+            for task in tasks():
+                self.render_tile(*task)
+            return
+
+        pool = Pool(processes, _init_worker, (self, ))
+        try:
+            for _ in pool.imap_unordered(_render_tile_in_worker, tasks(), 16):
+                pass
+            pool.close()
+        finally:
+            pool.terminate()
+            pool.join()
+
+
+class _TileDrawing(object):
+    """Draws a graph into a tile. The layout of the graph is given in the
+    coordinate system of the whole tile pyramid; I{bbox} is the area of the
+    tile in this coordinate system and I{scale} is the size of a unit of the
+    coordinate system on the tile."""
+
+    def __init__(self, graph, layout, bbox, scale):
+        self.graph = graph
+        self.layout = layout
+        self.bbox = bbox
+        self.scale = scale
+
+    def __plot__(self, context, bbox, palette, *args, **kwds):
+        context.scale(self.scale, self.scale)
+        context.translate(-self.bbox.left, -self.bbox.top)
+        self.graph.__plot__(context, self.bbox, palette, layout=self.layout,
+                            fit_layout=False, *args, **kwds)
+
+
+_worker_renderer = None
+
+def _init_worker(renderer):
+    """Stores the tile renderer used by a worker process."""
+    global _worker_renderer
+    _worker_renderer = renderer
+
+def _render_tile_in_worker(task):
+    """Renders a tile in a worker process."""
+    _worker_renderer.render_tile(*task)
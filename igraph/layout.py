@@ -7,10 +7,10 @@ This package contains the implementation of the L{Layout} object.
 """
 
 from itertools import izip
-from math import sin, cos, pi
+from math import pi
 
+from igraph._igraph import CoordinateArray
 from igraph.drawing.utils import BoundingBox
-from igraph.statistics import RunningMean
 
 __license__ = u"""\
 Copyright (C) 2006-2012  Tamás Nepusz <ntamas@gmail.com>
@@ -47,28 +47,35 @@ class Layout(object):
     C{igraph} will of course refuse to draw a graph with a layout that has
     less coordinates than the node count of the graph.
 
-    Layouts behave exactly like lists when they are accessed using the item
+    The coordinates are stored in a L{CoordinateArray}, a contiguous
+    array of doubles that can be accessed via the L{array} property and
+    that supports the buffer protocol. All the transformations of the
+    layout operate on this array in-place.
+
+    Layouts behave like lists when they are accessed using the item
     index operator (C{[...]}). They can even be iterated through. Items
-    returned by the index operator are only copies of the coordinates,
-    but the stored coordinates can be modified by directly assigning to
-    an index.
+    returned by the index operator are live views of the coordinates of
+    a single point that behave like lists of fixed length; the stored
+    coordinates can be modified either through these views or by
+    directly assigning to an index.
 
         >>> layout = Layout([(0, 1), (0, 2)])
         >>> coords = layout[1]
         >>> print coords
-        [0, 2]
-        >>> coords = (0, 3)
+        [0.0, 2.0]
+        >>> coords[1] = 3
         >>> print layout[1]
-        [0, 2]
-        >>> layout[1] = coords
+        [0.0, 3.0]
+        >>> layout[1] = (1, 4)
         >>> print layout[1]
-        [0, 3]
+        [1.0, 4.0]
     """
     
     def __init__(self, coords=None, dim=None):
         """Constructor.
 
-        @param coords: the coordinates to be stored in the layout.
+        @param coords: the coordinates to be stored in the layout. If this
+        is a L{CoordinateArray}, it is used as is without copying.
         @param dim: the number of dimensions. If C{None}, the number of
         dimensions is determined automatically from the length of the first
         item of the coordinate list. If there are no entries in the coordinate
@@ -76,22 +83,16 @@ class Layout(object):
         length of the coordinate list is zero, otherwise it should be left as
         is.
         """
-        if coords:
-            self._coords = [list(coord) for coord in coords]
-        else:
-            self._coords = []
-
-        if dim is None:
-            if len(self._coords) == 0:
-                self._dim = 2
-            else:
-                self._dim = len(self._coords[0])
+        if isinstance(coords, Layout):
+            coords = coords._coords.copy()
+
+        if isinstance(coords, CoordinateArray):
+            if dim is not None and int(dim) != coords.dim:
+                raise ValueError("all items in the coordinate list "+
+                                 "must have a length of %d" % int(dim))
+            self._coords = coords
         else:
-            self._dim = int(dim)
-            for row in self._coords:
-                if len(row) != self._dim:
-                    raise ValueError("all items in the coordinate list "+
-                                     "must have a length of %d" % self._dim)
+            self._coords = CoordinateArray(coords, dim)
 
     def __len__(self):
         return len(self._coords)
@@ -100,23 +101,24 @@ class Layout(object):
         return self._coords[idx]
 
     def __setitem__(self, idx, value):
-        if len(value) != self._dim:
-            raise ValueError("assigned item must have %d elements" % self._dim)
-        self._coords[idx] = list(value)
+        self._coords[idx] = value
 
     def __delitem__(self, idx):
         del self._coords[idx]
 
+    def __iter__(self):
+        return iter(self._coords)
+
     def __copy__(self):
-        return self.__class__(self.coords, self.dim)
+        return self.__class__(self._coords.copy())
 
     def __repr__(self):
-        if not self.coords:
+        if not self._coords:
             vertex_count = "no vertices"
-        elif len(self.coords) == 1:
+        elif len(self._coords) == 1:
             vertex_count = "1 vertex"
         else:
-            vertex_count = "%d vertices" % len(self.coords)
+            vertex_count = "%d vertices" % len(self._coords)
         if self.dim == 1:
             dim_count = "1 dimension"
         else:
@@ -124,21 +126,24 @@ class Layout(object):
         return "<%s with %s and %s>" % (self.__class__.__name__,
                 vertex_count, dim_count)
 
+    @property
+    def array(self):
+        """The L{CoordinateArray} storing the coordinates of the layout"""
+        return self._coords
+
     @property
     def dim(self):
         """Returns the number of dimensions"""
-        return self._dim
+        return self._coords.dim
 
     @property
     def coords(self):
         """The coordinates as a list of lists"""
-        return [row[:] for row in self._coords]
+        return self._coords.tolist()
 
     def append(self, value):
         """Appends a new point to the layout"""
-        if len(value) < self._dim:
-            raise ValueError("appended item must have %d elements" % self._dim)
-        self._coords.append([float(coord) for coord in value[0:self._dim]])
+        self._coords.append(value)
 
     def mirror(self, dim):
         """Mirrors the layout along the given dimension(s)
@@ -147,13 +152,7 @@ class Layout(object):
         """
         if isinstance(dim, int):
             dim = [dim]
-        else:
-            dim = [int(x) for x in dim]
-
-        for current_dim in dim:
-            for row in self._coords:
-                row[current_dim] *= -1
-
+        self._coords.mirror(dim)
 
     def rotate(self, angle, dim1=0, dim2=1, **kwds):
         """Rotates the layout by the given degrees on the plane defined by
@@ -166,18 +165,11 @@ class Layout(object):
           origin will be the origin of the coordinate system.
         """
 
-        origin = list(kwds.get("origin", [0.]*self._dim))
-        if len(origin) != self._dim:
-            raise ValueError("origin must have %d dimensions" % self._dim)
-
-        radian = angle * pi / 180.
-        cos_alpha, sin_alpha = cos(radian), sin(radian)
-        
-        for idx, row in enumerate(self._coords): 
-            x, y = row[dim1] - origin[dim1], row[dim2] - origin[dim2]
-            row[dim1] = cos_alpha*x - sin_alpha*y + origin[dim1]
-            row[dim2] = sin_alpha*x + cos_alpha*y + origin[dim2]
+        origin = kwds.get("origin")
+        if origin is not None and len(origin) != self.dim:
+            raise ValueError("origin must have %d dimensions" % self.dim)
 
+        self._coords.rotate(angle * pi / 180., dim1, dim2, origin)
 
     def scale(self, *args, **kwds):
         """Scales the layout.
@@ -194,9 +186,9 @@ class Layout(object):
         @keyword origin: the origin of scaling (this point will stay in place).
           Optional, defaults to the origin of the coordinate system being used.
         """
-        origin = list(kwds.get("origin", [0.]*self._dim))
-        if len(origin) != self._dim:
-            raise ValueError("origin must have %d dimensions" % self._dim)
+        origin = kwds.get("origin")
+        if origin is not None and len(origin) != self.dim:
+            raise ValueError("origin must have %d dimensions" % self.dim)
 
         scaling = kwds.get("scale") or args
         if isinstance(scaling, (int, float)):
@@ -205,16 +197,14 @@ class Layout(object):
             raise ValueError("scaling factor must be given")
         elif len(scaling) == 1:
             if type(scaling[0]) == int or type(scaling[0]) == float:
-                scaling = scaling*self._dim
+                scaling = scaling*self.dim
             else:
                 scaling = scaling[0]
-        if len(scaling) != self._dim:
+        if len(scaling) != self.dim:
             raise ValueError("scaling factor list must have %d elements" \
-                    % self._dim)
+                    % self.dim)
 
-        for idx, row in enumerate(self._coords):
-            self._coords[idx] = [(row[d]-origin[d])*scaling[d]+origin[d] \
-                                 for d in xrange(self._dim)]
+        self._coords.scale(scaling, origin)
 
     def translate(self, *args, **kwds):
         """Translates the layout.
@@ -232,13 +222,11 @@ class Layout(object):
             raise ValueError("translation vector must be given")
         elif len(v) == 1 and type(v[0]) != int and type(v[0]) != float:
             v = v[0]
-        if len(v) != self._dim:
+        if len(v) != self.dim:
             raise ValueError("translation vector must have %d dimensions" \
-                    % self._dim)
-
-        for idx, row in enumerate(self._coords):
-            self._coords[idx] = [row[d]+v[d] for d in xrange(self._dim)]
+                    % self.dim)
 
+        self._coords.translate(v)
 
     def to_radial(self, min_angle = 100, max_angle = 80, \
         min_radius=0.0, max_radius=1.0):
@@ -265,7 +253,7 @@ class Layout(object):
         @param min_radius: the radius corresponding to the minimum Y value
         @param max_radius: the radius corresponding to the maximum Y value
         """
-        if self._dim != 2:
+        if self.dim != 2:
             raise TypeError("implemented only for 2D layouts")
         bbox = self.bounding_box()
 
@@ -282,11 +270,8 @@ class Layout(object):
         ratio_x *= pi / 180.
         min_angle *= pi / 180.
         ratio_y = (max_radius - min_radius) / bbox.height
-        for idx, (x, y) in enumerate(self._coords):
-            alpha  = (x-bbox.left) * ratio_x + min_angle
-            radius = (y-bbox.top) * ratio_y + min_radius
-            self._coords[idx] = [cos(alpha)*radius, -sin(alpha)*radius]
-
+        self._coords._to_radial(bbox.left, bbox.top, ratio_x, ratio_y,
+                                min_angle, min_radius)
 
     def transform(self, function, *args, **kwds):
         """Performs an arbitrary transformation on the layout
@@ -297,9 +282,8 @@ class Layout(object):
         @param function: a function which receives the coordinates as a
           tuple and returns the transformed tuple.
         """
-        self._coords = [list(function(tuple(row), *args, **kwds)) \
-            for row in self._coords]
-
+        coords = [function(tuple(row), *args, **kwds) for row in self._coords]
+        self._coords = CoordinateArray(coords, None if coords else self.dim)
 
     def centroid(self):
         """Returns the centroid of the layout.
@@ -308,11 +292,7 @@ class Layout(object):
         the layout.
         
         @return: the centroid as a list of floats"""
-        centroid = [RunningMean() for _ in xrange(self._dim)]
-        for row in self._coords:
-            for dim in xrange(self._dim):
-                centroid[dim].add(row[dim])
-        return [rm.mean for rm in centroid]
+        return self._coords.centroid()
 
     def boundaries(self, border=0):
         """Returns the boundaries of the layout.
@@ -328,15 +308,7 @@ class Layout(object):
           the other one for the maximum.
         @raises ValueError: if the layout contains no layout items
         """
-        if not self._coords:
-            raise ValueError("layout contains no layout items")
-
-        mins, maxs = [], []
-        for dim in xrange(self._dim):
-            col = [row[dim] for row in self._coords]
-            mins.append(min(col)-border)
-            maxs.append(max(col)+border)
-        return mins, maxs
+        return self._coords.boundaries(border)
         
     def bounding_box(self, border=0):
         """Returns the bounding box of the layout.
@@ -351,7 +323,7 @@ class Layout(object):
           of the box. "Lower left" means the minimum coordinates and "upper right"
           means the maximum. These are encapsulated in a L{BoundingBox} object.
         """
-        if self._dim != 2:
+        if self.dim != 2:
             raise ValueError("Layout.boundary_box() supports 2D layouts only")
 
         try:
@@ -361,6 +333,22 @@ class Layout(object):
             return BoundingBox(0, 0, 0, 0)
 
 
+    def spatial_index(self):
+        """Builds a spatial index on the points of the layout.
+
+        The index is a k-d tree that answers nearest neighbor, radius and
+        box queries in logarithmic time on average, returning the indices
+        of the matching vertices. The index is built when it is first
+        needed and the same index is returned until the layout is modified;
+        copies of the layout share the index. It is built from a snapshot of
+        the coordinates, so an index obtained earlier does not follow the
+        later modifications.
+
+        @return: a L{SpatialIndex} object
+        @raises ValueError: if the layout has more than three dimensions
+        """
+        return self._coords.spatial_index()
+
     def center(self, *args, **kwds):
         """Centers the layout around the given point.
 
@@ -373,15 +361,15 @@ class Layout(object):
           the operation."""
         center = kwds.get("p") or args
         if len(center) == 0:
-            center = [0.] * self._dim
+            center = [0.] * self.dim
         elif len(center) == 1 and type(center[0]) != int \
             and type(center[0]) != float:
             center = center[0]
-        if len(center) != self._dim:
+        if len(center) != self.dim:
             raise ValueError("the given point must have %d dimensions" \
-                    % self._dim)
+                    % self.dim)
         centroid = self.centroid()
-        vec = [center[d]-centroid[d] for d in xrange(self._dim)]
+        vec = [center[d]-centroid[d] for d in xrange(self.dim)]
         self.translate(vec)
 
 
@@ -405,14 +393,14 @@ class Layout(object):
           will be kept and it will be centered within the bounding box.
         """
         if isinstance(bbox, BoundingBox):
-            if self._dim != 2:
+            if self.dim != 2:
                 raise TypeError("bounding boxes work for 2D layouts only")
             corner, target_sizes = [bbox.left, bbox.top], [bbox.width, bbox.height]
-        elif len(bbox) == self._dim:
-            corner, target_sizes = [0.] * self._dim, list(bbox)
-        elif len(bbox) == 2 * self._dim:
-            corner, opposite_corner = list(bbox[0:self._dim]), list(bbox[self._dim:])
-            for i in xrange(self._dim):
+        elif len(bbox) == self.dim:
+            corner, target_sizes = [0.] * self.dim, list(bbox)
+        elif len(bbox) == 2 * self.dim:
+            corner, opposite_corner = list(bbox[0:self.dim]), list(bbox[self.dim:])
+            for i in xrange(self.dim):
                 if corner[i] > opposite_corner[i]:
                     corner[i], opposite_corner[i] = opposite_corner[i], corner[i]
             target_sizes = [max_val-min_val \
@@ -421,7 +409,7 @@ class Layout(object):
         try:
             mins, maxs = self.boundaries()
         except ValueError:
-            mins, maxs = [0.0] * self._dim, [0.0] * self._dim
+            mins, maxs = [0.0] * self.dim, [0.0] * self.dim
         sizes = [max_val - min_val for min_val, max_val in izip(mins, maxs)]
 
         for i, size in enumerate(sizes):
@@ -434,10 +422,10 @@ class Layout(object):
                   for current_size, target_size in izip(sizes, target_sizes)]
         if keep_aspect_ratio:
             min_ratio = min(ratios)
-            ratios = [min_ratio] * self._dim
+            ratios = [min_ratio] * self.dim
 
         translations = []
-        for i in xrange(self._dim):
+        for i in xrange(self.dim):
             trans = (target_sizes[i] - ratios[i] * sizes[i]) / 2.
             trans -= mins[i] * ratios[i] - corner[i]
             translations.append(trans)
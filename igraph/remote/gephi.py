@@ -245,17 +245,21 @@ class GephiGraphStreamer(object):
 
         # Add the vertices
         add_node = self.format.get_add_node_event
-        for vertex in graph.vs:
-            yield add_node("%s:v:%d" % (id_prefix, vertex.index), vertex.attributes())
+        attrs = graph.vertex_attributes()
+        for values in graph.vs.iter_tuples(*attrs):
+            yield add_node("%s:v:%d" % (id_prefix, values[0]),
+                    dict(zip(attrs, values[1:])))
 
         # Add the edges
         add_edge = self.format.get_add_edge_event
         directed = graph.is_directed()
-        for edge in graph.es:
-            yield add_edge("%s:e:%d:%d" % (id_prefix, edge.source, edge.target),
-                    "%s:v:%d" % (id_prefix, edge.source),
-                    "%s:v:%d" % (id_prefix, edge.target),
-                    directed, edge.attributes())
+        attrs = graph.edge_attributes()
+        for values in graph.es.iter_tuples(*attrs):
+            source, target = values[1:3]
+            yield add_edge("%s:e:%d:%d" % (id_prefix, source, target),
+                    "%s:v:%d" % (id_prefix, source),
+                    "%s:v:%d" % (id_prefix, target),
+                    directed, dict(zip(attrs, values[3:])))
 
     def post(self, graph, destination, encoder=None):
         """Posts the given graph to the destination of the streamer using the
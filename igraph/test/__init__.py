@@ -2,9 +2,9 @@ import sys
 import unittest
 from igraph.test import basic, layouts, games, foreign, structural, flow, \
     spectral, attributes, cliques, decomposition, operators, generators, \
-    isomorphism, colortests, vertexseq, edgeseq, iterators, bipartite, \
-    conversion, rng, separators, indexing, atlas, matching, homepage, \
-    walks, unicode_issues
+    isomorphism, colortests, drawingtests, vertexseq, edgeseq, iterators, \
+    bipartite, conversion, rng, separators, indexing, atlas, matching, \
+    homepage, walks, unicode_issues
 
 
 def suite():
@@ -28,6 +28,7 @@ def suite():
         iterators.suite(),
         bipartite.suite(),
         colortests.suite(),
+        drawingtests.suite(),
         rng.suite(),
         separators.suite(),
         indexing.suite(),
@@ -209,6 +209,26 @@ class AttributeCombinationTests(unittest.TestCase):
         self.assertTrue(g.es["weight"] == [3, 3, 15])
         self.assertTrue(g.es["weight2"] == [2, 3, 6])
 
+    def testCombinationCount(self):
+        g = self.g
+        g.simplify(combine_edges={"weight": "count", "weight2": len})
+        self.assertTrue(g.es["weight"] == [2, 1, 3])
+        self.assertTrue(g.es["weight2"] == [2, 1, 3])
+
+    def testCombinationMixedNumericTypes(self):
+        g = self.g
+        g.es["weight"] = [1, 2.5, 3, 6, 5.0, 6.0, 7]
+        g.es["weight2"] = [1, "x", 3, 4, 5, 6, 7]
+        h = g.copy()
+        h.simplify(combine_edges={"weight": "max", "weight2": "min"})
+        self.assertTrue(h.es["weight"] == [2.5, 3, 6])
+        self.assertTrue(isinstance(h.es[2]["weight"], int))
+        self.assertTrue(h.es["weight2"] == [1, 3, 4])
+        h = g.copy()
+        h.simplify(combine_edges={"weight": "median", "weight2": "ignore"})
+        self.assertTrue(h.es["weight"] == [1.75, 3, 6])
+        self.assertTrue(isinstance(h.es[2]["weight"], int))
+
     def testCombinationTypeMismatch(self):
         g = self.g
         g.es["weight"] = list("ABCDEFG")
@@ -265,6 +265,15 @@ class BasicTests(unittest.TestCase):
         g=Graph(2, [(0,1), (1,0)], directed=True)
         self.assertTrue(g.is_multiple() == [False, False])
 
+    def testAutocurve(self):
+        g=Graph([(0,1), (1,2), (1,0), (2,3), (0,1), (2,3), (3,3)], directed=True)
+        self.assertEqual(autocurve(g, attribute=None),
+            [0.5, 0, 0.5, 0.5, 0, -0.5, 0])
+        self.assertEqual(autocurve(g, attribute=None, default=0.5),
+            [0.5, 0.5, 0.5, 0.5, 0, -0.5, 0.5])
+        autocurve(g)
+        self.assertEqual(g.es["curved"], [0.5, 0, 0.5, 0.5, 0, -0.5, 0])
+
 
     def testPickling(self):
         import pickle
@@ -33,6 +33,59 @@ class SubgraphTests(unittest.TestCase):
         self.assertTrue(sg.isomorphic(exp))
         self.assertTrue(sg.es["id"] == es)
 
+    def testGraphView(self):
+        g = Graph.Lattice([10, 10], circular=False, mutual=False)
+        g.vs["id"] = range(g.vcount())
+        g.es["weight"] = range(1, g.ecount()+1)
+        g["name"] = "lattice"
+
+        vs = [22, 0, 1, 2, 10, 11, 12, 20, 21, 21]
+        view = GraphView(g, vs)
+        self.assertTrue(view.vcount() == 9 and len(view) == 9)
+        self.assertTrue(view.vertex_ids == sorted(set(vs)))
+        self.assertTrue(view.vs["id"] == sorted(set(vs)))
+        self.assertTrue(view["name"] == "lattice")
+        self.assertTrue(view.parent_vertex(8) == 22)
+        self.assertTrue(view.local_vertex(22) == 8)
+        self.assertRaises(ValueError, view.local_vertex, 23)
+        self.assertTrue(view.graph.isomorphic(
+            Graph.Lattice([3, 3], circular=False, mutual=False)))
+        self.assertTrue(view.neighbors(4) == [1, 3, 5, 7])
+        self.assertTrue(view.degree() == [2, 3, 2, 3, 4, 3, 2, 3, 2])
+        self.assertTrue(view.strength(weights="weight") ==
+                        g.subgraph(vs).strength(weights="weight"))
+        self.assertTrue(view.shortest_paths(None, None, "weight") ==
+                        g.subgraph(vs).shortest_paths(None, None, "weight"))
+        self.assertTrue(view.strength(None, ALL, True, "weight") ==
+                        view.strength(weights="weight"))
+        self.assertRaises(AttributeError, getattr, view, "add_vertices")
+
+        g.vs["name"] = ["v%d" % v for v in range(g.vcount())]
+        for spec in (["v%d" % v for v in vs], g.vs.select(vs)):
+            self.assertTrue(GraphView(g, spec).vertex_ids == sorted(set(vs)))
+        self.assertTrue(GraphView(g, "v22").vertex_ids == [22])
+        self.assertTrue(GraphView(g, edges=g.es.select([3, 1])).edge_ids ==
+                        [1, 3])
+        self.assertRaises(ValueError, GraphView, g, ["v0", "nonexistent"])
+        del g.vs["name"]
+
+        sg = view.materialize()
+        self.assertTrue(sg.get_edgelist() == view.get_edgelist())
+        self.assertTrue(sg.vs["id"] == sorted(set(vs)))
+        self.assertTrue(sg.es["weight"] == [g.es[e]["weight"] for e in view.edge_ids])
+        self.assertTrue(sg["name"] == "lattice")
+
+        es = [0, 1, 2, 5, 20, 21, 22, 24, 38, 40]
+        view = GraphView(g, edges=es)
+        self.assertTrue(view.edge_ids == es)
+        self.assertTrue(view.es["weight"] == [e+1 for e in es])
+        self.assertTrue(view.graph.isomorphic(g.subgraph_edges(es)))
+        self.assertTrue(GraphView(g, [0, 1, 10], es).edge_ids == [0, 1])
+
+        cl = VertexClustering(g, [v // 50 for v in range(100)])
+        self.assertTrue([v.vertex_ids for v in cl.subgraphs(view=True)] ==
+                        [range(50), range(50, 100)])
+
 
 class DecompositionTests(unittest.TestCase):
     def testKCores(self):
@@ -46,6 +99,36 @@ class DecompositionTests(unittest.TestCase):
         l.sort()
         self.assertTrue(l == [(0,1), (0,2), (0,3), (1,2), (1,3), (2,3)])
 
+    def testIterComponents(self):
+        g = Graph([(0, 1), (1, 2), (3, 4), (5, 6), (6, 7), (7, 8), (10, 11),
+                   (11, 10)], directed=True)
+        self.assertTrue(list(g.iter_components(WEAK)) ==
+                        [[5, 6, 7, 8], [0, 1, 2], [3, 4], [10, 11], [9]])
+        self.assertTrue(list(g.iter_components(WEAK, minelements=3)) ==
+                        [[5, 6, 7, 8], [0, 1, 2]])
+        self.assertTrue(list(g.iter_components(minelements=2)) == [[10, 11]])
+
+        # Components of the same size come in the order of their smallest
+        # vertex IDs in both modes
+        random_graph = Graph.Erdos_Renyi(60, m=70, directed=True)
+        for mode in (STRONG, WEAK):
+            components = list(random_graph.iter_components(mode))
+            self.assertTrue(components == sorted(random_graph.clusters(mode),
+                            key=lambda vids: (-len(vids), vids[0])))
+
+        views = list(g.iter_components(WEAK, minelements=2, views=True))
+        self.assertTrue([view.vertex_ids for view in views] ==
+                        [[5, 6, 7, 8], [0, 1, 2], [3, 4], [10, 11]])
+        self.assertTrue([view.ecount() for view in views] == [3, 2, 1, 2])
+
+        for workers in (1, 3):
+            sizes = g.iter_components(WEAK, views=True, workers=workers,
+                                      callback=lambda view: view.ecount())
+            self.assertTrue(sizes == [3, 2, 1, 2, 0])
+            self.assertRaises(ZeroDivisionError, g.iter_components, WEAK,
+                              callback=lambda vids: 1 / (len(vids) - 1),
+                              workers=workers)
+
 
 class ClusteringTests(unittest.TestCase):
     def setUp(self):
@@ -57,12 +140,28 @@ class ClusteringTests(unittest.TestCase):
         self.assertTrue(self.cl[2] == [5])
         self.assertTrue(self.cl[3] == [])
         self.assertTrue(self.cl[4] == [8, 9])
+        self.assertRaises(IndexError, self.cl.__getitem__, 5)
+        self.assertTrue(list(self.cl) == [[0, 1, 2], [3, 4, 6, 7], [5], [], [8, 9]])
 
     def testClusteringLength(self):
         self.assertTrue(len(self.cl) == 5)
 
     def testClusteringMembership(self):
         self.assertTrue(self.cl.membership == [0,0,0,1,1,2,1,1,4,4])
+        self.assertTrue(isinstance(self.cl.membership, list))
+        self.assertTrue(self.cl.membership * 2 == [0,0,0,1,1,2,1,1,4,4] * 2)
+
+        def modify(membership):
+            membership[0] = 1
+        membership = self.cl.membership
+        modify(membership)
+        self.assertTrue(self.cl.membership != membership)
+
+        view = self.cl.membership_view
+        self.assertTrue(view == [0,0,0,1,1,2,1,1,4,4])
+        self.assertTrue(repr(view) == repr([0,0,0,1,1,2,1,1,4,4]))
+        self.assertRaises(TypeError, modify, view)
+        self.assertTrue(self.cl[0] == [0, 1, 2])
 
     def testClusteringSizes(self):
         self.assertTrue(self.cl.sizes() == [3, 4, 1, 0, 2])
@@ -108,6 +207,44 @@ class VertexClusteringTests(unittest.TestCase):
         self.assertTrue(clg.vs["string"] == ["aaa", "bbc", "ccab"])
         self.assertTrue(clg.vs["int"] == [41, 64, 47])
 
+        g = Graph([(0, 1), (1, 2), (2, 0), (2, 3), (3, 2), (1, 3), (3, 4)],
+                  directed=True)
+        g.es["weight"] = range(1, 8)
+        g["name"] = "test"
+        cl = VertexClustering(g, [1, 1, 0, 0, 2])
+        clg = cl.cluster_graph(combine_edges=dict(weight="sum"))
+        self.assertTrue(clg.is_directed())
+        self.assertTrue(clg["name"] == "test")
+        self.assertTrue(clg.get_edgelist() == [(0, 1), (0, 2), (1, 0)])
+        self.assertTrue(clg.es["weight"] == [3, 7, 8])
+
+    def testMove(self):
+        g = Graph.Famous("zachary")
+        g.add_edges([(0, 0), (5, 5)])
+        g.es["weight"] = [(i % 5) + 1 for i in xrange(g.ecount())]
+        membership = [i % 3 for i in xrange(g.vcount())]
+        moves = [(0, 1), (5, 3), (16, 3), (0, 0), (33, 2), (5, 3), (10, 4)]
+        for params in [{}, dict(weights="weight"),
+                       dict(weights="weight", resolution=0.5)]:
+            cl = VertexClustering(g, membership, modularity_params=params)
+            q = cl.q
+            for vertex, cluster in moves:
+                q += cl.move(vertex, cluster)
+                self.assertAlmostEqual(q, g.modularity(cl.membership, **params),
+                                       places=7)
+                self.assertAlmostEqual(cl.q, q, places=7)
+            self.assertEqual(len(cl), 5)
+            self.assertEqual(cl[4], [10])
+            self.assertEqual(cl.membership[:3], [0, 1, 2])
+            self.assertRaises(ValueError, cl.move, 0, 6)
+
+        cl = VertexClustering(g, membership)
+        cl.move(0, 1)
+        self.assertAlmostEqual(g.modularity(cl.membership, resolution=0.5),
+            g.modularity(cl.membership) + 0.5 * sum(
+                (sum(g.degree(cluster)) / (2.0 * g.ecount())) ** 2
+                for cluster in cl), places=7)
+
 
 class CoverTests(unittest.TestCase):
     def setUp(self):
@@ -119,6 +256,10 @@ class CoverTests(unittest.TestCase):
         self.assertTrue(self.cl[2] == [])
         self.assertTrue(self.cl[3] == [8, 9])
 
+    def testCoverMembership(self):
+        self.assertTrue(self.cl.membership == [[0], [0], [0], [0, 1], [1],
+            [1], [1], [], [3], [1, 3]])
+
     def testCoverLength(self):
         self.assertTrue(len(self.cl) == 4)
 
@@ -186,6 +327,23 @@ class CommunityTests(unittest.TestCase):
         cl = g.community_fastgreedy().as_clustering()
         self.assertMembershipsEqual(cl, range(g.vcount()))
 
+    def testConsensus(self):
+        g = Graph.Full(5) + Graph.Full(5) + Graph.Full(5)
+        g += [(0, 5), (5, 10), (10, 0)]
+        g.es["weight"] = [2] * 30 + [1] * 3
+        for method in ("label_propagation", "multilevel", "fastgreedy"):
+            cl = g.community_consensus(method, runs=10, workers=1,
+                                       weights="weight")
+            self.assertTrue(isinstance(cl, VertexClustering))
+            self.assertMembershipsEqual(cl, [0]*5 + [1]*5 + [2]*5)
+            self.assertAlmostEqual(cl.q, g.modularity(cl.membership,
+                                                      g.es["weight"]))
+
+        self.assertEqual(g._co_membership_counts([0]*5 + [1]*10),
+                         [1]*30 + [0, 1, 0])
+        self.assertRaises(ValueError, g.community_consensus, threshold=0)
+        self.assertRaises(ValueError, g.community_consensus, "no_such_method")
+
     def testEdgeBetweenness(self):
         # Full graph, no weights
         g = Graph.Full(5)
@@ -255,6 +413,38 @@ class CommunityTests(unittest.TestCase):
         self.assertAlmostEqual(cls[0].q, 0.346301, places=5)
         self.assertAlmostEqual(cls[1].q, 0.392219, places=5)
 
+    def testMultilevelUpdate(self):
+        g = Graph.Full(5) + Graph.Full(5)
+        g.add_edges([(0, 5)])
+        cl = g.community_multilevel()
+        self.assertMembershipsEqual(cl, [0]*5 + [1]*5)
+
+        # A new triangle attached to the first clique by a single edge
+        g.add_vertices(3)
+        added = [(10, 11), (11, 12), (10, 12), (12, 0)]
+        g.add_edges(added)
+        cl = g.community_multilevel_update(cl, added=added)
+        self.assertTrue(isinstance(cl, VertexClustering))
+        self.assertMembershipsEqual(cl, [0]*5 + [1]*5 + [2]*3)
+        self.assertAlmostEqual(cl.q, g.modularity(cl.membership), places=7)
+
+        # Removing the edges of a vertex lets it leave its community
+        removed = [(4, i) for i in xrange(4)]
+        g.delete_edges(removed)
+        g.add_edges([(4, 10)])
+        cl = g.community_multilevel_update(cl, added=[(4, 10)],
+                                           removed=removed)
+        self.assertMembershipsEqual(cl, [0]*4 + [1] + [2]*5 + [1]*3)
+        self.assertAlmostEqual(cl.q, g.modularity(cl.membership), places=7)
+
+        g.es["weight"] = [1] * g.ecount()
+        cl2 = g.community_multilevel_update(cl, weights="weight")
+        self.assertMembershipsEqual(cl2, cl.membership)
+        self.assertAlmostEqual(cl2.q, cl.q, places=7)
+
+        self.assertRaises(ValueError, g.community_multilevel_update,
+                          [0] * 20)
+
     def testOptimalModularity(self):
         try:
             g = Graph.Famous("bull")
@@ -307,6 +497,57 @@ class CommunityTests(unittest.TestCase):
         cl = g.community_walktrap(steps=3).as_clustering()
         self.assertMembershipsEqual(cl, [0,0,0,0,0,1,1,1,1,1,2,2,2,2,2])
 
+    def testDendrogramCuts(self):
+        g = Graph.Full(5) + Graph.Full(5) + Graph.Full(5)
+        g += [(0,5), (5,10), (10, 0), (3, 3)]
+        g.es["weight"] = range(1, g.ecount()+1)
+        for weights in (None, "weight"):
+            dendrogram = g.community_fastgreedy(weights)
+            n, merges = g.vcount(), dendrogram.merges
+
+            qs = dendrogram.modularities()
+            self.assertEqual(len(qs), len(merges)+1)
+            for step, q in enumerate(qs):
+                membership = community_to_membership(merges, n, step)
+                self.assertAlmostEqual(q, g.modularity(membership, weights))
+
+            counts = [15, 1, 3, 7, 3]
+            cls = dendrogram.as_clusterings(counts)
+            self.assertEqual([len(cl) for cl in cls], counts)
+            for cl, count in zip(cls, counts):
+                self.assertTrue(isinstance(cl, VertexClustering))
+                membership = community_to_membership(merges, n, n-count)
+                self.assertMembershipsEqual(cl, membership)
+                self.assertEqual(cl.membership[0], 0)
+                self.assertAlmostEqual(cl.q, g.modularity(membership, weights))
+
+        # The resolution parameter is honoured by the modularity sweep
+        dendrogram = g.community_fastgreedy()
+        merges = dendrogram.merges
+        dendrogram = VertexDendrogram(g, merges,
+                                      modularity_params=dict(resolution=0.5))
+        qs = dendrogram.modularities()
+        for step, q in enumerate(qs):
+            membership = community_to_membership(merges, n, step)
+            self.assertAlmostEqual(q, g.modularity(membership, resolution=0.5))
+        count = dendrogram.optimal_count
+        self.assertEqual(qs.index(max(qs)), n-count)
+        cl = dendrogram.as_clustering()
+        self.assertEqual(len(cl), count)
+        self.assertAlmostEqual(cl.q, max(qs))
+
+        # Dendrograms of disconnected graphs have fewer merges
+        dendrogram = VertexDendrogram(Graph(4, [(0, 1), (2, 3)]),
+                                      [(0, 1), (2, 3)])
+        self.assertEqual([cl.membership for cl in
+                          dendrogram.as_clusterings([4, 3, 2, 1])],
+                         [[0, 1, 2, 3], [0, 0, 1, 2], [0, 0, 1, 1],
+                          [0, 0, 1, 1]])
+        self.assertEqual(dendrogram.optimal_count, 2)
+
+        dendrogram = Dendrogram([(2, 3), (0, 1), (4, 5), (6, 7)])
+        self.assertEqual(dendrogram._traverse_inorder(), [3, 2, 4, 1, 0])
+
 
 class CohesiveBlocksTests(unittest.TestCase):
     def genericTests(self, cbs):
@@ -405,6 +646,38 @@ class ComparisonTests(unittest.TestCase):
         self.assertAlmostEqual(compare_communities(l1, l2, "nmi", remove_none=True), \
                 0.5158, places=3)
 
+    def testCompareMatrix(self):
+        expected = {
+            "vi": [0, 0.8675, math.log(6)],
+            "nmi": [1, 0.5158, 0],
+            "split": [0, 3, 5, 11],
+            "rand": [1, 2/3., 0, 0.590909],
+            "adjusted_rand": [1, 0.242424, 0, -0.04700353]
+        }
+        for method, results in expected.iteritems():
+            for clusters, result in zip(self.clusterings, results):
+                for threads in (1, 2):
+                    matrix = compare_communities_matrix(clusters, method,
+                            threads=threads)
+                    self.assertTrue(isinstance(matrix, Matrix))
+                    self.assertEqual(matrix.shape, (2, 2))
+                    self.assertAlmostEqual(matrix[0, 1], result, places=3)
+                    self.assertAlmostEqual(matrix[1, 0], result, places=3)
+
+        clusters = [c for pair in self.clusterings[:2] for c in pair]
+        matrix = compare_communities_matrix(clusters, "split", threads=3)
+        self.assertEqual(matrix.data, [[0, 0, 0, 3], [0, 0, 0, 3],
+            [0, 0, 0, 3], [3, 3, 3, 0]])
+
+        self.assertEqual(compare_communities_matrix([]).shape, (0, 0))
+        self.assertRaises(ValueError, compare_communities_matrix,
+                [[1, 1, 2], [1, 2]])
+
+        l1 = Clustering([1, 1, 1, None, None, 2, 2, 2, 2])
+        l2 = Clustering([1, 1, 2,    2, None, 2, 3, 3, None])
+        matrix = compare_communities_matrix([l1, l2], "nmi", remove_none=True)
+        self.assertAlmostEqual(matrix[0, 1], 0.5158, places=3)
+
 def suite():
     decomposition_suite = unittest.makeSuite(DecompositionTests)
     clustering_suite = unittest.makeSuite(ClusteringTests)
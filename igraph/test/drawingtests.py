@@ -0,0 +1,495 @@
+import os
+import random
+import shutil
+import tempfile
+import unittest
+
+from math import sqrt
+
+from igraph import *
+from igraph.drawing.colors import palettes
+from igraph.configuration import Configuration
+from igraph.drawing.edge import ArrowEdgeDrawer, TaperedEdgeDrawer
+from igraph.drawing.graph import DefaultGraphDrawer
+from igraph.drawing.metamagic import AttributeCollectorBase, ConstantColumn
+from igraph.drawing.tiles import TileRenderer
+from igraph.drawing.utils import BoundingBox
+from igraph.test.utils import skipIf
+
+try:
+    import cairo
+except ImportError:
+    try:
+        import cairocffi as cairo
+    except ImportError:
+        cairo = None
+
+
+class VisualBuilder(AttributeCollectorBase):
+    _kwds_prefix = "vertex_"
+    curved = (0.0, ArrowEdgeDrawer._curvature_to_float)
+    label = None
+    position = dict(func=lambda index: index * 10)
+    size = 20.0
+
+
+class AttributeCollectorTests(unittest.TestCase):
+    def setUp(self):
+        self.g = Graph.Ring(6)
+        self.g.vs["size"] = [1, None, 30, -40, 5, 6]
+        self.g.vs["label"] = ["a", None, "abc", None, 12345, ""]
+
+    def testLazyColumns(self):
+        builder = VisualBuilder(self.g.vs, dict(vertex_curved=True))
+        self.assertEqual(builder._columns, {})
+        self.assertEqual(builder[2].size, 30.)
+        self.assertEqual(sorted(builder._columns), ["size"])
+        self.assertEqual(builder.get_column("size"),
+                         [1., 20., 30., -40., 5., 6.])
+
+        # Constants are not expanded into lists
+        curved = builder.get_column("curved")
+        self.assertTrue(isinstance(curved, ConstantColumn))
+        self.assertEqual(list(curved), [0.5] * 6)
+        self.assertEqual([item.curved for item in builder], [0.5] * 6)
+        self.assertEqual([item.position for item in builder],
+                         [0, 10, 20, 30, 40, 50])
+
+        # Overriding a value turns the constant into a list
+        builder[4].curved = 1.
+        self.assertEqual(builder.get_column("curved"),
+                         [0.5, 0.5, 0.5, 0.5, 1., 0.5])
+        self.assertEqual([item.curved for item in builder],
+                         [0.5, 0.5, 0.5, 0.5, 1., 0.5])
+        builder.set_value("size", -1, 8)
+        self.assertEqual(builder[5].size, 8)
+
+        # Collectors do not share their columns
+        other = VisualBuilder(self.g.vs, dict(vertex_curved=False))
+        self.assertEqual(other[4].curved, 0.)
+        self.assertEqual(builder[4].curved, 1.)
+        self.assertEqual(other[5].size, 6.)
+
+    def testElements(self):
+        builder = VisualBuilder(self.g.vs)
+        other = VisualBuilder(self.g.vs)
+        self.assertTrue(builder[0])
+        self.assertEqual(builder[1], builder[1])
+        self.assertEqual(builder[-1], builder[5])
+        self.assertNotEqual(builder[1], builder[2])
+        self.assertNotEqual(builder[1], other[1])
+        self.assertNotEqual(builder[1], 1)
+        self.assertEqual(len(set([builder[1], builder[1], other[1]])), 2)
+        self.assertEqual(list(builder), [builder[idx] for idx in range(6)])
+        self.assertRaises(AttributeError, getattr, builder[0], "width")
+
+    def testRestriction(self):
+        kwds = dict(vertex_curved=[True, 0.2, None], vertex_label=None)
+        full = VisualBuilder(self.g.vs, kwds)
+        builder = VisualBuilder(self.g.vs, kwds, [5, 1, 3])
+        self.assertEqual(len(builder), 3)
+        for attr in ("curved", "label", "position", "size"):
+            self.assertEqual([getattr(item, attr) for item in builder],
+                             [getattr(full[idx], attr) for idx in (5, 1, 3)])
+            self.assertEqual(getattr(builder[1], attr),
+                             getattr(full[1], attr))
+        self.assertEqual(builder[-1].size, 6.0)
+        self.assertRaises(IndexError, builder.__getitem__, 0)
+        self.assertRaises(IndexError, builder.__getitem__, 6)
+
+        builder.set_value("size", 3, 7)
+        builder[5].curved = 2
+        self.assertEqual([item.size for item in builder], [6., 20., 7])
+        self.assertEqual(builder[5].curved, 2)
+
+        builder = VisualBuilder(self.g.vs, kwds, [])
+        self.assertEqual(list(builder), [])
+        self.assertEqual(builder.get_max("size"), 0)
+        self.assertEqual(builder.get_max_length("label"), None)
+
+    def testGetMax(self):
+        def column_max(builder, attr):
+            return max(abs(value) for value in builder.get_column(attr))
+
+        def column_max_length(builder, attr):
+            lengths = [len(str(value)) for value in builder.get_column(attr)
+                       if value is not None]
+            return max(lengths) if lengths else None
+
+        for kwds in [{}, dict(vertex_size=3), dict(vertex_size=[2, None]),
+                     dict(vertex_size=[0, 2, 50]), dict(vertex_size="-60"),
+                     dict(vertex_curved=True),
+                     dict(vertex_curved=[False, 0.2, None, -1.5]),
+                     dict(vertex_label=None), dict(vertex_label="xy"),
+                     dict(vertex_label=[None, "abcdefg"])]:
+            for indices in (None, [0, 1], [1, 3, 5]):
+                builder = VisualBuilder(self.g.vs, kwds, indices)
+                maxs = [builder.get_max("size"), builder.get_max("curved"),
+                        builder.get_max("position"),
+                        builder.get_max_length("label")]
+                self.assertEqual(sorted(builder._columns), ["position"])
+                self.assertEqual(maxs, [column_max(builder, "size"),
+                                        column_max(builder, "curved"),
+                                        column_max(builder, "position"),
+                                        column_max_length(builder, "label")])
+
+        self.assertRaises(AttributeError, VisualBuilder(self.g.vs).get_max,
+                          "width")
+
+
+class GraphDrawerTests(unittest.TestCase):
+    def segmentInBox(self, p, q, lower, upper):
+        def inside(point):
+            return all(lower[d] <= point[d] <= upper[d] for d in (0, 1))
+        def cross(o, a, b):
+            return (a[0]-o[0]) * (b[1]-o[1]) - (a[1]-o[1]) * (b[0]-o[0])
+
+        if inside(p) or inside(q):
+            return True
+        if p == q:
+            return False
+        corners = [lower, (upper[0], lower[1]), upper, (lower[0], upper[1])]
+        for a, b in zip(corners, corners[1:] + corners[:1]):
+            if cross(p, q, a) * cross(p, q, b) <= 0 and \
+                    cross(a, b, p) * cross(a, b, q) <= 0:
+                return True
+        return False
+
+    def testEdgesInBox(self):
+        rng = random.Random(42)
+        n = 40
+        edges = [(rng.randrange(n), rng.randrange(n)) for _ in xrange(300)]
+        edges.extend((i, i) for i in xrange(0, n, 4))
+        g = Graph(n, edges)
+        layout = Layout([(rng.uniform(0, 100), rng.uniform(0, 100))
+                         for _ in xrange(n)])
+
+        for margin, bend in [(0, 0), (3.5, 0), (0, 0.25), (2, 0.5)]:
+            for _ in xrange(20):
+                x, y = rng.uniform(-10, 100), rng.uniform(-10, 100)
+                lower = (x, y)
+                upper = (x + rng.uniform(0, 20), y + rng.uniform(0, 20))
+                expected = []
+                for eid, (u, v) in enumerate(edges):
+                    p, q = layout[u], layout[v]
+                    pad = margin + bend * ((p[0]-q[0])**2 +
+                                           (p[1]-q[1])**2) ** 0.5
+                    if self.segmentInBox(p, q,
+                            (lower[0]-pad, lower[1]-pad),
+                            (upper[0]+pad, upper[1]+pad)):
+                        expected.append(eid)
+                self.assertEqual(g._edges_in_box(layout.array, lower, upper,
+                                                 margin, bend), expected)
+                self.assertEqual(g._edges_in_box(layout.array, upper, lower,
+                                                 margin, bend), expected)
+
+        self.assertRaises(ValueError, g._edges_in_box,
+                          Layout([(0, 0)]).array, (0, 0), (1, 1))
+        self.assertRaises(ValueError, g._edges_in_box,
+                          Layout([(0, 0, 0)] * n).array, (0, 0), (1, 1))
+
+    def testCull(self):
+        g = Graph(4, [(0, 2)])
+        layout = Layout([(5, 5), (-40, 5), (500, 500), (-1000, 5)])
+        kwds = dict(vertex_label=["a", "long label", None, None])
+        bbox = BoundingBox(0, 0, 10, 10)
+        drawer = DefaultGraphDrawer(None, bbox)
+        vertex_builder = drawer.vertex_drawer_factory(None, bbox,
+                palettes["gray"], layout).VisualVertexBuilder(g.vs, kwds)
+        edge_builder = drawer.edge_drawer_factory(None, palettes["gray"]). \
+                VisualEdgeBuilder(g.es, kwds)
+
+        # The label of vertex 1 overlaps the viewport, its circle does not
+        vertices, vertex_labels, edges, edge_labels = drawer._cull(g, layout,
+                bbox, vertex_builder, edge_builder)
+        self.assertEqual(vertices, [0])
+        self.assertEqual(vertex_labels, [0, 1])
+        self.assertEqual(edges, [0])
+        self.assertEqual(edge_labels, [])
+        self.assertEqual(vertex_builder._columns, {})
+        self.assertEqual(edge_builder._columns, {})
+
+        kwds["vertex_label_size"] = 2
+        vertex_builder = drawer.vertex_drawer_factory(None, bbox,
+                palettes["gray"], layout).VisualVertexBuilder(g.vs, kwds)
+        vertices, vertex_labels, edges, edge_labels = drawer._cull(g, layout,
+                bbox, vertex_builder, edge_builder)
+        self.assertEqual(vertex_labels, [0])
+
+
+class RecordingContext(object):
+    """Mock Cairo context that records the methods called on it."""
+
+    def __init__(self):
+        self.calls = []
+
+    def __getattr__(self, name):
+        def method(*args):
+            self.calls.append((name, args))
+        return method
+
+    def user_to_device_distance(self, dx, dy):
+        return dx, dy
+
+    def count(self, name):
+        return sum(1 for called, _ in self.calls if called == name)
+
+
+class FastModeTests(unittest.TestCase):
+    def setUp(self):
+        self.context = RecordingContext()
+        self.bbox = BoundingBox(0, 0, 100, 100)
+        self.drawer = DefaultGraphDrawer(self.context, self.bbox)
+
+    def builders(self, graph, layout, kwds):
+        palette = palettes["gray"]
+        vertex_builder = self.drawer.vertex_drawer_factory(self.context,
+                self.bbox, palette, layout).VisualVertexBuilder(graph.vs, kwds)
+        edge_builder = self.drawer.edge_drawer_factory(self.context,
+                palette).VisualEdgeBuilder(graph.es, kwds)
+        return vertex_builder, edge_builder
+
+    def drawEdges(self, graph, kwds, edge_order=None, min_size=0):
+        layout = Layout([(10 * i, i % 2) for i in xrange(graph.vcount())])
+        vertex_builder, edge_builder = self.builders(graph, layout, kwds)
+        del self.context.calls[:]
+        self.drawer._draw_edges_fast(graph, edge_builder, vertex_builder,
+                                     layout, edge_order, min_size)
+        return [(name, args) for name, args in self.context.calls
+                if name in ("move_to", "arc", "set_line_width", "stroke",
+                            "close_path", "fill")]
+
+    def testUseFastMode(self):
+        g = Graph.Ring(10)
+        config = Configuration.instance()
+        threshold = config["plotting.fast_threshold"]
+        try:
+            config["plotting.fast_threshold"] = 20
+            self.assertTrue(self.drawer._use_fast_mode(g, {}))
+            self.assertFalse(self.drawer._use_fast_mode(g, dict(fast=False)))
+            config["plotting.fast_threshold"] = 21
+            self.assertFalse(self.drawer._use_fast_mode(g, {}))
+            self.assertTrue(self.drawer._use_fast_mode(g, dict(fast=True)))
+
+            # Custom drawers are not switched to fast mode automatically
+            config["plotting.fast_threshold"] = 0
+            drawer = DefaultGraphDrawer(self.context, self.bbox,
+                                        edge_drawer_factory=TaperedEdgeDrawer)
+            self.assertFalse(drawer._use_fast_mode(g, {}))
+            self.assertTrue(drawer._use_fast_mode(g, dict(fast=1)))
+        finally:
+            config["plotting.fast_threshold"] = threshold
+
+    def testBatching(self):
+        g = Graph([(0, 1), (1, 2), (2, 3), (3, 4)])
+        kwds = dict(edge_width=[1, 2], edge_curved=0)
+        calls = self.drawEdges(g, kwds)
+        self.assertEqual(self.context.count("stroke"), 2)
+        self.assertEqual(calls, [
+            ("move_to", (0, 0)), ("move_to", (20, 0)),
+            ("set_line_width", (1, )), ("stroke", ()),
+            ("move_to", (10, 1)), ("move_to", (30, 1)),
+            ("set_line_width", (2, )), ("stroke", ())])
+
+        # An explicit edge order is kept; only consecutive edges with the
+        # same style are batched
+        calls = self.drawEdges(g, kwds, edge_order=[3, 0, 1, 2])
+        self.assertEqual([args for name, args in calls if name == "move_to"],
+                         [(30, 1), (0, 0), (10, 1), (20, 0)])
+        self.assertEqual(self.context.count("stroke"), 4)
+
+    def testOrderedDrawing(self):
+        g = Graph([(0, 1), (1, 2), (2, 3), (3, 4)])
+        g.es["order"] = [2, 0, 3, 1]
+        kwds = dict(edge_order_by="order", edge_width=[1, 1, 2, 2],
+                    edge_curved=0, vertex_size=0,
+                    layout=Layout([(10 * i, 0) for i in xrange(5)]),
+                    fast=True, fit_layout=False)
+        self.drawer.draw(g, palettes["gray"], **kwds)
+        self.assertEqual([args for name, args in self.context.calls
+                          if name == "move_to"][:4],
+                         [(10, 0), (30, 0), (0, 0), (20, 0)])
+
+    def testLoops(self):
+        g = Graph([(0, 0), (0, 1)])
+        calls = self.drawEdges(g, dict(vertex_size=10, edge_curved=0))
+        self.assertEqual([name for name, _ in calls],
+                         ["arc", "move_to", "set_line_width", "stroke"])
+        self.assertEqual(calls[0][1][2], 7.5)
+
+    def testArrowheads(self):
+        g = Graph([(0, 1), (1, 2), (2, 0)], directed=True)
+        kwds = dict(edge_curved=0, edge_arrow_size=[1, 1, 0.1])
+        self.drawEdges(g, kwds)
+        self.assertEqual(self.context.count("close_path"), 3)
+        self.assertEqual(self.context.count("fill"), 1)
+
+        # Arrowheads smaller than min_size are skipped
+        self.drawEdges(g, kwds, min_size=10)
+        self.assertEqual(self.context.count("close_path"), 2)
+        self.drawEdges(g, kwds, min_size=20)
+        self.assertEqual(self.context.count("close_path"), 0)
+        self.assertEqual(self.context.count("fill"), 0)
+        self.assertEqual(self.context.count("stroke"), 1)
+
+
+class TileRendererTests(unittest.TestCase):
+    def setUp(self):
+        self.g = Graph(4, [(0, 1), (0, 3), (2, 3)])
+        self.g.vs["name"] = ["a", "b", "c", "d"]
+        self.g.es["weight"] = [1, 2, 3]
+        self.layout = Layout([(0, 0), (10, 0), (0, 10), (10, 10)])
+        # Half of the diagonal of the default vertex size plus the frame
+        self.margin = 10 * sqrt(2) + 1
+
+    def assertCoordsAlmostEqual(self, coords, expected):
+        self.assertEqual(len(coords), len(expected))
+        for point, expected_point in zip(coords, expected):
+            for value, expected_value in zip(point, expected_point):
+                self.assertAlmostEqual(value, expected_value, places=7)
+
+    def testTiles(self):
+        renderer = TileRenderer(self.g, self.layout, max_zoom=2,
+                                tile_size=128)
+        self.assertEqual(renderer.tile_bbox(0, 0, 0).coords,
+                         (0, 0, 512, 512))
+        self.assertEqual(renderer.tile_bbox(1, 1, 0).coords,
+                         (256, 0, 512, 256))
+        self.assertEqual(renderer.tile_bbox(2, 1, 3).coords,
+                         (128, 384, 256, 512))
+
+        tiles = list(renderer.tiles())
+        self.assertEqual(len(tiles), 1 + 4 + 16)
+        self.assertEqual(tiles[:6], [(0, 0, 0), (1, 0, 0), (1, 0, 1),
+                                     (1, 1, 0), (1, 1, 1), (2, 0, 0)])
+        self.assertEqual(tiles[-1], (2, 3, 3))
+
+        renderer = TileRenderer(self.g, self.layout, max_zoom=2, min_zoom=2)
+        self.assertEqual(list(renderer.tiles()),
+                         [(2, x, y) for x in xrange(4) for y in xrange(4)])
+
+        # The layout is fitted into the pyramid, leaving room for the corners
+        # of the vertices
+        lo, hi = self.margin, 1024 - self.margin
+        self.assertCoordsAlmostEqual(renderer.layout.coords,
+                                     [[lo, lo], [hi, lo], [lo, hi], [hi, hi]])
+        self.assertEqual(self.layout.coords,
+                         [[0, 0], [10, 0], [0, 10], [10, 10]])
+
+        self.assertRaises(ValueError, TileRenderer, self.g, self.layout,
+                          max_zoom=1, min_zoom=2)
+        self.assertRaises(ValueError, TileRenderer, self.g, self.layout,
+                          vertex_order=[0, 1, 2, 3])
+
+    def testRestrictKwds(self):
+        renderer = TileRenderer(self.g, self.layout, vertex_size=[1, 2, 3],
+                vertex_color="red", vertex_label=None, vertex_shape=[],
+                vertex_order_by="name", edge_width=[5, 6], edge_curved=0.2)
+        kwds = renderer._restrict_kwds([0, 2, 3], [2])
+        self.assertEqual(kwds, dict(vertex_size=[1, 3, 1], vertex_color="red",
+                vertex_label=None, vertex_shape=[], vertex_order_by="name",
+                edge_width=[5], edge_curved=0.2, autocurve=False, fast=True))
+        self.assertEqual(renderer.kwds["vertex_size"], [1, 2, 3])
+
+        kwds = renderer._restrict_kwds([], [])
+        self.assertEqual(kwds["vertex_size"], [])
+        self.assertEqual(kwds["edge_width"], [])
+
+    def testTileGraph(self):
+        renderer = TileRenderer(self.g, self.layout, max_zoom=2,
+                tile_size=128, vertex_color=["red", "green", "blue", "black"],
+                edge_width=[1, 2])
+
+        # The tile of vertex 0 gets the edges crossing it and their endpoints
+        graph, layout, kwds = renderer._tile_graph(2,
+                renderer.tile_bbox(2, 0, 0))
+        self.assertEqual(graph.get_edgelist(), [(0, 1), (0, 2)])
+        self.assertEqual(graph.vs["name"], ["a", "b", "d"])
+        self.assertEqual(graph.es["weight"], [1, 2])
+        lo, hi = self.margin, 512 - self.margin
+        self.assertCoordsAlmostEqual(layout.coords,
+                                     [[lo, lo], [hi, lo], [hi, hi]])
+        self.assertEqual(kwds["vertex_color"], ["red", "green", "black"])
+        self.assertEqual(kwds["edge_width"], [1, 2])
+
+        graph, layout, kwds = renderer._tile_graph(2,
+                renderer.tile_bbox(2, 3, 3))
+        self.assertEqual(graph.get_edgelist(), [(0, 2), (1, 2)])
+        self.assertEqual(graph.vs["name"], ["a", "c", "d"])
+        self.assertEqual(graph.es["weight"], [2, 3])
+        self.assertEqual(kwds["vertex_color"], ["red", "blue", "black"])
+        self.assertEqual(kwds["edge_width"], [2, 1])
+
+        graph, layout, kwds = renderer._tile_graph(0,
+                renderer.tile_bbox(0, 0, 0))
+        self.assertEqual(graph.get_edgelist(), self.g.get_edgelist())
+        self.assertEqual(graph.vs["name"], self.g.vs["name"])
+
+        # No vertex or edge comes close to this tile
+        self.assertEqual(renderer._tile_graph(2, renderer.tile_bbox(2, 0, 2)),
+                         None)
+
+    def testLevelOfDetail(self):
+        min_size = Configuration.instance()["plotting.fast_min_size"]
+        self.g.vs["label"] = ["a", "b", "c", "d"]
+        style = dict(vertex_size=3 * min_size,
+                     vertex_label_size=1.5 * min_size)
+        renderer = TileRenderer(self.g, self.layout, max_zoom=2,
+                                tile_size=128, **style)
+
+        # Vertices and labels that would be smaller than the minimum size
+        # on the tile are hidden
+        _, _, kwds = renderer._tile_graph(0, renderer.tile_bbox(0, 0, 0))
+        self.assertEqual(kwds["vertex_shape"], "hidden")
+        self.assertEqual(kwds["vertex_label"], None)
+
+        _, _, kwds = renderer._tile_graph(1, renderer.tile_bbox(1, 0, 0))
+        self.assertFalse("vertex_shape" in kwds)
+        self.assertEqual(kwds["vertex_label"], None)
+
+        _, _, kwds = renderer._tile_graph(2, renderer.tile_bbox(2, 0, 0))
+        self.assertFalse("vertex_shape" in kwds)
+        self.assertFalse("vertex_label" in kwds)
+
+        renderer = TileRenderer(self.g, self.layout, max_zoom=2,
+                                tile_size=128, fast=False, **style)
+        _, _, kwds = renderer._tile_graph(0, renderer.tile_bbox(0, 0, 0))
+        self.assertFalse("vertex_shape" in kwds)
+        self.assertFalse("vertex_label" in kwds)
+
+    @skipIf(cairo is None, "test case depends on Cairo")
+    def testRender(self):
+        renderer = TileRenderer(self.g, self.layout, max_zoom=1,
+                                tile_size=32)
+        directory = tempfile.mkdtemp()
+        try:
+            renderer.render(directory, processes=1)
+            names = []
+            for dirpath, _, filenames in os.walk(directory):
+                for filename in filenames:
+                    name = os.path.join(dirpath, filename)
+                    with open(name, "rb") as fp:
+                        self.assertEqual(fp.read(8), "\x89PNG\r\n\x1a\n")
+                    names.append(os.path.relpath(name, directory))
+            self.assertEqual(sorted(names), [os.path.join(*path) for path in
+                    [("0", "0", "0.png"), ("1", "0", "0.png"),
+                     ("1", "0", "1.png"), ("1", "1", "0.png"),
+                     ("1", "1", "1.png")]])
+        finally:
+            shutil.rmtree(directory)
+
+
+def suite():
+    attribute_collector_suite = unittest.makeSuite(AttributeCollectorTests)
+    graph_drawer_suite = unittest.makeSuite(GraphDrawerTests)
+    fast_mode_suite = unittest.makeSuite(FastModeTests)
+    tile_renderer_suite = unittest.makeSuite(TileRendererTests)
+    return unittest.TestSuite([attribute_collector_suite, graph_drawer_suite,
+                               fast_mode_suite, tile_renderer_suite])
+
+def test():
+    runner = unittest.TextTestRunner()
+    runner.run(suite())
+
+if __name__ == "__main__":
+    test()
@@ -257,12 +257,102 @@ class EdgeSeqTests(unittest.TestCase):
         self.assertTrue(len(g.es(betweenness_gt=10)) < 2000)
         self.assertTrue(len(g.es(betweenness_gt=10, parity=0)) < 2000)
 
+    def testKeywordOperatorsFilteringSelect(self):
+        g = Graph.Ring(10)
+        g.es["weight"] = range(10)
+        g.es["type"] = list("ababababab")
+        es = g.es
+        self.assertEqual(es(weight_lt=3)["weight"], [0, 1, 2])
+        self.assertEqual(es(weight_ge=8)["weight"], [8, 9])
+        self.assertEqual(es(weight_ne=0, type="a")["weight"], [2, 4, 6, 8])
+        self.assertEqual(es(weight_in=[1, 3, 4], type_notin="b")["weight"], [4])
+        self.assertEqual(es(_source_in=[2, 3], weight_gt=2)["weight"], [3])
+        self.assertEqual(es(_within=[0, 1, 2, 3], type="a")["weight"], [0, 2])
+        self.assertEqual(es(_is_loop=False, weight_le=1)["weight"], [0, 1])
+        self.assertRaises(KeyError, es.select, nonexistent_lt=4)
+
+    def testAttributeViewBuffer(self):
+        import struct
+        self.g.es["weight"] = [i / 2. for i in range(45)]
+        view = self.g.es.get_attribute_view("weight")
+        data = memoryview(view).tobytes()
+        self.assertEqual(list(struct.unpack("45d", data)), self.g.es["weight"])
+
+        # Every export sees the current values, even if an older export is
+        # still alive
+        exported = memoryview(view)
+        self.g.es["weight"] = [i * 2. for i in range(45)]
+        data = memoryview(view).tobytes()
+        self.assertEqual(list(struct.unpack("45d", data)), self.g.es["weight"])
+        self.g.delete_edges(range(40))
+        self.assertEqual(len(memoryview(view).tobytes()), 5 * 8)
+        self.assertEqual(struct.unpack("45d", exported.tobytes())[44], 22.)
+        del exported
+
+        self.g.es[0]["weight"] = None
+        self.assertRaises(BufferError, memoryview, view)
+
+    @skipIf(np is None, "test case depends on NumPy")
+    def testAttributeViewNumPy(self):
+        view = self.g.es[1:4].get_attribute_view("test")
+        self.assertEqual(np.frombuffer(view).tolist(), [1.0, 2.0, 3.0])
+
+    def testIterTuples(self):
+        g = Graph([(0, 1), (1, 2), (2, 0)], directed=True)
+        g.es["weight"] = [3, 4, 5]
+        self.assertEqual(list(g.es.iter_tuples()),
+                         [(0, 0, 1), (1, 1, 2), (2, 2, 0)])
+        self.assertEqual(list(g.es[2, 0].iter_tuples("weight", "weight")),
+                         [(2, 2, 0, 5, 5), (0, 0, 1, 3, 3)])
+        self.assertEqual(list(g.es.select(weight_gt=3).iter_tuples("weight")),
+                         [(1, 1, 2, 4), (2, 2, 0, 5)])
+        self.assertRaises(KeyError, g.es.iter_tuples, "nonexistent")
+
+        it = g.es.iter_tuples("weight")
+        g.delete_edges([0])
+        self.assertEqual(list(it), [(0, 1, 2, 4), (1, 2, 0, 5)])
+
+    def testAttributeIndexes(self):
+        g = Graph.Ring(10)
+        g.es["weight"] = [i % 3 for i in range(10)]
+        g.es.create_index("weight", kind="sorted")
+        self.assertEqual(g.es.index_info()["weight"]["kind"], "sorted")
+        self.assertEqual(g.es(weight=2).indices, [2, 5, 8])
+        self.assertEqual(g.es(weight_gt=0, weight_le=1).indices, [1, 4, 7])
+        self.assertEqual(g.es(weight_lt=1, _source_in=[3, 6]).indices, [3, 6])
+
+        g.es[0]["weight"] = 2
+        g.add_edge(0, 5, weight=2)
+        self.assertEqual(g.es(weight_ge=2).indices, [0, 2, 5, 8, 10])
+        g.delete_edges([2, 5])
+        self.assertEqual(g.es(weight=2).indices, [0, 6, 8])
+        g[0, 5] = 0
+        self.assertEqual(g.es(weight=2).indices, [0, 6])
+        self.assertEqual(g.copy().es(weight=2).indices, [0, 6])
+
+        # Deleting the attribute also drops its index
+        g.es["color"] = "red"
+        g.es.create_index("color")
+        del g.es["weight"]
+        self.assertEqual(list(g.es.index_info().keys()), ["color"])
+        del g.es[0]["color"]
+        self.assertEqual(g.es.index_info(), {})
+
     def testSourceTargetFiltering(self):
         g = Graph.Barabasi(1000, 2)
         es1 = set(e.source for e in g.es.select(_target_in = [2,4]))
         es2 = set(v1 for v1, v2 in g.get_edgelist() if v2 in [2, 4])
         self.assertTrue(es1 == es2)
 
+    def testEndpointFilteringOnSubsequence(self):
+        g = Graph([(0, 1), (1, 2), (2, 0), (2, 3), (3, 3)], directed=True)
+        es = g.es[4, 1, 3, 1, 0]
+        self.assertEqual(es(_source=2).indices, [3])
+        self.assertEqual(es(_target_in=[1, 3]).indices, [4, 3, 0])
+        self.assertEqual(es(_within=[1, 2, 3]).indices, [4, 1, 3, 1])
+        self.assertEqual(es(_between=([1], [2, 3])).indices, [1, 1])
+        self.assertEqual(es(_source_in=[17, "foo"]).indices, [])
+
     def testWithinFiltering(self):
         g = Graph.Lattice([10, 10])
         vs = [0, 1, 2, 10, 11, 12, 20, 21, 22]
@@ -1,5 +1,8 @@
+import copy
+import pickle
+import struct
 import unittest
-from igraph import Graph, Layout, BoundingBox
+from igraph import Graph, Layout, BoundingBox, CoordinateArray, SpatialIndex
 
 
 class LayoutTests(unittest.TestCase):
@@ -23,6 +26,67 @@ class LayoutTests(unittest.TestCase):
         del layout[1]
         self.assertEqual(len(layout), 3)
 
+        layout[0:2] = layout[1:3]
+        self.assertEqual(layout.coords, [[1, 0, 1], [2, 1, 3], [2, 1, 3]])
+        layout[1:1] = [(5, 5, 5), (6, 6, 6)]
+        self.assertEqual(layout.coords, [[1, 0, 1], [5, 5, 5], [6, 6, 6],
+                                         [2, 1, 3], [2, 1, 3]])
+        layout[::2] = [(0, 0, 0)] * 3
+        self.assertEqual(layout.coords, [[0, 0, 0], [5, 5, 5], [0, 0, 0],
+                                         [2, 1, 3], [0, 0, 0]])
+        layout[1:] = []
+        self.assertEqual(layout.coords, [[0, 0, 0]])
+        self.assertRaises(ValueError, layout.__setitem__, slice(None, None, 2),
+                          [(1, 1, 1)] * 2)
+        self.assertRaises(ValueError, layout.__setitem__, slice(0, 1), [(1, 1)])
+
+    def testRowAsList(self):
+        layout = Layout([(0, 1), (2, 3)])
+        row = layout[1]
+        self.assertEqual(row + [4], [2, 3, 4])
+        self.assertEqual([4] + row, [4, 2, 3])
+        self.assertEqual(row + layout[0], [2, 3, 0, 1])
+        self.assertEqual(row * 2, [2, 3, 2, 3])
+        self.assertEqual(2 * row, [2, 3, 2, 3])
+        self.assertTrue(isinstance(row + [4], list))
+        self.assertRaises(TypeError, lambda: row + (4, ))
+
+        for copied in (copy.copy(row), copy.deepcopy(row),
+                       pickle.loads(pickle.dumps(row, 2))):
+            self.assertTrue(isinstance(copied, list))
+            self.assertEqual(copied, [2, 3])
+        copied = copy.copy(row)
+        row[0] = 5
+        self.assertEqual(copied, [2, 3])
+
+    def testArray(self):
+        layout = Layout([(0,0,1), (0,1,0), (1,0,0), (2,1,3)])
+        self.assertTrue(isinstance(layout.array, CoordinateArray))
+        self.assertEqual(layout.array.dim, 3)
+
+        view = memoryview(layout.array)
+        self.assertEqual(view.format, "d")
+        self.assertEqual(view.shape, (4, 3))
+        self.assertEqual(list(struct.unpack("12d", view.tobytes())),
+                         [0, 0, 1, 0, 1, 0, 1, 0, 0, 2, 1, 3])
+        self.assertRaises(BufferError, layout.append, (1, 1, 1))
+        del view
+
+        layout.append((1, 1, 1, 1))
+        self.assertEqual(layout[4], [1, 1, 1])
+        self.assertRaises(ValueError, layout.append, (1, 1))
+
+        row = layout[4]
+        layout.scale(2)
+        self.assertEqual(row, [2, 2, 2])
+        del layout[4]
+        self.assertRaises(IndexError, row.tolist)
+
+        layout2 = layout.copy()
+        layout2[0][0] = 5
+        self.assertEqual(layout[0], [0, 0, 2])
+        self.assertEqual(pickle.loads(pickle.dumps(layout)).coords, layout.coords)
+
     def testScaling(self):
         layout = Layout([(0,0,1), (0,1,0), (1,0,0), (2,1,3)])
         layout.scale(1.5)
@@ -128,6 +192,74 @@ class LayoutTests(unittest.TestCase):
         layout.transform(tr, 2, -1)
         self.assertEqual(layout.coords, [[3, 1], [5, 3]])
 
+    def testSpatialIndex(self):
+        def dist2(p, q): return sum((a-b)**2 for a, b in zip(p, q))
+
+        for dim in (2, 3):
+            layout = Graph.GRG(300, 0.1).layout_random(dim=dim)
+            index = layout.spatial_index()
+            self.assertEqual(len(index), 300)
+            self.assertEqual(index.dim, dim)
+
+            query = [0.5] * dim
+            by_dist = sorted(xrange(300),
+                    key=lambda i: (dist2(layout[i], query), i))
+            self.assertEqual(index.nearest(query), by_dist[:1])
+            self.assertEqual(index.nearest(query, k=10), by_dist[:10])
+            self.assertEqual(index.nearest(query, k=500), by_dist)
+            self.assertEqual(index.nearest(query, k=300, max_distance=0.2),
+                    [i for i in by_dist if dist2(layout[i], query) <= 0.04])
+
+            self.assertEqual(index.within_radius(query, 0.25),
+                    [i for i in xrange(300) if dist2(layout[i], query) <= 0.0625])
+
+            lower, upper = [0.2] * dim, [0.6] * dim
+            self.assertEqual(index.within_box(upper, lower),
+                    [i for i in xrange(300)
+                     if all(0.2 <= x <= 0.6 for x in layout[i])])
+
+            # The index is a snapshot of the layout
+            layout[by_dist[0]] = [10] * dim
+            self.assertEqual(index.nearest(query), by_dist[:1])
+
+        # The index is cached until the layout is modified
+        layout = Layout([(i, i) for i in xrange(10)])
+        index = layout.spatial_index()
+        self.assertTrue(layout.spatial_index() is index)
+        layout[0][1] = 5
+        index = layout.spatial_index()
+        self.assertEqual(index.within_box((0, 4), (1, 6)), [0])
+        self.assertTrue(layout.spatial_index() is index)
+        self.assertTrue(layout.copy().spatial_index() is index)
+        modifications = [lambda: layout.scale(2),
+                         lambda: layout.translate(1, 0),
+                         lambda: layout.append((1, 1)),
+                         lambda: layout.__setitem__(1, (0, 0)),
+                         lambda: layout.__delitem__(2)]
+        for modify in modifications:
+            index = layout.spatial_index()
+            modify()
+            self.assertFalse(layout.spatial_index() is index)
+            self.assertEqual(len(layout.spatial_index()), len(layout))
+
+        index = SpatialIndex([[0, 0], [1, 1], [0, 0]])
+        self.assertEqual(index.nearest((0.1, 0), k=2), [0, 2])
+        self.assertEqual(SpatialIndex(CoordinateArray([], 2)).nearest((0, 0)), [])
+        self.assertRaises(ValueError, index.nearest, (0, 0), k=0)
+        self.assertRaises(ValueError, index.nearest, (0, 0, 0))
+        self.assertRaises(ValueError, index.within_radius, (0, 0), -1)
+        self.assertRaises(ValueError, Layout([[0]*4]).spatial_index)
+
+        # Points with non-finite coordinates are left out
+        nan, inf = float("nan"), float("inf")
+        coords = [(0, 0), (nan, 1), (2, 2), (inf, 0), (1, -inf)] + \
+                 [(i, i) for i in xrange(3, 30)]
+        index = Layout(coords).spatial_index()
+        self.assertEqual(len(index), 29)
+        self.assertEqual(index.nearest((0, 0), 2), [0, 2])
+        self.assertEqual(index.within_radius((1, 0), 2.5), [0, 2])
+        self.assertEqual(index.within_box((-inf, -inf), (inf, 3)), [0, 2, 5])
+
 
 class LayoutAlgorithmTests(unittest.TestCase):
     def testAuto(self):
@@ -282,6 +414,105 @@ class LayoutAlgorithmTests(unittest.TestCase):
         lo = g.layout("drl")
         self.assertTrue(isinstance(lo, Layout))
 
+    def testBarnesHut(self):
+        g = Graph.Lattice([10, 10], circular=False)
+        lo = g.layout("bh", niter=100)
+        self.assertTrue(isinstance(lo, Layout))
+        self.assertEqual(len(lo), g.vcount())
+
+        lo = g.layout("bh_3d", niter=10, theta=0.5)
+        self.assertEqual(lo.dim, 3)
+
+        seed = g.layout_circle()
+        fixed = [i % 2 == 0 for i in xrange(g.vcount())]
+        lo = g.layout("bh", seed=seed, fixed=fixed, niter=20)
+        for i in xrange(g.vcount()):
+            if fixed[i]:
+                self.assertEqual(lo[i], seed[i])
+            else:
+                self.assertNotEqual(lo[i], seed[i])
+
+        lo = g.layout("bh", seed=seed, niter=0)
+        self.assertEqual(lo.coords, seed.coords)
+
+        # Coincident vertices are separated deterministically
+        ring = Graph.Ring(4)
+        for theta in (1.2, 0):
+            lo = ring.layout_barnes_hut(seed=Layout([(1, 1)] * 4), theta=theta)
+            self.assertEqual(len(set(map(tuple, lo))), 4)
+            self.assertEqual(lo.coords, ring.layout_barnes_hut(
+                seed=Layout([(1, 1)] * 4), theta=theta).coords)
+
+        self.assertRaises(ValueError, g.layout_barnes_hut, theta=-1)
+        self.assertRaises(ValueError, g.layout_barnes_hut, fixed=[True])
+        self.assertRaises(ValueError, g.layout_barnes_hut, seed=[(0, 0)])
+
+        # Non-finite weights or seed coordinates are rejected up front
+        for value in (float("nan"), float("inf"), float("-inf")):
+            weights = [1] * g.ecount()
+            weights[7] = value
+            self.assertRaises(ValueError, g.layout_barnes_hut,
+                              weights=weights)
+            coords = seed.coords
+            coords[3] = [0, value]
+            self.assertRaises(ValueError, g.layout_barnes_hut, seed=coords)
+
+    def testIncremental(self):
+        g = Graph.Lattice([10, 10], circular=False)
+        lo = g.layout("bh", niter=100)
+        g.add_vertices(2)
+        g.add_edges([(0, 100), (100, 101), (55, 99)])
+
+        new_lo, displacement = g.layout_incremental(lo, [55])
+        self.assertTrue(isinstance(new_lo, Layout))
+        self.assertEqual(len(new_lo), g.vcount())
+        self.assertTrue(displacement > 0)
+        touched = set([0, 55, 99, 100, 101])
+        for v in list(touched):
+            touched.update(g.neighbors(v))
+        for v in xrange(100):
+            if v not in touched:
+                self.assertEqual(new_lo[v], lo[v])
+
+        new_lo, displacement = g.layout_incremental(new_lo, niter=0)
+        self.assertEqual(displacement, 0)
+
+        new_lo, displacement = Graph(3).layout_incremental(Layout([]))
+        self.assertEqual(len(new_lo), 3)
+
+        self.assertRaises(ValueError, Graph(2).layout_incremental, lo)
+        self.assertRaises(ValueError, g.layout_incremental, lo, hops=-1)
+
+    def testMultilevel(self):
+        g = Graph.Lattice([20, 20], circular=False)
+        lo = g.layout("multilevel")
+        self.assertTrue(isinstance(lo, Layout))
+        self.assertEqual(len(lo), g.vcount())
+        self.assertEqual(lo.dim, 2)
+        # Adjacent vertices should be much closer than the diameter
+        bbox = lo.bounding_box()
+        for u, v in g.get_edgelist():
+            dist = sum((a-b)**2 for a, b in zip(lo[u], lo[v])) ** 0.5
+            self.assertTrue(dist < max(bbox.width, bbox.height) / 4)
+
+        lo = g.layout("multilevel_3d", weights=[2] * g.ecount(), niter=5)
+        self.assertEqual(lo.dim, 3)
+
+        lo = g.layout("multilevel", time_limit=0)
+        self.assertEqual(len(lo), g.vcount())
+
+        for g in [Graph(), Graph(1), Graph(5, [(0, 1)])]:
+            lo = g.layout("multilevel")
+            self.assertEqual(len(lo), g.vcount())
+
+        self.assertRaises(ValueError, g.layout_multilevel, dim=4)
+        self.assertRaises(ValueError, g.layout_multilevel, min_size=0)
+
+        g = Graph.Ring(5)
+        for weight in (float("nan"), float("inf"), float("-inf")):
+            self.assertRaises(ValueError, g.layout_multilevel,
+                              weights=[1, 1, weight, 1, 1])
+
 
 def suite():
     layout_suite = unittest.makeSuite(LayoutTests)
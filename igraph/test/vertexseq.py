@@ -298,6 +298,101 @@ class VertexSeqTests(unittest.TestCase):
         del g.vs["degree"]
         self.assertTrue(len(g.vs(_degree_gt=30)) == l)
 
+    def testKeywordOperatorsFilteringSelect(self):
+        vs = self.g.vs
+        self.assertEqual(vs(test_lt=3)["test"], [0, 1, 2])
+        self.assertEqual(vs(test_le=3)["test"], [0, 1, 2, 3])
+        self.assertEqual(vs(test_gt=7)["test"], [8, 9])
+        self.assertEqual(vs(test_ge=7)["test"], [7, 8, 9])
+        self.assertEqual(vs(test_ne=5)["test"], [0, 1, 2, 3, 4, 6, 7, 8, 9])
+        self.assertEqual(vs(test=5)["test"], [5])
+        self.assertEqual(vs(name_in="ADF")["test"], [0, 3, 5])
+        self.assertEqual(vs(name_notin=["A", "D"], test_lt=5)["test"], [1, 2, 4])
+        self.assertEqual(vs(test_ge=2, test_lt=6, name_ne="C")["test"], [3, 4, 5])
+        self.assertEqual(vs[7, 2, 7, 4](test_gt=3)["test"], [7, 7, 4])
+        self.assertEqual(len(vs(_degree=9, test_lt=4)), 4)
+        self.assertRaises(KeyError, vs.select, nonexistent_lt=4)
+
+    def testAttributeView(self):
+        view = self.g.vs.get_attribute_view("name")
+        self.assertTrue(isinstance(view, AttributeView))
+        self.assertEqual(len(view), 10)
+        self.assertEqual(view[2], "C")
+        self.assertEqual(view[-1], "J")
+        self.assertEqual(view[1:4], ["B", "C", "D"])
+        self.assertEqual(list(view), list("ABCDEFGHIJ"))
+        self.assertEqual(view.tolist(), self.g.vs["name"])
+        self.assertTrue(view == list("ABCDEFGHIJ"))
+        self.assertTrue("D" in view and "X" not in view)
+        self.assertRaises(IndexError, view.__getitem__, 10)
+
+        sub = self.g.vs[7, 2, 7].get_attribute_view("test")
+        self.assertEqual(sub.tolist(), [7, 2, 7])
+        self.assertEqual(sum(sub), 16)
+
+        # Views are not copies
+        self.g.vs[2]["test"] = 12
+        self.assertEqual(sub.tolist(), [7, 12, 7])
+
+        self.assertRaises(KeyError, self.g.vs.get_attribute_view, "nonexistent")
+        del self.g.vs["test"]
+        self.assertRaises(KeyError, sub.tolist)
+
+    def testIterTuples(self):
+        self.assertEqual(list(self.g.vs.iter_tuples())[:3], [(0,), (1,), (2,)])
+        self.assertEqual(list(self.g.vs[7, 2, 7].iter_tuples("name", "test")),
+                         [(7, "H", 7), (2, "C", 2), (7, "H", 7)])
+        it = self.g.vs.iter_tuples("name")
+        self.assertEqual(next(it), (0, "A"))
+        self.assertTrue(iter(it) is it)
+        self.assertRaises(KeyError, self.g.vs.iter_tuples, "nonexistent")
+
+    def testAttributeIndexes(self):
+        g = self.g.copy()
+        g.vs["test"] = [i % 4 for i in range(10)]
+        g.vs.create_index("test")
+        g.vs.create_index("name", kind="sorted")
+        self.assertEqual(sorted(g.vs.index_info().keys()), ["name", "test"])
+        self.assertEqual(g.vs.index_info()["name"]["kind"], "sorted")
+        self.assertTrue(g.vs.index_info()["test"]["memory"] > 0)
+
+        self.assertEqual(g.vs(test=1).indices, [1, 5, 9])
+        self.assertEqual(g.vs(test_in=[3, 0, 3]).indices, [0, 3, 4, 7, 8])
+        self.assertEqual(g.vs(name_ge="C", name_lt="F").indices, [2, 3, 4])
+        self.assertEqual(g.vs(name_in="ADF", test=0).indices, [0])
+        self.assertEqual(g.vs[7, 1, 5](test=1).indices, [1, 5])
+        self.assertEqual(g.vs.find(test=2).index, 2)
+
+        # Indexes follow the modifications of the graph
+        g.vs[1]["test"] = 2
+        g.add_vertices(2)
+        g.vs[11]["test"] = 1
+        self.assertTrue(g.vs.index_info()["test"]["built"])
+        self.assertEqual(g.vs(test=1).indices, [5, 9, 11])
+        g.delete_vertices([0, 5])
+        self.assertEqual(g.vs(test=1).indices, [7, 9])
+        g.vs["test"] = [0] * g.vcount()
+        self.assertEqual(g.vs(test=1).indices, [])
+        self.assertEqual(g.copy().vs(test=0).indices, list(range(g.vcount())))
+
+        # Unhashable values make the hash index fall back to a full scan
+        g.vs[3]["test"] = [1, 2]
+        self.assertEqual(g.vs(test=[1, 2]).indices, [3])
+
+        g.vs.drop_index("test")
+        self.assertEqual(list(g.vs.index_info().keys()), ["name"])
+        self.assertRaises(KeyError, g.vs.drop_index, "test")
+        self.assertRaises(KeyError, g.vs.create_index, "nonexistent")
+        self.assertRaises(ValueError, g.vs.create_index, "name", kind="btree")
+
+        # Deleting the attribute also drops its index
+        g.vs["test"] = [0] * g.vcount()
+        g.vs.create_index("test")
+        del g.vs["test"]
+        self.assertEqual(list(g.vs.index_info().keys()), ["name"])
+        del g.vs[0]["name"]
+        self.assertEqual(g.vs.index_info(), {})
+
     def testIndexAndKeywordFilteringFind(self):
         self.assertRaises(ValueError, self.g.vs.find, 2, name="G")
         self.assertRaises(ValueError, self.g.vs.find, 2, test=4)
@@ -0,0 +1,291 @@
+# vim:ts=4:sw=4:sts=4:et
+# -*- coding: utf-8 -*-
+"""Read-only views of subgraphs."""
+
+import inspect
+
+from igraph.compat import property
+from igraph.datatypes import ListView
+
+__all__ = ["GraphView"]
+
+__license__ = u"""\
+Copyright (C) 2006-2012  Tamás Nepusz <ntamas@gmail.com>
+Pázmány Péter sétány 1/a, 1117 Budapest, Hungary
+
+This program is free software; you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation; either version 2 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program; if not, write to the Free Software
+Foundation, Inc.,  51 Franklin Street, Fifth Floor, Boston, MA
+02110-1301 USA
+"""
+
+class GraphView(object):
+    """A read-only view of a subgraph of a graph.
+
+    A view selects some vertices and edges of a I{parent} graph without
+    copying the graph or its attributes. The vertices and the edges of the
+    view have their own IDs starting from zero, in the order of their IDs in
+    the parent graph; L{parent_vertex()}, L{local_vertex()} and their edge
+    counterparts translate between the two.
+
+    Creating a view takes time proportional to the number of its vertices
+    and their degrees, independently of the size of the parent graph. The
+    structure of the view is turned into a L{Graph} without attributes when
+    it is first needed, and the attributes are looked up in the parent
+    graph only when they are queried through L{vs}, L{es} or the indexing
+    operator. The read-only methods of L{Graph} listed in the C{methods}
+    attribute of the class can be called on the view directly; they work
+    with local IDs, and C{weights} given as an edge attribute name, either
+    by keyword or by position, is looked up in the parent graph.
+    L{materialize()} creates an independent copy of the subgraph with all
+    its attributes.
+
+    The view reflects the parent graph at the time of its creation; it must
+    not be used after vertices or edges have been removed from the parent.
+
+    Examples:
+
+      >>> from igraph import Graph
+      >>> g = Graph.Ring(10)
+      >>> view = GraphView(g, [0, 1, 2, 5])
+      >>> view.vcount(), view.ecount()
+      (4, 2)
+      >>> view.get_edgelist()
+      [(0, 1), (1, 2)]
+      >>> view.parent_vertex(3)
+      5
+      >>> view.degree()
+      [1, 2, 1, 0]
+    """
+
+    # Read-only methods of Graph that are run on the structure of the view
+    methods = frozenset([
+        "are_connected", "assortativity", "assortativity_degree",
+        "authority_score", "average_path_length", "betweenness", "bfs",
+        "bibcoupling", "clique_number", "closeness", "clusters", "cocitation",
+        "components", "constraint", "coreness", "count_multiple", "degree",
+        "density", "diameter", "diversity", "dyad_census", "eccentricity",
+        "edge_betweenness", "edge_connectivity", "eigenvector_centrality",
+        "evcent", "get_adjacency", "get_adjlist", "get_all_shortest_paths",
+        "get_eid", "get_eids", "get_inclist", "get_shortest_paths", "girth",
+        "has_multiple", "hub_score", "incident", "independence_number",
+        "is_connected", "is_dag", "is_loop", "is_multiple", "is_mutual",
+        "is_simple", "knn", "laplacian", "largest_cliques", "maxdegree",
+        "maximal_cliques", "motifs_randesu", "neighborhood",
+        "neighborhood_size", "neighbors", "pagerank",
+        "personalized_pagerank", "predecessors", "radius", "shortest_paths",
+        "shortest_paths_dijkstra", "similarity_dice", "similarity_jaccard",
+        "strength", "successors", "topological_sorting",
+        "transitivity_avglocal_undirected", "transitivity_local_undirected",
+        "transitivity_undirected", "triad_census", "vertex_connectivity"
+    ])
+
+    def __init__(self, graph, vertices=None, edges=None):
+        """Creates a view of a subgraph of the given graph.
+
+        @param graph: the parent graph
+        @param vertices: the vertices of the view in the parent graph, given
+          by IDs, names, a L{VertexSeq} or anything else that selects
+          vertices in the methods of L{Graph}. C{None} means all the vertices
+          if C{edges} is also C{None}, or the endpoints of C{edges} otherwise.
+        @param edges: the edges of the view in the parent graph, given by IDs,
+          an L{EdgeSeq} or anything else that selects edges in the methods of
+          L{Graph}. Edges with an endpoint outside C{vertices} are left out.
+          C{None} means all the edges between the vertices, i.e. the view
+          shows the subgraph induced by the vertices.
+        """
+        self._parent = graph
+        self._vertex_ids, self._edge_ids, self._edgelist = \
+                graph._subgraph_view(vertices, edges)
+        self._local_vertex_ids = None
+        self._local_edge_ids = None
+        self._graph = None
+
+    def __getattr__(self, name):
+        if name not in self.methods:
+            raise AttributeError("%r object has no attribute %r" %
+                                 (self.__class__.__name__, name))
+        method = getattr(self.graph, name)
+        position = _weights_position(method)
+
+        def wrapper(*args, **kwds):
+            if position is not None and len(args) > position:
+                if isinstance(args[position], basestring):
+                    args = list(args)
+                    args[position] = self.es[args[position]]
+            weights = kwds.get("weights")
+            if isinstance(weights, basestring):
+                kwds["weights"] = self.es[weights]
+            return method(*args, **kwds)
+        wrapper.__name__ = name
+        wrapper.__doc__ = method.__doc__
+        return wrapper
+
+    def __getitem__(self, name):
+        """Returns the value of a graph attribute of the parent graph."""
+        return self._parent[name]
+
+    def __len__(self):
+        """Returns the number of vertices of the view."""
+        return len(self._vertex_ids)
+
+    def __repr__(self):
+        return "<%s of %r with %d vertices and %d edges>" % \
+                (self.__class__.__name__, self._parent, self.vcount(),
+                 self.ecount())
+
+    def attributes(self):
+        """Returns the names of the graph attributes of the parent graph."""
+        return self._parent.attributes()
+
+    @property
+    def parent(self):
+        """The graph the view belongs to."""
+        return self._parent
+
+    @property
+    def vertex_ids(self):
+        """The IDs of the vertices of the view in the parent graph."""
+        return ListView(self._vertex_ids)
+
+    @property
+    def edge_ids(self):
+        """The IDs of the edges of the view in the parent graph."""
+        return ListView(self._edge_ids)
+
+    @property
+    def graph(self):
+        """The structure of the view as a L{Graph} without attributes.
+
+        The graph is created when it is first needed and it is shared by
+        the subsequent calls; it should not be modified."""
+        if self._graph is None:
+            from igraph import Graph
+            self._graph = Graph(len(self._vertex_ids), self._edgelist,
+                                self._parent.is_directed())
+        return self._graph
+
+    @property
+    def vs(self):
+        """The vertices of the view as a vertex sequence of the parent graph.
+
+        Attributes queried from the sequence are returned in the order of the
+        local vertex IDs; the C{index} attributes of the vertices are their
+        IDs in the parent graph."""
+        return self._parent.vs.select(self._vertex_ids)
+
+    @property
+    def es(self):
+        """The edges of the view as an edge sequence of the parent graph.
+
+        Attributes queried from the sequence are returned in the order of the
+        local edge IDs; the C{index} attributes of the edges are their IDs
+        in the parent graph."""
+        return self._parent.es.select(self._edge_ids)
+
+    def vcount(self):
+        """Returns the number of vertices of the view."""
+        return len(self._vertex_ids)
+
+    def ecount(self):
+        """Returns the number of edges of the view."""
+        return len(self._edge_ids)
+
+    def is_directed(self):
+        """Returns whether the parent graph is directed."""
+        return self._parent.is_directed()
+
+    def get_edgelist(self):
+        """Returns the edges of the view as pairs of local vertex IDs."""
+        return list(self._edgelist)
+
+    def parent_vertex(self, vertex):
+        """Returns the ID of a vertex of the view in the parent graph.
+
+        @param vertex: the local ID of the vertex
+        """
+        return self._vertex_ids[vertex]
+
+    def parent_edge(self, edge):
+        """Returns the ID of an edge of the view in the parent graph.
+
+        @param edge: the local ID of the edge
+        """
+        return self._edge_ids[edge]
+
+    def local_vertex(self, vertex):
+        """Returns the local ID of a vertex of the parent graph.
+
+        @param vertex: the ID of the vertex in the parent graph
+        @raise ValueError: if the vertex is not in the view
+        """
+        if self._local_vertex_ids is None:
+            self._local_vertex_ids = dict((vid, idx) for idx, vid in
+                                          enumerate(self._vertex_ids))
+        try:
+            return self._local_vertex_ids[vertex]
+        except KeyError:
+            raise ValueError("vertex %r is not in the view" % (vertex, ))
+
+    def local_edge(self, edge):
+        """Returns the local ID of an edge of the parent graph.
+
+        @param edge: the ID of the edge in the parent graph
+        @raise ValueError: if the edge is not in the view
+        """
+        if self._local_edge_ids is None:
+            self._local_edge_ids = dict((eid, idx) for idx, eid in
+                                        enumerate(self._edge_ids))
+        try:
+            return self._local_edge_ids[edge]
+        except KeyError:
+            raise ValueError("edge %r is not in the view" % (edge, ))
+
+    def materialize(self):
+        """Creates an independent copy of the subgraph shown by the view.
+
+        @return: a new L{Graph} with the vertices and the edges of the view
+          and all the attributes of the parent graph, its vertices and its
+          edges.
+        """
+        result = self.graph.copy()
+        for name in self._parent.attributes():
+            result[name] = self._parent[name]
+        if self._vertex_ids:
+            vs = self.vs
+            for name in self._parent.vs.attribute_names():
+                result.vs[name] = vs[name]
+        if self._edge_ids:
+            es = self.es
+            for name in self._parent.es.attribute_names():
+                result.es[name] = es[name]
+        return result
+
+
+def _weights_position(method):
+    """Returns the position of the C{weights} argument of a bound method of
+    L{Graph} among its positional arguments, or C{None} if the method has no
+    such argument.
+
+    The arguments of methods implemented in C are parsed from the signature
+    in the first line(s) of their docstring."""
+    if inspect.ismethod(method):
+        args = inspect.getargspec(method).args[1:]
+    else:
+        signature = (method.__doc__ or "").split(")", 1)[0]
+        args = [arg.split("=", 1)[0].strip()
+                for arg in signature.split("(", 1)[-1].split(",")]
+    try:
+        return args.index("weights")
+    except ValueError:
+        return None
@@ -0,0 +1,57 @@
+#!/usr/bin/env python
+"""Benchmarks the Barnes-Hut force-directed layout on Barabasi graphs.
+
+Usage: benchmark_layout.py [-n VERTICES ...] [-m EDGES] [-i ITERATIONS]
+
+The script lays out random Barabasi graphs of increasing size with
+Graph.layout_barnes_hut() and prints the running time of a single
+iteration. The last column divides it by n log2 n; it should stay roughly
+constant as the graphs grow if an iteration takes O(n log n) time.
+"""
+
+from __future__ import print_function
+
+from argparse import ArgumentParser
+from math import log
+from timeit import default_timer
+
+from igraph import Graph
+
+
+def time_iteration(graph, niter, theta, dim):
+    """Runs I{niter} iterations of the Barnes-Hut layout on the given graph
+    and returns the running time of a single iteration in seconds."""
+    seed = graph.layout_random(dim=dim)
+    start = default_timer()
+    graph.layout_barnes_hut(niter=niter, theta=theta, seed=seed, dim=dim)
+    return (default_timer() - start) / niter
+
+
+def main():
+    parser = ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("-n", "--vertices", type=int, nargs="+",
+                        default=[1000, 10000, 100000, 1000000],
+                        help="number of vertices in the random graphs")
+    parser.add_argument("-m", "--edges", type=int, default=3,
+                        help="number of edges added with each vertex")
+    parser.add_argument("-i", "--iterations", type=int, default=5,
+                        help="number of iterations to time on each graph")
+    parser.add_argument("-t", "--theta", type=float, default=1.2,
+                        help="opening angle of the Barnes-Hut algorithm")
+    parser.add_argument("-d", "--dim", type=int, default=2, choices=(2, 3),
+                        help="number of dimensions of the layout")
+    options = parser.parse_args()
+
+    print("%10s %10s %14s %14s" % ("vertices", "edges", "s/iteration",
+                                   "ns/(n log n)"))
+    for n in options.vertices:
+        graph = Graph.Barabasi(n, options.edges)
+        elapsed = time_iteration(graph, options.iterations, options.theta,
+                                 options.dim)
+        print("%10d %10d %14.4f %14.2f" % (
+            graph.vcount(), graph.ecount(), elapsed,
+            elapsed * 1e9 / (n * log(max(n, 2), 2))))
+
+
+if __name__ == "__main__":
+    main()
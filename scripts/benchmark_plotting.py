@@ -0,0 +1,66 @@
+#!/usr/bin/env python
+"""Benchmarks the default graph drawer of igraph in normal and fast mode.
+
+Usage: benchmark_plotting.py [-n VERTICES] [-m EDGES] [-r REPEAT]
+
+The script plots a random graph with a random layout into a PNG file in a
+temporary directory using both rendering modes of the default graph drawer
+and prints the best running time of each mode.
+"""
+
+from __future__ import print_function
+
+import os
+import shutil
+import tempfile
+
+from argparse import ArgumentParser
+from timeit import default_timer
+
+from igraph import Graph, plot
+
+
+def time_plot(graph, layout, filename, repeat, **kwds):
+    """Plots the given graph into the given file I{repeat} times and returns
+    the best running time in seconds."""
+    best = None
+    for _ in range(repeat):
+        start = default_timer()
+        plot(graph, filename, layout=layout, bbox=(1000, 1000), **kwds)
+        elapsed = default_timer() - start
+        if best is None or elapsed < best:
+            best = elapsed
+    return best
+
+
+def main():
+    parser = ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("-n", "--vertices", type=int, default=10000,
+                        help="number of vertices in the random graph")
+    parser.add_argument("-m", "--edges", type=int, default=50000,
+                        help="number of edges in the random graph")
+    parser.add_argument("-r", "--repeat", type=int, default=3,
+                        help="number of times each plot is repeated")
+    parser.add_argument("-d", "--directed", action="store_true",
+                        help="use a directed graph")
+    options = parser.parse_args()
+
+    graph = Graph.Erdos_Renyi(options.vertices, m=options.edges,
+                              directed=options.directed)
+    layout = graph.layout_random()
+
+    tmpdir = tempfile.mkdtemp()
+    try:
+        filename = os.path.join(tmpdir, "plot.png")
+        print("Graph with %d vertices and %d edges" % (graph.vcount(),
+                                                       graph.ecount()))
+        for fast in (False, True):
+            elapsed = time_plot(graph, layout, filename, options.repeat,
+                                fast=fast)
+            print("%-8s %10.3f s" % ("fast" if fast else "normal", elapsed))
+    finally:
+        shutil.rmtree(tmpdir)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+#!/usr/bin/env python
+"""Benchmarks the visual attribute builders of the default graph drawer.
+
+Usage: benchmark_visual_builders.py [-n VERTICES] [-m EDGES] [-r REPEAT]
+
+The script builds the visual vertex and edge builders of the default graph
+drawer for a random graph and prints the best running time of reading the
+visual attributes in the same patterns as the drawer does: every attribute
+of every edge together with the size and shape of its endpoints (normal
+mode), every attribute of every vertex, and only the color and width of the
+edges (fast mode). Cairo is not needed.
+"""
+
+from __future__ import print_function
+
+from argparse import ArgumentParser
+from timeit import default_timer
+
+from igraph import Graph
+from igraph.drawing.colors import palettes
+from igraph.drawing.graph import DefaultGraphDrawer
+from igraph.drawing.utils import BoundingBox
+
+
+def best_time(func, repeat):
+    """Calls the given function I{repeat} times and returns the best running
+    time in seconds."""
+    best = None
+    for _ in range(repeat):
+        start = default_timer()
+        func()
+        elapsed = default_timer() - start
+        if best is None or elapsed < best:
+            best = elapsed
+    return best
+
+
+def main():
+    parser = ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("-n", "--vertices", type=int, default=20000,
+                        help="number of vertices in the random graph")
+    parser.add_argument("-m", "--edges", type=int, default=100000,
+                        help="number of edges in the random graph")
+    parser.add_argument("-r", "--repeat", type=int, default=5,
+                        help="number of times each benchmark is repeated")
+    options = parser.parse_args()
+
+    graph = Graph.Erdos_Renyi(options.vertices, m=options.edges)
+    graph.vs["color"] = ["red", "blue"] * (graph.vcount() // 2) + \
+            ["red"] * (graph.vcount() % 2)
+    graph.es["width"] = [1 + i % 3 for i in range(graph.ecount())]
+    edgelist = graph.get_edgelist()
+
+    bbox = BoundingBox(1000, 1000)
+    palette = palettes["gray"]
+    drawer = DefaultGraphDrawer(None, bbox)
+    layout = drawer.ensure_layout(graph.layout_random(), graph)
+    VisualVertexBuilder = drawer.vertex_drawer_factory(None, bbox, palette,
+            layout).VisualVertexBuilder
+    VisualEdgeBuilder = drawer.edge_drawer_factory(None, palette). \
+            VisualEdgeBuilder
+
+    def all_edge_attributes():
+        vertex_builder = VisualVertexBuilder(graph.vs, {})
+        for edge, (src, dest) in zip(VisualEdgeBuilder(graph.es, {}),
+                                     edgelist):
+            (edge.arrow_size, edge.arrow_width, edge.color, edge.curved,
+             edge.label, edge.label_color, edge.label_size, edge.font,
+             edge.width)
+            src_vertex, dest_vertex = vertex_builder[src], vertex_builder[dest]
+            (src_vertex.size, dest_vertex.size, src_vertex.shape,
+             dest_vertex.shape)
+
+    def all_vertex_attributes():
+        for vertex in VisualVertexBuilder(graph.vs, {}):
+            (vertex.color, vertex.frame_color, vertex.frame_width,
+             vertex.label, vertex.label_angle, vertex.label_color,
+             vertex.label_dist, vertex.label_size, vertex.font,
+             vertex.position, vertex.shape, vertex.size)
+
+    def edge_style_only():
+        for edge in VisualEdgeBuilder(graph.es, {}):
+            edge.color, edge.width
+
+    print("Graph with %d vertices and %d edges" % (graph.vcount(),
+                                                   graph.ecount()))
+    for func in (all_edge_attributes, all_vertex_attributes, edge_style_only):
+        print("%-22s %10.3f s" % (func.__name__,
+                                  best_time(func, options.repeat)))
+
+
+if __name__ == "__main__":
+    main()
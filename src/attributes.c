@@ -24,9 +24,13 @@
 #include "attributes.h"
 #include "common.h"
 #include "convert.h"
+#include "error.h"
 #include "py2compat.h"
 #include "pyhelpers.h"
 
+static void igraphmodule_i_attribute_index_destroy(
+    igraphmodule_i_attribute_index_t *index);
+
 int igraphmodule_i_attribute_struct_init(igraphmodule_i_attribute_struct *attrs) {
   int i;
   for (i=0; i<3; i++) {
@@ -35,18 +39,30 @@ int igraphmodule_i_attribute_struct_init(igraphmodule_i_attribute_struct *attrs)
       return 1;
     RC_ALLOC("dict", attrs->attrs[i]);
   }
+  for (i=0; i<3; i++) {
+    if (igraph_vector_ptr_init(&attrs->indexes[i], 0)) {
+      PyErr_NoMemory();
+      return 1;
+    }
+  }
   attrs->vertex_name_index = 0;
   return 0;
 }
 
 void igraphmodule_i_attribute_struct_destroy(igraphmodule_i_attribute_struct *attrs) {
-  int i;
+  long int i, j, n;
   for (i=0; i<3; i++) {
     if (attrs->attrs[i]) {
       RC_DEALLOC("dict", attrs->attrs[i]);
       Py_DECREF(attrs->attrs[i]);
     }
   }
+  for (i=0; i<3; i++) {
+    n = igraph_vector_ptr_size(&attrs->indexes[i]);
+    for (j=0; j<n; j++)
+      igraphmodule_i_attribute_index_destroy(VECTOR(attrs->indexes[i])[j]);
+    igraph_vector_ptr_destroy(&attrs->indexes[i]);
+  }
   if (attrs->vertex_name_index) {
     RC_DEALLOC("dict", attrs->vertex_name_index);
     Py_DECREF(attrs->vertex_name_index);
@@ -107,6 +123,710 @@ void igraphmodule_index_vertex_names(igraph_t *graph, igraph_bool_t force) {
   igraphmodule_i_attribute_struct_index_vertex_names(ATTR_STRUCT(graph), force);
 }
 
+/********************* Secondary indexes on attributes *********************/
+
+/**
+ * \brief Translation table for the kinds of attribute indexes.
+ */
+static igraphmodule_enum_translation_table_entry_t igraphmodule_attribute_index_kind_tt[] = {
+  {"hash", IGRAPHMODULE_ATTRIBUTE_INDEX_HASH},
+  {"sorted", IGRAPHMODULE_ATTRIBUTE_INDEX_SORTED},
+  {0, 0}
+};
+
+static igraphmodule_i_attribute_index_t* igraphmodule_i_attribute_index_new(
+    PyObject *name, int kind) {
+  igraphmodule_i_attribute_index_t *index;
+
+  index = (igraphmodule_i_attribute_index_t*)calloc(1, sizeof(igraphmodule_i_attribute_index_t));
+  if (index == 0) {
+    PyErr_NoMemory();
+    return 0;
+  }
+
+  Py_INCREF(name);
+  index->name = name;
+  index->kind = kind;
+  index->dirty = 1;
+
+  return index;
+}
+
+/**
+ * \brief Drops the data of an attribute index and marks it as dirty.
+ */
+static void igraphmodule_i_attribute_index_clear(
+    igraphmodule_i_attribute_index_t *index) {
+  Py_XDECREF(index->keys);
+  Py_XDECREF(index->ids);
+  index->keys = 0;
+  index->ids = 0;
+  index->dirty = 1;
+}
+
+static void igraphmodule_i_attribute_index_destroy(
+    igraphmodule_i_attribute_index_t *index) {
+  igraphmodule_i_attribute_index_clear(index);
+  Py_XDECREF(index->name);
+  free(index);
+}
+
+/**
+ * \brief Finds the index on the given attribute of the given element type.
+ * \return the position of the index in the index vector or -1 if there is
+ *         no index on the attribute
+ */
+static long int igraphmodule_i_attribute_struct_find_index(
+    igraphmodule_i_attribute_struct *attrs, int attrhash_idx, PyObject *name) {
+  igraphmodule_i_attribute_index_t *index;
+  long int i, n = igraph_vector_ptr_size(&attrs->indexes[attrhash_idx]);
+  int equal;
+
+  for (i = 0; i < n; i++) {
+    index = (igraphmodule_i_attribute_index_t*)VECTOR(attrs->indexes[attrhash_idx])[i];
+    equal = PyObject_RichCompareBool(index->name, name, Py_EQ);
+    if (equal < 0) {
+      PyErr_Clear();
+    } else if (equal) {
+      return i;
+    }
+  }
+
+  return -1;
+}
+
+/**
+ * \brief Binary search in a sorted Python list in the range [lo, hi).
+ *
+ * Returns the first position whose item is not less than \c value if
+ * \c right is false, or the first position whose item is greater than
+ * \c value if \c right is true. Returns -1 if a comparison failed.
+ */
+static Py_ssize_t igraphmodule_i_bisect(PyObject *list, Py_ssize_t lo,
+    Py_ssize_t hi, PyObject *value, igraph_bool_t right) {
+  Py_ssize_t mid;
+  int less;
+
+  while (lo < hi) {
+    mid = lo + (hi - lo) / 2;
+    if (right)
+      less = PyObject_RichCompareBool(value, PyList_GET_ITEM(list, mid), Py_LT);
+    else
+      less = PyObject_RichCompareBool(PyList_GET_ITEM(list, mid), value, Py_LT);
+    if (less < 0)
+      return -1;
+    if (right ? !less : less)
+      lo = mid + 1;
+    else
+      hi = mid;
+  }
+
+  return lo;
+}
+
+/**
+ * \brief Binary search for an ID in a Python list of ascending IDs in the
+ *        range [lo, hi); returns the first position whose ID is not less
+ *        than \c id.
+ */
+static Py_ssize_t igraphmodule_i_bisect_ids(PyObject *list, Py_ssize_t lo,
+    Py_ssize_t hi, long int id) {
+  Py_ssize_t mid;
+
+  while (lo < hi) {
+    mid = lo + (hi - lo) / 2;
+    if (PyInt_AsLong(PyList_GET_ITEM(list, mid)) < id)
+      lo = mid + 1;
+    else
+      hi = mid;
+  }
+
+  return lo;
+}
+
+/**
+ * \brief Adds a single ID with the given attribute value to a built index.
+ * \return 0 if everything was OK, 1 otherwise
+ */
+static int igraphmodule_i_attribute_index_insert(
+    igraphmodule_i_attribute_index_t *index, long int id, PyObject *value) {
+  PyObject *bucket, *o;
+  Py_ssize_t lo, hi;
+  int retval;
+
+  o = PyInt_FromLong(id);
+  if (o == 0)
+    return 1;
+
+  if (index->kind == IGRAPHMODULE_ATTRIBUTE_INDEX_HASH) {
+    if (PyObject_Hash(value) == -1) {
+      Py_DECREF(o);
+      return 1;
+    }
+    bucket = PyDict_GetItem(index->keys, value);
+    if (bucket == 0) {
+      bucket = PyList_New(1);
+      if (bucket == 0) {
+        Py_DECREF(o);
+        return 1;
+      }
+      PyList_SET_ITEM(bucket, 0, o);     /* reference stolen here */
+      retval = PyDict_SetItem(index->keys, value, bucket);
+      Py_DECREF(bucket);
+      return retval ? 1 : 0;
+    }
+    lo = igraphmodule_i_bisect_ids(bucket, 0, PyList_GET_SIZE(bucket), id);
+    retval = PyList_Insert(bucket, lo, o);
+    Py_DECREF(o);
+    return retval ? 1 : 0;
+  }
+
+  lo = igraphmodule_i_bisect(index->keys, 0, PyList_GET_SIZE(index->keys), value, 0);
+  hi = lo < 0 ? -1 : igraphmodule_i_bisect(index->keys, lo, PyList_GET_SIZE(index->keys), value, 1);
+  if (hi < 0) {
+    Py_DECREF(o);
+    return 1;
+  }
+  lo = igraphmodule_i_bisect_ids(index->ids, lo, hi, id);
+  retval = PyList_Insert(index->keys, lo, value) || PyList_Insert(index->ids, lo, o);
+  Py_DECREF(o);
+  return retval ? 1 : 0;
+}
+
+/**
+ * \brief Removes a single ID with the given attribute value from a built index.
+ * \return 0 if everything was OK, 1 otherwise
+ */
+static int igraphmodule_i_attribute_index_remove(
+    igraphmodule_i_attribute_index_t *index, long int id, PyObject *value) {
+  PyObject *bucket;
+  Py_ssize_t lo, hi;
+
+  if (index->kind == IGRAPHMODULE_ATTRIBUTE_INDEX_HASH) {
+    if (PyObject_Hash(value) == -1)
+      return 1;
+    bucket = PyDict_GetItem(index->keys, value);
+    if (bucket == 0)
+      return 1;
+    lo = igraphmodule_i_bisect_ids(bucket, 0, PyList_GET_SIZE(bucket), id);
+    if (lo >= PyList_GET_SIZE(bucket) || PyInt_AsLong(PyList_GET_ITEM(bucket, lo)) != id)
+      return 1;
+    if (PyList_GET_SIZE(bucket) == 1)
+      return PyDict_DelItem(index->keys, value) ? 1 : 0;
+    return PyList_SetSlice(bucket, lo, lo+1, 0) ? 1 : 0;
+  }
+
+  lo = igraphmodule_i_bisect(index->keys, 0, PyList_GET_SIZE(index->keys), value, 0);
+  hi = lo < 0 ? -1 : igraphmodule_i_bisect(index->keys, lo, PyList_GET_SIZE(index->keys), value, 1);
+  if (hi < 0)
+    return 1;
+  lo = igraphmodule_i_bisect_ids(index->ids, lo, hi, id);
+  if (lo >= hi || PyInt_AsLong(PyList_GET_ITEM(index->ids, lo)) != id)
+    return 1;
+  if (PyList_SetSlice(index->keys, lo, lo+1, 0) || PyList_SetSlice(index->ids, lo, lo+1, 0))
+    return 1;
+  return 0;
+}
+
+/**
+ * \brief (Re)builds an attribute index from the current attribute values.
+ * \return 0 if everything was OK, 1 otherwise. A Python exception is
+ *         raised in the latter case and the index stays dirty.
+ */
+static int igraphmodule_i_attribute_index_build(
+    igraphmodule_i_attribute_struct *attrs, int attrhash_idx,
+    igraphmodule_i_attribute_index_t *index) {
+  PyObject *column, *o, *getter, *sort, *args, *kwds, *result;
+  Py_ssize_t i, n;
+
+  igraphmodule_i_attribute_index_clear(index);
+
+  column = PyDict_GetItem(attrs->attrs[attrhash_idx], index->name);
+  if (column == 0) {
+    PyErr_SetString(PyExc_KeyError, "Attribute does not exist");
+    return 1;
+  }
+  if (!PyList_Check(column)) {
+    PyErr_SetString(PyExc_TypeError, "attribute hash member is not a list");
+    return 1;
+  }
+
+  n = PyList_GET_SIZE(column);
+
+  if (index->kind == IGRAPHMODULE_ATTRIBUTE_INDEX_HASH) {
+    index->keys = PyDict_New();
+    if (index->keys == 0)
+      return 1;
+    for (i = 0; i < n; i++) {
+      if (igraphmodule_i_attribute_index_insert(index, i, PyList_GET_ITEM(column, i))) {
+        igraphmodule_i_attribute_index_clear(index);
+        return 1;
+      }
+    }
+    index->dirty = 0;
+    return 0;
+  }
+
+  /* Sorted index: sort the IDs by the attribute values. The sort is stable
+   * so IDs with equal values stay in ascending order */
+  index->ids = PyList_New(n);
+  if (index->ids == 0)
+    return 1;
+  for (i = 0; i < n; i++) {
+    o = PyInt_FromLong(i);
+    if (o == 0) {
+      igraphmodule_i_attribute_index_clear(index);
+      return 1;
+    }
+    PyList_SET_ITEM(index->ids, i, o);   /* reference stolen here */
+  }
+
+  getter = PyObject_GetAttrString(column, "__getitem__");
+  sort = PyObject_GetAttrString(index->ids, "sort");
+  args = PyTuple_New(0);
+  kwds = getter ? Py_BuildValue("{sO}", "key", getter) : 0;
+  result = (sort && args && kwds) ? PyObject_Call(sort, args, kwds) : 0;
+  Py_XDECREF(getter);
+  Py_XDECREF(sort);
+  Py_XDECREF(args);
+  Py_XDECREF(kwds);
+  if (result == 0) {
+    igraphmodule_i_attribute_index_clear(index);
+    return 1;
+  }
+  Py_DECREF(result);
+
+  index->keys = PyList_New(n);
+  if (index->keys == 0) {
+    igraphmodule_i_attribute_index_clear(index);
+    return 1;
+  }
+  for (i = 0; i < n; i++) {
+    o = PyList_GET_ITEM(column, PyInt_AsLong(PyList_GET_ITEM(index->ids, i)));
+    Py_INCREF(o);
+    PyList_SET_ITEM(index->keys, i, o);  /* reference stolen here */
+  }
+
+  index->dirty = 0;
+  return 0;
+}
+
+/**
+ * \brief Appends the values of the vertices or edges with IDs larger than
+ *        or equal to \c from to all the built indexes of the given type.
+ *
+ * Indexes that cannot be updated are marked as dirty.
+ */
+static void igraphmodule_i_attribute_struct_extend_indexes(
+    igraphmodule_i_attribute_struct *attrs, int attrhash_idx, long int from) {
+  igraphmodule_i_attribute_index_t *index;
+  PyObject *column;
+  long int i, j, n = igraph_vector_ptr_size(&attrs->indexes[attrhash_idx]);
+
+  for (i = 0; i < n; i++) {
+    index = (igraphmodule_i_attribute_index_t*)VECTOR(attrs->indexes[attrhash_idx])[i];
+    if (index->dirty)
+      continue;
+
+    column = PyDict_GetItem(attrs->attrs[attrhash_idx], index->name);
+    if (column == 0 || !PyList_Check(column)) {
+      igraphmodule_i_attribute_index_clear(index);
+      continue;
+    }
+
+    for (j = from; j < PyList_GET_SIZE(column); j++) {
+      if (igraphmodule_i_attribute_index_insert(index, j, PyList_GET_ITEM(column, j))) {
+        PyErr_Clear();
+        igraphmodule_i_attribute_index_clear(index);
+        break;
+      }
+    }
+  }
+}
+
+/**
+ * \brief Marks the indexes on the given attribute (or on all the attributes
+ *        if \c name is null) of the given element type as dirty.
+ */
+static void igraphmodule_i_attribute_struct_invalidate_indexes(
+    igraphmodule_i_attribute_struct *attrs, int attrhash_idx, PyObject *name) {
+  long int i, n = igraph_vector_ptr_size(&attrs->indexes[attrhash_idx]);
+
+  if (name != 0) {
+    i = igraphmodule_i_attribute_struct_find_index(attrs, attrhash_idx, name);
+    if (i >= 0)
+      igraphmodule_i_attribute_index_clear(VECTOR(attrs->indexes[attrhash_idx])[i]);
+    return;
+  }
+
+  for (i = 0; i < n; i++)
+    igraphmodule_i_attribute_index_clear(VECTOR(attrs->indexes[attrhash_idx])[i]);
+}
+
+/**
+ * \brief Copies the definitions of the indexes of the given element type
+ *        from one attribute struct to another. The copies are dirty and
+ *        will be built when they are first used.
+ * \return 0 if everything was OK, 1 otherwise
+ */
+static int igraphmodule_i_attribute_struct_copy_indexes(
+    igraphmodule_i_attribute_struct *from, igraphmodule_i_attribute_struct *to,
+    int attrhash_idx) {
+  igraphmodule_i_attribute_index_t *index, *copy;
+  long int i, n = igraph_vector_ptr_size(&from->indexes[attrhash_idx]);
+
+  for (i = 0; i < n; i++) {
+    index = (igraphmodule_i_attribute_index_t*)VECTOR(from->indexes[attrhash_idx])[i];
+    if (igraphmodule_i_attribute_struct_find_index(to, attrhash_idx, index->name) >= 0)
+      continue;
+    copy = igraphmodule_i_attribute_index_new(index->name, index->kind);
+    if (copy == 0)
+      return 1;
+    if (igraph_vector_ptr_push_back(&to->indexes[attrhash_idx], copy)) {
+      igraphmodule_i_attribute_index_destroy(copy);
+      return 1;
+    }
+  }
+
+  return 0;
+}
+
+/**
+ * \brief Looks up the IDs satisfying a single criterion using an index.
+ *
+ * \param  index   a built attribute index
+ * \param  op      the operator of the criterion (see
+ *                 \ref igraphmodule_filter_by_attribute_criteria)
+ * \param  value   the right hand side of the criterion
+ * \param  result  an initialized vector; the matching IDs will be returned
+ *                 here in ascending order
+ * \param  used    will be set to true if the index could be used for the
+ *                 criterion and false otherwise
+ * \return 0 if everything was OK, 1 otherwise. A Python exception is
+ *         raised in the latter case.
+ */
+static int igraphmodule_i_attribute_index_lookup(
+    igraphmodule_i_attribute_index_t *index, int op, PyObject *value,
+    igraph_vector_t *result, igraph_bool_t *used) {
+  PyObject *fast = 0, *item, *bucket;
+  Py_ssize_t i, j, k, n, lo, hi;
+  long int last;
+
+  *used = 0;
+  igraph_vector_clear(result);
+
+  if (op == IGRAPHMODULE_ATTRIBUTE_FILTER_IN) {
+    /* Strings are sequences too, but "in" means a substring test for them */
+    if (!PyList_Check(value) && !PyTuple_Check(value) &&
+        !PyAnySet_Check(value) && !PyDict_Check(value))
+      return 0;
+    fast = PySequence_Fast(value, "");
+    if (fast == 0)
+      return 1;
+    n = PySequence_Fast_GET_SIZE(fast);
+  } else if (op == Py_EQ) {
+    n = 1;
+  } else if (index->kind == IGRAPHMODULE_ATTRIBUTE_INDEX_SORTED &&
+      op != Py_NE && op != IGRAPHMODULE_ATTRIBUTE_FILTER_NOTIN) {
+    n = 1;
+  } else {
+    return 0;
+  }
+
+  for (k = 0; k < n; k++) {
+    item = fast ? PySequence_Fast_GET_ITEM(fast, k) : value;
+
+    if (index->kind == IGRAPHMODULE_ATTRIBUTE_INDEX_HASH) {
+      if (PyObject_Hash(item) == -1) {
+        /* Unhashable values can still be compared by a full scan */
+        PyErr_Clear();
+        Py_XDECREF(fast);
+        return 0;
+      }
+      bucket = PyDict_GetItem(index->keys, item);
+      lo = 0;
+      hi = bucket ? PyList_GET_SIZE(bucket) : 0;
+    } else {
+      bucket = index->ids;
+      lo = 0;
+      hi = PyList_GET_SIZE(index->keys);
+      if (op == Py_LT || op == Py_GE || op == Py_EQ || fast) {
+        i = igraphmodule_i_bisect(index->keys, lo, hi, item, 0);
+        if (i < 0)
+          goto error;
+        if (op == Py_LT)
+          hi = i;
+        else
+          lo = i;
+      }
+      if (op == Py_LE || op == Py_GT || op == Py_EQ || fast) {
+        i = igraphmodule_i_bisect(index->keys, lo, hi, item, 1);
+        if (i < 0)
+          goto error;
+        if (op == Py_GT)
+          lo = i;
+        else
+          hi = i;
+      }
+    }
+
+    for (j = lo; j < hi; j++) {
+      if (igraph_vector_push_back(result, PyInt_AsLong(PyList_GET_ITEM(bucket, j)))) {
+        igraphmodule_handle_igraph_error();
+        goto error;
+      }
+    }
+  }
+
+  Py_XDECREF(fast);
+
+  /* Sort the IDs and remove duplicates (which may come from equal items
+   * in the right hand side of "in") */
+  if (n > 1 || index->kind == IGRAPHMODULE_ATTRIBUTE_INDEX_SORTED) {
+    igraph_vector_sort(result);
+    n = igraph_vector_size(result);
+    for (i = 0, j = 0, last = -1; i < n; i++) {
+      if (VECTOR(*result)[i] != last) {
+        last = (long int)VECTOR(*result)[i];
+        VECTOR(*result)[j++] = last;
+      }
+    }
+    igraph_vector_resize(result, j);   /* shrinking, cannot fail */
+  }
+
+  *used = 1;
+  return 0;
+
+error:
+  Py_XDECREF(fast);
+  return 1;
+}
+
+static Py_ssize_t igraphmodule_i_sizeof(PyObject *o) {
+  PyObject *size;
+  Py_ssize_t result;
+
+  size = PyObject_CallMethod(o, "__sizeof__", 0);
+  if (size == 0)
+    return -1;
+  result = PyNumber_AsSsize_t(size, 0);
+  Py_DECREF(size);
+  return result;
+}
+
+/**
+ * \brief Approximate memory footprint of an index in bytes.
+ *
+ * Counts the containers of the index and the ID objects, but not the
+ * attribute values themselves, which are shared with the graph.
+ */
+static Py_ssize_t igraphmodule_i_attribute_index_memory(
+    igraphmodule_i_attribute_index_t *index) {
+  PyObject *key, *value;
+  Py_ssize_t pos = 0, size, result = 0, count = 0;
+
+  if (index->dirty)
+    return 0;
+
+  result = igraphmodule_i_sizeof(index->keys);
+  if (result < 0)
+    return -1;
+  if (index->kind == IGRAPHMODULE_ATTRIBUTE_INDEX_HASH) {
+    while (PyDict_Next(index->keys, &pos, &key, &value)) {
+      size = igraphmodule_i_sizeof(value);
+      if (size < 0)
+        return -1;
+      result += size;
+      count += PyList_GET_SIZE(value);
+    }
+  } else {
+    size = igraphmodule_i_sizeof(index->ids);
+    if (size < 0)
+      return -1;
+    result += size;
+    count = PyList_GET_SIZE(index->ids);
+  }
+
+  return result + count * (Py_ssize_t)sizeof(PyIntObject);
+}
+
+/**
+ * \brief Creates (or recreates) an index on a vertex or edge attribute.
+ *
+ * \param  graph         the graph
+ * \param  attrhash_idx  \c ATTRHASH_IDX_VERTEX or \c ATTRHASH_IDX_EDGE
+ * \param  name          the name of the attribute
+ * \param  kind_o        the kind of the index as a Python object; see
+ *                       \c igraphmodule_attribute_index_kind_tt
+ * \return 0 if everything was OK, 1 otherwise. A Python exception is
+ *         raised in the latter case.
+ */
+int igraphmodule_create_attribute_index(igraph_t *graph, int attrhash_idx,
+    PyObject *name, PyObject *kind_o) {
+  igraphmodule_i_attribute_struct *attrs = ATTR_STRUCT(graph);
+  igraphmodule_i_attribute_index_t *index;
+  int kind = IGRAPHMODULE_ATTRIBUTE_INDEX_HASH;
+  long int i;
+
+  if (!igraphmodule_attribute_name_check(name))
+    return 1;
+  if (igraphmodule_PyObject_to_enum(kind_o, igraphmodule_attribute_index_kind_tt, &kind))
+    return 1;
+  if (kind != IGRAPHMODULE_ATTRIBUTE_INDEX_HASH && kind != IGRAPHMODULE_ATTRIBUTE_INDEX_SORTED) {
+    PyErr_SetString(PyExc_ValueError, "index kind must be \"hash\" or \"sorted\"");
+    return 1;
+  }
+
+  i = igraphmodule_i_attribute_struct_find_index(attrs, attrhash_idx, name);
+  if (i >= 0) {
+    index = (igraphmodule_i_attribute_index_t*)VECTOR(attrs->indexes[attrhash_idx])[i];
+    index->kind = kind;
+    if (igraphmodule_i_attribute_index_build(attrs, attrhash_idx, index)) {
+      igraphmodule_i_attribute_index_destroy(index);
+      igraph_vector_ptr_remove(&attrs->indexes[attrhash_idx], i);
+      return 1;
+    }
+    return 0;
+  }
+
+  index = igraphmodule_i_attribute_index_new(name, kind);
+  if (index == 0)
+    return 1;
+  if (igraphmodule_i_attribute_index_build(attrs, attrhash_idx, index)) {
+    igraphmodule_i_attribute_index_destroy(index);
+    return 1;
+  }
+  if (igraph_vector_ptr_push_back(&attrs->indexes[attrhash_idx], index)) {
+    igraphmodule_i_attribute_index_destroy(index);
+    igraphmodule_handle_igraph_error();
+    return 1;
+  }
+
+  return 0;
+}
+
+/**
+ * \brief Drops the index on a vertex or edge attribute.
+ * \return 0 if everything was OK, 1 otherwise. A Python exception is
+ *         raised in the latter case.
+ */
+int igraphmodule_drop_attribute_index(igraph_t *graph, int attrhash_idx,
+    PyObject *name) {
+  igraphmodule_i_attribute_struct *attrs = ATTR_STRUCT(graph);
+  long int i;
+
+  i = igraphmodule_i_attribute_struct_find_index(attrs, attrhash_idx, name);
+  if (i < 0) {
+    PyErr_SetString(PyExc_KeyError, "no index on the given attribute");
+    return 1;
+  }
+
+  igraphmodule_i_attribute_index_destroy(VECTOR(attrs->indexes[attrhash_idx])[i]);
+  igraph_vector_ptr_remove(&attrs->indexes[attrhash_idx], i);
+  return 0;
+}
+
+/**
+ * \brief Deletes a vertex or edge attribute together with its index (if any).
+ * \return 0 if everything was OK, -1 otherwise. A Python exception is
+ *         raised in the latter case.
+ */
+int igraphmodule_delete_attribute(igraph_t *graph, int attrhash_idx,
+    PyObject *name) {
+  igraphmodule_i_attribute_struct *attrs = ATTR_STRUCT(graph);
+  long int i;
+
+  if (PyDict_DelItem(attrs->attrs[attrhash_idx], name))
+    return -1;
+
+  i = igraphmodule_i_attribute_struct_find_index(attrs, attrhash_idx, name);
+  if (i >= 0) {
+    igraphmodule_i_attribute_index_destroy(VECTOR(attrs->indexes[attrhash_idx])[i]);
+    igraph_vector_ptr_remove(&attrs->indexes[attrhash_idx], i);
+  }
+
+  return 0;
+}
+
+/**
+ * \brief Marks the indexes on the given attribute (or on all the attributes
+ *        if \c name is null) as dirty. They will be rebuilt when used next.
+ */
+void igraphmodule_invalidate_attribute_indexes(igraph_t *graph,
+    int attrhash_idx, PyObject *name) {
+  igraphmodule_i_attribute_struct_invalidate_indexes(ATTR_STRUCT(graph),
+      attrhash_idx, name);
+}
+
+/**
+ * \brief Updates the index on the given attribute after the value of a
+ *        single vertex or edge has changed from \c old_value to \c new_value.
+ *
+ * The index is marked as dirty if it cannot be updated incrementally.
+ */
+void igraphmodule_update_attribute_indexes(igraph_t *graph, int attrhash_idx,
+    PyObject *name, long int id, PyObject *old_value, PyObject *new_value) {
+  igraphmodule_i_attribute_struct *attrs = ATTR_STRUCT(graph);
+  igraphmodule_i_attribute_index_t *index;
+  long int i;
+
+  i = igraphmodule_i_attribute_struct_find_index(attrs, attrhash_idx, name);
+  if (i < 0)
+    return;
+
+  index = (igraphmodule_i_attribute_index_t*)VECTOR(attrs->indexes[attrhash_idx])[i];
+  if (index->dirty || old_value == new_value)
+    return;
+
+  if (igraphmodule_i_attribute_index_remove(index, id, old_value) ||
+      igraphmodule_i_attribute_index_insert(index, id, new_value)) {
+    PyErr_Clear();
+    igraphmodule_i_attribute_index_clear(index);
+  }
+}
+
+/**
+ * \brief Describes the indexes of the given element type.
+ *
+ * \return a new Python dict mapping attribute names to dicts with the
+ *         following keys: \c kind (\c "hash" or \c "sorted"), \c built
+ *         (whether the index is up-to-date) and \c memory (the approximate
+ *         memory footprint of the index in bytes).
+ */
+PyObject* igraphmodule_describe_attribute_indexes(igraph_t *graph,
+    int attrhash_idx) {
+  igraphmodule_i_attribute_struct *attrs = ATTR_STRUCT(graph);
+  igraphmodule_i_attribute_index_t *index;
+  PyObject *result, *item;
+  long int i, n = igraph_vector_ptr_size(&attrs->indexes[attrhash_idx]);
+  Py_ssize_t memory;
+
+  result = PyDict_New();
+  if (result == 0)
+    return 0;
+
+  for (i = 0; i < n; i++) {
+    index = (igraphmodule_i_attribute_index_t*)VECTOR(attrs->indexes[attrhash_idx])[i];
+    memory = igraphmodule_i_attribute_index_memory(index);
+    if (memory < 0) {
+      Py_DECREF(result);
+      return 0;
+    }
+    item = Py_BuildValue("{sssOsn}",
+        "kind", index->kind == IGRAPHMODULE_ATTRIBUTE_INDEX_HASH ? "hash" : "sorted",
+        "built", index->dirty ? Py_False : Py_True,
+        "memory", memory);
+    if (item == 0 || PyDict_SetItem(result, index->name, item)) {
+      Py_XDECREF(item);
+      Py_DECREF(result);
+      return 0;
+    }
+    Py_DECREF(item);
+  }
+
+  return result;
+}
+
 int igraphmodule_PyObject_matches_attribute_record(PyObject* object, igraph_attribute_record_t* record) {
   int result;
 
@@ -421,6 +1141,12 @@ static int igraphmodule_i_attribute_copy(igraph_t *to, const igraph_t *from,
         PyDict_SetItem(toattrs->attrs[i], key, newval);
         Py_DECREF(newval); /* compensate for PyDict_SetItem */
       }
+
+      /* Indexes are copied as dirty and will be rebuilt on demand */
+      if (i>0 && igraphmodule_i_attribute_struct_copy_indexes(fromattrs, toattrs, i)) {
+        PyErr_Clear();
+        IGRAPH_ERROR("not enough memory to copy attribute indexes", IGRAPH_ENOMEM);
+      }
     }
   }
   return IGRAPH_SUCCESS;
@@ -562,6 +1288,10 @@ static int igraphmodule_i_attribute_add_vertices(igraph_t *graph, long int nv, i
     IGRAPH_FINALLY_CLEAN(1);
   }
 
+  /* Add the new vertices to the indexes */
+  igraphmodule_i_attribute_struct_extend_indexes(ATTR_STRUCT(graph),
+      ATTRHASH_IDX_VERTEX, igraph_vcount(graph)-nv);
+
   return IGRAPH_SUCCESS;
 }
 
@@ -600,8 +1330,14 @@ static int igraphmodule_i_attribute_permute_vertices(const igraph_t *graph,
   ATTR_STRUCT_DICT(newgraph)[ATTRHASH_IDX_VERTEX]=newdict;
   Py_DECREF(dict);
 
-  /* Invalidate the vertex name index */
+  /* Invalidate the vertex name index and the other indexes */
   igraphmodule_i_attribute_struct_invalidate_vertex_name_index(ATTR_STRUCT(newgraph));
+  if (graph != newgraph &&
+      igraphmodule_i_attribute_struct_copy_indexes(ATTR_STRUCT(graph),
+        ATTR_STRUCT(newgraph), ATTRHASH_IDX_VERTEX))
+    return 1;
+  igraphmodule_i_attribute_struct_invalidate_indexes(ATTR_STRUCT(newgraph),
+      ATTRHASH_IDX_VERTEX, 0);
 
   return 0;
 }
@@ -741,6 +1477,10 @@ static int igraphmodule_i_attribute_add_edges(igraph_t *graph, const igraph_vect
     IGRAPH_FINALLY_CLEAN(1);
   }
 
+  /* Add the new edges to the indexes */
+  igraphmodule_i_attribute_struct_extend_indexes(ATTR_STRUCT(graph),
+      ATTRHASH_IDX_EDGE, igraph_ecount(graph)-ne);
+
   return IGRAPH_SUCCESS;
 }
 
@@ -818,6 +1558,14 @@ static int igraphmodule_i_attribute_permute_edges(const igraph_t *graph,
   ATTR_STRUCT_DICT(newgraph)[ATTRHASH_IDX_EDGE]=newdict;
   Py_DECREF(dict);
 
+  /* Invalidate the indexes */
+  if (graph != newgraph &&
+      igraphmodule_i_attribute_struct_copy_indexes(ATTR_STRUCT(graph),
+        ATTR_STRUCT(newgraph), ATTRHASH_IDX_EDGE))
+    return 1;
+  igraphmodule_i_attribute_struct_invalidate_indexes(ATTR_STRUCT(newgraph),
+      ATTRHASH_IDX_EDGE, 0);
+
   return 0;
 }
 
@@ -864,30 +1612,254 @@ static PyObject* igraphmodule_i_ac_func(PyObject* values,
  */
 static PyObject* igraphmodule_i_ac_builtin_func(PyObject* values,
     const igraph_vector_ptr_t *merges, const char* func_name) {
-  static PyObject* builtin_module_dict = 0;
-  PyObject* func = 0;
+  PyObject* func = igraphmodule_get_builtin_function(func_name);
 
-  if (builtin_module_dict == 0) {
-#ifdef IGRAPH_PYTHON3
-    PyObject* builtin_module = PyImport_ImportModule("builtins");
-#else
-    PyObject* builtin_module = PyImport_ImportModule("__builtin__");
+  if (func == 0)
+    return 0;
+
+  return igraphmodule_i_ac_func(values, merges, func);
+}
+
+/* Auxiliary function for the native numeric code path of the attribute
+ * combination functions. Converts the given attribute value list to a vector
+ * of doubles in a single pass if all the values are Python ints, longs or
+ * floats. When exact is true, the conversion also fails for NaNs and for
+ * integers that cannot be represented exactly as a double, so the values can
+ * safely be compared to each other in C. Returns 1 if the conversion succeeded,
+ * 0 if the list contains a value that cannot be converted and -1 if an error
+ * happened.
+ */
+static int igraphmodule_i_ac_numeric_values(PyObject* values,
+    igraph_vector_t *result, igraph_bool_t exact) {
+  Py_ssize_t i, n;
+  PyObject *item;
+  double num;
+
+  if (!PyList_Check(values))
+    return 0;
+
+  n = PyList_GET_SIZE(values);
+  if (igraph_vector_init(result, n)) {
+    igraphmodule_handle_igraph_error();
+    return -1;
+  }
+
+  for (i = 0; i < n; i++) {
+    item = PyList_GET_ITEM(values, i);
+    if (PyFloat_Check(item)) {
+      num = PyFloat_AS_DOUBLE(item);
+      if (exact && num != num)
+        break;
+#ifndef IGRAPH_PYTHON3
+    } else if (PyInt_Check(item)) {
+      num = (double)PyInt_AS_LONG(item);
+      if (exact && (num > 9007199254740992.0 || num < -9007199254740992.0))
+        break;
 #endif
-    if (builtin_module == 0)
+    } else if (PyLong_Check(item)) {
+      num = PyLong_AsDouble(item);
+      if (num == -1.0 && PyErr_Occurred()) {
+        /* Overflow; let the generic code path deal with it */
+        PyErr_Clear();
+        break;
+      }
+      if (exact && (num > 9007199254740992.0 || num < -9007199254740992.0))
+        break;
+    } else {
+      break;
+    }
+    VECTOR(*result)[i] = num;
+  }
+
+  if (i < n) {
+    igraph_vector_destroy(result);
+    return 0;
+  }
+
+  return 1;
+}
+
+/* Auxiliary function for combining vertices/edges. Implements the sum,
+ * product, minimum, maximum, mean and median combination functions natively
+ * for numeric attributes. The attribute values are converted to doubles only
+ * once, and each merge group is then aggregated in C without calling back
+ * into Python.
+ *
+ * Returns 1 if the combination was handled here; the new attribute value list
+ * (or NULL if an error happened) is then returned in result. Returns 0 if the
+ * attribute is not numeric or the combination type is not supported here; the
+ * caller should then fall back to the generic implementation.
+ */
+static int igraphmodule_i_ac_numeric(PyObject* values,
+    const igraph_vector_ptr_t *merges, igraph_attribute_combination_type_t type,
+    PyObject **result) {
+  long int i, j, len = igraph_vector_ptr_size(merges);
+  igraph_bool_t exact;
+  igraph_vector_t nums, group;
+  PyObject *res, *item;
+
+  switch (type) {
+    case IGRAPH_ATTRIBUTE_COMBINE_SUM:
+    case IGRAPH_ATTRIBUTE_COMBINE_PROD:
+    case IGRAPH_ATTRIBUTE_COMBINE_MEAN:
+      exact = 0;
+      break;
+
+    case IGRAPH_ATTRIBUTE_COMBINE_MIN:
+    case IGRAPH_ATTRIBUTE_COMBINE_MAX:
+    case IGRAPH_ATTRIBUTE_COMBINE_MEDIAN:
+      exact = 1;
+      break;
+
+    default:
       return 0;
-    builtin_module_dict = PyModule_GetDict(builtin_module);
-    Py_DECREF(builtin_module);
-    if (builtin_module_dict == 0)
+  }
+
+  switch (igraphmodule_i_ac_numeric_values(values, &nums, exact)) {
+    case -1:
+      *result = 0;
+      return 1;
+
+    case 0:
       return 0;
   }
 
-  func = PyDict_GetItemString(builtin_module_dict, func_name);
-  if (func == 0) {
-    PyErr_Format(PyExc_NameError, "no such builtin function; %s", func_name);
+  if (igraph_vector_init(&group, 0)) {
+    igraphmodule_handle_igraph_error();
+    igraph_vector_destroy(&nums);
+    *result = 0;
+    return 1;
+  }
+
+  res = PyList_New(len);
+  if (res == 0) {
+    igraph_vector_destroy(&group);
+    igraph_vector_destroy(&nums);
+    *result = 0;
+    return 1;
+  }
+
+  for (i = 0; i < len; i++) {
+    igraph_vector_t *v = (igraph_vector_t*)VECTOR(*merges)[i];
+    long int n = igraph_vector_size(v), best = 0, k;
+    double acc, num, median;
+
+    item = 0;
+    switch (type) {
+      case IGRAPH_ATTRIBUTE_COMBINE_SUM:
+        for (j = 0, acc = 0.0; j < n; j++)
+          acc += VECTOR(nums)[(long int)VECTOR(*v)[j]];
+        item = PyFloat_FromDouble(acc);
+        break;
+
+      case IGRAPH_ATTRIBUTE_COMBINE_PROD:
+        for (j = 0, acc = 1.0; j < n; j++)
+          acc *= VECTOR(nums)[(long int)VECTOR(*v)[j]];
+        item = PyFloat_FromDouble(acc);
+        break;
+
+      case IGRAPH_ATTRIBUTE_COMBINE_MEAN:
+        for (j = 0, acc = 0.0; j < n; ) {
+          num = VECTOR(nums)[(long int)VECTOR(*v)[j]] - acc;
+          j++;
+          acc += num / j;
+        }
+        item = PyFloat_FromDouble(acc);
+        break;
+
+      case IGRAPH_ATTRIBUTE_COMBINE_MIN:
+      case IGRAPH_ATTRIBUTE_COMBINE_MAX:
+        if (n == 0) {
+          PyErr_Format(PyExc_ValueError, "%s() arg is an empty sequence",
+              type == IGRAPH_ATTRIBUTE_COMBINE_MIN ? "min" : "max");
+          break;
+        }
+        /* Like min() and max(), return the first extremal value */
+        best = (long int)VECTOR(*v)[0];
+        for (j = 1; j < n; j++) {
+          k = (long int)VECTOR(*v)[j];
+          if (type == IGRAPH_ATTRIBUTE_COMBINE_MIN ?
+              VECTOR(nums)[k] < VECTOR(nums)[best] :
+              VECTOR(nums)[k] > VECTOR(nums)[best])
+            best = k;
+        }
+        item = PyList_GET_ITEM(values, best);
+        Py_INCREF(item);
+        break;
+
+      case IGRAPH_ATTRIBUTE_COMBINE_MEDIAN:
+        if (n == 0) {
+          item = Py_None;
+          Py_INCREF(item);
+          break;
+        }
+        if (igraph_vector_resize(&group, n)) {
+          igraphmodule_handle_igraph_error();
+          break;
+        }
+        for (j = 0; j < n; j++)
+          VECTOR(group)[j] = VECTOR(nums)[(long int)VECTOR(*v)[j]];
+        igraph_vector_sort(&group);
+        if (n % 2 == 0) {
+          item = PyFloat_FromDouble((VECTOR(group)[n / 2 - 1] + VECTOR(group)[n / 2]) / 2);
+          break;
+        }
+        /* Return the original object that a stable sort of the group would
+         * have put in the middle */
+        median = VECTOR(group)[n / 2];
+        for (k = n / 2; k > 0 && VECTOR(group)[k - 1] == median; k--);
+        k = n / 2 - k;
+        for (j = 0; j < n; j++) {
+          best = (long int)VECTOR(*v)[j];
+          if (VECTOR(nums)[best] == median && k-- == 0)
+            break;
+        }
+        item = PyList_GET_ITEM(values, best);
+        Py_INCREF(item);
+        break;
+
+      default:
+        break;
+    }
+
+    if (item == 0) {
+      Py_DECREF(res);
+      res = 0;
+      break;
+    }
+
+    PyList_SET_ITEM(res, i, item);   /* reference to item stolen */
+  }
+
+  igraph_vector_destroy(&group);
+  igraph_vector_destroy(&nums);
+
+  *result = res;
+  return 1;
+}
+
+/* Auxiliary function for combining vertices/edges. Given a merge list
+ * (which specifies the vertex/edge IDs that were merged, returns a new list
+ * containing the number of merged vertices/edges for each new vertex/edge.
+ */
+static PyObject* igraphmodule_i_ac_count(const igraph_vector_ptr_t *merges) {
+  long int i, len = igraph_vector_ptr_size(merges);
+  PyObject *res, *item;
+
+  res = PyList_New(len);
+  if (res == 0)
     return 0;
+
+  for (i = 0; i < len; i++) {
+    item = PyInt_FromLong(igraph_vector_size((igraph_vector_t*)VECTOR(*merges)[i]));
+    if (item == 0) {
+      Py_DECREF(res);
+      return 0;
+    }
+    PyList_SET_ITEM(res, i, item);   /* reference to item stolen */
   }
 
-  return igraphmodule_i_ac_func(values, merges, func);
+  return res;
 }
 
 /* Auxiliary function for combining vertices/edges. Given a merge list
@@ -1217,23 +2189,30 @@ static int igraphmodule_i_attribute_combine_dicts(PyObject *dict,
 
       case IGRAPH_ATTRIBUTE_COMBINE_FUNCTION:
         func = (PyObject*)todo[i].func;
-        newvalue = igraphmodule_i_ac_func(value, merges, func);
+        if (func == igraphmodule_get_builtin_function("len"))
+          newvalue = igraphmodule_i_ac_count(merges);
+        else
+          newvalue = igraphmodule_i_ac_func(value, merges, func);
         break;
 
       case IGRAPH_ATTRIBUTE_COMBINE_SUM:
-        newvalue = igraphmodule_i_ac_sum(value, merges);
+        if (!igraphmodule_i_ac_numeric(value, merges, todo[i].type, &newvalue))
+          newvalue = igraphmodule_i_ac_sum(value, merges);
         break;
 
       case IGRAPH_ATTRIBUTE_COMBINE_PROD:
-        newvalue = igraphmodule_i_ac_prod(value, merges);
+        if (!igraphmodule_i_ac_numeric(value, merges, todo[i].type, &newvalue))
+          newvalue = igraphmodule_i_ac_prod(value, merges);
         break;
 
       case IGRAPH_ATTRIBUTE_COMBINE_MIN:
-        newvalue = igraphmodule_i_ac_builtin_func(value, merges, "min");
+        if (!igraphmodule_i_ac_numeric(value, merges, todo[i].type, &newvalue))
+          newvalue = igraphmodule_i_ac_builtin_func(value, merges, "min");
         break;
 
       case IGRAPH_ATTRIBUTE_COMBINE_MAX:
-        newvalue = igraphmodule_i_ac_builtin_func(value, merges, "max");
+        if (!igraphmodule_i_ac_numeric(value, merges, todo[i].type, &newvalue))
+          newvalue = igraphmodule_i_ac_builtin_func(value, merges, "max");
         break;
 
       case IGRAPH_ATTRIBUTE_COMBINE_RANDOM:
@@ -1249,11 +2228,13 @@ static int igraphmodule_i_attribute_combine_dicts(PyObject *dict,
         break;
 
       case IGRAPH_ATTRIBUTE_COMBINE_MEAN:
-        newvalue = igraphmodule_i_ac_mean(value, merges);
+        if (!igraphmodule_i_ac_numeric(value, merges, todo[i].type, &newvalue))
+          newvalue = igraphmodule_i_ac_mean(value, merges);
         break;
 
       case IGRAPH_ATTRIBUTE_COMBINE_MEDIAN:
-        newvalue = igraphmodule_i_ac_median(value, merges);
+        if (!igraphmodule_i_ac_numeric(value, merges, todo[i].type, &newvalue))
+          newvalue = igraphmodule_i_ac_median(value, merges);
         break;
 
       case IGRAPH_ATTRIBUTE_COMBINE_CONCAT:
@@ -1311,6 +2292,12 @@ static int igraphmodule_i_attribute_combine_vertices(const igraph_t *graph,
   /* Invalidate vertex name index */
   igraphmodule_i_attribute_struct_invalidate_vertex_name_index(ATTR_STRUCT(graph));
 
+  /* Keep the index definitions; they will be rebuilt on demand */
+  if (!result && graph != newgraph &&
+      igraphmodule_i_attribute_struct_copy_indexes(ATTR_STRUCT(graph),
+        ATTR_STRUCT(newgraph), ATTRHASH_IDX_VERTEX))
+    result = 1;
+
   return result;
 }
 
@@ -1319,13 +2306,22 @@ static int igraphmodule_i_attribute_combine_edges(const igraph_t *graph,
     igraph_t *newgraph, const igraph_vector_ptr_t *merges,
     const igraph_attribute_combination_t *comb) {
   PyObject *dict, *newdict;
+  int result;
 
   /* Get the attribute dicts */
   dict=ATTR_STRUCT_DICT(graph)[ATTRHASH_IDX_EDGE];
   newdict=ATTR_STRUCT_DICT(newgraph)[ATTRHASH_IDX_EDGE];
 
-  return igraphmodule_i_attribute_combine_dicts(dict, newdict,
+  result = igraphmodule_i_attribute_combine_dicts(dict, newdict,
       merges, comb);
+
+  /* Keep the index definitions; they will be rebuilt on demand */
+  if (!result && graph != newgraph &&
+      igraphmodule_i_attribute_struct_copy_indexes(ATTR_STRUCT(graph),
+        ATTR_STRUCT(newgraph), ATTRHASH_IDX_EDGE))
+    result = 1;
+
+  return result;
 }
 
 /* Getting attribute names and types */
@@ -1868,6 +2864,234 @@ void igraphmodule_initialize_attribute_handler(void) {
   igraph_i_set_attribute_table(&igraphmodule_attribute_table);
 }
 
+/**
+ * \brief Translation table for the operators of attribute-based filtering.
+ *
+ * The comparison operators map directly to the corresponding \c Py_LT,
+ * \c Py_GT etc. constants; membership tests use values above \c Py_GE.
+ */
+static igraphmodule_enum_translation_table_entry_t igraphmodule_attribute_filter_op_tt[] = {
+  {"lt", Py_LT},
+  {"le", Py_LE},
+  {"eq", Py_EQ},
+  {"ne", Py_NE},
+  {"gt", Py_GT},
+  {"ge", Py_GE},
+  {"in", IGRAPHMODULE_ATTRIBUTE_FILTER_IN},
+  {"notin", IGRAPHMODULE_ATTRIBUTE_FILTER_NOTIN},
+  {0, 0}
+};
+
+/**
+ * \brief Filters a list of vertex or edge IDs based on attribute criteria.
+ *
+ * All the criteria are evaluated in a single pass over the IDs, and an ID
+ * is kept only if it satisfies all of them. Each criterion must be a tuple
+ * of the form <tt>(attr, op, value)</tt>. \c attr is either the name of an
+ * attribute in \c dict (in which case the attribute list is indexed by the
+ * ID itself) or a Python list with exactly one item for each ID (in which
+ * case it is indexed by the position of the ID in \c ids). \c op is one of
+ * \c "eq", \c "ne", \c "lt", \c "gt", \c "le", \c "ge", \c "in" or
+ * \c "notin", and \c value is the right hand side of the comparison.
+ *
+ * If there is an index on the attribute of a criterion that it can answer
+ * (equality or membership for hash indexes, also ranges for sorted ones),
+ * the candidates are looked up in the first such index and only they are
+ * checked against the remaining criteria.
+ *
+ * \param  graph         the graph
+ * \param  attrhash_idx  \c ATTRHASH_IDX_VERTEX or \c ATTRHASH_IDX_EDGE
+ * \param  ids           the vertex or edge IDs to filter
+ * \param  all           whether \c ids contains all the vertex or edge IDs
+ *                       of the graph in ascending order
+ * \param  criteria      a Python sequence containing the criteria
+ * \param  result        an initialized vector; the IDs satisfying all the
+ *                       criteria will be returned here, in the same order
+ *                       as they appeared in \c ids
+ * \return 0 if everything was OK, 1 otherwise. A Python exception is
+ *         raised in the latter case.
+ */
+int igraphmodule_filter_by_attribute_criteria(igraph_t *graph, int attrhash_idx,
+    const igraph_vector_t *ids, igraph_bool_t all, PyObject *criteria,
+    igraph_vector_t *result) {
+  igraphmodule_i_attribute_struct *attrs = ATTR_STRUCT(graph);
+  igraphmodule_i_attribute_index_t *index;
+  PyObject *dict = attrs->attrs[attrhash_idx];
+  PyObject *fast, *item, *attr, *op, *value, *lhs, *cmp;
+  PyObject **columns = 0, **values = 0;
+  const igraph_vector_t *source = ids;
+  igraph_vector_t candidates;
+  int *ops = 0;
+  char *mask = 0;
+  igraph_bool_t *positional = 0, used = 0;
+  Py_ssize_t i, j, k, pos, n = igraph_vector_size(ids), indexed = -1;
+  long int l;
+  int truth, retval = 1;
+
+  fast = PySequence_Fast(criteria, "filtering criteria must be given in a sequence");
+  if (fast == 0)
+    return 1;
+
+  if (igraph_vector_init(&candidates, 0)) {
+    igraphmodule_handle_igraph_error();
+    Py_DECREF(fast);
+    return 1;
+  }
+
+  k = PySequence_Fast_GET_SIZE(fast);
+  columns = (PyObject**)calloc(k > 0 ? k : 1, sizeof(PyObject*));
+  values = (PyObject**)calloc(k > 0 ? k : 1, sizeof(PyObject*));
+  ops = (int*)calloc(k > 0 ? k : 1, sizeof(int));
+  positional = (igraph_bool_t*)calloc(k > 0 ? k : 1, sizeof(igraph_bool_t));
+  if (columns == 0 || values == 0 || ops == 0 || positional == 0) {
+    PyErr_NoMemory();
+    goto cleanup;
+  }
+
+  /* Resolve the criteria first so the main loop does not have to look up
+   * anything in the attribute dict */
+  for (j = 0; j < k; j++) {
+    item = PySequence_Fast_GET_ITEM(fast, j);
+    if (!PyTuple_Check(item) || !PyArg_ParseTuple(item, "OOO", &attr, &op, &value)) {
+      PyErr_SetString(PyExc_TypeError, "filtering criteria must be (attribute, operator, value) tuples");
+      goto cleanup;
+    }
+
+    ops[j] = Py_EQ;
+    if (op == Py_None || igraphmodule_PyObject_to_enum(op,
+          igraphmodule_attribute_filter_op_tt, &ops[j]))
+      goto cleanup;
+
+    if (PyBaseString_Check(attr)) {
+      columns[j] = PyDict_GetItem(dict, attr);
+      if (columns[j] == 0) {
+        PyErr_SetString(PyExc_KeyError, "Attribute does not exist");
+        goto cleanup;
+      }
+      if (!PyList_Check(columns[j])) {
+        PyErr_SetString(PyExc_TypeError, "attribute hash member is not a list");
+        goto cleanup;
+      }
+    } else if (PyList_Check(attr)) {
+      if (PyList_GET_SIZE(attr) != n) {
+        PyErr_SetString(PyExc_ValueError, "precalculated value list must have "
+            "exactly one item for each vertex or edge in the sequence");
+        goto cleanup;
+      }
+      columns[j] = attr;
+      positional[j] = 1;
+    } else {
+      PyErr_SetString(PyExc_TypeError, "attribute name or list of values expected");
+      goto cleanup;
+    }
+
+    values[j] = value;
+
+    /* Use the first index that can answer one of the criteria */
+    if (indexed >= 0 || positional[j])
+      continue;
+    l = igraphmodule_i_attribute_struct_find_index(attrs, attrhash_idx, attr);
+    if (l < 0)
+      continue;
+    index = (igraphmodule_i_attribute_index_t*)VECTOR(attrs->indexes[attrhash_idx])[l];
+    if (index->dirty && igraphmodule_i_attribute_index_build(attrs, attrhash_idx, index)) {
+      /* e.g., unhashable values; fall back to a full scan */
+      PyErr_Clear();
+      continue;
+    }
+    if (igraphmodule_i_attribute_index_lookup(index, ops[j], value, &candidates, &used))
+      goto cleanup;
+    if (used && !igraph_vector_empty(&candidates) &&
+        igraph_vector_tail(&candidates) >= PyList_GET_SIZE(columns[j])) {
+      /* Stale index; this should not happen, but let's be on the safe side */
+      igraphmodule_i_attribute_index_clear(index);
+      used = 0;
+    }
+    if (used)
+      indexed = j;
+  }
+
+  if (indexed >= 0) {
+    if (all) {
+      /* IDs and positions coincide, so iterate over the candidates only */
+      source = &candidates;
+      n = igraph_vector_size(&candidates);
+    } else {
+      mask = (char*)calloc(PyList_GET_SIZE(columns[indexed]) + 1, sizeof(char));
+      if (mask == 0) {
+        PyErr_NoMemory();
+        goto cleanup;
+      }
+      for (i = 0; i < igraph_vector_size(&candidates); i++)
+        mask[(long int)VECTOR(candidates)[i]] = 1;
+    }
+  }
+
+  igraph_vector_clear(result);
+  if (k == 0) {
+    if (igraph_vector_update(result, ids)) {
+      igraphmodule_handle_igraph_error();
+      goto cleanup;
+    }
+    retval = 0;
+    goto cleanup;
+  }
+
+  for (i = 0; i < n; i++) {
+    long int id = (long int)VECTOR(*source)[i];
+
+    if (mask != 0 && !mask[id])
+      continue;
+
+    pos = (source == ids) ? i : id;
+    truth = 1;
+    for (j = 0; j < k && truth; j++) {
+      if (j == indexed)
+        continue;
+      lhs = PyList_GET_ITEM(columns[j], positional[j] ? pos : id);
+      switch (ops[j]) {
+        case IGRAPHMODULE_ATTRIBUTE_FILTER_IN:
+          truth = PySequence_Contains(values[j], lhs);
+          break;
+
+        case IGRAPHMODULE_ATTRIBUTE_FILTER_NOTIN:
+          truth = PySequence_Contains(values[j], lhs);
+          if (truth >= 0)
+            truth = !truth;
+          break;
+
+        default:
+          cmp = PyObject_RichCompare(lhs, values[j], ops[j]);
+          if (cmp == 0) {
+            truth = -1;
+          } else {
+            truth = PyObject_IsTrue(cmp);
+            Py_DECREF(cmp);
+          }
+      }
+      if (truth < 0)
+        goto cleanup;
+    }
+
+    if (truth && igraph_vector_push_back(result, id)) {
+      igraphmodule_handle_igraph_error();
+      goto cleanup;
+    }
+  }
+
+  retval = 0;
+
+cleanup:
+  free(columns);
+  free(values);
+  free(ops);
+  free(positional);
+  free(mask);
+  igraph_vector_destroy(&candidates);
+  Py_DECREF(fast);
+  return retval;
+}
+
 /**
  * Checks whether the given Python object can be a valid attribute name or not.
  * Returns 1 if the object could be used as an attribute name, 0 otherwise.
@@ -34,9 +34,32 @@
 #define ATTRHASH_IDX_VERTEX 1
 #define ATTRHASH_IDX_EDGE   2
 
+#define IGRAPHMODULE_ATTRIBUTE_FILTER_IN    (Py_GE + 1)
+#define IGRAPHMODULE_ATTRIBUTE_FILTER_NOTIN (Py_GE + 2)
+
+#define IGRAPHMODULE_ATTRIBUTE_INDEX_HASH   0
+#define IGRAPHMODULE_ATTRIBUTE_INDEX_SORTED 1
+
+/**
+ * \brief Secondary index on a vertex or edge attribute.
+ *
+ * Hash indexes map each attribute value to the (ascending) list of IDs
+ * having that value in \c keys, and \c ids is unused. Sorted indexes keep
+ * the attribute values in ascending order in \c keys and the corresponding
+ * IDs in \c ids. Dirty indexes have no data and are rebuilt on demand.
+ */
+typedef struct {
+  PyObject* name;
+  int kind;
+  igraph_bool_t dirty;
+  PyObject* keys;
+  PyObject* ids;
+} igraphmodule_i_attribute_index_t;
+
 typedef struct {
   PyObject* attrs[3];
   PyObject* vertex_name_index;
+  igraph_vector_ptr_t indexes[3];
 } igraphmodule_i_attribute_struct;
 
 #define ATTR_STRUCT(graph) ((igraphmodule_i_attribute_struct*)((graph)->attr))
@@ -83,6 +106,22 @@ void igraphmodule_initialize_attribute_handler(void);
 void igraphmodule_index_vertex_names(igraph_t *graph, igraph_bool_t force);
 void igraphmodule_invalidate_vertex_name_index(igraph_t *graph);
 int igraphmodule_get_vertex_id_by_name(igraph_t *graph, PyObject* o, igraph_integer_t* id);
+int igraphmodule_filter_by_attribute_criteria(igraph_t *graph, int attrhash_idx,
+    const igraph_vector_t *ids, igraph_bool_t all, PyObject *criteria,
+    igraph_vector_t *result);
+
+int igraphmodule_create_attribute_index(igraph_t *graph, int attrhash_idx,
+    PyObject *name, PyObject *kind);
+int igraphmodule_drop_attribute_index(igraph_t *graph, int attrhash_idx,
+    PyObject *name);
+int igraphmodule_delete_attribute(igraph_t *graph, int attrhash_idx,
+    PyObject *name);
+void igraphmodule_invalidate_attribute_indexes(igraph_t *graph,
+    int attrhash_idx, PyObject *name);
+void igraphmodule_update_attribute_indexes(igraph_t *graph, int attrhash_idx,
+    PyObject *name, long int id, PyObject *old_value, PyObject *new_value);
+PyObject* igraphmodule_describe_attribute_indexes(igraph_t *graph,
+    int attrhash_idx);
 
 PyObject* igraphmodule_create_edge_attribute(const igraph_t* graph,
     const char* name);
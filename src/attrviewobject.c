@@ -0,0 +1,608 @@
+/* -*- mode: C -*-  */
+/* 
+   IGraph library.
+   Copyright (C) 2006-2012  Tamas Nepusz <ntamas@gmail.com>
+   
+   This program is free software; you can redistribute it and/or modify
+   it under the terms of the GNU General Public License as published by
+   the Free Software Foundation; either version 2 of the License, or
+   (at your option) any later version.
+   
+   This program is distributed in the hope that it will be useful,
+   but WITHOUT ANY WARRANTY; without even the implied warranty of
+   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+   GNU General Public License for more details.
+   
+   You should have received a copy of the GNU General Public License
+   along with this program; if not, write to the Free Software
+   Foundation, Inc.,  51 Franklin Street, Fifth Floor, Boston, MA 
+   02110-1301 USA
+
+*/
+
+#include "attributes.h"
+#include "attrviewobject.h"
+#include "common.h"
+#include "error.h"
+#include "py2compat.h"
+
+#ifndef Py_TPFLAGS_HAVE_NEWBUFFER
+#  define Py_TPFLAGS_HAVE_NEWBUFFER 0
+#endif
+
+/**
+ * \ingroup python_interface
+ * \defgroup python_interface_attrview Attribute view object
+ */
+
+PyTypeObject igraphmodule_AttributeViewType;
+
+/**
+ * \ingroup python_interface_attrview
+ * \brief Memory block backing a buffer exported by an attribute view
+ */
+struct igraphmodule_i_AttributeView_buffer {
+  struct igraphmodule_i_AttributeView_buffer *next;
+  Py_ssize_t shape[2];
+  double data[1];
+};
+
+/**
+ * \ingroup python_interface_attrview
+ * \brief Frees all the arrays that were exported by an attribute view
+ */
+static void igraphmodule_i_AttributeView_free_buffers(igraphmodule_AttributeViewObject *self) {
+  struct igraphmodule_i_AttributeView_buffer *buffer;
+  while (self->buffers != NULL) {
+    buffer=self->buffers;
+    self->buffers=buffer->next;
+    free(buffer);
+  }
+}
+
+/**
+ * \ingroup python_interface_attrview
+ * \brief Allocates a new view of a vertex or edge attribute
+ * \param g the graph object being referenced
+ * \param attrhash_idx \c ATTRHASH_IDX_VERTEX or \c ATTRHASH_IDX_EDGE
+ * \param name the name of the attribute
+ * \param all whether the view covers all the vertices or edges of the graph
+ * \param ids the vertex or edge IDs covered by the view if \c all is false
+ * \return the allocated PyObject
+ */
+PyObject* igraphmodule_AttributeView_new(igraphmodule_GraphObject *g,
+    int attrhash_idx, PyObject *name, igraph_bool_t all, const igraph_vector_t *ids) {
+  igraphmodule_AttributeViewObject* o;
+
+  o=PyObject_GC_New(igraphmodule_AttributeViewObject, &igraphmodule_AttributeViewType);
+  if (o == NULL)
+    return NULL;
+
+  if (all) {
+    if (igraph_vector_init(&o->ids, 0)) {
+      igraphmodule_handle_igraph_error();
+      PyObject_GC_Del(o);
+      return NULL;
+    }
+  } else if (igraph_vector_copy(&o->ids, ids)) {
+    igraphmodule_handle_igraph_error();
+    PyObject_GC_Del(o);
+    return NULL;
+  }
+
+  Py_INCREF(g);
+  o->gref=g;
+  Py_INCREF(name);
+  o->name=name;
+  o->attrhash_idx=attrhash_idx;
+  o->all=all;
+  o->buffers=NULL;
+  o->buffer_exports=0;
+
+  PyObject_GC_Track(o);
+
+  RC_ALLOC("AttributeView", o);
+
+  return (PyObject*)o;
+}
+
+/**
+ * \ingroup python_interface_attrview
+ * \brief Support for cyclic garbage collection in Python
+ */
+int igraphmodule_AttributeView_traverse(igraphmodule_AttributeViewObject *self,
+    visitproc visit, void *arg) {
+  RC_TRAVERSE("AttributeView", self);
+  Py_VISIT(self->gref);
+  return 0;
+}
+
+/**
+ * \ingroup python_interface_attrview
+ * \brief Clears the view's subobjects (before deallocation)
+ */
+int igraphmodule_AttributeView_clear(igraphmodule_AttributeViewObject *self) {
+  PyObject *tmp;
+
+  PyObject_GC_UnTrack(self);
+
+  tmp=(PyObject*)self->gref;
+  self->gref=NULL;
+  Py_XDECREF(tmp);
+
+  tmp=self->name;
+  self->name=NULL;
+  Py_XDECREF(tmp);
+
+  return 0;
+}
+
+/**
+ * \ingroup python_interface_attrview
+ * \brief Deallocates a Python representation of a given attribute view
+ */
+void igraphmodule_AttributeView_dealloc(igraphmodule_AttributeViewObject* self) {
+  igraphmodule_AttributeView_clear(self);
+  igraph_vector_destroy(&self->ids);
+  igraphmodule_i_AttributeView_free_buffers(self);
+
+  RC_DEALLOC("AttributeView", self);
+
+  PyObject_GC_Del(self);
+}
+
+/**
+ * \ingroup python_interface_attrview
+ * \brief Returns the list storing the values of the attribute in the graph
+ * \return a borrowed reference to the list or \c NULL if the attribute does
+ *         not exist any more
+ */
+static PyObject* igraphmodule_AttributeView_i_column(igraphmodule_AttributeViewObject* self) {
+  PyObject *column;
+
+  if (self->gref == NULL) {
+    PyErr_SetString(PyExc_ValueError, "attribute view is not bound to a graph");
+    return NULL;
+  }
+
+  column=PyDict_GetItem(ATTR_STRUCT_DICT(&self->gref->g)[self->attrhash_idx], self->name);
+  if (column == NULL) {
+    PyErr_SetString(PyExc_KeyError, "Attribute does not exist");
+    return NULL;
+  }
+  if (!PyList_Check(column)) {
+    PyErr_SetString(igraphmodule_InternalError, "attribute hash member is not a list");
+    return NULL;
+  }
+
+  return column;
+}
+
+/**
+ * \ingroup python_interface_attrview
+ * \brief Returns the number of items in the view
+ */
+Py_ssize_t igraphmodule_AttributeView_sq_length(igraphmodule_AttributeViewObject* self) {
+  PyObject *column;
+
+  if (!self->all)
+    return igraph_vector_size(&self->ids);
+
+  column=igraphmodule_AttributeView_i_column(self);
+  if (column == NULL)
+    return -1;
+
+  return PyList_GET_SIZE(column);
+}
+
+/**
+ * \ingroup python_interface_attrview
+ * \brief Returns the item at the given position of the view
+ * \return a new reference to the item
+ */
+PyObject* igraphmodule_AttributeView_sq_item(igraphmodule_AttributeViewObject* self,
+    Py_ssize_t i) {
+  PyObject *column, *result;
+  Py_ssize_t n;
+  long int id;
+
+  column=igraphmodule_AttributeView_i_column(self);
+  if (column == NULL)
+    return NULL;
+
+  n=self->all ? PyList_GET_SIZE(column) : igraph_vector_size(&self->ids);
+  if (i < 0 || i >= n) {
+    PyErr_SetString(PyExc_IndexError, "attribute view index out of range");
+    return NULL;
+  }
+
+  id=self->all ? i : (long int)VECTOR(self->ids)[i];
+  if (id >= PyList_GET_SIZE(column)) {
+    PyErr_SetString(PyExc_ValueError, "the vertices or edges of the attribute "
+        "view do not exist any more");
+    return NULL;
+  }
+
+  result=PyList_GET_ITEM(column, id);
+  Py_INCREF(result);
+  return result;
+}
+
+/**
+ * \ingroup python_interface_attrview
+ * \brief Returns the items of the view in a new list
+ */
+PyObject* igraphmodule_AttributeView_tolist(igraphmodule_AttributeViewObject* self) {
+  PyObject *column, *result, *item;
+  Py_ssize_t i, n;
+
+  column=igraphmodule_AttributeView_i_column(self);
+  if (column == NULL)
+    return NULL;
+
+  if (self->all)
+    return PyList_GetSlice(column, 0, PyList_GET_SIZE(column));
+
+  n=igraph_vector_size(&self->ids);
+  result=PyList_New(n);
+  if (result == NULL)
+    return NULL;
+
+  for (i=0; i<n; i++) {
+    item=igraphmodule_AttributeView_sq_item(self, i);
+    if (item == NULL) {
+      Py_DECREF(result);
+      return NULL;
+    }
+    PyList_SET_ITEM(result, i, item);   /* reference stolen here */
+  }
+
+  return result;
+}
+
+/**
+ * \ingroup python_interface_attrview
+ * \brief Indexing the view with an integer or a slice
+ */
+PyObject* igraphmodule_AttributeView_mp_subscript(igraphmodule_AttributeViewObject* self,
+    PyObject* key) {
+  PyObject *list, *result;
+  Py_ssize_t i, n;
+
+  if (PySlice_Check(key)) {
+    list=igraphmodule_AttributeView_tolist(self);
+    if (list == NULL)
+      return NULL;
+    result=PyObject_GetItem(list, key);
+    Py_DECREF(list);
+    return result;
+  }
+
+  i=PyNumber_AsSsize_t(key, PyExc_IndexError);
+  if (i == -1 && PyErr_Occurred())
+    return NULL;
+
+  if (i < 0) {
+    n=igraphmodule_AttributeView_sq_length(self);
+    if (n < 0)
+      return NULL;
+    i += n;
+  }
+
+  return igraphmodule_AttributeView_sq_item(self, i);
+}
+
+/**
+ * \ingroup python_interface_attrview
+ * \brief Returns an iterator over the items of the view
+ *
+ * If the view covers all the vertices or edges, the iterator walks the
+ * underlying attribute list directly.
+ */
+PyObject* igraphmodule_AttributeView_iter(igraphmodule_AttributeViewObject* self) {
+  PyObject *column;
+
+  if (!self->all)
+    return PySeqIter_New((PyObject*)self);
+
+  column=igraphmodule_AttributeView_i_column(self);
+  if (column == NULL)
+    return NULL;
+
+  return PyObject_GetIter(column);
+}
+
+/**
+ * \ingroup python_interface_attrview
+ * \brief Membership test
+ */
+int igraphmodule_AttributeView_sq_contains(igraphmodule_AttributeViewObject* self,
+    PyObject* value) {
+  PyObject *column, *item;
+  Py_ssize_t i, n;
+  int result;
+
+  column=igraphmodule_AttributeView_i_column(self);
+  if (column == NULL)
+    return -1;
+
+  if (self->all)
+    return PySequence_Contains(column, value);
+
+  n=igraph_vector_size(&self->ids);
+  for (i=0; i<n; i++) {
+    item=igraphmodule_AttributeView_sq_item(self, i);
+    if (item == NULL)
+      return -1;
+    result=PyObject_RichCompareBool(item, value, Py_EQ);
+    Py_DECREF(item);
+    if (result != 0)
+      return result;
+  }
+
+  return 0;
+}
+
+/**
+ * \ingroup python_interface_attrview
+ * \brief Compares the view with another view or a list item by item
+ */
+PyObject* igraphmodule_AttributeView_richcompare(igraphmodule_AttributeViewObject* self,
+    PyObject* other, int op) {
+  PyObject *list, *other_list, *result;
+
+  if (!PyObject_TypeCheck(self, &igraphmodule_AttributeViewType) ||
+      (!PyList_Check(other) && !PyObject_TypeCheck(other, &igraphmodule_AttributeViewType))) {
+    Py_INCREF(Py_NotImplemented);
+    return Py_NotImplemented;
+  }
+
+  list=igraphmodule_AttributeView_tolist(self);
+  if (list == NULL)
+    return NULL;
+
+  if (PyList_Check(other)) {
+    Py_INCREF(other);
+    other_list=other;
+  } else {
+    other_list=igraphmodule_AttributeView_tolist((igraphmodule_AttributeViewObject*)other);
+    if (other_list == NULL) {
+      Py_DECREF(list);
+      return NULL;
+    }
+  }
+
+  result=PyObject_RichCompare(list, other_list, op);
+  Py_DECREF(list);
+  Py_DECREF(other_list);
+  return result;
+}
+
+/**
+ * \ingroup python_interface_attrview
+ * \brief Returns the string representation of the view
+ */
+PyObject* igraphmodule_AttributeView_repr(igraphmodule_AttributeViewObject* self) {
+  PyObject *list, *list_repr, *result;
+  char *s;
+
+  list=igraphmodule_AttributeView_tolist(self);
+  if (list == NULL)
+    return NULL;
+
+  list_repr=PyObject_Repr(list);
+  Py_DECREF(list);
+  if (list_repr == NULL)
+    return NULL;
+
+  s=PyString_CopyAsString(list_repr);
+  Py_DECREF(list_repr);
+  if (s == NULL)
+    return NULL;
+
+  result=PyString_FromFormat("AttributeView(%s)", s);
+  free(s);
+  return result;
+}
+
+/**
+ * \ingroup python_interface_attrview
+ * \brief Exports a numeric attribute as a read-only buffer of doubles
+ *
+ * Attribute values are stored as Python objects, so every export gets a
+ * fresh array of doubles holding the current values of the attribute.
+ * The arrays are kept until the last exported buffer is released: the
+ * memoryview of Python 2.7 hands out copies of its own buffer (including
+ * \c view->internal) when it is exported again, so an array cannot be
+ * freed together with the buffer that requested it.
+ */
+int igraphmodule_AttributeView_getbuffer(igraphmodule_AttributeViewObject* self,
+    Py_buffer* view, int flags) {
+  struct igraphmodule_i_AttributeView_buffer *buffer;
+  PyObject *column, *item;
+  Py_ssize_t i, n;
+  long int id;
+
+  view->obj=NULL;
+
+  if (flags & PyBUF_WRITABLE) {
+    PyErr_SetString(PyExc_BufferError, "attribute views are read-only");
+    return -1;
+  }
+
+  column=igraphmodule_AttributeView_i_column(self);
+  if (column == NULL)
+    return -1;
+
+  n=self->all ? PyList_GET_SIZE(column) : igraph_vector_size(&self->ids);
+  buffer=(struct igraphmodule_i_AttributeView_buffer*)malloc(
+      sizeof(struct igraphmodule_i_AttributeView_buffer) +
+      (n > 0 ? n-1 : 0) * sizeof(double));
+  if (buffer == NULL) {
+    PyErr_NoMemory();
+    return -1;
+  }
+
+  for (i=0; i<n; i++) {
+    id=self->all ? i : (long int)VECTOR(self->ids)[i];
+    if (id >= PyList_GET_SIZE(column)) {
+      PyErr_SetString(PyExc_ValueError, "the vertices or edges of the attribute "
+          "view do not exist any more");
+      free(buffer);
+      return -1;
+    }
+    item=PyList_GET_ITEM(column, id);
+    if (!PyFloat_Check(item) && !PyInt_Check(item) && !PyLong_Check(item)) {
+      PyErr_SetString(PyExc_BufferError, "only attributes with numeric "
+          "values can be exported as a buffer");
+      free(buffer);
+      return -1;
+    }
+    buffer->data[i]=PyFloat_AsDouble(item);
+    if (buffer->data[i] == -1 && PyErr_Occurred()) {
+      free(buffer);
+      return -1;
+    }
+  }
+  buffer->shape[0]=n;
+  buffer->shape[1]=sizeof(double);
+  buffer->next=self->buffers;
+  self->buffers=buffer;
+  self->buffer_exports++;
+
+  view->buf=buffer->data;
+  view->obj=(PyObject*)self;
+  Py_INCREF(self);
+  view->len=n * sizeof(double);
+  view->itemsize=sizeof(double);
+  view->readonly=1;
+  view->format=(flags & PyBUF_FORMAT) ? "d" : NULL;
+  view->ndim=1;
+  view->shape=(flags & PyBUF_ND) ? buffer->shape : NULL;
+  view->strides=((flags & PyBUF_STRIDES) == PyBUF_STRIDES) ? buffer->shape + 1 : NULL;
+  view->suboffsets=NULL;
+  view->internal=NULL;
+
+  return 0;
+}
+
+/**
+ * \ingroup python_interface_attrview
+ * \brief Frees the exported arrays when the last buffer is released
+ */
+void igraphmodule_AttributeView_releasebuffer(igraphmodule_AttributeViewObject* self,
+    Py_buffer* view) {
+  self->buffer_exports--;
+  if (self->buffer_exports <= 0) {
+    self->buffer_exports=0;
+    igraphmodule_i_AttributeView_free_buffers(self);
+  }
+}
+
+/**
+ * \ingroup python_interface_attrview
+ * Method table for the \c igraph.AttributeView object
+ */
+PyMethodDef igraphmodule_AttributeView_methods[] = {
+  {"tolist", (PyCFunction)igraphmodule_AttributeView_tolist,
+   METH_NOARGS,
+   "tolist() -> list\n\n"
+   "Returns the values in the view in a new list.\n"
+  },
+  {NULL}
+};
+
+/**
+ * \ingroup python_interface_attrview
+ * This is the collection of functions necessary to implement the
+ * attribute view as a sequence
+ */
+static PySequenceMethods igraphmodule_AttributeView_as_sequence = {
+  (lenfunc)igraphmodule_AttributeView_sq_length,
+  0,               /* sq_concat */
+  0,               /* sq_repeat */
+  (ssizeargfunc)igraphmodule_AttributeView_sq_item, /* sq_item */
+  0,                                          /* sq_slice */
+  0,                                          /* sq_ass_item */
+  0,                                          /* sq_ass_slice */
+  (objobjproc)igraphmodule_AttributeView_sq_contains, /* sq_contains */
+  0,                                          /* sq_inplace_concat */
+  0,                                          /* sq_inplace_repeat */
+};
+
+/**
+ * \ingroup python_interface_attrview
+ * This is the collection of functions necessary to support indexing the
+ * attribute view with slices and negative indices
+ */
+static PyMappingMethods igraphmodule_AttributeView_as_mapping = {
+  (lenfunc)igraphmodule_AttributeView_sq_length,
+  (binaryfunc)igraphmodule_AttributeView_mp_subscript,
+  0
+};
+
+/**
+ * \ingroup python_interface_attrview
+ * Buffer protocol of the attribute view
+ */
+static PyBufferProcs igraphmodule_AttributeView_as_buffer = {
+#ifndef IGRAPH_PYTHON3
+  0, 0, 0, 0,      /* old-style buffer protocol of Python 2.x */
+#endif
+  (getbufferproc)igraphmodule_AttributeView_getbuffer,
+  (releasebufferproc)igraphmodule_AttributeView_releasebuffer
+};
+
+/** \ingroup python_interface_attrview
+ * Python type object referencing the methods Python calls when it performs
+ * various operations on an attribute view
+ */
+PyTypeObject igraphmodule_AttributeViewType =
+{
+  PyVarObject_HEAD_INIT(0, 0)
+  "igraph.AttributeView",                   // tp_name
+  sizeof(igraphmodule_AttributeViewObject), // tp_basicsize
+  0,                                        // tp_itemsize
+  (destructor)igraphmodule_AttributeView_dealloc, // tp_dealloc
+  0,                                        // tp_print
+  0,                                        // tp_getattr
+  0,                                        // tp_setattr
+  0,                                        /* tp_compare (2.x) / tp_reserved (3.x) */
+  (reprfunc)igraphmodule_AttributeView_repr, // tp_repr
+  0,                                        // tp_as_number
+  &igraphmodule_AttributeView_as_sequence,  // tp_as_sequence
+  &igraphmodule_AttributeView_as_mapping,   // tp_as_mapping
+  0,                                        // tp_hash
+  0,                                        // tp_call
+  0,                                        // tp_str
+  0,                                        // tp_getattro
+  0,                                        // tp_setattro
+  &igraphmodule_AttributeView_as_buffer,    // tp_as_buffer
+  Py_TPFLAGS_DEFAULT | Py_TPFLAGS_HAVE_GC | Py_TPFLAGS_HAVE_NEWBUFFER, // tp_flags
+  "Read-only view of the values of a vertex or edge attribute.\n\n"
+  "The view does not copy the attribute values; every access is forwarded\n"
+  "to the graph, so the view always reflects the current values. Use\n"
+  "L{tolist()} to obtain an independent copy. Views of numeric attributes\n"
+  "also support the buffer protocol; every exported buffer contains a\n"
+  "snapshot of the values as doubles, taken when the buffer is requested.\n\n"
+  "Attribute views are returned by L{VertexSeq.get_attribute_view()} and\n"
+  "L{EdgeSeq.get_attribute_view()}.", // tp_doc
+  (traverseproc) igraphmodule_AttributeView_traverse, /* tp_traverse */
+  (inquiry) igraphmodule_AttributeView_clear, /* tp_clear */
+  (richcmpfunc) igraphmodule_AttributeView_richcompare, /* tp_richcompare */
+  0,                                        // tp_weaklistoffset
+  (getiterfunc)igraphmodule_AttributeView_iter, /* tp_iter */
+  0,                                        /* tp_iternext */
+  igraphmodule_AttributeView_methods,       /* tp_methods */
+  0,                                        /* tp_members */
+  0,                                        /* tp_getset */
+  0,                                        /* tp_base */
+  0,                                        /* tp_dict */
+  0,                                        /* tp_descr_get */
+  0,                                        /* tp_descr_set */
+  0,                                        /* tp_dictoffset */
+  0,                                        /* tp_init */
+  0,                                        /* tp_alloc */
+  0,                                        /* tp_new */
+  0,                                        /* tp_free */
+};
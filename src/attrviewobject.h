@@ -0,0 +1,59 @@
+/* -*- mode: C -*-  */
+/* 
+   IGraph library.
+   Copyright (C) 2006-2012  Tamas Nepusz <ntamas@gmail.com>
+   
+   This program is free software; you can redistribute it and/or modify
+   it under the terms of the GNU General Public License as published by
+   the Free Software Foundation; either version 2 of the License, or
+   (at your option) any later version.
+   
+   This program is distributed in the hope that it will be useful,
+   but WITHOUT ANY WARRANTY; without even the implied warranty of
+   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+   GNU General Public License for more details.
+   
+   You should have received a copy of the GNU General Public License
+   along with this program; if not, write to the Free Software
+   Foundation, Inc.,  51 Franklin Street, Fifth Floor, Boston, MA 
+   02110-1301 USA
+
+*/
+
+
+#ifndef PYTHON_ATTRVIEWOBJECT_H
+#define PYTHON_ATTRVIEWOBJECT_H
+
+#include <Python.h>
+#include "graphobject.h"
+
+/**
+ * \ingroup python_interface_attrview
+ * \brief A read-only view of the values of a vertex or edge attribute
+ *
+ * The view does not copy the attribute values; it looks up the attribute
+ * in the graph whenever it is accessed, so it always reflects the current
+ * values of the attribute.
+ */
+typedef struct
+{
+  PyObject_HEAD
+  igraphmodule_GraphObject* gref;
+  int attrhash_idx;
+  PyObject* name;
+  igraph_bool_t all;
+  igraph_vector_t ids;
+  struct igraphmodule_i_AttributeView_buffer* buffers;
+  Py_ssize_t buffer_exports;
+} igraphmodule_AttributeViewObject;
+
+PyObject* igraphmodule_AttributeView_new(igraphmodule_GraphObject *g,
+    int attrhash_idx, PyObject *name, igraph_bool_t all, const igraph_vector_t *ids);
+int igraphmodule_AttributeView_traverse(igraphmodule_AttributeViewObject *self,
+    visitproc visit, void *arg);
+int igraphmodule_AttributeView_clear(igraphmodule_AttributeViewObject *self);
+void igraphmodule_AttributeView_dealloc(igraphmodule_AttributeViewObject* self);
+
+extern PyTypeObject igraphmodule_AttributeViewType;
+
+#endif
@@ -0,0 +1,399 @@
+/* -*- mode: C -*-  */
+/*
+   IGraph library.
+   Copyright (C) 2006-2012  Tamas Nepusz <ntamas@gmail.com>
+
+   This program is free software; you can redistribute it and/or modify
+   it under the terms of the GNU General Public License as published by
+   the Free Software Foundation; either version 2 of the License, or
+   (at your option) any later version.
+
+   This program is distributed in the hope that it will be useful,
+   but WITHOUT ANY WARRANTY; without even the implied warranty of
+   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+   GNU General Public License for more details.
+
+   You should have received a copy of the GNU General Public License
+   along with this program; if not, write to the Free Software
+   Foundation, Inc.,  51 Franklin Street, Fifth Floor, Boston, MA
+   02110-1301 USA
+
+*/
+
+#include <Python.h>
+#include <pythread.h>
+#include <limits.h>
+#include <math.h>
+#include <stdlib.h>
+#include <string.h>
+#include "commcmp.h"
+
+/**
+ * \ingroup python_interface
+ * \defgroup python_interface_commcmp Comparison of community structures
+ *
+ * The functions here compare many partitions of the same set pairwise.
+ * Every measure is calculated from the nonzero entries of the contingency
+ * table of two partitions, which is built one cluster of the first
+ * partition at a time. The pairs are distributed among native threads;
+ * the threads do not call the igraph library as it is not thread-safe,
+ * nor the Python API, so they can run while the global interpreter lock
+ * is released.
+ */
+
+/**
+ * \ingroup python_interface_commcmp
+ * \brief Initializes a comparison of the given number of partitions
+ *
+ * The membership arrays are filled by \ref igraphmodule_commcmp_set.
+ */
+int igraphmodule_commcmp_init(igraphmodule_commcmp_t *cmp, long int n,
+    long int no_of_partitions) {
+  size_t size = n > 0 ? (size_t) n : 1;
+  size_t count = no_of_partitions > 0 ? (size_t) no_of_partitions : 1;
+
+  cmp->n = n;
+  cmp->no_of_partitions = no_of_partitions;
+  cmp->max_clusters = 0;
+  cmp->membership = (int*) calloc(size * count, sizeof(int));
+  cmp->no_of_clusters = (long int*) calloc(count, sizeof(long int));
+  cmp->entropy_sum = (double*) calloc(count, sizeof(double));
+  cmp->pair_count = (double*) calloc(count, sizeof(double));
+  if (cmp->membership == 0 || cmp->no_of_clusters == 0 ||
+      cmp->entropy_sum == 0 || cmp->pair_count == 0) {
+    igraphmodule_commcmp_destroy(cmp);
+    IGRAPH_ERROR("cannot compare partitions", IGRAPH_ENOMEM);
+  }
+
+  return IGRAPH_SUCCESS;
+}
+
+/**
+ * \ingroup python_interface_commcmp
+ * \brief Destroys a comparison of partitions
+ */
+void igraphmodule_commcmp_destroy(igraphmodule_commcmp_t *cmp) {
+  free(cmp->membership);
+  free(cmp->no_of_clusters);
+  free(cmp->entropy_sum);
+  free(cmp->pair_count);
+  cmp->membership = 0;
+  cmp->no_of_clusters = 0;
+  cmp->entropy_sum = 0;
+  cmp->pair_count = 0;
+}
+
+/**
+ * \ingroup python_interface_commcmp
+ * \brief Stores a partition in a comparison
+ *
+ * The cluster indices are renumbered so that the clusters of the partition
+ * are numbered from zero consecutively, in increasing order of the original
+ * indices. The cluster sizes are summarized in the terms that the measures
+ * need for the partition alone.
+ *
+ * \param cmp the comparison
+ * \param index the index of the partition in the comparison
+ * \param membership the membership vector of the partition; its length
+ *        must be equal to the number of elements of the comparison
+ */
+int igraphmodule_commcmp_set(igraphmodule_commcmp_t *cmp, long int index,
+    igraph_vector_t *membership) {
+  igraph_vector_t order;
+  int *dest = cmp->membership + index * cmp->n;
+  long int i, start, k = 0;
+  double size, entropy_sum = 0.0, pair_count = 0.0;
+
+  if (igraph_vector_size(membership) != cmp->n)
+    IGRAPH_ERROR("membership vectors must be equal in length", IGRAPH_EINVAL);
+  if (cmp->n > INT_MAX)
+    IGRAPH_ERROR("too many elements", IGRAPH_EINVAL);
+
+  IGRAPH_VECTOR_INIT_FINALLY(&order, 0);
+  IGRAPH_CHECK(igraph_vector_qsort_ind(membership, &order, 0));
+
+  for (i = 1, start = 0; i <= cmp->n; i++) {
+    if (i < cmp->n && VECTOR(*membership)[(long int) VECTOR(order)[i]] ==
+        VECTOR(*membership)[(long int) VECTOR(order)[i-1]])
+      continue;
+    /* The elements order[start..i-1] form the next cluster */
+    size = i - start;
+    entropy_sum += size * log(size);
+    pair_count += size * (size - 1) / 2.0;
+    for (; start < i; start++)
+      dest[(long int) VECTOR(order)[start]] = (int) k;
+    k++;
+  }
+
+  igraph_vector_destroy(&order);
+  IGRAPH_FINALLY_CLEAN(1);
+
+  cmp->no_of_clusters[index] = k;
+  cmp->entropy_sum[index] = entropy_sum;
+  cmp->pair_count[index] = pair_count;
+  if (k > cmp->max_clusters)
+    cmp->max_clusters = k;
+
+  return IGRAPH_SUCCESS;
+}
+
+/**
+ * \ingroup python_interface_commcmp
+ * \brief State shared by the threads of a comparison
+ */
+typedef struct {
+  const igraphmodule_commcmp_t *cmp;
+  igraph_community_comparison_t method;
+  double *result;
+  PyThread_type_lock lock;
+  long int next_row;
+} igraphmodule_i_commcmp_shared_t;
+
+/**
+ * \ingroup python_interface_commcmp
+ * \brief Working memory of a single thread of a comparison
+ */
+typedef struct {
+  igraphmodule_i_commcmp_shared_t *shared;
+  PyThread_type_lock done;
+  long int *offsets;
+  int *members;
+  long int *counts;
+  long int *column_max;
+  int *touched;
+} igraphmodule_i_commcmp_worker_t;
+
+/**
+ * \ingroup python_interface_commcmp
+ * \brief Compares two partitions
+ *
+ * \param w the working memory of the thread; the members of the clusters of
+ *        partition \c p1 must already be listed in it
+ * \param p1 the index of the first partition
+ * \param p2 the index of the second partition
+ * \return the value of the measure
+ */
+static double igraphmodule_i_commcmp_pair(igraphmodule_i_commcmp_worker_t *w,
+    long int p1, long int p2) {
+  const igraphmodule_commcmp_t *cmp = w->shared->cmp;
+  const int *memb2 = cmp->membership + p2 * cmp->n;
+  long int k1 = cmp->no_of_clusters[p1], k2 = cmp->no_of_clusters[p2];
+  long int c, i, j, t, no_of_touched, nij, row_max;
+  long int row_max_sum = 0, column_max_sum = 0;
+  double n = cmp->n, entropy_sum = 0.0, pair_count = 0.0;
+  double h1, h2, mut_inf, all_pairs, rand, frac1, frac2, expected;
+
+  for (c = 0; c < k1; c++) {
+    no_of_touched = 0;
+    for (i = w->offsets[c]; i < w->offsets[c+1]; i++) {
+      j = memb2[w->members[i]];
+      if (w->counts[j] == 0)
+        w->touched[no_of_touched++] = (int) j;
+      w->counts[j]++;
+    }
+    row_max = 0;
+    for (t = 0; t < no_of_touched; t++) {
+      j = w->touched[t];
+      nij = w->counts[j];
+      w->counts[j] = 0;
+      entropy_sum += nij * log((double) nij);
+      pair_count += nij * (nij - 1) / 2.0;
+      if (nij > row_max)
+        row_max = nij;
+      if (nij > w->column_max[j])
+        w->column_max[j] = nij;
+    }
+    row_max_sum += row_max;
+  }
+  for (j = 0; j < k2; j++) {
+    column_max_sum += w->column_max[j];
+    w->column_max[j] = 0;
+  }
+
+  switch (w->shared->method) {
+    case IGRAPH_COMMCMP_VI:
+      if (cmp->n == 0)
+        return 0.0;
+      h1 = (cmp->entropy_sum[p1] + cmp->entropy_sum[p2] - 2 * entropy_sum) / n;
+      return h1 > 0 ? h1 : 0.0;
+
+    case IGRAPH_COMMCMP_NMI:
+      if (cmp->n == 0)
+        return 1.0;
+      h1 = log(n) - cmp->entropy_sum[p1] / n;
+      h2 = log(n) - cmp->entropy_sum[p2] / n;
+      if (h1 + h2 == 0)
+        return 1.0;
+      mut_inf = log(n) + (entropy_sum - cmp->entropy_sum[p1] -
+          cmp->entropy_sum[p2]) / n;
+      return 2 * mut_inf / (h1 + h2);
+
+    case IGRAPH_COMMCMP_SPLIT_JOIN:
+      return 2 * cmp->n - row_max_sum - column_max_sum;
+
+    case IGRAPH_COMMCMP_RAND:
+    case IGRAPH_COMMCMP_ADJUSTED_RAND:
+      if (k1 == 1 && k2 == 1)
+        return 1.0;
+      all_pairs = n * (n - 1) / 2.0;
+      frac1 = cmp->pair_count[p1] / all_pairs;
+      frac2 = cmp->pair_count[p2] / all_pairs;
+      rand = 1.0 + 2.0 * pair_count / all_pairs - frac1 - frac2;
+      if (w->shared->method == IGRAPH_COMMCMP_RAND)
+        return rand;
+      expected = frac1 * frac2 + (1 - frac1) * (1 - frac2);
+      return (rand - expected) / (1 - expected);
+
+    default:
+      return 0.0;
+  }
+}
+
+/**
+ * \ingroup python_interface_commcmp
+ * \brief Compares partitions in a single thread
+ *
+ * Rows of the upper triangle of the result matrix are taken one by one until
+ * none is left. The members of the clusters of the partition of the row are
+ * listed once, and the partition is then compared to itself and to all the
+ * partitions after it.
+ */
+static void igraphmodule_i_commcmp_worker(void *arg) {
+  igraphmodule_i_commcmp_worker_t *w = (igraphmodule_i_commcmp_worker_t*) arg;
+  igraphmodule_i_commcmp_shared_t *shared = w->shared;
+  const igraphmodule_commcmp_t *cmp = shared->cmp;
+  long int p = cmp->no_of_partitions;
+  long int row, col, i, k;
+  const int *memb;
+  double value;
+
+  while (1) {
+    PyThread_acquire_lock(shared->lock, WAIT_LOCK);
+    row = shared->next_row++;
+    PyThread_release_lock(shared->lock);
+    if (row >= p)
+      break;
+
+    /* List the members of the clusters of this row in a CSR structure */
+    memb = cmp->membership + row * cmp->n;
+    k = cmp->no_of_clusters[row];
+    memset(w->offsets, 0, sizeof(long int) * (k + 1));
+    for (i = 0; i < cmp->n; i++)
+      w->offsets[memb[i] + 1]++;
+    for (i = 0; i < k; i++)
+      w->offsets[i+1] += w->offsets[i];
+    for (i = 0; i < cmp->n; i++)
+      w->members[w->offsets[memb[i]]++] = (int) i;
+    for (i = k; i > 0; i--)
+      w->offsets[i] = w->offsets[i-1];
+    w->offsets[0] = 0;
+
+    for (col = row; col < p; col++) {
+      value = igraphmodule_i_commcmp_pair(w, row, col);
+      shared->result[row * p + col] = value;
+      shared->result[col * p + row] = value;
+    }
+  }
+
+  if (w->done != 0)
+    PyThread_release_lock(w->done);
+}
+
+/**
+ * \ingroup python_interface_commcmp
+ * \brief Calculates the matrix of a measure between all pairs of partitions
+ *
+ * The function does not use the Python API, so the caller may release the
+ * global interpreter lock while it runs.
+ *
+ * \param cmp the comparison
+ * \param method the measure to calculate. The split-join distance is the
+ *        sum of the projection distances in both directions.
+ * \param threads the number of threads to use
+ * \param result the result matrix in row-major order; it must have room for
+ *        the square of the number of partitions
+ * \return \c IGRAPH_ENOMEM if the working memory of the threads could not
+ *         be allocated. It does not call the igraph error handler.
+ */
+int igraphmodule_commcmp_matrix(const igraphmodule_commcmp_t *cmp,
+    igraph_community_comparison_t method, int threads, double *result) {
+  igraphmodule_i_commcmp_shared_t shared;
+  igraphmodule_i_commcmp_worker_t *workers;
+  size_t n = cmp->n > 0 ? (size_t) cmp->n : 1;
+  size_t k = (size_t) cmp->max_clusters + 1;
+  int i, started = 1, retval = IGRAPH_SUCCESS;
+
+  if (threads > cmp->no_of_partitions)
+    threads = (int) cmp->no_of_partitions;
+  if (threads < 1)
+    threads = 1;
+
+  shared.cmp = cmp;
+  shared.method = method;
+  shared.result = result;
+  shared.next_row = 0;
+  shared.lock = PyThread_allocate_lock();
+  workers = (igraphmodule_i_commcmp_worker_t*)
+    calloc(threads, sizeof(igraphmodule_i_commcmp_worker_t));
+  if (shared.lock == 0 || workers == 0) {
+    retval = IGRAPH_ENOMEM;
+    goto cleanup;
+  }
+
+  for (i = 0; i < threads; i++) {
+    workers[i].shared = &shared;
+    workers[i].offsets = (long int*) calloc(k, sizeof(long int));
+    workers[i].members = (int*) calloc(n, sizeof(int));
+    workers[i].counts = (long int*) calloc(k, sizeof(long int));
+    workers[i].column_max = (long int*) calloc(k, sizeof(long int));
+    workers[i].touched = (int*) calloc(k, sizeof(int));
+    if (workers[i].offsets == 0 || workers[i].members == 0 ||
+        workers[i].counts == 0 || workers[i].column_max == 0 ||
+        workers[i].touched == 0) {
+      retval = IGRAPH_ENOMEM;
+      goto cleanup;
+    }
+  }
+
+  /* The first worker runs in the calling thread. A worker holds its lock
+   * until it finishes; we simply do with fewer threads if one cannot be
+   * started. */
+  for (i = 1; i < threads; i++) {
+    workers[i].done = PyThread_allocate_lock();
+    if (workers[i].done == 0)
+      break;
+    PyThread_acquire_lock(workers[i].done, WAIT_LOCK);
+    if ((long) PyThread_start_new_thread(igraphmodule_i_commcmp_worker,
+          &workers[i]) == -1L) {
+      PyThread_release_lock(workers[i].done);
+      PyThread_free_lock(workers[i].done);
+      workers[i].done = 0;
+      break;
+    }
+    started++;
+  }
+
+  igraphmodule_i_commcmp_worker(&workers[0]);
+
+  for (i = 1; i < started; i++) {
+    PyThread_acquire_lock(workers[i].done, WAIT_LOCK);
+    PyThread_release_lock(workers[i].done);
+    PyThread_free_lock(workers[i].done);
+  }
+
+cleanup:
+  if (workers != 0) {
+    for (i = 0; i < threads; i++) {
+      free(workers[i].offsets);
+      free(workers[i].members);
+      free(workers[i].counts);
+      free(workers[i].column_max);
+      free(workers[i].touched);
+    }
+    free(workers);
+  }
+  if (shared.lock != 0)
+    PyThread_free_lock(shared.lock);
+
+  return retval;
+}
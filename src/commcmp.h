@@ -0,0 +1,51 @@
+/* -*- mode: C -*-  */
+/*
+   IGraph library.
+   Copyright (C) 2006-2012  Tamas Nepusz <ntamas@gmail.com>
+
+   This program is free software; you can redistribute it and/or modify
+   it under the terms of the GNU General Public License as published by
+   the Free Software Foundation; either version 2 of the License, or
+   (at your option) any later version.
+
+   This program is distributed in the hope that it will be useful,
+   but WITHOUT ANY WARRANTY; without even the implied warranty of
+   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+   GNU General Public License for more details.
+
+   You should have received a copy of the GNU General Public License
+   along with this program; if not, write to the Free Software
+   Foundation, Inc.,  51 Franklin Street, Fifth Floor, Boston, MA
+   02110-1301 USA
+
+*/
+
+#ifndef PYTHON_COMMCMP_H
+#define PYTHON_COMMCMP_H
+
+#include <igraph.h>
+
+/* Pairwise comparison of many partitions of the same set. The partitions
+ * are stored as compact membership arrays where partition p maps element i
+ * to membership[p*n+i], a cluster index between zero and the number of
+ * clusters of the partition. */
+
+typedef struct {
+  long int n;
+  long int no_of_partitions;
+  long int max_clusters;
+  int *membership;
+  long int *no_of_clusters;
+  double *entropy_sum;
+  double *pair_count;
+} igraphmodule_commcmp_t;
+
+int igraphmodule_commcmp_init(igraphmodule_commcmp_t *cmp, long int n,
+    long int no_of_partitions);
+void igraphmodule_commcmp_destroy(igraphmodule_commcmp_t *cmp);
+int igraphmodule_commcmp_set(igraphmodule_commcmp_t *cmp, long int index,
+    igraph_vector_t *membership);
+int igraphmodule_commcmp_matrix(const igraphmodule_commcmp_t *cmp,
+    igraph_community_comparison_t method, int threads, double *result);
+
+#endif
@@ -69,3 +69,34 @@ PyObject* igraphmodule_resolve_graph_weakref(PyObject* ref) {
   }
   return o;
 }
+
+/**
+ * \ingroup python_interface
+ * \brief Looks up a builtin Python function by name
+ * \return a borrowed reference to the function or NULL if there is no such
+ * builtin function. Sets an exception in the latter case.
+ */
+PyObject* igraphmodule_get_builtin_function(const char* name) {
+  static PyObject* builtin_module_dict = 0;
+  PyObject* func;
+
+  if (builtin_module_dict == 0) {
+#ifdef IGRAPH_PYTHON3
+    PyObject* builtin_module = PyImport_ImportModule("builtins");
+#else
+    PyObject* builtin_module = PyImport_ImportModule("__builtin__");
+#endif
+    if (builtin_module == 0)
+      return 0;
+    builtin_module_dict = PyModule_GetDict(builtin_module);
+    Py_DECREF(builtin_module);
+    if (builtin_module_dict == 0)
+      return 0;
+  }
+
+  func = PyDict_GetItemString(builtin_module_dict, name);
+  if (func == 0)
+    PyErr_Format(PyExc_NameError, "no such builtin function; %s", name);
+
+  return func;
+}
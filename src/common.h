@@ -75,4 +75,5 @@
 
 PyObject* igraphmodule_unimplemented(PyObject* self, PyObject* args, PyObject* kwds);
 PyObject* igraphmodule_resolve_graph_weakref(PyObject* ref);
+PyObject* igraphmodule_get_builtin_function(const char* name);
 #endif
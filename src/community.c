@@ -0,0 +1,910 @@
+/* -*- mode: C -*-  */
+/*
+   IGraph library.
+   Copyright (C) 2006-2012  Tamas Nepusz <ntamas@gmail.com>
+
+   This program is free software; you can redistribute it and/or modify
+   it under the terms of the GNU General Public License as published by
+   the Free Software Foundation; either version 2 of the License, or
+   (at your option) any later version.
+
+   This program is distributed in the hope that it will be useful,
+   but WITHOUT ANY WARRANTY; without even the implied warranty of
+   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+   GNU General Public License for more details.
+
+   You should have received a copy of the GNU General Public License
+   along with this program; if not, write to the Free Software
+   Foundation, Inc.,  51 Franklin Street, Fifth Floor, Boston, MA
+   02110-1301 USA
+
+*/
+
+#include <math.h>
+#include "community.h"
+
+/**
+ * \ingroup python_interface
+ * \defgroup python_interface_community Community detection helpers
+ */
+
+/**
+ * \ingroup python_interface_community
+ * \brief Calculates the quotient graph of a clustering
+ *
+ * The quotient graph has a vertex for every cluster. Two clusters are
+ * connected by a single edge whose weight is the total weight of the edges
+ * between them, and every cluster containing edges has a loop whose weight
+ * is the total weight of these edges. The edges are grouped by their
+ * smaller endpoint with a counting sort, so the quotient is found in
+ * linear time without hashing.
+ *
+ * \param graph the graph
+ * \param weights the weights of the edges; \c NULL means that all the edges
+ *        have unit weight
+ * \param membership the cluster index of each vertex, between zero and
+ *        \c no_of_clusters - 1
+ * \param no_of_clusters the number of clusters
+ * \param edges initialized vector, the endpoints of the edges of the
+ *        quotient graph are stored here. The edges are ordered by their
+ *        smaller endpoint, and the smaller endpoint comes first.
+ * \param edge_weights initialized vector, the weights of the edges of the
+ *        quotient graph are stored here
+ * \return error code
+ */
+int igraphmodule_community_quotient(const igraph_t *graph,
+    const igraph_vector_t *weights, const igraph_vector_t *membership,
+    long int no_of_clusters, igraph_vector_t *edges,
+    igraph_vector_t *edge_weights) {
+  long int no_of_edges = igraph_ecount(graph);
+  long int e, i, c, d, t, no_of_touched;
+  igraph_vector_long_t offsets, order, touched;
+  igraph_vector_t total;
+  igraph_vector_char_t seen;
+
+  IGRAPH_CHECK(igraph_vector_long_init(&offsets, no_of_clusters + 1));
+  IGRAPH_FINALLY(igraph_vector_long_destroy, &offsets);
+  IGRAPH_CHECK(igraph_vector_long_init(&order, no_of_edges));
+  IGRAPH_FINALLY(igraph_vector_long_destroy, &order);
+  IGRAPH_CHECK(igraph_vector_long_init(&touched, no_of_clusters));
+  IGRAPH_FINALLY(igraph_vector_long_destroy, &touched);
+  IGRAPH_VECTOR_INIT_FINALLY(&total, no_of_clusters);
+  IGRAPH_CHECK(igraph_vector_char_init(&seen, no_of_clusters));
+  IGRAPH_FINALLY(igraph_vector_char_destroy, &seen);
+
+#define CLUSTER(v) ((long int) VECTOR(*membership)[(long int) (v)])
+#define SMALLER(e) (CLUSTER(IGRAPH_FROM(graph, e)) < CLUSTER(IGRAPH_TO(graph, e)) ? \
+    CLUSTER(IGRAPH_FROM(graph, e)) : CLUSTER(IGRAPH_TO(graph, e)))
+#define LARGER(e) (CLUSTER(IGRAPH_FROM(graph, e)) < CLUSTER(IGRAPH_TO(graph, e)) ? \
+    CLUSTER(IGRAPH_TO(graph, e)) : CLUSTER(IGRAPH_FROM(graph, e)))
+
+  for (e = 0; e < no_of_edges; e++)
+    VECTOR(offsets)[SMALLER(e) + 1]++;
+  for (c = 0; c < no_of_clusters; c++)
+    VECTOR(offsets)[c + 1] += VECTOR(offsets)[c];
+  for (e = 0; e < no_of_edges; e++)
+    VECTOR(order)[VECTOR(offsets)[SMALLER(e)]++] = e;
+
+  igraph_vector_clear(edges);
+  igraph_vector_clear(edge_weights);
+
+  for (c = 0, i = 0; c < no_of_clusters; c++) {
+    no_of_touched = 0;
+    for (; i < VECTOR(offsets)[c]; i++) {
+      e = VECTOR(order)[i];
+      d = LARGER(e);
+      if (!VECTOR(seen)[d]) {
+        VECTOR(seen)[d] = 1;
+        VECTOR(touched)[no_of_touched++] = d;
+      }
+      VECTOR(total)[d] += weights ? VECTOR(*weights)[e] : 1;
+    }
+    for (t = 0; t < no_of_touched; t++) {
+      d = VECTOR(touched)[t];
+      IGRAPH_CHECK(igraph_vector_push_back(edges, c));
+      IGRAPH_CHECK(igraph_vector_push_back(edges, d));
+      IGRAPH_CHECK(igraph_vector_push_back(edge_weights, VECTOR(total)[d]));
+      VECTOR(total)[d] = 0;
+      VECTOR(seen)[d] = 0;
+    }
+  }
+
+#undef LARGER
+#undef SMALLER
+#undef CLUSTER
+
+  igraph_vector_char_destroy(&seen);
+  igraph_vector_destroy(&total);
+  igraph_vector_long_destroy(&touched);
+  igraph_vector_long_destroy(&order);
+  igraph_vector_long_destroy(&offsets);
+  IGRAPH_FINALLY_CLEAN(5);
+
+  return IGRAPH_SUCCESS;
+}
+
+/**
+ * \ingroup python_interface_community
+ * \brief Updates a community structure found by the multilevel algorithm
+ *        after some edges of the graph changed
+ *
+ * The community structure is improved in two phases. First, the vertices
+ * of a queue are moved one by one to the neighboring community that
+ * increases the modularity the most, as in the first phase of the multilevel
+ * algorithm of Blondel et al. The queue initially contains the seed vertices
+ * and their neighbors; whenever a vertex moves, its neighbors outside its
+ * new community are queued again, so only the region around the changes is
+ * visited. Second, the communities are contracted into a weighted quotient
+ * graph, and the multilevel algorithm is run on the quotient graph to merge
+ * the communities where this increases the modularity.
+ *
+ * \param graph the graph; it must be undirected
+ * \param weights the weights of the edges; \c NULL means that all the edges
+ *        have unit weight
+ * \param membership the community index of each vertex before the update;
+ *        the indices must be non-negative. The updated community structure
+ *        is stored here, with the communities numbered from zero.
+ * \param seeds the vertices whose edges changed
+ * \param isolated the vertices that are moved to a community of their own
+ *        before the first phase, e.g. the endpoints of removed edges that
+ *        were within a community. These should also be seeds.
+ * \param modularity if not \c NULL, the modularity of the updated
+ *        community structure is stored here
+ * \return error code
+ */
+int igraphmodule_community_multilevel_update(const igraph_t *graph,
+    const igraph_vector_t *weights, igraph_vector_t *membership,
+    const igraph_vector_t *seeds, const igraph_vector_t *isolated,
+    igraph_real_t *modularity) {
+  long int n = igraph_vcount(graph), no_of_edges = igraph_ecount(graph);
+  long int i, j, v, u, e, c, best, head, tail, queued, no_of_touched;
+  long int no_of_clusters, no_of_isolated = igraph_vector_size(isolated);
+  igraph_integer_t nb_clusters;
+  igraph_vector_int_t *incs;
+  igraph_inclist_t inclist;
+  igraph_vector_t strength, total, neighbor_weight, quotient_edges,
+    quotient_weights, quotient_membership, merged;
+  igraph_vector_long_t queue, touched;
+  igraph_vector_char_t in_queue, seen;
+  igraph_real_t m2 = 0, k, gain, best_gain, q_moved, q_merged;
+  igraph_t quotient;
+
+  if (igraph_is_directed(graph))
+    IGRAPH_ERROR("multilevel update works on undirected graphs only",
+        IGRAPH_EINVAL);
+  if (igraph_vector_size(membership) != n)
+    IGRAPH_ERROR("membership vector has wrong length", IGRAPH_EINVAL);
+  if (weights && igraph_vector_size(weights) != no_of_edges)
+    IGRAPH_ERROR("weight vector has wrong length", IGRAPH_EINVAL);
+  if (weights && no_of_edges > 0 && igraph_vector_min(weights) < 0)
+    IGRAPH_ERROR("weights must not be negative", IGRAPH_EINVAL);
+
+  for (i = 0; i < igraph_vector_size(seeds); i++) {
+    if (VECTOR(*seeds)[i] < 0 || VECTOR(*seeds)[i] >= n)
+      IGRAPH_ERROR("invalid seed vertex", IGRAPH_EINVVID);
+  }
+  for (i = 0; i < no_of_isolated; i++) {
+    if (VECTOR(*isolated)[i] < 0 || VECTOR(*isolated)[i] >= n)
+      IGRAPH_ERROR("invalid isolated vertex", IGRAPH_EINVVID);
+  }
+
+  IGRAPH_CHECK(igraph_reindex_membership(membership, 0, &nb_clusters));
+  no_of_clusters = nb_clusters;
+  for (i = 0; i < no_of_isolated; i++)
+    VECTOR(*membership)[(long int) VECTOR(*isolated)[i]] = no_of_clusters++;
+
+  IGRAPH_CHECK(igraph_inclist_init(graph, &inclist, IGRAPH_ALL));
+  IGRAPH_FINALLY(igraph_inclist_destroy, &inclist);
+  IGRAPH_VECTOR_INIT_FINALLY(&strength, n);
+  IGRAPH_VECTOR_INIT_FINALLY(&total, no_of_clusters);
+  IGRAPH_VECTOR_INIT_FINALLY(&neighbor_weight, no_of_clusters);
+  IGRAPH_CHECK(igraph_vector_long_init(&queue, n));
+  IGRAPH_FINALLY(igraph_vector_long_destroy, &queue);
+  IGRAPH_CHECK(igraph_vector_long_init(&touched, no_of_clusters));
+  IGRAPH_FINALLY(igraph_vector_long_destroy, &touched);
+  IGRAPH_CHECK(igraph_vector_char_init(&in_queue, n));
+  IGRAPH_FINALLY(igraph_vector_char_destroy, &in_queue);
+  IGRAPH_CHECK(igraph_vector_char_init(&seen, no_of_clusters));
+  IGRAPH_FINALLY(igraph_vector_char_destroy, &seen);
+
+  /* Loops are listed twice in the incidence lists, so they count twice in
+   * the strengths as well */
+  for (v = 0; v < n; v++) {
+    incs = igraph_inclist_get(&inclist, v);
+    for (j = 0; j < igraph_vector_int_size(incs); j++)
+      VECTOR(strength)[v] += weights ? VECTOR(*weights)[(long int) VECTOR(*incs)[j]] : 1;
+    VECTOR(total)[(long int) VECTOR(*membership)[v]] += VECTOR(strength)[v];
+    m2 += VECTOR(strength)[v];
+  }
+
+  /* The queue is a ring buffer; a vertex is in it at most once */
+  head = tail = queued = 0;
+#define ENQUEUE(x) { \
+    if (!VECTOR(in_queue)[x]) { \
+      VECTOR(in_queue)[x] = 1; \
+      VECTOR(queue)[tail] = (x); \
+      tail = (tail + 1) % n; \
+      queued++; \
+    } \
+  }
+  for (i = 0; i < igraph_vector_size(seeds); i++) {
+    v = (long int) VECTOR(*seeds)[i];
+    ENQUEUE(v);
+    incs = igraph_inclist_get(&inclist, v);
+    for (j = 0; j < igraph_vector_int_size(incs); j++) {
+      u = IGRAPH_OTHER(graph, VECTOR(*incs)[j], v);
+      ENQUEUE(u);
+    }
+  }
+
+  while (queued > 0 && m2 > 0) {
+    v = VECTOR(queue)[head];
+    head = (head + 1) % n;
+    queued--;
+    VECTOR(in_queue)[v] = 0;
+
+    /* Collect the weights towards the neighboring communities; the
+     * current community is always a candidate */
+    c = (long int) VECTOR(*membership)[v];
+    k = VECTOR(strength)[v];
+    VECTOR(seen)[c] = 1;
+    VECTOR(touched)[0] = c;
+    no_of_touched = 1;
+    incs = igraph_inclist_get(&inclist, v);
+    for (j = 0; j < igraph_vector_int_size(incs); j++) {
+      e = VECTOR(*incs)[j];
+      u = IGRAPH_OTHER(graph, e, v);
+      if (u == v)
+        continue;
+      i = (long int) VECTOR(*membership)[u];
+      if (!VECTOR(seen)[i]) {
+        VECTOR(seen)[i] = 1;
+        VECTOR(touched)[no_of_touched++] = i;
+      }
+      VECTOR(neighbor_weight)[i] += weights ? VECTOR(*weights)[e] : 1;
+    }
+
+    /* Take the vertex out of its community and put it back into the best
+     * one; it stays unless another community is strictly better */
+    VECTOR(total)[c] -= k;
+    best = c;
+    best_gain = VECTOR(neighbor_weight)[c] - VECTOR(total)[c] * k / m2;
+    for (i = 1; i < no_of_touched; i++) {
+      j = VECTOR(touched)[i];
+      gain = VECTOR(neighbor_weight)[j] - VECTOR(total)[j] * k / m2;
+      if (gain > best_gain + 1e-12 * fabs(best_gain)) {
+        best = j;
+        best_gain = gain;
+      }
+    }
+    VECTOR(total)[best] += k;
+    VECTOR(*membership)[v] = best;
+
+    for (i = 0; i < no_of_touched; i++) {
+      j = VECTOR(touched)[i];
+      VECTOR(seen)[j] = 0;
+      VECTOR(neighbor_weight)[j] = 0;
+    }
+
+    if (best != c) {
+      for (j = 0; j < igraph_vector_int_size(incs); j++) {
+        u = IGRAPH_OTHER(graph, VECTOR(*incs)[j], v);
+        if (VECTOR(*membership)[u] != best)
+          ENQUEUE(u);
+      }
+    }
+  }
+#undef ENQUEUE
+
+  igraph_vector_char_destroy(&seen);
+  igraph_vector_char_destroy(&in_queue);
+  igraph_vector_long_destroy(&touched);
+  igraph_vector_long_destroy(&queue);
+  igraph_vector_destroy(&neighbor_weight);
+  igraph_vector_destroy(&total);
+  igraph_vector_destroy(&strength);
+  igraph_inclist_destroy(&inclist);
+  IGRAPH_FINALLY_CLEAN(8);
+
+  /* Merge the communities by running the multilevel algorithm on the
+   * quotient graph */
+  IGRAPH_CHECK(igraph_reindex_membership(membership, 0, &nb_clusters));
+  IGRAPH_CHECK(igraph_modularity(graph, membership, &q_moved, weights));
+
+  IGRAPH_VECTOR_INIT_FINALLY(&quotient_edges, 0);
+  IGRAPH_VECTOR_INIT_FINALLY(&quotient_weights, 0);
+  IGRAPH_VECTOR_INIT_FINALLY(&quotient_membership, 0);
+  IGRAPH_CHECK(igraphmodule_community_quotient(graph, weights, membership,
+        nb_clusters, &quotient_edges, &quotient_weights));
+  IGRAPH_CHECK(igraph_create(&quotient, &quotient_edges, nb_clusters, 0));
+  IGRAPH_FINALLY(igraph_destroy, &quotient);
+  IGRAPH_CHECK(igraph_community_multilevel(&quotient, &quotient_weights,
+        &quotient_membership, 0, 0));
+  igraph_destroy(&quotient);
+  IGRAPH_FINALLY_CLEAN(1);
+
+  /* Keep the merged communities only if they are better */
+  IGRAPH_VECTOR_INIT_FINALLY(&merged, n);
+  for (v = 0; v < n; v++)
+    VECTOR(merged)[v] =
+      VECTOR(quotient_membership)[(long int) VECTOR(*membership)[v]];
+  IGRAPH_CHECK(igraph_modularity(graph, &merged, &q_merged, weights));
+  if (q_merged > q_moved) {
+    IGRAPH_CHECK(igraph_reindex_membership(&merged, 0, &nb_clusters));
+    IGRAPH_CHECK(igraph_vector_update(membership, &merged));
+    q_moved = q_merged;
+  }
+
+  igraph_vector_destroy(&merged);
+  igraph_vector_destroy(&quotient_membership);
+  igraph_vector_destroy(&quotient_weights);
+  igraph_vector_destroy(&quotient_edges);
+  IGRAPH_FINALLY_CLEAN(4);
+
+  if (modularity)
+    *modularity = q_moved;
+
+  return IGRAPH_SUCCESS;
+}
+
+/**
+ * \ingroup python_interface_community
+ * \brief Finds the union-find root of an element with path halving
+ */
+static long int igraphmodule_i_community_find(igraph_vector_long_t *parent,
+    long int v) {
+  while (VECTOR(*parent)[v] != v) {
+    VECTOR(*parent)[v] = VECTOR(*parent)[VECTOR(*parent)[v]];
+    v = VECTOR(*parent)[v];
+  }
+  return v;
+}
+
+/**
+ * \ingroup python_interface_community
+ * \brief Returns the elements that represent the two clusters of a merge
+ *
+ * \param merges the merge matrix
+ * \param n the number of elements
+ * \param k the index of the merge
+ * \param leader the element that represents each of the earlier merges
+ * \param from the element representing the first cluster is stored here
+ * \param to the element representing the second cluster is stored here
+ * \return error code
+ */
+static int igraphmodule_i_community_merge_ends(const igraph_matrix_t *merges,
+    long int n, long int k, const igraph_vector_long_t *leader,
+    long int *from, long int *to) {
+  long int i = (long int) MATRIX(*merges, k, 0);
+  long int j = (long int) MATRIX(*merges, k, 1);
+
+  if (i < 0 || j < 0 || i >= n + k || j >= n + k || i == j)
+    IGRAPH_ERROR("malformed merge matrix", IGRAPH_EINVAL);
+  *from = i < n ? i : VECTOR(*leader)[i - n];
+  *to = j < n ? j : VECTOR(*leader)[j - n];
+
+  return IGRAPH_SUCCESS;
+}
+
+/**
+ * \ingroup python_interface_community
+ * \brief Cuts a dendrogram at multiple levels in a single sweep
+ *
+ * The merges are replayed once with a union-find structure, and the
+ * membership vector is recorded whenever the number of merges replayed so
+ * far is one of the requested ones. The clusters in each membership vector
+ * are numbered in the order of their first element, like
+ * \c igraph.UniqueIdGenerator would number them.
+ *
+ * \param merges the merge matrix of the dendrogram
+ * \param n the number of elements
+ * \param steps the numbers of merges after which the membership vectors
+ *        are recorded, in any order; none of them may be larger than the
+ *        number of merges
+ * \param memberships initialized matrix, the membership vector after the
+ *        i-th number of merges in \c steps is stored in its i-th row
+ * \return error code
+ */
+int igraphmodule_community_dendrogram_cuts(const igraph_matrix_t *merges,
+    long int n, const igraph_vector_t *steps, igraph_matrix_t *memberships) {
+  long int no_of_merges = igraph_matrix_nrow(merges);
+  long int no_of_steps = igraph_vector_size(steps);
+  long int i, k, v, r, from, to, row, next;
+  igraph_vector_long_t parent, leader, label;
+  igraph_vector_t order;
+
+  if (no_of_merges > 0 && igraph_matrix_ncol(merges) != 2)
+    IGRAPH_ERROR("merge matrix must have two columns", IGRAPH_EINVAL);
+  if (no_of_merges >= n && no_of_merges > 0)
+    IGRAPH_ERROR("too many merges", IGRAPH_EINVAL);
+  for (i = 0; i < no_of_steps; i++) {
+    if (VECTOR(*steps)[i] < 0 || VECTOR(*steps)[i] > no_of_merges)
+      IGRAPH_ERROR("number of steps is out of range", IGRAPH_EINVAL);
+  }
+
+  IGRAPH_CHECK(igraph_matrix_resize(memberships, no_of_steps, n));
+  IGRAPH_CHECK(igraph_vector_long_init_seq(&parent, 0, n > 0 ? n - 1 : -1));
+  IGRAPH_FINALLY(igraph_vector_long_destroy, &parent);
+  IGRAPH_CHECK(igraph_vector_long_init(&leader, no_of_merges));
+  IGRAPH_FINALLY(igraph_vector_long_destroy, &leader);
+  IGRAPH_CHECK(igraph_vector_long_init(&label, n));
+  IGRAPH_FINALLY(igraph_vector_long_destroy, &label);
+  IGRAPH_VECTOR_INIT_FINALLY(&order, 0);
+  IGRAPH_CHECK(igraph_vector_qsort_ind((igraph_vector_t *) steps, &order, 0));
+
+  for (k = 0, i = 0; i < no_of_steps; i++) {
+    row = (long int) VECTOR(order)[i];
+    for (; k < VECTOR(*steps)[row]; k++) {
+      IGRAPH_CHECK(igraphmodule_i_community_merge_ends(merges, n, k, &leader,
+            &from, &to));
+      from = igraphmodule_i_community_find(&parent, from);
+      to = igraphmodule_i_community_find(&parent, to);
+      if (from == to)
+        IGRAPH_ERROR("malformed merge matrix", IGRAPH_EINVAL);
+      VECTOR(parent)[to] = from;
+      VECTOR(leader)[k] = from;
+    }
+
+    /* Labels are stored shifted by one so that zero means unlabeled */
+    igraph_vector_long_null(&label);
+    for (v = 0, next = 0; v < n; v++) {
+      r = igraphmodule_i_community_find(&parent, v);
+      if (VECTOR(label)[r] == 0)
+        VECTOR(label)[r] = ++next;
+      MATRIX(*memberships, row, v) = VECTOR(label)[r] - 1;
+    }
+  }
+
+  igraph_vector_destroy(&order);
+  igraph_vector_long_destroy(&label);
+  igraph_vector_long_destroy(&leader);
+  igraph_vector_long_destroy(&parent);
+  IGRAPH_FINALLY_CLEAN(4);
+
+  return IGRAPH_SUCCESS;
+}
+
+/**
+ * \ingroup python_interface_community
+ * \brief Calculates the modularity of every level of a dendrogram
+ *
+ * The modularity is updated incrementally as the merges are replayed:
+ * merging clusters \c c and \c d changes it by
+ * <code>2 w(c, d) / 2m - 2 gamma a(c) a(d) / (2m)^2</code>, where
+ * \c w(c, d) is the total weight of the edges between the clusters, \c a(c)
+ * is the total strength of the vertices in \c c, \c m is the total weight
+ * of the edges and \c gamma is the resolution parameter. \c w(c, d) is
+ * found by scanning the edges of the smaller cluster, so every vertex is
+ * scanned at most a logarithmic number of times.
+ *
+ * \param graph the graph; it must be undirected
+ * \param weights the weights of the edges; \c NULL means that all the edges
+ *        have unit weight
+ * \param merges the merge matrix of the dendrogram of the vertices
+ * \param resolution the resolution parameter; 1 gives the modularity of
+ *        \c igraph_modularity()
+ * \param modularity initialized vector, the modularity after the first
+ *        \c i merges is stored in its i-th element
+ * \return error code
+ */
+int igraphmodule_community_modularity_sweep(const igraph_t *graph,
+    const igraph_vector_t *weights, const igraph_matrix_t *merges,
+    igraph_real_t resolution, igraph_vector_t *modularity) {
+  long int n = igraph_vcount(graph), no_of_edges = igraph_ecount(graph);
+  long int no_of_merges = igraph_matrix_nrow(merges);
+  long int j, k, v, u, e, from, to, tmp;
+  igraph_vector_long_t parent, size, next, last, leader;
+  igraph_vector_t strength;
+  igraph_vector_int_t *incs;
+  igraph_inclist_t inclist;
+  igraph_real_t m2 = 0, q = 0, w, between;
+
+  if (igraph_is_directed(graph))
+    IGRAPH_ERROR("modularity is implemented for undirected graphs",
+        IGRAPH_EINVAL);
+  if (weights && igraph_vector_size(weights) != no_of_edges)
+    IGRAPH_ERROR("weight vector has wrong length", IGRAPH_EINVAL);
+  if (weights && no_of_edges > 0 && igraph_vector_min(weights) < 0)
+    IGRAPH_ERROR("negative weight in weight vector", IGRAPH_EINVAL);
+  if (no_of_merges > 0 && igraph_matrix_ncol(merges) != 2)
+    IGRAPH_ERROR("merge matrix must have two columns", IGRAPH_EINVAL);
+  if (no_of_merges >= n && no_of_merges > 0)
+    IGRAPH_ERROR("too many merges", IGRAPH_EINVAL);
+
+  IGRAPH_CHECK(igraph_vector_resize(modularity, no_of_merges + 1));
+  igraph_vector_null(modularity);
+
+  IGRAPH_CHECK(igraph_inclist_init(graph, &inclist, IGRAPH_ALL));
+  IGRAPH_FINALLY(igraph_inclist_destroy, &inclist);
+  IGRAPH_VECTOR_INIT_FINALLY(&strength, n);
+  IGRAPH_CHECK(igraph_vector_long_init_seq(&parent, 0, n > 0 ? n - 1 : -1));
+  IGRAPH_FINALLY(igraph_vector_long_destroy, &parent);
+  IGRAPH_CHECK(igraph_vector_long_init(&size, n));
+  IGRAPH_FINALLY(igraph_vector_long_destroy, &size);
+  IGRAPH_CHECK(igraph_vector_long_init(&next, n));
+  IGRAPH_FINALLY(igraph_vector_long_destroy, &next);
+  IGRAPH_CHECK(igraph_vector_long_init_seq(&last, 0, n > 0 ? n - 1 : -1));
+  IGRAPH_FINALLY(igraph_vector_long_destroy, &last);
+  IGRAPH_CHECK(igraph_vector_long_init(&leader, no_of_merges));
+  IGRAPH_FINALLY(igraph_vector_long_destroy, &leader);
+
+  /* Loops are listed twice in the incidence lists, so they count twice in
+   * the strengths and in the weight within the clusters, as in
+   * igraph_modularity() */
+  for (v = 0; v < n; v++) {
+    incs = igraph_inclist_get(&inclist, v);
+    for (j = 0; j < igraph_vector_int_size(incs); j++) {
+      e = VECTOR(*incs)[j];
+      w = weights ? VECTOR(*weights)[e] : 1;
+      VECTOR(strength)[v] += w;
+      if (IGRAPH_OTHER(graph, e, v) == v)
+        q += w;
+    }
+    m2 += VECTOR(strength)[v];
+    VECTOR(size)[v] = 1;
+    VECTOR(next)[v] = -1;
+  }
+
+  if (m2 > 0) {
+    q /= m2;
+    for (v = 0; v < n; v++)
+      q -= resolution * (VECTOR(strength)[v] / m2) * (VECTOR(strength)[v] / m2);
+    VECTOR(*modularity)[0] = q;
+  }
+
+  for (k = 0; k < no_of_merges; k++) {
+    IGRAPH_CHECK(igraphmodule_i_community_merge_ends(merges, n, k, &leader,
+          &from, &to));
+    from = igraphmodule_i_community_find(&parent, from);
+    to = igraphmodule_i_community_find(&parent, to);
+    if (from == to)
+      IGRAPH_ERROR("malformed merge matrix", IGRAPH_EINVAL);
+    if (VECTOR(size)[from] > VECTOR(size)[to]) {
+      tmp = from; from = to; to = tmp;
+    }
+
+    /* Scan the edges of the smaller cluster 'from' */
+    between = 0;
+    for (v = from; v >= 0; v = VECTOR(next)[v]) {
+      incs = igraph_inclist_get(&inclist, v);
+      for (j = 0; j < igraph_vector_int_size(incs); j++) {
+        e = VECTOR(*incs)[j];
+        u = IGRAPH_OTHER(graph, e, v);
+        if (igraphmodule_i_community_find(&parent, u) == to)
+          between += weights ? VECTOR(*weights)[e] : 1;
+      }
+    }
+
+    if (m2 > 0)
+      q += 2 * between / m2 - 2 * resolution *
+        (VECTOR(strength)[from] / m2) * (VECTOR(strength)[to] / m2);
+    VECTOR(*modularity)[k + 1] = m2 > 0 ? q : 0;
+
+    /* Append the members of 'from' to those of 'to' */
+    VECTOR(parent)[from] = to;
+    VECTOR(size)[to] += VECTOR(size)[from];
+    VECTOR(strength)[to] += VECTOR(strength)[from];
+    VECTOR(next)[VECTOR(last)[to]] = from;
+    VECTOR(last)[to] = VECTOR(last)[from];
+    VECTOR(leader)[k] = to;
+  }
+
+  igraph_vector_long_destroy(&leader);
+  igraph_vector_long_destroy(&last);
+  igraph_vector_long_destroy(&next);
+  igraph_vector_long_destroy(&size);
+  igraph_vector_long_destroy(&parent);
+  igraph_vector_destroy(&strength);
+  igraph_inclist_destroy(&inclist);
+  IGRAPH_FINALLY_CLEAN(7);
+
+  return IGRAPH_SUCCESS;
+}
+
+/**
+ * \ingroup python_interface_community
+ * \brief Returns the slot of a cluster pair in an open addressing hash table
+ *
+ * \param slots the slots of the table; each of them contains the index of
+ *        a pair or -1. The number of slots must be a power of two, and at
+ *        least one slot must be empty.
+ * \param ends the endpoints of the pairs, two elements for each pair
+ * \param a the first cluster of the pair
+ * \param b the second cluster of the pair
+ * \return the slot containing the pair, or the empty slot where it should
+ *         be inserted
+ */
+static long int igraphmodule_i_community_pair_slot(
+    const igraph_vector_long_t *slots, const igraph_vector_long_t *ends,
+    long int a, long int b) {
+  unsigned long int mask = (unsigned long int) igraph_vector_long_size(slots) - 1;
+  unsigned long int hash = (unsigned long int) a * 2654435761UL + (unsigned long int) b;
+  long int pair;
+
+  hash ^= hash >> 16;
+  hash *= 0x45d9f3bUL;
+  hash ^= hash >> 16;
+
+  while ((pair = VECTOR(*slots)[hash & mask]) >= 0) {
+    if (VECTOR(*ends)[2 * pair] == a && VECTOR(*ends)[2 * pair + 1] == b)
+      break;
+    hash++;
+  }
+
+  return (long int) (hash & mask);
+}
+
+/**
+ * \ingroup python_interface_community
+ * \brief Looks up a cluster pair in a hash table and adds it if needed
+ *
+ * The table is doubled whenever it becomes half full.
+ *
+ * \param slots the slots of the table, see
+ *        \ref igraphmodule_i_community_pair_slot()
+ * \param ends the endpoints of the pairs
+ * \param counts the number of times each pair was looked up
+ * \param a the first cluster of the pair
+ * \param b the second cluster of the pair
+ * \param pair the index of the pair is stored here
+ * \return error code
+ */
+static int igraphmodule_i_community_pair_add(igraph_vector_long_t *slots,
+    igraph_vector_long_t *ends, igraph_vector_long_t *counts,
+    long int a, long int b, long int *pair) {
+  long int slot = igraphmodule_i_community_pair_slot(slots, ends, a, b);
+  long int i, no_of_pairs;
+
+  *pair = VECTOR(*slots)[slot];
+  if (*pair >= 0) {
+    VECTOR(*counts)[*pair]++;
+    return IGRAPH_SUCCESS;
+  }
+
+  *pair = no_of_pairs = igraph_vector_long_size(counts);
+  IGRAPH_CHECK(igraph_vector_long_push_back(ends, a));
+  IGRAPH_CHECK(igraph_vector_long_push_back(ends, b));
+  IGRAPH_CHECK(igraph_vector_long_push_back(counts, 1));
+  VECTOR(*slots)[slot] = no_of_pairs++;
+
+  if (2 * no_of_pairs > igraph_vector_long_size(slots)) {
+    IGRAPH_CHECK(igraph_vector_long_resize(slots,
+          2 * igraph_vector_long_size(slots)));
+    igraph_vector_long_fill(slots, -1);
+    for (i = 0; i < no_of_pairs; i++) {
+      slot = igraphmodule_i_community_pair_slot(slots, ends,
+          VECTOR(*ends)[2 * i], VECTOR(*ends)[2 * i + 1]);
+      VECTOR(*slots)[slot] = i;
+    }
+  }
+
+  return IGRAPH_SUCCESS;
+}
+
+/**
+ * \ingroup python_interface_community
+ * \brief Compares two cluster pairs by their endpoints, see
+ *        \ref igraphmodule_community_quotient_graph()
+ */
+static int igraphmodule_i_community_pair_cmp(void *ends, const void *p1,
+    const void *p2) {
+  const long int *e = VECTOR(*(igraph_vector_long_t *) ends);
+  long int i = *(const long int *) p1, j = *(const long int *) p2;
+
+  if (e[2 * i] != e[2 * j])
+    return e[2 * i] < e[2 * j] ? -1 : 1;
+  if (e[2 * i + 1] != e[2 * j + 1])
+    return e[2 * i + 1] < e[2 * j + 1] ? -1 : 1;
+  return 0;
+}
+
+/**
+ * \ingroup python_interface_community
+ * \brief Collects the elements of each group for the attribute combination
+ *        functions of the attribute handler
+ *
+ * \param group_of the group of each element, or a negative number for the
+ *        elements that do not belong to any group
+ * \param no_of_groups the number of groups
+ * \param groups initialized pointer vector, the vectors of the elements of
+ *        the groups are stored here. Its item destructor is set, so it
+ *        should be freed with \c igraph_vector_ptr_destroy_all().
+ * \return error code
+ */
+static int igraphmodule_i_community_groups(const igraph_vector_t *group_of,
+    long int no_of_groups, igraph_vector_ptr_t *groups) {
+  long int i, g, n = igraph_vector_size(group_of);
+  igraph_vector_long_t sizes;
+  igraph_vector_t *v;
+
+  IGRAPH_CHECK(igraph_vector_long_init(&sizes, no_of_groups));
+  IGRAPH_FINALLY(igraph_vector_long_destroy, &sizes);
+  for (i = 0; i < n; i++) {
+    if (VECTOR(*group_of)[i] >= 0)
+      VECTOR(sizes)[(long int) VECTOR(*group_of)[i]]++;
+  }
+
+  IGRAPH_VECTOR_PTR_SET_ITEM_DESTRUCTOR(groups, igraph_vector_destroy);
+  IGRAPH_CHECK(igraph_vector_ptr_resize(groups, no_of_groups));
+  igraph_vector_ptr_null(groups);
+  for (g = 0; g < no_of_groups; g++) {
+    v = igraph_Calloc(1, igraph_vector_t);
+    if (v == 0)
+      IGRAPH_ERROR("cannot collect the groups", IGRAPH_ENOMEM);
+    VECTOR(*groups)[g] = v;
+    IGRAPH_CHECK(igraph_vector_init(v, VECTOR(sizes)[g]));
+    igraph_vector_clear(v);
+  }
+  for (i = 0; i < n; i++) {
+    if (VECTOR(*group_of)[i] >= 0) {
+      v = VECTOR(*groups)[(long int) VECTOR(*group_of)[i]];
+      igraph_vector_push_back(v, i);   /* space was reserved above */
+    }
+  }
+
+  igraph_vector_long_destroy(&sizes);
+  IGRAPH_FINALLY_CLEAN(1);
+
+  return IGRAPH_SUCCESS;
+}
+
+/**
+ * \ingroup python_interface_community
+ * \brief Constructs the graph of the clusters of a clustering directly
+ *
+ * The result has a vertex for every cluster. If \c simplify is true, two
+ * clusters are connected by a single edge if there is at least one edge
+ * between them in the original graph, and the edges within the clusters
+ * are dropped; this is the same graph that \c igraph_contract_vertices()
+ * and \c igraph_simplify() would give, including the order of the edges
+ * and the attributes, but the original graph is not copied. The cluster
+ * pairs are collected in a hash table, so apart from the result only
+ * memory proportional to the number of clusters and connected cluster
+ * pairs is needed, unless the edge attributes have to be combined. If
+ * \c simplify is false, every edge of the original graph is kept with its
+ * attributes.
+ *
+ * \param graph the graph
+ * \param membership the cluster index of each vertex, between zero and
+ *        \c no_of_clusters - 1
+ * \param no_of_clusters the number of clusters
+ * \param simplify whether to merge the edges between the same clusters and
+ *        drop the edges within the clusters
+ * \param vertex_comb how to combine the vertex attributes of the clusters;
+ *        \c NULL means that the vertices of the result have no attributes
+ * \param edge_comb how to combine the edge attributes of merged edges;
+ *        \c NULL means that the merged edges have no attributes. Ignored if
+ *        \c simplify is false.
+ * \param res uninitialized graph, the result is stored here
+ * \return error code
+ */
+int igraphmodule_community_quotient_graph(const igraph_t *graph,
+    const igraph_vector_t *membership, long int no_of_clusters,
+    igraph_bool_t simplify, const igraph_attribute_combination_t *vertex_comb,
+    const igraph_attribute_combination_t *edge_comb, igraph_t *res) {
+  long int no_of_edges = igraph_ecount(graph);
+  igraph_bool_t directed = igraph_is_directed(graph);
+  long int e, i, a, b, pair, no_of_pairs;
+  igraph_vector_t edges, group_of;
+  igraph_vector_long_t slots, ends, counts, order, rank;
+  igraph_vector_ptr_t groups;
+
+#define CLUSTER(v) ((long int) VECTOR(*membership)[(long int) (v)])
+
+  IGRAPH_VECTOR_INIT_FINALLY(&edges, 0);
+
+  if (!simplify) {
+    IGRAPH_CHECK(igraph_vector_resize(&edges, 2 * no_of_edges));
+    for (e = 0; e < no_of_edges; e++) {
+      VECTOR(edges)[2 * e] = CLUSTER(IGRAPH_FROM(graph, e));
+      VECTOR(edges)[2 * e + 1] = CLUSTER(IGRAPH_TO(graph, e));
+    }
+    IGRAPH_CHECK(igraph_create(res, &edges, no_of_clusters, directed));
+    IGRAPH_FINALLY(igraph_destroy, res);
+    IGRAPH_I_ATTRIBUTE_DESTROY(res);
+    IGRAPH_I_ATTRIBUTE_COPY(res, graph, /*graph=*/ 1, /*vertex=*/ 0,
+                            /*edge=*/ 1);
+  } else {
+    IGRAPH_CHECK(igraph_vector_long_init(&slots, 16));
+    IGRAPH_FINALLY(igraph_vector_long_destroy, &slots);
+    IGRAPH_CHECK(igraph_vector_long_init(&ends, 0));
+    IGRAPH_FINALLY(igraph_vector_long_destroy, &ends);
+    IGRAPH_CHECK(igraph_vector_long_init(&counts, 0));
+    IGRAPH_FINALLY(igraph_vector_long_destroy, &counts);
+    igraph_vector_long_fill(&slots, -1);
+
+    for (e = 0; e < no_of_edges; e++) {
+      a = CLUSTER(IGRAPH_FROM(graph, e));
+      b = CLUSTER(IGRAPH_TO(graph, e));
+      if (a == b)
+        continue;
+      if (!directed && a > b) {
+        i = a; a = b; b = i;
+      }
+      IGRAPH_CHECK(igraphmodule_i_community_pair_add(&slots, &ends, &counts,
+            a, b, &pair));
+    }
+
+    /* The edges of the result are sorted by their endpoints, the same way
+     * as igraph_simplify() orders them */
+    no_of_pairs = igraph_vector_long_size(&counts);
+    IGRAPH_CHECK(igraph_vector_long_init_seq(&order, 0, no_of_pairs - 1));
+    IGRAPH_FINALLY(igraph_vector_long_destroy, &order);
+    igraph_qsort_r(VECTOR(order), (size_t) no_of_pairs, sizeof(long int),
+        &ends, igraphmodule_i_community_pair_cmp);
+
+    IGRAPH_CHECK(igraph_vector_resize(&edges, 2 * no_of_pairs));
+    for (i = 0; i < no_of_pairs; i++) {
+      pair = VECTOR(order)[i];
+      VECTOR(edges)[2 * i] = VECTOR(ends)[2 * pair];
+      VECTOR(edges)[2 * i + 1] = VECTOR(ends)[2 * pair + 1];
+    }
+    IGRAPH_CHECK(igraph_create(res, &edges, no_of_clusters, directed));
+    IGRAPH_FINALLY(igraph_destroy, res);
+    IGRAPH_I_ATTRIBUTE_DESTROY(res);
+    IGRAPH_I_ATTRIBUTE_COPY(res, graph, /*graph=*/ 1, /*vertex=*/ 0,
+                            /*edge=*/ 0);
+
+    if (edge_comb && igraph_has_attribute_table()) {
+      IGRAPH_CHECK(igraph_vector_long_init(&rank, no_of_pairs));
+      IGRAPH_FINALLY(igraph_vector_long_destroy, &rank);
+      for (i = 0; i < no_of_pairs; i++)
+        VECTOR(rank)[VECTOR(order)[i]] = i;
+
+      IGRAPH_VECTOR_INIT_FINALLY(&group_of, no_of_edges);
+      for (e = 0; e < no_of_edges; e++) {
+        a = CLUSTER(IGRAPH_FROM(graph, e));
+        b = CLUSTER(IGRAPH_TO(graph, e));
+        if (a == b) {
+          VECTOR(group_of)[e] = -1;
+          continue;
+        }
+        if (!directed && a > b) {
+          i = a; a = b; b = i;
+        }
+        pair = VECTOR(slots)[igraphmodule_i_community_pair_slot(&slots,
+            &ends, a, b)];
+        VECTOR(group_of)[e] = VECTOR(rank)[pair];
+      }
+
+      IGRAPH_CHECK(igraph_vector_ptr_init(&groups, 0));
+      IGRAPH_FINALLY(igraph_vector_ptr_destroy_all, &groups);
+      IGRAPH_CHECK(igraphmodule_i_community_groups(&group_of, no_of_pairs,
+            &groups));
+      IGRAPH_CHECK(igraph_i_attribute_combine_edges(graph, res, &groups,
+            edge_comb));
+
+      igraph_vector_ptr_destroy_all(&groups);
+      igraph_vector_destroy(&group_of);
+      igraph_vector_long_destroy(&rank);
+      IGRAPH_FINALLY_CLEAN(3);
+    }
+
+    /* The temporary vectors are below res on the finally stack, so res is
+     * pushed again after removing them */
+    igraph_vector_long_destroy(&order);
+    igraph_vector_long_destroy(&counts);
+    igraph_vector_long_destroy(&ends);
+    igraph_vector_long_destroy(&slots);
+    IGRAPH_FINALLY_CLEAN(5);
+    IGRAPH_FINALLY(igraph_destroy, res);
+  }
+
+#undef CLUSTER
+
+  if (vertex_comb && igraph_has_attribute_table()) {
+    IGRAPH_CHECK(igraph_vector_ptr_init(&groups, 0));
+    IGRAPH_FINALLY(igraph_vector_ptr_destroy_all, &groups);
+    IGRAPH_CHECK(igraphmodule_i_community_groups(membership, no_of_clusters,
+          &groups));
+    IGRAPH_CHECK(igraph_i_attribute_combine_vertices(graph, res, &groups,
+          vertex_comb));
+    igraph_vector_ptr_destroy_all(&groups);
+    IGRAPH_FINALLY_CLEAN(1);
+  }
+
+  igraph_vector_destroy(&edges);
+  IGRAPH_FINALLY_CLEAN(2);
+
+  return IGRAPH_SUCCESS;
+}
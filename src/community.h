@@ -0,0 +1,52 @@
+/* -*- mode: C -*-  */
+/*
+   IGraph library.
+   Copyright (C) 2006-2012  Tamas Nepusz <ntamas@gmail.com>
+
+   This program is free software; you can redistribute it and/or modify
+   it under the terms of the GNU General Public License as published by
+   the Free Software Foundation; either version 2 of the License, or
+   (at your option) any later version.
+
+   This program is distributed in the hope that it will be useful,
+   but WITHOUT ANY WARRANTY; without even the implied warranty of
+   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+   GNU General Public License for more details.
+
+   You should have received a copy of the GNU General Public License
+   along with this program; if not, write to the Free Software
+   Foundation, Inc.,  51 Franklin Street, Fifth Floor, Boston, MA
+   02110-1301 USA
+
+*/
+
+#ifndef PYTHON_COMMUNITY_H
+#define PYTHON_COMMUNITY_H
+
+#include <igraph.h>
+
+/* Community detection helpers implemented in the Python interface */
+
+int igraphmodule_community_quotient(const igraph_t *graph,
+    const igraph_vector_t *weights, const igraph_vector_t *membership,
+    long int no_of_clusters, igraph_vector_t *edges,
+    igraph_vector_t *edge_weights);
+
+int igraphmodule_community_multilevel_update(const igraph_t *graph,
+    const igraph_vector_t *weights, igraph_vector_t *membership,
+    const igraph_vector_t *seeds, const igraph_vector_t *isolated,
+    igraph_real_t *modularity);
+
+int igraphmodule_community_dendrogram_cuts(const igraph_matrix_t *merges,
+    long int n, const igraph_vector_t *steps, igraph_matrix_t *memberships);
+
+int igraphmodule_community_modularity_sweep(const igraph_t *graph,
+    const igraph_vector_t *weights, const igraph_matrix_t *merges,
+    igraph_real_t resolution, igraph_vector_t *modularity);
+
+int igraphmodule_community_quotient_graph(const igraph_t *graph,
+    const igraph_vector_t *membership, long int no_of_clusters,
+    igraph_bool_t simplify, const igraph_attribute_combination_t *vertex_comb,
+    const igraph_attribute_combination_t *edge_comb, igraph_t *res);
+
+#endif
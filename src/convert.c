@@ -31,6 +31,7 @@
 #include "edgeseqobject.h"
 #include "edgeobject.h"
 #include "convert.h"
+#include "coordarrayobject.h"
 #include "error.h"
 #include "memory.h"
 #include "py2compat.h"
@@ -2051,6 +2052,10 @@ int igraphmodule_PyList_to_matrix_t(PyObject* o, igraph_matrix_t *m) {
   PyObject *row, *item;
   int was_warned=0;
 
+  if (PyObject_TypeCheck(o, &igraphmodule_CoordinateArrayType))
+    return igraphmodule_CoordinateArray_to_matrix_t(
+        (igraphmodule_CoordinateArrayObject*)o, m);
+
   /* calculate the matrix dimensions */
   if (!PySequence_Check(o) || PyString_Check(o)) {
     PyErr_SetString(PyExc_TypeError, "matrix expected (list of sequences)");
@@ -2844,6 +2849,14 @@ int igraphmodule_PyObject_to_drl_options_t(PyObject *obj,
 int igraphmodule_i_PyObject_pair_to_attribute_combination_record_t(
     PyObject* name, PyObject* value,
     igraph_attribute_combination_record_t *result) {
+  if (PyString_IsEqualToASCIIString(value, "count")) {
+    /* "count" is not known to the C core; it is treated as len(), which
+     * the attribute handler implements natively */
+    value = igraphmodule_get_builtin_function("len");
+    if (value == 0)
+      return 1;
+  }
+
   if (igraphmodule_PyObject_to_attribute_combination_type_t(value, &result->type))
     return 1;
 
@@ -2886,6 +2899,7 @@ int igraphmodule_i_PyObject_pair_to_attribute_combination_record_t(
  *   - \c "min"     - the minimum attribute value will be used
  *   - \c "max"     - the maximum attribute value will be used
  *   - \c "random"  - a random value will be selected
+ *   - \c "count"   - the number of merged vertices/edges will be used
  *   - \c "first"   - the first value encountered will be selected
  *   - \c "last"    - the last value encountered will be selected
  *   - \c "mean"    - the mean of the attributes will be selected
@@ -0,0 +1,1845 @@
+/* -*- mode: C -*-  */
+/*
+   IGraph library.
+   Copyright (C) 2006-2012  Tamas Nepusz <ntamas@gmail.com>
+
+   This program is free software; you can redistribute it and/or modify
+   it under the terms of the GNU General Public License as published by
+   the Free Software Foundation; either version 2 of the License, or
+   (at your option) any later version.
+
+   This program is distributed in the hope that it will be useful,
+   but WITHOUT ANY WARRANTY; without even the implied warranty of
+   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+   GNU General Public License for more details.
+
+   You should have received a copy of the GNU General Public License
+   along with this program; if not, write to the Free Software
+   Foundation, Inc.,  51 Franklin Street, Fifth Floor, Boston, MA
+   02110-1301 USA
+
+*/
+
+#include <math.h>
+#include <string.h>
+#include "common.h"
+#include "coordarrayobject.h"
+#include "error.h"
+#include "py2compat.h"
+#include "spatialindexobject.h"
+
+#ifndef Py_TPFLAGS_HAVE_NEWBUFFER
+#  define Py_TPFLAGS_HAVE_NEWBUFFER 0
+#endif
+
+#ifdef IGRAPH_PYTHON3
+#  define SLICE_OBJECT(o) (o)
+#else
+#  define SLICE_OBJECT(o) ((PySliceObject*)(o))
+#endif
+
+/**
+ * \ingroup python_interface
+ * \defgroup python_interface_coordarray Coordinate array object
+ */
+
+PyTypeObject igraphmodule_CoordinateArrayType;
+PyTypeObject igraphmodule_CoordinateRowType;
+
+static PyObject* igraphmodule_CoordinateRow_new(
+    igraphmodule_CoordinateArrayObject* array, Py_ssize_t index);
+static double* igraphmodule_CoordinateRow_i_data(igraphmodule_CoordinateRowObject* self);
+
+/**
+ * \ingroup python_interface_coordarray
+ * \brief Allocates a new coordinate array of the given type with all the
+ *        coordinates set to zero
+ */
+static igraphmodule_CoordinateArrayObject* igraphmodule_CoordinateArray_i_alloc(
+    PyTypeObject* type, Py_ssize_t n, Py_ssize_t dim) {
+  igraphmodule_CoordinateArrayObject* self;
+  Py_ssize_t capacity = n * dim;
+
+  self = (igraphmodule_CoordinateArrayObject*)type->tp_alloc(type, 0);
+  if (self == NULL)
+    return NULL;
+
+  self->data = (double*)calloc(capacity > 0 ? capacity : 1, sizeof(double));
+  if (self->data == NULL) {
+    Py_DECREF(self);
+    PyErr_NoMemory();
+    return NULL;
+  }
+
+  self->n = n;
+  self->dim = dim;
+  self->capacity = capacity;
+  self->buffer_exports = 0;
+  self->spatial_index = NULL;
+
+  RC_ALLOC("CoordinateArray", self);
+
+  return self;
+}
+
+/**
+ * \ingroup python_interface_coordarray
+ * \brief Allocates a new coordinate array with all the coordinates set to zero
+ * \param n the number of points
+ * \param dim the number of dimensions
+ * \return the allocated PyObject
+ */
+PyObject* igraphmodule_CoordinateArray_new_empty(Py_ssize_t n, Py_ssize_t dim) {
+  return (PyObject*)igraphmodule_CoordinateArray_i_alloc(
+      &igraphmodule_CoordinateArrayType, n, dim);
+}
+
+/**
+ * \ingroup python_interface_coordarray
+ * \brief Creates a coordinate array from an \c igraph_matrix_t
+ *
+ * Each row of the matrix becomes a point of the array.
+ */
+PyObject* igraphmodule_CoordinateArray_from_matrix_t(const igraph_matrix_t *m) {
+  igraphmodule_CoordinateArrayObject* self;
+  Py_ssize_t i, j, n, dim;
+  double* p;
+
+  n = igraph_matrix_nrow(m);
+  dim = igraph_matrix_ncol(m);
+  if (n == 0 && dim == 0)
+    dim = 2;
+
+  self = igraphmodule_CoordinateArray_i_alloc(&igraphmodule_CoordinateArrayType, n, dim);
+  if (self == NULL)
+    return NULL;
+
+  for (i = 0, p = self->data; i < n; i++)
+    for (j = 0; j < dim; j++, p++)
+      *p = MATRIX(*m, i, j);
+
+  return (PyObject*)self;
+}
+
+/**
+ * \ingroup python_interface_coordarray
+ * \brief Copies a coordinate array into an uninitialized \c igraph_matrix_t
+ * \return 0 if everything was OK, 1 otherwise
+ */
+int igraphmodule_CoordinateArray_to_matrix_t(igraphmodule_CoordinateArrayObject *self,
+    igraph_matrix_t *m) {
+  Py_ssize_t i, j;
+  double* p;
+
+  if (igraph_matrix_init(m, self->n, self->dim)) {
+    igraphmodule_handle_igraph_error();
+    return 1;
+  }
+
+  for (i = 0, p = self->data; i < self->n; i++)
+    for (j = 0; j < self->dim; j++, p++)
+      MATRIX(*m, i, j) = *p;
+
+  return 0;
+}
+
+/**
+ * \ingroup python_interface_coordarray
+ * \brief Reads the coordinates of a single point from a Python sequence
+ * \param point the Python sequence
+ * \param dim the number of coordinates to read
+ * \param dest where the coordinates should be written
+ * \param allow_longer whether sequences longer than \c dim are accepted;
+ *        the extra items are ignored in this case
+ * \param errmsg format string of the error message raised when the length
+ *        of the sequence is invalid. It receives \c dim as its argument.
+ * \return 0 if everything was OK, 1 otherwise
+ */
+static int igraphmodule_CoordinateArray_i_read_point(PyObject* point,
+    Py_ssize_t dim, double* dest, int allow_longer, const char* errmsg) {
+  PyObject *fast, **items;
+  igraphmodule_CoordinateRowObject *row;
+  Py_ssize_t j, n;
+  double x, *data;
+
+  if (PyObject_TypeCheck(point, &igraphmodule_CoordinateRowType)) {
+    row = (igraphmodule_CoordinateRowObject*)point;
+    n = row->array->dim;
+    if (n != dim && (!allow_longer || n < dim)) {
+      PyErr_Format(PyExc_ValueError, errmsg, dim);
+      return 1;
+    }
+    data = igraphmodule_CoordinateRow_i_data(row);
+    if (data == NULL)
+      return 1;
+    memmove(dest, data, dim * sizeof(double));
+    return 0;
+  }
+
+  fast = PySequence_Fast(point, "points must be given as sequences of coordinates");
+  if (fast == NULL)
+    return 1;
+
+  n = PySequence_Fast_GET_SIZE(fast);
+  if (n != dim && (!allow_longer || n < dim)) {
+    Py_DECREF(fast);
+    PyErr_Format(PyExc_ValueError, errmsg, dim);
+    return 1;
+  }
+
+  items = PySequence_Fast_ITEMS(fast);
+  for (j = 0; j < dim; j++) {
+    x = PyFloat_AsDouble(items[j]);
+    if (x == -1 && PyErr_Occurred()) {
+      Py_DECREF(fast);
+      return 1;
+    }
+    dest[j] = x;
+  }
+
+  Py_DECREF(fast);
+  return 0;
+}
+
+/**
+ * \ingroup python_interface_coordarray
+ * \brief Reads the coordinates of a single point from a Python sequence
+ *
+ * \param point the Python sequence or \c igraph.CoordinateRow
+ * \param dim the required length of the sequence
+ * \param dest the coordinates are stored here
+ * \return 0 if everything was OK, 1 otherwise
+ */
+int igraphmodule_CoordinateArray_read_point(PyObject* point, Py_ssize_t dim,
+    double* dest) {
+  return igraphmodule_CoordinateArray_i_read_point(point, dim, dest, 0,
+      "points must have %zd coordinates");
+}
+
+/**
+ * \ingroup python_interface_coordarray
+ * \brief Converts a Python sequence to a newly allocated array of doubles
+ * \param o the Python sequence; \c NULL or \c None yields an array of zeros
+ * \param dim the required length of the sequence
+ * \param what the name of the argument, used in error messages
+ * \return the array (to be freed by the caller) or \c NULL in case of errors
+ */
+static double* igraphmodule_CoordinateArray_i_vector(PyObject* o, Py_ssize_t dim,
+    const char* what) {
+  double* result;
+  char errmsg[128];
+
+  result = (double*)calloc(dim > 0 ? dim : 1, sizeof(double));
+  if (result == NULL) {
+    PyErr_NoMemory();
+    return NULL;
+  }
+
+  if (o == NULL || o == Py_None)
+    return result;
+
+  PyOS_snprintf(errmsg, sizeof(errmsg), "%s must have %%zd elements", what);
+  if (igraphmodule_CoordinateArray_i_read_point(o, dim, result, 0, errmsg)) {
+    free(result);
+    return NULL;
+  }
+
+  return result;
+}
+
+/**
+ * \ingroup python_interface_coordarray
+ * \brief Checks whether the number of points in the array may be changed
+ */
+static int igraphmodule_CoordinateArray_i_check_resizable(
+    igraphmodule_CoordinateArrayObject* self) {
+  if (self->buffer_exports > 0) {
+    PyErr_SetString(PyExc_BufferError, "cannot resize a coordinate array "
+        "while its buffer is exported");
+    return 1;
+  }
+  return 0;
+}
+
+/**
+ * \ingroup python_interface_coordarray
+ * \brief Drops the cached spatial index of the array; must be called
+ *        whenever the coordinates are modified
+ */
+static void igraphmodule_CoordinateArray_i_modified(
+    igraphmodule_CoordinateArrayObject* self) {
+  Py_CLEAR(self->spatial_index);
+}
+
+/**
+ * \ingroup python_interface_coordarray
+ * \brief Ensures that the array has room for at least \c n points
+ *
+ * The storage grows geometrically so appending points one by one takes
+ * amortized constant time.
+ */
+static int igraphmodule_CoordinateArray_i_reserve(
+    igraphmodule_CoordinateArrayObject* self, Py_ssize_t n) {
+  Py_ssize_t capacity = n * self->dim;
+  double* data;
+
+  if (capacity <= self->capacity)
+    return 0;
+
+  if (capacity < 2 * self->capacity)
+    capacity = 2 * self->capacity;
+
+  data = (double*)realloc(self->data, capacity * sizeof(double));
+  if (data == NULL) {
+    PyErr_NoMemory();
+    return 1;
+  }
+
+  self->data = data;
+  self->capacity = capacity;
+  return 0;
+}
+
+/**
+ * \ingroup python_interface_coordarray
+ * \brief Creates a new coordinate array from a sequence of points
+ */
+PyObject* igraphmodule_CoordinateArray_new(PyTypeObject* type, PyObject* args,
+    PyObject* kwds) {
+  static char* kwlist[] = { "coords", "dim", NULL };
+  PyObject *coords_o = Py_None, *dim_o = Py_None, *fast, **items;
+  igraphmodule_CoordinateArrayObject *self, *other;
+  Py_ssize_t i, n, dim = -1;
+
+  if (!PyArg_ParseTupleAndKeywords(args, kwds, "|OO", kwlist, &coords_o, &dim_o))
+    return NULL;
+
+  if (dim_o != Py_None) {
+    dim = PyNumber_AsSsize_t(dim_o, PyExc_OverflowError);
+    if (dim == -1 && PyErr_Occurred())
+      return NULL;
+    if (dim < 0) {
+      PyErr_SetString(PyExc_ValueError, "number of dimensions must be non-negative");
+      return NULL;
+    }
+  }
+
+  if (PyObject_TypeCheck(coords_o, &igraphmodule_CoordinateArrayType)) {
+    other = (igraphmodule_CoordinateArrayObject*)coords_o;
+    if (dim >= 0 && dim != other->dim) {
+      PyErr_Format(PyExc_ValueError, "all items in the coordinate list "
+          "must have a length of %zd", dim);
+      return NULL;
+    }
+    self = igraphmodule_CoordinateArray_i_alloc(type, other->n, other->dim);
+    if (self == NULL)
+      return NULL;
+    memcpy(self->data, other->data, other->n * other->dim * sizeof(double));
+    return (PyObject*)self;
+  }
+
+  if (coords_o == Py_None) {
+    n = 0;
+    fast = NULL;
+    items = NULL;
+  } else {
+    fast = PySequence_Fast(coords_o, "coordinates must be given as a sequence of points");
+    if (fast == NULL)
+      return NULL;
+    n = PySequence_Fast_GET_SIZE(fast);
+    items = PySequence_Fast_ITEMS(fast);
+  }
+
+  if (dim < 0) {
+    if (n > 0) {
+      dim = PySequence_Size(items[0]);
+      if (dim < 0) {
+        Py_DECREF(fast);
+        return NULL;
+      }
+    } else {
+      dim = 2;
+    }
+  }
+
+  self = igraphmodule_CoordinateArray_i_alloc(type, n, dim);
+  if (self == NULL) {
+    Py_XDECREF(fast);
+    return NULL;
+  }
+
+  for (i = 0; i < n; i++) {
+    if (igraphmodule_CoordinateArray_i_read_point(items[i], dim, self->data + i * dim,
+          0, "all items in the coordinate list must have a length of %zd")) {
+      Py_DECREF(fast);
+      Py_DECREF(self);
+      return NULL;
+    }
+  }
+
+  Py_XDECREF(fast);
+  return (PyObject*)self;
+}
+
+/**
+ * \ingroup python_interface_coordarray
+ * \brief Deallocates a coordinate array
+ */
+void igraphmodule_CoordinateArray_dealloc(igraphmodule_CoordinateArrayObject* self) {
+  free(self->data);
+  self->data = NULL;
+  Py_CLEAR(self->spatial_index);
+
+  RC_DEALLOC("CoordinateArray", self);
+
+  Py_TYPE(self)->tp_free((PyObject*)self);
+}
+
+/**
+ * \ingroup python_interface_coordarray
+ * \brief Returns the number of points in the array
+ */
+Py_ssize_t igraphmodule_CoordinateArray_sq_length(igraphmodule_CoordinateArrayObject* self) {
+  return self->n;
+}
+
+/**
+ * \ingroup python_interface_coordarray
+ * \brief Returns a live view of the point with the given index
+ */
+PyObject* igraphmodule_CoordinateArray_sq_item(igraphmodule_CoordinateArrayObject* self,
+    Py_ssize_t i) {
+  if (i < 0 || i >= self->n) {
+    PyErr_SetString(PyExc_IndexError, "coordinate array index out of range");
+    return NULL;
+  }
+  return igraphmodule_CoordinateRow_new(self, i);
+}
+
+/**
+ * \ingroup python_interface_coordarray
+ * \brief Returns a point of the array or a list of points for a slice
+ */
+PyObject* igraphmodule_CoordinateArray_mp_subscript(igraphmodule_CoordinateArrayObject* self,
+    PyObject* key) {
+  PyObject *result, *row;
+  Py_ssize_t i, start, stop, step, slicelength;
+
+  if (PySlice_Check(key)) {
+    if (PySlice_GetIndicesEx(SLICE_OBJECT(key), self->n, &start, &stop, &step,
+          &slicelength))
+      return NULL;
+    result = PyList_New(slicelength);
+    if (result == NULL)
+      return NULL;
+    for (i = 0; i < slicelength; i++, start += step) {
+      row = igraphmodule_CoordinateRow_new(self, start);
+      if (row == NULL) {
+        Py_DECREF(result);
+        return NULL;
+      }
+      PyList_SET_ITEM(result, i, row);
+    }
+    return result;
+  }
+
+  i = PyNumber_AsSsize_t(key, PyExc_IndexError);
+  if (i == -1 && PyErr_Occurred())
+    return NULL;
+  if (i < 0)
+    i += self->n;
+
+  return igraphmodule_CoordinateArray_sq_item(self, i);
+}
+
+/**
+ * \ingroup python_interface_coordarray
+ * \brief Removes the points selected by a slice from the array
+ */
+static int igraphmodule_CoordinateArray_i_delete_slice(
+    igraphmodule_CoordinateArrayObject* self, PyObject* key) {
+  Py_ssize_t i, j, start, stop, step, slicelength;
+  char* removed;
+
+  if (PySlice_GetIndicesEx(SLICE_OBJECT(key), self->n, &start, &stop, &step,
+        &slicelength))
+    return -1;
+
+  if (slicelength <= 0)
+    return 0;
+
+  if (igraphmodule_CoordinateArray_i_check_resizable(self))
+    return -1;
+
+  removed = (char*)calloc(self->n, sizeof(char));
+  if (removed == NULL) {
+    PyErr_NoMemory();
+    return -1;
+  }
+
+  igraphmodule_CoordinateArray_i_modified(self);
+  for (i = 0; i < slicelength; i++, start += step)
+    removed[start] = 1;
+
+  for (i = 0, j = 0; i < self->n; i++) {
+    if (removed[i])
+      continue;
+    if (i != j)
+      memcpy(self->data + j * self->dim, self->data + i * self->dim,
+          self->dim * sizeof(double));
+    j++;
+  }
+  self->n = j;
+
+  free(removed);
+  return 0;
+}
+
+/**
+ * \ingroup python_interface_coordarray
+ * \brief Replaces the points selected by a slice with the points of a
+ *        sequence
+ *
+ * As with lists, a simple slice may be replaced by a different number of
+ * points, while an extended slice must be replaced by the same number of
+ * points. The new points are read into a temporary buffer first, so the
+ * sequence may contain views of the points of the array itself.
+ */
+static int igraphmodule_CoordinateArray_i_assign_slice(
+    igraphmodule_CoordinateArrayObject* self, PyObject* key, PyObject* value) {
+  PyObject *fast;
+  Py_ssize_t i, k, start, stop, step, slicelength;
+  double* points;
+
+  if (PySlice_GetIndicesEx(SLICE_OBJECT(key), self->n, &start, &stop, &step,
+        &slicelength))
+    return -1;
+
+  fast = PySequence_Fast(value, "can only assign a sequence of points");
+  if (fast == NULL)
+    return -1;
+
+  k = PySequence_Fast_GET_SIZE(fast);
+  if (step != 1 && k != slicelength) {
+    Py_DECREF(fast);
+    PyErr_Format(PyExc_ValueError, "attempt to assign sequence of size %zd "
+        "to extended slice of size %zd", k, slicelength);
+    return -1;
+  }
+
+  points = igraphmodule_CoordinateArray_i_vector(NULL, k * self->dim, "");
+  if (points == NULL) {
+    Py_DECREF(fast);
+    return -1;
+  }
+  for (i = 0; i < k; i++) {
+    if (igraphmodule_CoordinateArray_i_read_point(PySequence_Fast_GET_ITEM(fast, i),
+          self->dim, points + i * self->dim, 0,
+          "assigned item must have %zd elements")) {
+      Py_DECREF(fast);
+      free(points);
+      return -1;
+    }
+  }
+  Py_DECREF(fast);
+
+  igraphmodule_CoordinateArray_i_modified(self);
+  if (step == 1) {
+    if (k != slicelength) {
+      if (igraphmodule_CoordinateArray_i_check_resizable(self) ||
+          igraphmodule_CoordinateArray_i_reserve(self, self->n - slicelength + k)) {
+        free(points);
+        return -1;
+      }
+      memmove(self->data + (start + k) * self->dim,
+          self->data + (start + slicelength) * self->dim,
+          (self->n - start - slicelength) * self->dim * sizeof(double));
+      self->n += k - slicelength;
+    }
+    memcpy(self->data + start * self->dim, points, k * self->dim * sizeof(double));
+  } else {
+    for (i = 0; i < k; i++, start += step)
+      memcpy(self->data + start * self->dim, points + i * self->dim,
+          self->dim * sizeof(double));
+  }
+
+  free(points);
+  return 0;
+}
+
+/**
+ * \ingroup python_interface_coordarray
+ * \brief Replaces or removes a point of the array or the points of a slice
+ */
+int igraphmodule_CoordinateArray_mp_assign_subscript(igraphmodule_CoordinateArrayObject* self,
+    PyObject* key, PyObject* value) {
+  Py_ssize_t i;
+
+  if (PySlice_Check(key)) {
+    if (value != NULL)
+      return igraphmodule_CoordinateArray_i_assign_slice(self, key, value);
+    return igraphmodule_CoordinateArray_i_delete_slice(self, key);
+  }
+
+  i = PyNumber_AsSsize_t(key, PyExc_IndexError);
+  if (i == -1 && PyErr_Occurred())
+    return -1;
+  if (i < 0)
+    i += self->n;
+  if (i < 0 || i >= self->n) {
+    PyErr_SetString(PyExc_IndexError, "coordinate array index out of range");
+    return -1;
+  }
+
+  if (value == NULL) {
+    if (igraphmodule_CoordinateArray_i_check_resizable(self))
+      return -1;
+    igraphmodule_CoordinateArray_i_modified(self);
+    memmove(self->data + i * self->dim, self->data + (i + 1) * self->dim,
+        (self->n - i - 1) * self->dim * sizeof(double));
+    self->n--;
+    return 0;
+  }
+
+  /* Read into a temporary buffer first so that a failed assignment does not
+   * leave a half-updated point behind */
+  {
+    double* point = igraphmodule_CoordinateArray_i_vector(NULL, self->dim, "");
+    if (point == NULL)
+      return -1;
+    if (igraphmodule_CoordinateArray_i_read_point(value, self->dim, point, 0,
+          "assigned item must have %zd elements")) {
+      free(point);
+      return -1;
+    }
+    igraphmodule_CoordinateArray_i_modified(self);
+    memcpy(self->data + i * self->dim, point, self->dim * sizeof(double));
+    free(point);
+  }
+
+  return 0;
+}
+
+/**
+ * \ingroup python_interface_coordarray
+ * \brief Returns the coordinates as a list of lists
+ */
+PyObject* igraphmodule_CoordinateArray_tolist(igraphmodule_CoordinateArrayObject* self) {
+  PyObject *result, *row, *item;
+  Py_ssize_t i, j;
+  double* p = self->data;
+
+  result = PyList_New(self->n);
+  if (result == NULL)
+    return NULL;
+
+  for (i = 0; i < self->n; i++) {
+    row = PyList_New(self->dim);
+    if (row == NULL) {
+      Py_DECREF(result);
+      return NULL;
+    }
+    PyList_SET_ITEM(result, i, row);
+    for (j = 0; j < self->dim; j++, p++) {
+      item = PyFloat_FromDouble(*p);
+      if (item == NULL) {
+        Py_DECREF(result);
+        return NULL;
+      }
+      PyList_SET_ITEM(row, j, item);
+    }
+  }
+
+  return result;
+}
+
+/**
+ * \ingroup python_interface_coordarray
+ * \brief Returns an independent copy of the array
+ *
+ * The cached spatial index is shared with the copy; it is a snapshot of the
+ * same coordinates.
+ */
+PyObject* igraphmodule_CoordinateArray_copy(igraphmodule_CoordinateArrayObject* self) {
+  igraphmodule_CoordinateArrayObject* result;
+
+  result = igraphmodule_CoordinateArray_i_alloc(Py_TYPE(self), self->n, self->dim);
+  if (result == NULL)
+    return NULL;
+
+  memcpy(result->data, self->data, self->n * self->dim * sizeof(double));
+  Py_XINCREF(self->spatial_index);
+  result->spatial_index = self->spatial_index;
+  return (PyObject*)result;
+}
+
+/**
+ * \ingroup python_interface_coordarray
+ * \brief Support for pickling
+ */
+PyObject* igraphmodule_CoordinateArray_reduce(igraphmodule_CoordinateArrayObject* self) {
+  PyObject* list;
+
+  list = igraphmodule_CoordinateArray_tolist(self);
+  if (list == NULL)
+    return NULL;
+
+  return Py_BuildValue("O(Nn)", (PyObject*)Py_TYPE(self), list, self->dim);
+}
+
+/**
+ * \ingroup python_interface_coordarray
+ * \brief Returns the spatial index of the array, building it only if the
+ *        array was modified since the last call
+ */
+PyObject* igraphmodule_CoordinateArray_spatial_index(igraphmodule_CoordinateArrayObject* self) {
+  PyObject* result;
+
+  if (self->spatial_index != NULL) {
+    Py_INCREF(self->spatial_index);
+    return self->spatial_index;
+  }
+
+  result = PyObject_CallFunctionObjArgs((PyObject*)&igraphmodule_SpatialIndexType,
+      (PyObject*)self, NULL);
+  if (result != NULL && self->buffer_exports == 0) {
+    Py_INCREF(result);
+    self->spatial_index = result;
+  }
+
+  return result;
+}
+
+/**
+ * \ingroup python_interface_coordarray
+ * \brief Appends a new point to the array
+ */
+PyObject* igraphmodule_CoordinateArray_append(igraphmodule_CoordinateArrayObject* self,
+    PyObject* point) {
+  double* dest;
+
+  if (igraphmodule_CoordinateArray_i_check_resizable(self))
+    return NULL;
+
+  if (igraphmodule_CoordinateArray_i_reserve(self, self->n + 1))
+    return NULL;
+
+  dest = self->data + self->n * self->dim;
+  if (igraphmodule_CoordinateArray_i_read_point(point, self->dim, dest, 1,
+        "appended item must have %zd elements"))
+    return NULL;
+
+  igraphmodule_CoordinateArray_i_modified(self);
+  self->n++;
+
+  Py_RETURN_NONE;
+}
+
+/**
+ * \ingroup python_interface_coordarray
+ * \brief Scales the points of the array in-place
+ */
+PyObject* igraphmodule_CoordinateArray_scale(igraphmodule_CoordinateArrayObject* self,
+    PyObject* args, PyObject* kwds) {
+  static char* kwlist[] = { "factors", "origin", NULL };
+  PyObject *factors_o, *origin_o = Py_None;
+  double *factors, *origin, *p, *end;
+  Py_ssize_t j, dim = self->dim;
+
+  if (!PyArg_ParseTupleAndKeywords(args, kwds, "O|O", kwlist, &factors_o, &origin_o))
+    return NULL;
+
+  factors = igraphmodule_CoordinateArray_i_vector(factors_o, dim,
+      "scaling factor list");
+  if (factors == NULL)
+    return NULL;
+
+  origin = igraphmodule_CoordinateArray_i_vector(origin_o, dim, "origin");
+  if (origin == NULL) {
+    free(factors);
+    return NULL;
+  }
+
+  igraphmodule_CoordinateArray_i_modified(self);
+  for (p = self->data, end = p + self->n * dim; p < end; p += dim)
+    for (j = 0; j < dim; j++)
+      p[j] = (p[j] - origin[j]) * factors[j] + origin[j];
+
+  free(factors);
+  free(origin);
+
+  Py_RETURN_NONE;
+}
+
+/**
+ * \ingroup python_interface_coordarray
+ * \brief Translates the points of the array in-place
+ */
+PyObject* igraphmodule_CoordinateArray_translate(igraphmodule_CoordinateArrayObject* self,
+    PyObject* args, PyObject* kwds) {
+  static char* kwlist[] = { "v", NULL };
+  PyObject *v_o;
+  double *v, *p, *end;
+  Py_ssize_t j, dim = self->dim;
+
+  if (!PyArg_ParseTupleAndKeywords(args, kwds, "O", kwlist, &v_o))
+    return NULL;
+
+  v = igraphmodule_CoordinateArray_i_vector(v_o, dim, "translation vector");
+  if (v == NULL)
+    return NULL;
+
+  igraphmodule_CoordinateArray_i_modified(self);
+  for (p = self->data, end = p + self->n * dim; p < end; p += dim)
+    for (j = 0; j < dim; j++)
+      p[j] += v[j];
+
+  free(v);
+
+  Py_RETURN_NONE;
+}
+
+/**
+ * \ingroup python_interface_coordarray
+ * \brief Converts a possibly negative dimension index to a valid one
+ * \return the index or -1 if it is out of range (an exception is set then)
+ */
+static Py_ssize_t igraphmodule_CoordinateArray_i_dim_index(
+    igraphmodule_CoordinateArrayObject* self, Py_ssize_t d) {
+  if (d < 0)
+    d += self->dim;
+  if (d < 0 || d >= self->dim) {
+    PyErr_SetString(PyExc_IndexError, "dimension index out of range");
+    return -1;
+  }
+  return d;
+}
+
+/**
+ * \ingroup python_interface_coordarray
+ * \brief Rotates the points of the array in-place
+ */
+PyObject* igraphmodule_CoordinateArray_rotate(igraphmodule_CoordinateArrayObject* self,
+    PyObject* args, PyObject* kwds) {
+  static char* kwlist[] = { "angle", "dim1", "dim2", "origin", NULL };
+  PyObject *origin_o = Py_None;
+  Py_ssize_t dim1 = 0, dim2 = 1, dim = self->dim;
+  double angle, cos_alpha, sin_alpha, x, y, ox, oy, *origin, *p, *end;
+
+  if (!PyArg_ParseTupleAndKeywords(args, kwds, "d|nnO", kwlist, &angle,
+        &dim1, &dim2, &origin_o))
+    return NULL;
+
+  dim1 = igraphmodule_CoordinateArray_i_dim_index(self, dim1);
+  if (dim1 < 0)
+    return NULL;
+  dim2 = igraphmodule_CoordinateArray_i_dim_index(self, dim2);
+  if (dim2 < 0)
+    return NULL;
+
+  origin = igraphmodule_CoordinateArray_i_vector(origin_o, dim, "origin");
+  if (origin == NULL)
+    return NULL;
+
+  igraphmodule_CoordinateArray_i_modified(self);
+  ox = origin[dim1]; oy = origin[dim2];
+  cos_alpha = cos(angle); sin_alpha = sin(angle);
+  for (p = self->data, end = p + self->n * dim; p < end; p += dim) {
+    x = p[dim1] - ox; y = p[dim2] - oy;
+    p[dim1] = cos_alpha * x - sin_alpha * y + ox;
+    p[dim2] = sin_alpha * x + cos_alpha * y + oy;
+  }
+
+  free(origin);
+
+  Py_RETURN_NONE;
+}
+
+/**
+ * \ingroup python_interface_coordarray
+ * \brief Mirrors the points of the array along the given dimensions in-place
+ */
+PyObject* igraphmodule_CoordinateArray_mirror(igraphmodule_CoordinateArrayObject* self,
+    PyObject* args, PyObject* kwds) {
+  static char* kwlist[] = { "dims", NULL };
+  PyObject *dims_o, *fast;
+  Py_ssize_t i, n, d, dim = self->dim;
+  char* flip;
+  double *p, *end;
+
+  if (!PyArg_ParseTupleAndKeywords(args, kwds, "O", kwlist, &dims_o))
+    return NULL;
+
+  fast = PySequence_Fast(dims_o, "dimensions must be given as a sequence");
+  if (fast == NULL)
+    return NULL;
+
+  flip = (char*)calloc(dim > 0 ? dim : 1, sizeof(char));
+  if (flip == NULL) {
+    Py_DECREF(fast);
+    PyErr_NoMemory();
+    return NULL;
+  }
+
+  /* Mirroring twice along the same dimension is an identity */
+  n = PySequence_Fast_GET_SIZE(fast);
+  for (i = 0; i < n; i++) {
+    d = PyNumber_AsSsize_t(PySequence_Fast_GET_ITEM(fast, i), PyExc_IndexError);
+    if (d == -1 && PyErr_Occurred()) {
+      Py_DECREF(fast);
+      free(flip);
+      return NULL;
+    }
+    d = igraphmodule_CoordinateArray_i_dim_index(self, d);
+    if (d < 0) {
+      Py_DECREF(fast);
+      free(flip);
+      return NULL;
+    }
+    flip[d] = !flip[d];
+  }
+  Py_DECREF(fast);
+
+  igraphmodule_CoordinateArray_i_modified(self);
+  for (d = 0; d < dim; d++) {
+    if (!flip[d])
+      continue;
+    for (p = self->data + d, end = self->data + self->n * dim; p < end; p += dim)
+      *p = -*p;
+  }
+
+  free(flip);
+
+  Py_RETURN_NONE;
+}
+
+/**
+ * \ingroup python_interface_coordarray
+ * \brief Returns the minimum and maximum coordinates along all dimensions
+ */
+PyObject* igraphmodule_CoordinateArray_boundaries(igraphmodule_CoordinateArrayObject* self,
+    PyObject* args, PyObject* kwds) {
+  static char* kwlist[] = { "border", NULL };
+  PyObject *mins_o, *maxs_o;
+  Py_ssize_t j, dim = self->dim;
+  double border = 0, *mins, *maxs, *p, *end;
+
+  if (!PyArg_ParseTupleAndKeywords(args, kwds, "|d", kwlist, &border))
+    return NULL;
+
+  if (self->n == 0) {
+    PyErr_SetString(PyExc_ValueError, "layout contains no layout items");
+    return NULL;
+  }
+
+  mins = igraphmodule_CoordinateArray_i_vector(NULL, dim, "");
+  maxs = igraphmodule_CoordinateArray_i_vector(NULL, dim, "");
+  if (mins == NULL || maxs == NULL) {
+    free(mins); free(maxs);
+    return NULL;
+  }
+
+  memcpy(mins, self->data, dim * sizeof(double));
+  memcpy(maxs, self->data, dim * sizeof(double));
+  for (p = self->data + dim, end = self->data + self->n * dim; p < end; p += dim) {
+    for (j = 0; j < dim; j++) {
+      if (p[j] < mins[j])
+        mins[j] = p[j];
+      else if (p[j] > maxs[j])
+        maxs[j] = p[j];
+    }
+  }
+
+  mins_o = PyList_New(dim);
+  maxs_o = PyList_New(dim);
+  if (mins_o == NULL || maxs_o == NULL) {
+    Py_XDECREF(mins_o); Py_XDECREF(maxs_o);
+    free(mins); free(maxs);
+    return NULL;
+  }
+
+  for (j = 0; j < dim; j++) {
+    PyList_SET_ITEM(mins_o, j, PyFloat_FromDouble(mins[j] - border));
+    PyList_SET_ITEM(maxs_o, j, PyFloat_FromDouble(maxs[j] + border));
+  }
+
+  free(mins); free(maxs);
+
+  return Py_BuildValue("NN", mins_o, maxs_o);
+}
+
+/**
+ * \ingroup python_interface_coordarray
+ * \brief Returns the centroid of the points in the array
+ */
+PyObject* igraphmodule_CoordinateArray_centroid(igraphmodule_CoordinateArrayObject* self) {
+  PyObject* result;
+  Py_ssize_t j, dim = self->dim;
+  double *sums, *p, *end;
+
+  sums = igraphmodule_CoordinateArray_i_vector(NULL, dim, "");
+  if (sums == NULL)
+    return NULL;
+
+  for (p = self->data, end = p + self->n * dim; p < end; p += dim)
+    for (j = 0; j < dim; j++)
+      sums[j] += p[j];
+
+  result = PyList_New(dim);
+  if (result == NULL) {
+    free(sums);
+    return NULL;
+  }
+
+  for (j = 0; j < dim; j++)
+    PyList_SET_ITEM(result, j, PyFloat_FromDouble(self->n > 0 ? sums[j] / self->n : 0.0));
+
+  free(sums);
+  return result;
+}
+
+/**
+ * \ingroup python_interface_coordarray
+ * \brief Maps the points of a 2D array from polar to Cartesian coordinates
+ *
+ * The X coordinate of each point is mapped to an angle, the Y coordinate
+ * is mapped to a radius, both with an affine transformation.
+ */
+PyObject* igraphmodule_CoordinateArray_to_radial(igraphmodule_CoordinateArrayObject* self,
+    PyObject* args) {
+  double x0, y0, ratio_x, ratio_y, min_angle, min_radius, alpha, radius, *p, *end;
+
+  if (!PyArg_ParseTuple(args, "dddddd", &x0, &y0, &ratio_x, &ratio_y,
+        &min_angle, &min_radius))
+    return NULL;
+
+  if (self->dim != 2) {
+    PyErr_SetString(PyExc_TypeError, "implemented only for 2D layouts");
+    return NULL;
+  }
+
+  igraphmodule_CoordinateArray_i_modified(self);
+  for (p = self->data, end = p + self->n * 2; p < end; p += 2) {
+    alpha = (p[0] - x0) * ratio_x + min_angle;
+    radius = (p[1] - y0) * ratio_y + min_radius;
+    p[0] = cos(alpha) * radius;
+    p[1] = -sin(alpha) * radius;
+  }
+
+  Py_RETURN_NONE;
+}
+
+/**
+ * \ingroup python_interface_coordarray
+ * \brief Returns the number of dimensions
+ */
+PyObject* igraphmodule_CoordinateArray_get_dim(igraphmodule_CoordinateArrayObject* self,
+    void* closure) {
+  return PyInt_FromLong((long)self->dim);
+}
+
+/**
+ * \ingroup python_interface_coordarray
+ * \brief Returns the string representation of the array
+ */
+PyObject* igraphmodule_CoordinateArray_repr(igraphmodule_CoordinateArrayObject* self) {
+  PyObject *list, *list_repr, *result;
+  char *s;
+
+  list = igraphmodule_CoordinateArray_tolist(self);
+  if (list == NULL)
+    return NULL;
+
+  list_repr = PyObject_Repr(list);
+  Py_DECREF(list);
+  if (list_repr == NULL)
+    return NULL;
+
+  s = PyString_CopyAsString(list_repr);
+  Py_DECREF(list_repr);
+  if (s == NULL)
+    return NULL;
+
+  result = PyString_FromFormat("CoordinateArray(%s, dim=%ld)", s, (long)self->dim);
+  free(s);
+  return result;
+}
+
+/**
+ * \ingroup python_interface_coordarray
+ * \brief Exports the coordinates as a writable n x dim buffer of doubles
+ *
+ * The exported buffer refers to the storage of the array directly, so the
+ * number of points cannot change while a buffer is exported.
+ */
+int igraphmodule_CoordinateArray_getbuffer(igraphmodule_CoordinateArrayObject* self,
+    Py_buffer* view, int flags) {
+  /* The buffer is writable, so the cached spatial index may go stale */
+  igraphmodule_CoordinateArray_i_modified(self);
+  self->buffer_shape[0] = self->n;
+  self->buffer_shape[1] = self->dim;
+  self->buffer_strides[0] = self->dim * sizeof(double);
+  self->buffer_strides[1] = sizeof(double);
+  self->buffer_exports++;
+
+  view->buf = self->data;
+  view->obj = (PyObject*)self;
+  Py_INCREF(self);
+  view->len = self->n * self->dim * sizeof(double);
+  view->itemsize = sizeof(double);
+  view->readonly = 0;
+  view->format = (flags & PyBUF_FORMAT) ? "d" : NULL;
+  view->ndim = (flags & PyBUF_ND) ? 2 : 1;
+  view->shape = (flags & PyBUF_ND) ? self->buffer_shape : NULL;
+  view->strides = ((flags & PyBUF_STRIDES) == PyBUF_STRIDES) ? self->buffer_strides : NULL;
+  view->suboffsets = NULL;
+  view->internal = NULL;
+
+  return 0;
+}
+
+/**
+ * \ingroup python_interface_coordarray
+ * \brief Called when an exported buffer is released
+ */
+void igraphmodule_CoordinateArray_releasebuffer(igraphmodule_CoordinateArrayObject* self,
+    Py_buffer* view) {
+  if (self->buffer_exports > 0)
+    self->buffer_exports--;
+  igraphmodule_CoordinateArray_i_modified(self);
+}
+
+/**
+ * \ingroup python_interface_coordarray
+ * Method table for the \c igraph.CoordinateArray object
+ */
+PyMethodDef igraphmodule_CoordinateArray_methods[] = {
+  {"append", (PyCFunction)igraphmodule_CoordinateArray_append,
+   METH_O,
+   "append(point)\n\n"
+   "Appends a new point to the array. Extra coordinates are ignored.\n"
+  },
+  {"boundaries", (PyCFunction)igraphmodule_CoordinateArray_boundaries,
+   METH_VARARGS | METH_KEYWORDS,
+   "boundaries(border=0)\n\n"
+   "Returns the minimum and maximum coordinates along all dimensions\n"
+   "in a tuple of two lists.\n\n"
+   "@param border: this value gets subtracted from the minimum bounds\n"
+   "  and gets added to the maximum bounds.\n"
+   "@raises ValueError: if the array contains no points\n"
+  },
+  {"centroid", (PyCFunction)igraphmodule_CoordinateArray_centroid,
+   METH_NOARGS,
+   "centroid()\n\n"
+   "Returns the arithmetic mean of the points as a list of floats.\n"
+  },
+  {"copy", (PyCFunction)igraphmodule_CoordinateArray_copy,
+   METH_NOARGS,
+   "copy()\n\n"
+   "Returns an independent copy of the array.\n"
+  },
+  {"mirror", (PyCFunction)igraphmodule_CoordinateArray_mirror,
+   METH_VARARGS | METH_KEYWORDS,
+   "mirror(dims)\n\n"
+   "Mirrors the points in-place along the given dimensions.\n\n"
+   "@param dims: the list of dimensions\n"
+  },
+  {"rotate", (PyCFunction)igraphmodule_CoordinateArray_rotate,
+   METH_VARARGS | METH_KEYWORDS,
+   "rotate(angle, dim1=0, dim2=1, origin=None)\n\n"
+   "Rotates the points in-place on the plane defined by the given two\n"
+   "dimensions.\n\n"
+   "@param angle: the angle of the rotation, specified in radians.\n"
+   "@param dim1: the first axis of the plane of the rotation.\n"
+   "@param dim2: the second axis of the plane of the rotation.\n"
+   "@param origin: the origin of the rotation. C{None} means the origin\n"
+   "  of the coordinate system.\n"
+  },
+  {"scale", (PyCFunction)igraphmodule_CoordinateArray_scale,
+   METH_VARARGS | METH_KEYWORDS,
+   "scale(factors, origin=None)\n\n"
+   "Scales the points in-place.\n\n"
+   "@param factors: the scaling coefficients, one for each dimension.\n"
+   "@param origin: the point that stays in place. C{None} means the origin\n"
+   "  of the coordinate system.\n"
+  },
+  {"spatial_index", (PyCFunction)igraphmodule_CoordinateArray_spatial_index,
+   METH_NOARGS,
+   "spatial_index()\n\n"
+   "Returns a L{SpatialIndex} of the points.\n\n"
+   "The index is cached and returned again until the array is modified;\n"
+   "copies of the array share the cached index. It is not cached while a\n"
+   "buffer of the array is exported, since the coordinates may be changed\n"
+   "through the buffer.\n"
+  },
+  {"tolist", (PyCFunction)igraphmodule_CoordinateArray_tolist,
+   METH_NOARGS,
+   "tolist()\n\n"
+   "Returns the coordinates as a list of lists.\n"
+  },
+  {"translate", (PyCFunction)igraphmodule_CoordinateArray_translate,
+   METH_VARARGS | METH_KEYWORDS,
+   "translate(v)\n\n"
+   "Translates the points in-place.\n\n"
+   "@param v: the translation vector\n"
+  },
+  {"_to_radial", (PyCFunction)igraphmodule_CoordinateArray_to_radial,
+   METH_VARARGS,
+   "Internal function, undocumented.\n\n"
+   "@see: Layout.to_radial()"
+  },
+  {"__reduce__", (PyCFunction)igraphmodule_CoordinateArray_reduce,
+   METH_NOARGS,
+   "For internal use only."
+  },
+  {NULL}
+};
+
+/**
+ * \ingroup python_interface_coordarray
+ * Getters and setters of the \c igraph.CoordinateArray object
+ */
+PyGetSetDef igraphmodule_CoordinateArray_getseters[] = {
+  {"dim", (getter)igraphmodule_CoordinateArray_get_dim, NULL,
+   "Number of dimensions", NULL},
+  {NULL}
+};
+
+/**
+ * \ingroup python_interface_coordarray
+ * This is the collection of functions necessary to implement the
+ * coordinate array as a sequence
+ */
+static PySequenceMethods igraphmodule_CoordinateArray_as_sequence = {
+  (lenfunc)igraphmodule_CoordinateArray_sq_length,
+  0,               /* sq_concat */
+  0,               /* sq_repeat */
+  (ssizeargfunc)igraphmodule_CoordinateArray_sq_item, /* sq_item */
+  0,                                          /* sq_slice */
+  0,                                          /* sq_ass_item */
+  0,                                          /* sq_ass_slice */
+  0,                                          /* sq_contains */
+  0,                                          /* sq_inplace_concat */
+  0,                                          /* sq_inplace_repeat */
+};
+
+/**
+ * \ingroup python_interface_coordarray
+ * This is the collection of functions necessary to support indexing the
+ * coordinate array with slices and negative indices
+ */
+static PyMappingMethods igraphmodule_CoordinateArray_as_mapping = {
+  (lenfunc)igraphmodule_CoordinateArray_sq_length,
+  (binaryfunc)igraphmodule_CoordinateArray_mp_subscript,
+  (objobjargproc)igraphmodule_CoordinateArray_mp_assign_subscript
+};
+
+/**
+ * \ingroup python_interface_coordarray
+ * Buffer protocol of the coordinate array
+ */
+static PyBufferProcs igraphmodule_CoordinateArray_as_buffer = {
+#ifndef IGRAPH_PYTHON3
+  0, 0, 0, 0,      /* old-style buffer protocol of Python 2.x */
+#endif
+  (getbufferproc)igraphmodule_CoordinateArray_getbuffer,
+  (releasebufferproc)igraphmodule_CoordinateArray_releasebuffer
+};
+
+/** \ingroup python_interface_coordarray
+ * Python type object referencing the methods Python calls when it performs
+ * various operations on a coordinate array
+ */
+PyTypeObject igraphmodule_CoordinateArrayType =
+{
+  PyVarObject_HEAD_INIT(0, 0)
+  "igraph.CoordinateArray",                 // tp_name
+  sizeof(igraphmodule_CoordinateArrayObject), // tp_basicsize
+  0,                                        // tp_itemsize
+  (destructor)igraphmodule_CoordinateArray_dealloc, // tp_dealloc
+  0,                                        // tp_print
+  0,                                        // tp_getattr
+  0,                                        // tp_setattr
+  0,                                        /* tp_compare (2.x) / tp_reserved (3.x) */
+  (reprfunc)igraphmodule_CoordinateArray_repr, // tp_repr
+  0,                                        // tp_as_number
+  &igraphmodule_CoordinateArray_as_sequence, // tp_as_sequence
+  &igraphmodule_CoordinateArray_as_mapping, // tp_as_mapping
+  0,                                        // tp_hash
+  0,                                        // tp_call
+  0,                                        // tp_str
+  0,                                        // tp_getattro
+  0,                                        // tp_setattro
+  &igraphmodule_CoordinateArray_as_buffer,  // tp_as_buffer
+  Py_TPFLAGS_DEFAULT | Py_TPFLAGS_HAVE_NEWBUFFER, // tp_flags
+  "CoordinateArray(coords=None, dim=None)\n\n"
+  "Contiguous array of points in a space of fixed dimension.\n\n"
+  "The coordinates are stored as doubles in row-major order, and the\n"
+  "array supports the buffer protocol; the exported buffer has a shape\n"
+  "of (number of points, number of dimensions) and is writable. The\n"
+  "number of points cannot change while a buffer is exported.\n\n"
+  "Indexing the array with an integer returns a live view of a single\n"
+  "point; changing the view changes the array and vice versa.\n\n"
+  "@param coords: the coordinates of the points as a sequence of\n"
+  "  sequences.\n"
+  "@param dim: the number of dimensions. If C{None}, it is determined\n"
+  "  from the length of the first point or is 2 if there are no points.\n", // tp_doc
+  0,                                        /* tp_traverse */
+  0,                                        /* tp_clear */
+  0,                                        /* tp_richcompare */
+  0,                                        // tp_weaklistoffset
+  0,                                        /* tp_iter */
+  0,                                        /* tp_iternext */
+  igraphmodule_CoordinateArray_methods,     /* tp_methods */
+  0,                                        /* tp_members */
+  igraphmodule_CoordinateArray_getseters,   /* tp_getset */
+  0,                                        /* tp_base */
+  0,                                        /* tp_dict */
+  0,                                        /* tp_descr_get */
+  0,                                        /* tp_descr_set */
+  0,                                        /* tp_dictoffset */
+  0,                                        /* tp_init */
+  0,                                        /* tp_alloc */
+  (newfunc)igraphmodule_CoordinateArray_new, /* tp_new */
+  0,                                        /* tp_free */
+};
+
+/**********************************************************************/
+
+/**
+ * \ingroup python_interface_coordarray
+ * \brief Creates a live view of a single point of a coordinate array
+ */
+static PyObject* igraphmodule_CoordinateRow_new(
+    igraphmodule_CoordinateArrayObject* array, Py_ssize_t index) {
+  igraphmodule_CoordinateRowObject* o;
+
+  o = PyObject_New(igraphmodule_CoordinateRowObject, &igraphmodule_CoordinateRowType);
+  if (o == NULL)
+    return NULL;
+
+  Py_INCREF(array);
+  o->array = array;
+  o->index = index;
+
+  RC_ALLOC("CoordinateRow", o);
+
+  return (PyObject*)o;
+}
+
+/**
+ * \ingroup python_interface_coordarray
+ * \brief Deallocates a view of a point
+ */
+void igraphmodule_CoordinateRow_dealloc(igraphmodule_CoordinateRowObject* self) {
+  Py_DECREF(self->array);
+
+  RC_DEALLOC("CoordinateRow", self);
+
+  PyObject_Del((PyObject*)self);
+}
+
+/**
+ * \ingroup python_interface_coordarray
+ * \brief Returns the coordinates of the point in the array
+ * \return a pointer to the first coordinate or \c NULL if the point does
+ *         not exist any more
+ */
+static double* igraphmodule_CoordinateRow_i_data(igraphmodule_CoordinateRowObject* self) {
+  if (self->index >= self->array->n) {
+    PyErr_SetString(PyExc_IndexError, "the point does not exist in the "
+        "coordinate array any more");
+    return NULL;
+  }
+  return self->array->data + self->index * self->array->dim;
+}
+
+/**
+ * \ingroup python_interface_coordarray
+ * \brief Returns the number of coordinates of the point
+ */
+Py_ssize_t igraphmodule_CoordinateRow_sq_length(igraphmodule_CoordinateRowObject* self) {
+  return self->array->dim;
+}
+
+/**
+ * \ingroup python_interface_coordarray
+ * \brief Returns a single coordinate of the point
+ */
+PyObject* igraphmodule_CoordinateRow_sq_item(igraphmodule_CoordinateRowObject* self,
+    Py_ssize_t i) {
+  double* data = igraphmodule_CoordinateRow_i_data(self);
+
+  if (data == NULL)
+    return NULL;
+
+  if (i < 0 || i >= self->array->dim) {
+    PyErr_SetString(PyExc_IndexError, "coordinate index out of range");
+    return NULL;
+  }
+
+  return PyFloat_FromDouble(data[i]);
+}
+
+/**
+ * \ingroup python_interface_coordarray
+ * \brief Changes a single coordinate of the point
+ */
+int igraphmodule_CoordinateRow_sq_ass_item(igraphmodule_CoordinateRowObject* self,
+    Py_ssize_t i, PyObject* value) {
+  double* data = igraphmodule_CoordinateRow_i_data(self);
+  double x;
+
+  if (data == NULL)
+    return -1;
+
+  if (value == NULL) {
+    PyErr_SetString(PyExc_TypeError, "coordinates cannot be deleted");
+    return -1;
+  }
+
+  if (i < 0 || i >= self->array->dim) {
+    PyErr_SetString(PyExc_IndexError, "coordinate index out of range");
+    return -1;
+  }
+
+  x = PyFloat_AsDouble(value);
+  if (x == -1 && PyErr_Occurred())
+    return -1;
+
+  igraphmodule_CoordinateArray_i_modified(self->array);
+  data[i] = x;
+  return 0;
+}
+
+/**
+ * \ingroup python_interface_coordarray
+ * \brief Returns the coordinates of the point as a list
+ */
+PyObject* igraphmodule_CoordinateRow_tolist(igraphmodule_CoordinateRowObject* self) {
+  double* data = igraphmodule_CoordinateRow_i_data(self);
+  PyObject *result, *item;
+  Py_ssize_t j;
+
+  if (data == NULL)
+    return NULL;
+
+  result = PyList_New(self->array->dim);
+  if (result == NULL)
+    return NULL;
+
+  for (j = 0; j < self->array->dim; j++) {
+    item = PyFloat_FromDouble(data[j]);
+    if (item == NULL) {
+      Py_DECREF(result);
+      return NULL;
+    }
+    PyList_SET_ITEM(result, j, item);
+  }
+
+  return result;
+}
+
+/**
+ * \ingroup python_interface_coordarray
+ * \brief Returns a new list with the coordinates of a point, or a new
+ *        reference to the given object if it is not a point
+ */
+static PyObject* igraphmodule_CoordinateRow_i_as_list(PyObject* o) {
+  if (PyObject_TypeCheck(o, &igraphmodule_CoordinateRowType))
+    return igraphmodule_CoordinateRow_tolist((igraphmodule_CoordinateRowObject*)o);
+  Py_INCREF(o);
+  return o;
+}
+
+/**
+ * \ingroup python_interface_coordarray
+ * \brief Concatenates the coordinates of the point with a list
+ *
+ * The result is a new list, like the concatenation of a list with a list.
+ */
+PyObject* igraphmodule_CoordinateRow_sq_concat(igraphmodule_CoordinateRowObject* self,
+    PyObject* other) {
+  PyObject *list, *result;
+
+  list = igraphmodule_CoordinateRow_tolist(self);
+  if (list == NULL)
+    return NULL;
+
+  other = igraphmodule_CoordinateRow_i_as_list(other);
+  if (other == NULL) {
+    Py_DECREF(list);
+    return NULL;
+  }
+
+  result = PySequence_Concat(list, other);
+  Py_DECREF(list);
+  Py_DECREF(other);
+  return result;
+}
+
+/**
+ * \ingroup python_interface_coordarray
+ * \brief Repeats the coordinates of the point in a new list
+ */
+PyObject* igraphmodule_CoordinateRow_sq_repeat(igraphmodule_CoordinateRowObject* self,
+    Py_ssize_t count) {
+  PyObject *list, *result;
+
+  list = igraphmodule_CoordinateRow_tolist(self);
+  if (list == NULL)
+    return NULL;
+
+  result = PySequence_Repeat(list, count);
+  Py_DECREF(list);
+  return result;
+}
+
+/**
+ * \ingroup python_interface_coordarray
+ * \brief Adds a point and a list in any order, resulting in a new list
+ *
+ * This makes <tt>[z] + point</tt> work; list concatenation itself does not
+ * accept other types of sequences on its right hand side.
+ */
+PyObject* igraphmodule_CoordinateRow_nb_add(PyObject* left, PyObject* right) {
+  PyObject *result;
+
+  if (!(PyList_Check(left) || PyObject_TypeCheck(left, &igraphmodule_CoordinateRowType)) ||
+      !(PyList_Check(right) || PyObject_TypeCheck(right, &igraphmodule_CoordinateRowType))) {
+    Py_INCREF(Py_NotImplemented);
+    return Py_NotImplemented;
+  }
+
+  left = igraphmodule_CoordinateRow_i_as_list(left);
+  if (left == NULL)
+    return NULL;
+
+  right = igraphmodule_CoordinateRow_i_as_list(right);
+  if (right == NULL) {
+    Py_DECREF(left);
+    return NULL;
+  }
+
+  result = PySequence_Concat(left, right);
+  Py_DECREF(left);
+  Py_DECREF(right);
+  return result;
+}
+
+/**
+ * \ingroup python_interface_coordarray
+ * \brief Support for pickling; a point is pickled as a list
+ */
+PyObject* igraphmodule_CoordinateRow_reduce(igraphmodule_CoordinateRowObject* self) {
+  PyObject* list;
+
+  list = igraphmodule_CoordinateRow_tolist(self);
+  if (list == NULL)
+    return NULL;
+
+  return Py_BuildValue("O(N)", (PyObject*)&PyList_Type, list);
+}
+
+/**
+ * \ingroup python_interface_coordarray
+ * \brief Returns a coordinate of the point or a list of coordinates for a slice
+ */
+PyObject* igraphmodule_CoordinateRow_mp_subscript(igraphmodule_CoordinateRowObject* self,
+    PyObject* key) {
+  PyObject *list, *result;
+  Py_ssize_t i;
+
+  if (PySlice_Check(key)) {
+    list = igraphmodule_CoordinateRow_tolist(self);
+    if (list == NULL)
+      return NULL;
+    result = PyObject_GetItem(list, key);
+    Py_DECREF(list);
+    return result;
+  }
+
+  i = PyNumber_AsSsize_t(key, PyExc_IndexError);
+  if (i == -1 && PyErr_Occurred())
+    return NULL;
+  if (i < 0)
+    i += self->array->dim;
+
+  return igraphmodule_CoordinateRow_sq_item(self, i);
+}
+
+/**
+ * \ingroup python_interface_coordarray
+ * \brief Changes a coordinate of the point or several coordinates for a slice
+ */
+int igraphmodule_CoordinateRow_mp_assign_subscript(igraphmodule_CoordinateRowObject* self,
+    PyObject* key, PyObject* value) {
+  PyObject *fast;
+  Py_ssize_t i, start, stop, step, slicelength;
+  double *data, *values;
+
+  if (!PySlice_Check(key)) {
+    i = PyNumber_AsSsize_t(key, PyExc_IndexError);
+    if (i == -1 && PyErr_Occurred())
+      return -1;
+    if (i < 0)
+      i += self->array->dim;
+    return igraphmodule_CoordinateRow_sq_ass_item(self, i, value);
+  }
+
+  data = igraphmodule_CoordinateRow_i_data(self);
+  if (data == NULL)
+    return -1;
+
+  if (value == NULL) {
+    PyErr_SetString(PyExc_TypeError, "coordinates cannot be deleted");
+    return -1;
+  }
+
+  if (PySlice_GetIndicesEx(SLICE_OBJECT(key), self->array->dim, &start, &stop,
+        &step, &slicelength))
+    return -1;
+
+  fast = PySequence_Fast(value, "can only assign a sequence of coordinates");
+  if (fast == NULL)
+    return -1;
+
+  if (PySequence_Fast_GET_SIZE(fast) != slicelength) {
+    Py_DECREF(fast);
+    PyErr_SetString(PyExc_ValueError, "the number of coordinates of a point "
+        "cannot be changed");
+    return -1;
+  }
+
+  values = igraphmodule_CoordinateArray_i_vector(NULL, slicelength, "");
+  if (values == NULL) {
+    Py_DECREF(fast);
+    return -1;
+  }
+
+  for (i = 0; i < slicelength; i++) {
+    values[i] = PyFloat_AsDouble(PySequence_Fast_GET_ITEM(fast, i));
+    if (values[i] == -1 && PyErr_Occurred()) {
+      Py_DECREF(fast);
+      free(values);
+      return -1;
+    }
+  }
+  Py_DECREF(fast);
+
+  igraphmodule_CoordinateArray_i_modified(self->array);
+  for (i = 0; i < slicelength; i++, start += step)
+    data[start] = values[i];
+
+  free(values);
+  return 0;
+}
+
+/**
+ * \ingroup python_interface_coordarray
+ * \brief Compares the point with another sequence as if it was a list
+ */
+PyObject* igraphmodule_CoordinateRow_richcompare(igraphmodule_CoordinateRowObject* self,
+    PyObject* other, int op) {
+  PyObject *list, *result;
+
+  if (!PySequence_Check(other)) {
+    Py_INCREF(Py_NotImplemented);
+    return Py_NotImplemented;
+  }
+
+  list = igraphmodule_CoordinateRow_tolist(self);
+  if (list == NULL)
+    return NULL;
+
+  if (PyObject_TypeCheck(other, &igraphmodule_CoordinateRowType)) {
+    other = igraphmodule_CoordinateRow_tolist((igraphmodule_CoordinateRowObject*)other);
+    if (other == NULL) {
+      Py_DECREF(list);
+      return NULL;
+    }
+  } else if (!PyList_Check(other)) {
+    other = PySequence_List(other);
+    if (other == NULL) {
+      Py_DECREF(list);
+      return NULL;
+    }
+  } else {
+    Py_INCREF(other);
+  }
+
+  result = PyObject_RichCompare(list, other, op);
+  Py_DECREF(list);
+  Py_DECREF(other);
+  return result;
+}
+
+/**
+ * \ingroup python_interface_coordarray
+ * \brief Returns the string representation of the point
+ */
+PyObject* igraphmodule_CoordinateRow_repr(igraphmodule_CoordinateRowObject* self) {
+  PyObject *list, *result;
+
+  list = igraphmodule_CoordinateRow_tolist(self);
+  if (list == NULL)
+    return NULL;
+
+  result = PyObject_Repr(list);
+  Py_DECREF(list);
+  return result;
+}
+
+/**
+ * \ingroup python_interface_coordarray
+ * Method table for the \c igraph.CoordinateRow object
+ */
+PyMethodDef igraphmodule_CoordinateRow_methods[] = {
+  {"tolist", (PyCFunction)igraphmodule_CoordinateRow_tolist,
+   METH_NOARGS,
+   "tolist() -> list\n\n"
+   "Returns the coordinates of the point in a new list.\n"
+  },
+  {"__copy__", (PyCFunction)igraphmodule_CoordinateRow_tolist,
+   METH_NOARGS,
+   "For internal use only."
+  },
+  {"__reduce__", (PyCFunction)igraphmodule_CoordinateRow_reduce,
+   METH_NOARGS,
+   "For internal use only."
+  },
+  {NULL}
+};
+
+/**
+ * \ingroup python_interface_coordarray
+ * This is the collection of functions necessary to implement the
+ * point as a sequence
+ */
+static PySequenceMethods igraphmodule_CoordinateRow_as_sequence = {
+  (lenfunc)igraphmodule_CoordinateRow_sq_length,
+  (binaryfunc)igraphmodule_CoordinateRow_sq_concat, /* sq_concat */
+  (ssizeargfunc)igraphmodule_CoordinateRow_sq_repeat, /* sq_repeat */
+  (ssizeargfunc)igraphmodule_CoordinateRow_sq_item, /* sq_item */
+  0,                                          /* sq_slice */
+  (ssizeobjargproc)igraphmodule_CoordinateRow_sq_ass_item, /* sq_ass_item */
+  0,                                          /* sq_ass_slice */
+  0,                                          /* sq_contains */
+  0,                                          /* sq_inplace_concat */
+  0,                                          /* sq_inplace_repeat */
+};
+
+/**
+ * \ingroup python_interface_coordarray
+ * Numeric operators of the point; only addition is supported so that a
+ * point can be concatenated to a list from either side
+ */
+static PyNumberMethods igraphmodule_CoordinateRow_as_number = {
+  (binaryfunc)igraphmodule_CoordinateRow_nb_add, /* nb_add */
+  0,                            /*nb_subtract */
+  0,                            /*nb_multiply */
+#ifndef IGRAPH_PYTHON3
+  0,                            /*nb_divide */
+#endif
+  0,                            /*nb_remainder */
+  0,                            /*nb_divmod */
+  0,                            /*nb_power */
+  0,                            /*nb_negative */
+  0,                            /*nb_positive */
+  0,                            /*nb_absolute */
+  0,                            /*nb_nonzero (2.x) / nb_bool (3.x) */
+  0,                            /*nb_invert */
+  0,                            /*nb_lshift */
+  0,                            /*nb_rshift */
+  0,                            /*nb_and */
+  0,                            /*nb_xor */
+  0,                            /*nb_or */
+#ifndef IGRAPH_PYTHON3
+  0,                            /*nb_coerce */
+#endif
+  0,                            /*nb_int */
+  0,                            /*nb_long (2.x) / nb_reserved (3.x)*/
+  0,                            /*nb_float */
+#ifndef IGRAPH_PYTHON3
+  0,                            /*nb_oct */
+  0,                            /*nb_hex */
+#endif
+  0,                            /*nb_inplace_add */
+  0,                            /*nb_inplace_subtract */
+  0,                            /*nb_inplace_multiply */
+#ifndef IGRAPH_PYTHON3
+  0,                            /*nb_inplace_divide */
+#endif
+  0,                            /*nb_inplace_remainder */
+  0,                            /*nb_inplace_power */
+  0,                            /*nb_inplace_lshift */
+  0,                            /*nb_inplace_rshift */
+  0,                            /*nb_inplace_and */
+  0,                            /*nb_inplace_xor */
+  0,                            /*nb_inplace_or */
+
+#ifdef IGRAPH_PYTHON3
+  0,                            /*nb_floor_divide */
+  0,                            /*nb_true_divide */
+  0,                            /*nb_inplace_floor_divide */
+  0,                            /*nb_inplace_true_divide */
+  0,                            /*nb_index */
+#endif
+};
+
+/**
+ * \ingroup python_interface_coordarray
+ * This is the collection of functions necessary to support indexing the
+ * point with slices and negative indices
+ */
+static PyMappingMethods igraphmodule_CoordinateRow_as_mapping = {
+  (lenfunc)igraphmodule_CoordinateRow_sq_length,
+  (binaryfunc)igraphmodule_CoordinateRow_mp_subscript,
+  (objobjargproc)igraphmodule_CoordinateRow_mp_assign_subscript
+};
+
+/** \ingroup python_interface_coordarray
+ * Python type object referencing the methods Python calls when it performs
+ * various operations on a single point of a coordinate array
+ */
+PyTypeObject igraphmodule_CoordinateRowType =
+{
+  PyVarObject_HEAD_INIT(0, 0)
+  "igraph.CoordinateRow",                   // tp_name
+  sizeof(igraphmodule_CoordinateRowObject), // tp_basicsize
+  0,                                        // tp_itemsize
+  (destructor)igraphmodule_CoordinateRow_dealloc, // tp_dealloc
+  0,                                        // tp_print
+  0,                                        // tp_getattr
+  0,                                        // tp_setattr
+  0,                                        /* tp_compare (2.x) / tp_reserved (3.x) */
+  (reprfunc)igraphmodule_CoordinateRow_repr, // tp_repr
+  &igraphmodule_CoordinateRow_as_number,    // tp_as_number
+  &igraphmodule_CoordinateRow_as_sequence,  // tp_as_sequence
+  &igraphmodule_CoordinateRow_as_mapping,   // tp_as_mapping
+  PyObject_HashNotImplemented,              // tp_hash
+  0,                                        // tp_call
+  0,                                        // tp_str
+  0,                                        // tp_getattro
+  0,                                        // tp_setattro
+  0,                                        // tp_as_buffer
+#ifndef IGRAPH_PYTHON3
+  Py_TPFLAGS_DEFAULT | Py_TPFLAGS_CHECKTYPES, // tp_flags
+#else
+  Py_TPFLAGS_DEFAULT,                       // tp_flags
+#endif
+  "Live view of a single point of a L{CoordinateArray}.\n\n"
+  "The view behaves like a list of floats of fixed length; changing a\n"
+  "coordinate through the view changes the array. Concatenation and\n"
+  "repetition return new lists, and copying or pickling the view yields\n"
+  "a list as well. Use L{tolist()} to obtain an independent copy, e.g.\n"
+  "before passing the point to the C{json} module, which accepts real\n"
+  "lists only.", // tp_doc
+  0,                                        /* tp_traverse */
+  0,                                        /* tp_clear */
+  (richcmpfunc) igraphmodule_CoordinateRow_richcompare, /* tp_richcompare */
+  0,                                        // tp_weaklistoffset
+  0,                                        /* tp_iter */
+  0,                                        /* tp_iternext */
+  igraphmodule_CoordinateRow_methods,       /* tp_methods */
+};
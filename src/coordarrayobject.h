@@ -0,0 +1,73 @@
+/* -*- mode: C -*-  */
+/*
+   IGraph library.
+   Copyright (C) 2006-2012  Tamas Nepusz <ntamas@gmail.com>
+
+   This program is free software; you can redistribute it and/or modify
+   it under the terms of the GNU General Public License as published by
+   the Free Software Foundation; either version 2 of the License, or
+   (at your option) any later version.
+
+   This program is distributed in the hope that it will be useful,
+   but WITHOUT ANY WARRANTY; without even the implied warranty of
+   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+   GNU General Public License for more details.
+
+   You should have received a copy of the GNU General Public License
+   along with this program; if not, write to the Free Software
+   Foundation, Inc.,  51 Franklin Street, Fifth Floor, Boston, MA
+   02110-1301 USA
+
+*/
+
+
+#ifndef PYTHON_COORDARRAYOBJECT_H
+#define PYTHON_COORDARRAYOBJECT_H
+
+#include <Python.h>
+#include <igraph.h>
+
+/**
+ * \ingroup python_interface_coordarray
+ * \brief A contiguous array of points in a space of fixed dimension
+ *
+ * The coordinates are stored in row-major order as doubles, i.e. the
+ * j-th coordinate of the i-th point is at <tt>data[i*dim+j]</tt>.
+ * \c spatial_index caches the spatial index of the points until the
+ * coordinates are modified.
+ */
+typedef struct
+{
+  PyObject_HEAD
+  double* data;
+  Py_ssize_t n;
+  Py_ssize_t dim;
+  Py_ssize_t capacity;
+  Py_ssize_t buffer_shape[2];
+  Py_ssize_t buffer_strides[2];
+  Py_ssize_t buffer_exports;
+  PyObject* spatial_index;
+} igraphmodule_CoordinateArrayObject;
+
+/**
+ * \ingroup python_interface_coordarray
+ * \brief A live view of a single point of a coordinate array
+ */
+typedef struct
+{
+  PyObject_HEAD
+  igraphmodule_CoordinateArrayObject* array;
+  Py_ssize_t index;
+} igraphmodule_CoordinateRowObject;
+
+PyObject* igraphmodule_CoordinateArray_new_empty(Py_ssize_t n, Py_ssize_t dim);
+PyObject* igraphmodule_CoordinateArray_from_matrix_t(const igraph_matrix_t *m);
+int igraphmodule_CoordinateArray_to_matrix_t(igraphmodule_CoordinateArrayObject *self,
+    igraph_matrix_t *m);
+int igraphmodule_CoordinateArray_read_point(PyObject* point, Py_ssize_t dim,
+    double* dest);
+
+extern PyTypeObject igraphmodule_CoordinateArrayType;
+extern PyTypeObject igraphmodule_CoordinateRowType;
+
+#endif
@@ -379,9 +379,10 @@ int igraphmodule_Edge_set_attribute(igraphmodule_EdgeObject* self, PyObject* k,
   if (!igraphmodule_attribute_name_check(k))
     return -1;
 
-  if (v==NULL)
+  if (v==NULL) {
     // we are deleting attribute
-    return PyDict_DelItem(((PyObject**)o->g.attr)[2], k);
+    return igraphmodule_delete_attribute(&o->g, ATTRHASH_IDX_EDGE, k);
+  }
   
   result=PyDict_GetItem(((PyObject**)o->g.attr)[2], k);
   if (result) {
@@ -390,6 +391,8 @@ int igraphmodule_Edge_set_attribute(igraphmodule_EdgeObject* self, PyObject* k,
       PyErr_SetString(igraphmodule_InternalError, "Vertex attribute dict member is not a list");
       return -1;
     }
+    igraphmodule_update_attribute_indexes(&o->g, ATTRHASH_IDX_EDGE, k,
+        self->idx, PyList_GET_ITEM(result, self->idx), v);
     /* we actually don't own a reference here to v, so we must increase
      * its reference count, because PyList_SetItem will "steal" a reference!
      * It took me 1.5 hours between London and Manchester to figure it out */
@@ -23,12 +23,14 @@
 */
 
 #include "attributes.h"
+#include "attrviewobject.h"
 #include "common.h"
 #include "convert.h"
 #include "edgeseqobject.h"
 #include "edgeobject.h"
 #include "error.h"
 #include "py2compat.h"
+#include "tupleiter.h"
 #include "pyhelpers.h"
 
 #define GET_GRAPH(obj) (((igraphmodule_GraphObject*)obj->gref)->g)
@@ -97,6 +99,34 @@ igraphmodule_EdgeSeq_copy(igraphmodule_EdgeSeqObject* o) {
   return copy;
 }
 
+/**
+ * \ingroup python_interface_edgeseq
+ * \brief Creates an edge sequence of the same graph containing the given IDs
+ *
+ * The type of the new object will be the same as the type of \c o.
+ * \return the new PyObject
+ */
+igraphmodule_EdgeSeqObject*
+igraphmodule_EdgeSeq_new_from_vector(igraphmodule_EdgeSeqObject* o,
+  const igraph_vector_t* v) {
+  igraphmodule_EdgeSeqObject *result;
+
+  result=(igraphmodule_EdgeSeqObject*)PyType_GenericNew(Py_TYPE(o), 0, 0);
+  if (result == NULL) return NULL;
+
+  if (igraph_es_vector_copy(&result->es, v)) {
+    igraphmodule_handle_igraph_error();
+    Py_DECREF(result);
+    return NULL;
+  }
+
+  result->gref = o->gref;
+  if (o->gref) Py_INCREF(o->gref);
+  RC_ALLOC("EdgeSeq(from vector)", result);
+
+  return result;
+}
+
 
 /**
  * \ingroup python_interface_edgeseq
@@ -350,6 +380,73 @@ PyObject* igraphmodule_EdgeSeq_get_attribute_values_mapping(igraphmodule_EdgeSeq
   return igraphmodule_EdgeSeq_get_attribute_values(self, o);
 }
 
+/**
+ * \ingroup python_interface_edgeseq
+ * \brief Returns a read-only view of the values of a given edge attribute
+ */
+PyObject* igraphmodule_EdgeSeq_get_attribute_view(igraphmodule_EdgeSeqObject* self,
+    PyObject* attrname) {
+  igraphmodule_GraphObject *gr = self->gref;
+  igraph_vector_t ids;
+  PyObject *result;
+
+  if (!igraphmodule_attribute_name_check(attrname))
+    return NULL;
+
+  if (PyDict_GetItem(ATTR_STRUCT_DICT(&gr->g)[ATTRHASH_IDX_EDGE], attrname) == NULL) {
+    PyErr_SetString(PyExc_KeyError, "Attribute does not exist");
+    return NULL;
+  }
+
+  if (igraph_es_type(&self->es) == IGRAPH_ES_ALL)
+    return igraphmodule_AttributeView_new(gr, ATTRHASH_IDX_EDGE, attrname, 1, 0);
+
+  if (igraph_vector_init(&ids, 0)) {
+    igraphmodule_handle_igraph_error();
+    return NULL;
+  }
+  if (igraph_es_as_vector(&gr->g, self->es, &ids)) {
+    igraphmodule_handle_igraph_error();
+    igraph_vector_destroy(&ids);
+    return NULL;
+  }
+
+  result = igraphmodule_AttributeView_new(gr, ATTRHASH_IDX_EDGE, attrname, 0, &ids);
+  igraph_vector_destroy(&ids);
+
+  return result;
+}
+
+/**
+ * \ingroup python_interface_edgeseq
+ * \brief Returns an iterator yielding the IDs, endpoints and some attribute
+ * values of the edges in the sequence as tuples
+ */
+PyObject* igraphmodule_EdgeSeq_iter_tuples(igraphmodule_EdgeSeqObject* self,
+    PyObject* args) {
+  igraphmodule_GraphObject *gr = self->gref;
+  igraph_vector_t ids;
+  PyObject *result;
+
+  if (igraph_es_type(&self->es) == IGRAPH_ES_ALL)
+    return igraphmodule_TupleIter_new(gr, ATTRHASH_IDX_EDGE, args, 1, 0);
+
+  if (igraph_vector_init(&ids, 0)) {
+    igraphmodule_handle_igraph_error();
+    return NULL;
+  }
+  if (igraph_es_as_vector(&gr->g, self->es, &ids)) {
+    igraphmodule_handle_igraph_error();
+    igraph_vector_destroy(&ids);
+    return NULL;
+  }
+
+  result = igraphmodule_TupleIter_new(gr, ATTRHASH_IDX_EDGE, args, 0, &ids);
+  igraph_vector_destroy(&ids);
+
+  return result;
+}
+
 /** \ingroup python_interface_edgeseq
  * \brief Sets the list of values for a given attribute
  */
@@ -365,9 +462,11 @@ int igraphmodule_EdgeSeq_set_attribute_values_mapping(igraphmodule_EdgeSeqObject
   if (!igraphmodule_attribute_name_check(attrname))
     return -1;
 
+  igraphmodule_invalidate_attribute_indexes(&gr->g, ATTRHASH_IDX_EDGE, attrname);
+
   if (values == 0) {
     if (igraph_es_type(&self->es) == IGRAPH_ES_ALL)
-      return PyDict_DelItem(dict, attrname);
+      return igraphmodule_delete_attribute(&gr->g, ATTRHASH_IDX_EDGE, attrname);
     PyErr_SetString(PyExc_TypeError, "can't delete attribute from an edge sequence not representing the whole graph");
     return -1;
   }
@@ -789,6 +888,268 @@ PyObject* igraphmodule_EdgeSeq_select(igraphmodule_EdgeSeqObject *self, PyObject
   return (PyObject*)result;
 }
 
+/**
+ * \ingroup python_interface_edgeseq
+ * \brief Selects a subset of the edge sequence based on attribute criteria
+ *
+ * All the criteria are evaluated in a single pass over the edges; see
+ * \ref igraphmodule_filter_by_attribute_criteria for their format.
+ */
+PyObject* igraphmodule_EdgeSeq__select_by_criteria(
+  igraphmodule_EdgeSeqObject *self, PyObject *criteria) {
+  igraphmodule_EdgeSeqObject *result;
+  igraphmodule_GraphObject *gr = self->gref;
+  igraph_vector_t ids, filtered;
+
+  if (igraph_vector_init(&ids, 0)) {
+    igraphmodule_handle_igraph_error();
+    return NULL;
+  }
+  if (igraph_es_as_vector(&gr->g, self->es, &ids)) {
+    igraphmodule_handle_igraph_error();
+    igraph_vector_destroy(&ids);
+    return NULL;
+  }
+  if (igraph_vector_init(&filtered, 0)) {
+    igraphmodule_handle_igraph_error();
+    igraph_vector_destroy(&ids);
+    return NULL;
+  }
+
+  if (igraphmodule_filter_by_attribute_criteria(
+        &gr->g, ATTRHASH_IDX_EDGE, &ids,
+        igraph_es_type(&self->es) == IGRAPH_ES_ALL, criteria, &filtered)) {
+    igraph_vector_destroy(&ids);
+    igraph_vector_destroy(&filtered);
+    return NULL;
+  }
+  igraph_vector_destroy(&ids);
+
+  result = igraphmodule_EdgeSeq_new_from_vector(self, &filtered);
+  igraph_vector_destroy(&filtered);
+
+  return (PyObject*)result;
+}
+
+/**
+ * \brief Marks the vertex IDs found in a Python iterable.
+ *
+ * Items that are not valid vertex IDs are ignored as they cannot match
+ * any endpoint. If \c o is \c None, \c mask is set to null (meaning that
+ * every vertex matches).
+ *
+ * \param  o     the iterable
+ * \param  n     the number of vertices in the graph
+ * \param  mask  a newly allocated array of \c n flags is returned here
+ * \param  vids  an initialized vector; the distinct vertex IDs found in
+ *               the iterable are returned here
+ * \return 0 if everything was OK, 1 otherwise
+ */
+static int igraphmodule_i_EdgeSeq_mark_vertices(PyObject *o, long int n,
+    char **mask, igraph_vector_t *vids) {
+  PyObject *it, *item;
+  long int vid;
+  double value;
+
+  *mask = 0;
+  igraph_vector_clear(vids);
+  if (o == Py_None)
+    return 0;
+
+  it = PyObject_GetIter(o);
+  if (it == 0)
+    return 1;
+
+  *mask = (char*)calloc(n > 0 ? n : 1, sizeof(char));
+  if (*mask == 0) {
+    Py_DECREF(it);
+    PyErr_NoMemory();
+    return 1;
+  }
+
+  while ((item = PyIter_Next(it)) != 0) {
+    vid = -1;
+    if (PyInt_Check(item) || PyLong_Check(item)) {
+      vid = PyInt_AsLong(item);
+      if (vid == -1 && PyErr_Occurred())
+        PyErr_Clear();
+    } else if (PyFloat_Check(item)) {
+      value = PyFloat_AsDouble(item);
+      if (value == (long int)value)
+        vid = (long int)value;
+    }
+    Py_DECREF(item);
+
+    if (vid < 0 || vid >= n || (*mask)[vid])
+      continue;
+    (*mask)[vid] = 1;
+    if (igraph_vector_push_back(vids, vid)) {
+      igraphmodule_handle_igraph_error();
+      Py_DECREF(it);
+      return 1;
+    }
+  }
+
+  Py_DECREF(it);
+  return PyErr_Occurred() ? 1 : 0;
+}
+
+/**
+ * \ingroup python_interface_edgeseq
+ * \brief Selects the edges whose endpoints are in the given vertex sets
+ *
+ * An edge matches if its source is in the first set and its target is in
+ * the second set, or, if the match is not ordered, the other way round.
+ * \c None stands for the set of all vertices. Only the incidence lists of
+ * the smaller vertex set are scanned, and the matching edges are returned
+ * in the order they appear in the edge sequence.
+ */
+PyObject* igraphmodule_EdgeSeq__select_by_endpoints(
+  igraphmodule_EdgeSeqObject *self, PyObject *args) {
+  igraphmodule_EdgeSeqObject *result = 0;
+  igraphmodule_GraphObject *gr = self->gref;
+  PyObject *set1_o, *set2_o, *ordered_o = Py_False;
+  igraph_vector_t vids1 = IGRAPH_VECTOR_NULL, vids2 = IGRAPH_VECTOR_NULL;
+  igraph_vector_t incident = IGRAPH_VECTOR_NULL, edges = IGRAPH_VECTOR_NULL;
+  igraph_vector_t ids = IGRAPH_VECTOR_NULL, filtered = IGRAPH_VECTOR_NULL;
+  igraph_vector_t *scanned;
+  igraph_integer_t from, to;
+  igraph_bool_t ordered;
+  char *mask1 = 0, *mask2 = 0;
+  long int i, j, k, n, eid, last;
+
+  if (!PyArg_ParseTuple(args, "OO|O", &set1_o, &set2_o, &ordered_o))
+    return NULL;
+
+  ordered = PyObject_IsTrue(ordered_o);
+  n = igraph_vcount(&gr->g);
+
+  if (igraph_vector_init(&vids1, 0) || igraph_vector_init(&vids2, 0) ||
+      igraph_vector_init(&incident, 0) || igraph_vector_init(&edges, 0) ||
+      igraph_vector_init(&ids, 0) || igraph_vector_init(&filtered, 0)) {
+    igraphmodule_handle_igraph_error();
+    goto cleanup;
+  }
+
+  if (igraphmodule_i_EdgeSeq_mark_vertices(set1_o, n, &mask1, &vids1) ||
+      igraphmodule_i_EdgeSeq_mark_vertices(set2_o, n, &mask2, &vids2))
+    goto cleanup;
+
+  if (mask1 == 0 && mask2 == 0) {
+    /* No restriction on the endpoints */
+    result = (igraphmodule_EdgeSeqObject*)igraphmodule_EdgeSeq_copy(self);
+    goto cleanup;
+  }
+
+  /* Collect the candidate edges from the smaller vertex set */
+  if (mask1 == 0)
+    scanned = &vids2;
+  else if (mask2 == 0)
+    scanned = &vids1;
+  else
+    scanned = igraph_vector_size(&vids1) <= igraph_vector_size(&vids2) ? &vids1 : &vids2;
+
+  k = igraph_vector_size(scanned);
+  for (i = 0; i < k; i++) {
+    if (igraph_incident(&gr->g, &incident, (igraph_integer_t)VECTOR(*scanned)[i], IGRAPH_ALL)) {
+      igraphmodule_handle_igraph_error();
+      goto cleanup;
+    }
+    for (j = 0; j < igraph_vector_size(&incident); j++) {
+      eid = (long int)VECTOR(incident)[j];
+      igraph_edge(&gr->g, (igraph_integer_t)eid, &from, &to);
+      if (((mask1 == 0 || mask1[(long int)from]) && (mask2 == 0 || mask2[(long int)to])) ||
+          (!ordered && (mask1 == 0 || mask1[(long int)to]) && (mask2 == 0 || mask2[(long int)from]))) {
+        if (igraph_vector_push_back(&edges, eid)) {
+          igraphmodule_handle_igraph_error();
+          goto cleanup;
+        }
+      }
+    }
+  }
+
+  /* Edges may have been found from both of their endpoints */
+  igraph_vector_sort(&edges);
+  k = igraph_vector_size(&edges);
+  for (i = 0, j = 0, last = -1; i < k; i++) {
+    if (VECTOR(edges)[i] != last) {
+      last = (long int)VECTOR(edges)[i];
+      VECTOR(edges)[j++] = last;
+    }
+  }
+  igraph_vector_resize(&edges, j);   /* shrinking, cannot fail */
+
+  if (igraph_es_type(&self->es) == IGRAPH_ES_ALL) {
+    result = igraphmodule_EdgeSeq_new_from_vector(self, &edges);
+    goto cleanup;
+  }
+
+  /* Keep the order (and the duplicates) of the original edge sequence */
+  if (igraph_es_as_vector(&gr->g, self->es, &ids)) {
+    igraphmodule_handle_igraph_error();
+    goto cleanup;
+  }
+  k = igraph_vector_size(&ids);
+  for (i = 0; i < k; i++) {
+    if (igraph_vector_binsearch2(&edges, VECTOR(ids)[i]) &&
+        igraph_vector_push_back(&filtered, VECTOR(ids)[i])) {
+      igraphmodule_handle_igraph_error();
+      goto cleanup;
+    }
+  }
+  result = igraphmodule_EdgeSeq_new_from_vector(self, &filtered);
+
+cleanup:
+  free(mask1);
+  free(mask2);
+  igraph_vector_destroy(&vids1);
+  igraph_vector_destroy(&vids2);
+  igraph_vector_destroy(&incident);
+  igraph_vector_destroy(&edges);
+  igraph_vector_destroy(&ids);
+  igraph_vector_destroy(&filtered);
+
+  return (PyObject*)result;
+}
+
+/**
+ * \ingroup python_interface_edgeseq
+ * Creates an index on an edge attribute
+ */
+PyObject* igraphmodule_EdgeSeq_create_index(igraphmodule_EdgeSeqObject *self,
+    PyObject *args, PyObject *kwds) {
+  static char* kwlist[] = { "attrname", "kind", NULL };
+  PyObject *attrname, *kind = Py_None;
+
+  if (!PyArg_ParseTupleAndKeywords(args, kwds, "O|O", kwlist, &attrname, &kind))
+    return NULL;
+
+  if (igraphmodule_create_attribute_index(&self->gref->g, ATTRHASH_IDX_EDGE,
+        attrname, kind))
+    return NULL;
+
+  Py_RETURN_NONE;
+}
+
+/**
+ * \ingroup python_interface_edgeseq
+ * Drops the index on an edge attribute
+ */
+PyObject* igraphmodule_EdgeSeq_drop_index(igraphmodule_EdgeSeqObject *self,
+    PyObject *attrname) {
+  if (igraphmodule_drop_attribute_index(&self->gref->g, ATTRHASH_IDX_EDGE, attrname))
+    return NULL;
+
+  Py_RETURN_NONE;
+}
+
+/**
+ * \ingroup python_interface_edgeseq
+ * Describes the indexes on the edge attributes
+ */
+PyObject* igraphmodule_EdgeSeq_index_info(igraphmodule_EdgeSeqObject *self) {
+  return igraphmodule_describe_attribute_indexes(&self->gref->g, ATTRHASH_IDX_EDGE);
+}
 
 /**
  * \ingroup python_interface_edgeseq
@@ -800,6 +1161,39 @@ PyMethodDef igraphmodule_EdgeSeq_methods[] = {
    "attribute_names() -> list\n\n"
    "Returns the attribute name list of the graph's edges\n"
   },
+  {"create_index", (PyCFunction)igraphmodule_EdgeSeq_create_index,
+   METH_VARARGS | METH_KEYWORDS,
+   "create_index(attrname, kind=\"hash\")\n\n"
+   "Creates an index on the given edge attribute of the graph.\n\n"
+   "Indexed attributes are used automatically by L{select()} and L{find()}\n"
+   "for the C{eq} and C{in} operators, and also for C{lt}, C{le}, C{gt} and\n"
+   "C{ge} in case of sorted indexes. The index belongs to the graph, not to\n"
+   "the edge sequence, and it is kept up-to-date when edges are added\n"
+   "or the attribute of a single edge is modified. Other modifications\n"
+   "cause the index to be rebuilt the next time it is used. The index is\n"
+   "dropped when the attribute is deleted.\n\n"
+   "@param attrname: the name of the attribute\n"
+   "@param kind: C{\"hash\"} for a hash-based index (equality and membership\n"
+   "  tests only, the attribute values must be hashable) or C{\"sorted\"}\n"
+   "  for a sorted index that also supports range queries (the attribute\n"
+   "  values must be mutually comparable).\n"
+  },
+  {"drop_index", (PyCFunction)igraphmodule_EdgeSeq_drop_index,
+   METH_O,
+   "drop_index(attrname)\n\n"
+   "Drops the index on the given edge attribute.\n\n"
+   "@param attrname: the name of the attribute\n"
+  },
+  {"index_info", (PyCFunction)igraphmodule_EdgeSeq_index_info,
+   METH_NOARGS,
+   "index_info() -> dict\n\n"
+   "Returns information about the indexes on the edge attributes.\n\n"
+   "@return: a dict mapping the names of the indexed attributes to dicts\n"
+   "  with the following keys: C{kind} is the kind of the index, C{built}\n"
+   "  tells whether the index is up-to-date and C{memory} is the approximate\n"
+   "  number of bytes used by the index (not counting the attribute values,\n"
+   "  which are shared with the graph).\n"
+  },
   {"find", (PyCFunction)igraphmodule_EdgeSeq_find,
    METH_VARARGS,
    "find(condition) -> Edge\n\n"
@@ -817,6 +1211,32 @@ PyMethodDef igraphmodule_EdgeSeq_methods[] = {
    "the order of their edge IDs.\n\n"
    "This is used for optimizations in some of the edge selector routines.\n"
   },
+  {"get_attribute_view", (PyCFunction)igraphmodule_EdgeSeq_get_attribute_view,
+   METH_O,
+   "get_attribute_view(attrname) -> AttributeView\n\n"
+   "Returns a read-only view of the values of a given edge attribute for\n"
+   "all edges in the sequence.\n\n"
+   "Unlike L{get_attribute_values()}, the view does not copy the values into\n"
+   "a new list; it always reflects the current values of the attribute. Use\n"
+   "C{tolist()} on the view if you need a list.\n\n"
+   "@param attrname: the name of the attribute\n"
+  },
+  {"iter_tuples", (PyCFunction)igraphmodule_EdgeSeq_iter_tuples,
+   METH_VARARGS,
+   "iter_tuples(*attrnames) -> iterator\n\n"
+   "Iterates over the edges in the sequence, yielding a tuple for each\n"
+   "edge that contains the ID of the edge, its source and target vertices\n"
+   "and the values of the given attributes, in the order they were\n"
+   "specified.\n\n"
+   "This is considerably faster than iterating over the sequence itself as\n"
+   "no L{Edge} object has to be constructed for each edge. For instance,\n"
+   "the following snippet prints the endpoints and weights of all the edges:\n\n"
+   "  >>> for index, source, target, weight in g.es.iter_tuples(\"weight\"):\n"
+   "  ...     print index, source, target, weight\n\n"
+   "@param attrnames: the names of the attributes to include in the tuples\n"
+   "@return: an iterator yielding tuples of the form\n"
+   "  C{(index, source, target, attr1, attr2, ...)}\n"
+  },
   {"set_attribute_values", (PyCFunction)igraphmodule_EdgeSeq_set_attribute_values,
    METH_VARARGS | METH_KEYWORDS,
    "set_attribute_values(attrname, values) -> list\n"
@@ -829,6 +1249,23 @@ PyMethodDef igraphmodule_EdgeSeq_methods[] = {
    "select(...) -> VertexSeq\n\n"
    "For internal use only.\n"
   },
+  {"_select_by_endpoints", (PyCFunction)igraphmodule_EdgeSeq__select_by_endpoints,
+   METH_VARARGS,
+   "_select_by_endpoints(set1, set2, ordered=False) -> EdgeSeq\n\n"
+   "Selects the edges whose source is in set1 and whose target is in set2\n"
+   "(or the other way round if ordered is False), using the incidence lists\n"
+   "of the smaller set. None stands for the set of all vertices.\n\n"
+   "For internal use only.\n"
+  },
+  {"_select_by_criteria", (PyCFunction)igraphmodule_EdgeSeq__select_by_criteria,
+   METH_O,
+   "_select_by_criteria(criteria) -> EdgeSeq\n\n"
+   "Selects the edges satisfying all the given attribute criteria in a\n"
+   "single pass. Each criterion is an (attribute, operator, value) tuple,\n"
+   "where attribute is either an attribute name or a list of precalculated\n"
+   "values, one for each edge in the sequence.\n\n"
+   "For internal use only.\n"
+  },
   {NULL}
 };
 
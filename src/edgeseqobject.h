@@ -45,6 +45,8 @@ igraphmodule_EdgeSeqObject* igraphmodule_EdgeSeq_copy(
 int igraphmodule_EdgeSeq_init(igraphmodule_EdgeSeqObject *self,
   PyObject *args, PyObject *kwds);
 void igraphmodule_EdgeSeq_dealloc(igraphmodule_EdgeSeqObject* self);
+igraphmodule_EdgeSeqObject* igraphmodule_EdgeSeq_new_from_vector(
+  igraphmodule_EdgeSeqObject *o, const igraph_vector_t *v);
 
 int igraphmodule_EdgeSeq_sq_length(igraphmodule_EdgeSeqObject *self);
 
@@ -0,0 +1,1157 @@
+/* -*- mode: C -*-  */
+/*
+   IGraph library.
+   Copyright (C) 2006-2012  Tamas Nepusz <ntamas@gmail.com>
+
+   This program is free software; you can redistribute it and/or modify
+   it under the terms of the GNU General Public License as published by
+   the Free Software Foundation; either version 2 of the License, or
+   (at your option) any later version.
+
+   This program is distributed in the hope that it will be useful,
+   but WITHOUT ANY WARRANTY; without even the implied warranty of
+   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+   GNU General Public License for more details.
+
+   You should have received a copy of the GNU General Public License
+   along with this program; if not, write to the Free Software
+   Foundation, Inc.,  51 Franklin Street, Fifth Floor, Boston, MA
+   02110-1301 USA
+
+*/
+
+#include <math.h>
+#include <stdlib.h>
+#include <string.h>
+#include <time.h>
+#include "forcelayout.h"
+
+/**
+ * \ingroup python_interface
+ * \defgroup python_interface_forcelayout Force-directed layouts
+ *
+ * All the layouts here use an ideal edge length of 1: vertices repel each
+ * other with a force of 1/d and edges pull their endpoints together with
+ * a force of d^2 (multiplied by the weight of the edge), where d is the
+ * distance of the two vertices.
+ */
+
+#define IGRAPHMODULE_LAYOUT_MAX_LEVELS 64
+#define IGRAPHMODULE_LAYOUT_MAX_DEPTH 48
+#define IGRAPHMODULE_LAYOUT_THETA 1.2
+
+/**
+ * \ingroup python_interface_forcelayout
+ * \brief Returns the CPU time used by the process in seconds
+ */
+static double igraphmodule_i_layout_now(void) {
+  return ((double) clock()) / CLOCKS_PER_SEC;
+}
+
+/**
+ * \ingroup python_interface_forcelayout
+ * \brief Converts a time limit in seconds to a deadline
+ *
+ * \param time_limit the time limit in seconds; negative numbers mean no
+ *        time limit
+ * \return the deadline to be passed to the layout functions; negative if
+ *         there is no deadline
+ */
+double igraphmodule_layout_deadline(double time_limit) {
+  if (time_limit < 0)
+    return -1;
+  return igraphmodule_i_layout_now() + time_limit;
+}
+
+static igraph_bool_t igraphmodule_i_layout_time_is_up(double deadline) {
+  return deadline >= 0 && igraphmodule_i_layout_now() > deadline;
+}
+
+/**
+ * \ingroup python_interface_forcelayout
+ * \brief A node of the quadtree (2D) or octree (3D) used by the Barnes-Hut
+ *        approximation of the repulsive forces
+ *
+ * Nodes are stored in a single array; the 2^dim children of a node are
+ * stored next to each other starting at \c children.
+ */
+typedef struct {
+  double sum[3];       /* sum of the positions of the vertices in the node */
+  double mass;         /* number of vertices in the node */
+  double center[3];    /* center of the bounding box of the node */
+  double half;         /* half of the side length of the bounding box */
+  long int children;   /* index of the first child or -1 if this is a leaf */
+  long int body;       /* first vertex in the leaf or -1 if it is empty */
+} igraphmodule_i_layout_bhnode_t;
+
+/**
+ * \ingroup python_interface_forcelayout
+ * \brief The Barnes-Hut tree
+ *
+ * A leaf usually holds a single vertex; leaves at the maximum depth may
+ * hold several vertices that are very close to each other, in which case
+ * \c next links them into a list. \c order lists the vertices in the
+ * order of a depth-first traversal, which keeps vertices that are close to
+ * each other in the layout close to each other in the list as well.
+ */
+typedef struct {
+  igraphmodule_i_layout_bhnode_t *nodes;
+  long int no_of_nodes;
+  long int capacity;
+  long int *stack;
+  long int *next;
+  long int *order;
+} igraphmodule_i_layout_bhtree_t;
+
+static void igraphmodule_i_layout_bhtree_destroy(igraphmodule_i_layout_bhtree_t *tree) {
+  free(tree->nodes); tree->nodes = 0;
+  free(tree->stack); tree->stack = 0;
+  free(tree->next); tree->next = 0;
+  free(tree->order); tree->order = 0;
+}
+
+static int igraphmodule_i_layout_bhtree_init(igraphmodule_i_layout_bhtree_t *tree,
+    long int n) {
+  tree->no_of_nodes = 0;
+  tree->capacity = 2 * n + 16;
+  tree->nodes = (igraphmodule_i_layout_bhnode_t*) calloc(tree->capacity,
+      sizeof(igraphmodule_i_layout_bhnode_t));
+  tree->stack = (long int*) calloc(IGRAPHMODULE_LAYOUT_MAX_DEPTH * 8 + 8,
+      sizeof(long int));
+  tree->next = (long int*) calloc(n > 0 ? n : 1, sizeof(long int));
+  tree->order = (long int*) calloc(n > 0 ? n : 1, sizeof(long int));
+  if (tree->nodes == 0 || tree->stack == 0 || tree->next == 0 ||
+      tree->order == 0) {
+    igraphmodule_i_layout_bhtree_destroy(tree);
+    IGRAPH_ERROR("cannot allocate tree for layout", IGRAPH_ENOMEM);
+  }
+  return 0;
+}
+
+/* Appends 'count' empty nodes to the tree and returns the index of the
+ * first one, or -1 if the memory ran out */
+static long int igraphmodule_i_layout_bhtree_alloc(
+    igraphmodule_i_layout_bhtree_t *tree, long int count) {
+  igraphmodule_i_layout_bhnode_t *new_nodes;
+  long int i, first = tree->no_of_nodes;
+
+  if (tree->no_of_nodes + count > tree->capacity) {
+    new_nodes = (igraphmodule_i_layout_bhnode_t*) realloc(tree->nodes,
+        2 * tree->capacity * sizeof(igraphmodule_i_layout_bhnode_t));
+    if (new_nodes == 0)
+      return -1;
+    tree->nodes = new_nodes;
+    tree->capacity *= 2;
+  }
+  for (i = first; i < first + count; i++) {
+    memset(&tree->nodes[i], 0, sizeof(igraphmodule_i_layout_bhnode_t));
+    tree->nodes[i].children = -1;
+    tree->nodes[i].body = -1;
+  }
+  tree->no_of_nodes += count;
+  return first;
+}
+
+/* Returns the index of the child of 'node' that contains the point p */
+static long int igraphmodule_i_layout_bhtree_child(
+    const igraphmodule_i_layout_bhnode_t *node, const double *p, int dim) {
+  long int i = 0;
+  int d;
+  for (d = 0; d < dim; d++) {
+    if (p[d] >= node->center[d])
+      i |= 1 << d;
+  }
+  return node->children + i;
+}
+
+static int igraphmodule_i_layout_bhtree_split(
+    igraphmodule_i_layout_bhtree_t *tree, long int node, int dim) {
+  igraphmodule_i_layout_bhnode_t *parent, *child;
+  long int first, i;
+  int d;
+
+  first = igraphmodule_i_layout_bhtree_alloc(tree, 1 << dim);
+  if (first < 0) {
+    IGRAPH_ERROR("cannot allocate tree for layout", IGRAPH_ENOMEM);
+  }
+  parent = &tree->nodes[node];
+  parent->children = first;
+  for (i = 0; i < (1 << dim); i++) {
+    child = &tree->nodes[first + i];
+    child->half = parent->half / 2;
+    for (d = 0; d < dim; d++) {
+      child->center[d] = parent->center[d] +
+        ((i & (1 << d)) ? child->half : -child->half);
+    }
+  }
+  return 0;
+}
+
+/**
+ * \ingroup python_interface_forcelayout
+ * \brief Builds the Barnes-Hut tree of the vertices
+ *
+ * Vertices that are very close to each other end up in the same leaf when
+ * the tree reaches its maximum depth; such leaves hold several vertices.
+ * The depth-first order of the vertices is also calculated here.
+ *
+ * \param vids the vertices to put in the tree; \c NULL means vertices
+ *        0 to n-1
+ */
+static int igraphmodule_i_layout_bhtree_build(
+    igraphmodule_i_layout_bhtree_t *tree, const double *coords,
+    const igraph_vector_t *vids, long int n, int dim) {
+  double mins[3], maxs[3], x;
+  igraphmodule_i_layout_bhnode_t *node;
+  long int i, j, k, u, current, depth, sp;
+  int d;
+
+  tree->no_of_nodes = 0;
+  igraphmodule_i_layout_bhtree_alloc(tree, 1);
+  if (vids)
+    n = igraph_vector_size(vids);
+
+  for (d = 0; d < dim; d++)
+    mins[d] = maxs[d] = 0;
+  for (k = 0; k < n; k++) {
+    i = vids ? (long int) VECTOR(*vids)[k] : k;
+    for (d = 0; d < dim; d++) {
+      x = coords[i * dim + d];
+      if (k == 0 || x < mins[d]) mins[d] = x;
+      if (k == 0 || x > maxs[d]) maxs[d] = x;
+    }
+  }
+  node = &tree->nodes[0];
+  for (d = 0; d < dim; d++) {
+    node->center[d] = (mins[d] + maxs[d]) / 2;
+    if (maxs[d] - mins[d] > 2 * node->half)
+      node->half = (maxs[d] - mins[d]) / 2;
+  }
+  node->half = node->half * 1.001 + 1e-9;
+
+  for (k = 0; k < n; k++) {
+    const double *p;
+    i = vids ? (long int) VECTOR(*vids)[k] : k;
+    p = coords + i * dim;
+    current = 0;
+    for (depth = 0; ; depth++) {
+      node = &tree->nodes[current];
+      node->mass++;
+      for (d = 0; d < dim; d++)
+        node->sum[d] += p[d];
+
+      if (node->children >= 0) {
+        current = igraphmodule_i_layout_bhtree_child(node, p, dim);
+        continue;
+      }
+      if (node->body == -1 || depth >= IGRAPHMODULE_LAYOUT_MAX_DEPTH) {
+        tree->next[i] = node->body;
+        node->body = i;
+        break;
+      }
+
+      /* The leaf already holds a vertex; split it and move that vertex
+       * down one level before continuing with the new one */
+      u = node->body;
+      IGRAPH_CHECK(igraphmodule_i_layout_bhtree_split(tree, current, dim));
+      node = &tree->nodes[current];
+      node->body = -1;
+      j = igraphmodule_i_layout_bhtree_child(node, coords + u * dim, dim);
+      tree->nodes[j].mass = 1;
+      tree->nodes[j].body = u;
+      for (d = 0; d < dim; d++)
+        tree->nodes[j].sum[d] = coords[u * dim + d];
+      current = igraphmodule_i_layout_bhtree_child(node, p, dim);
+    }
+  }
+
+  sp = 0; k = 0;
+  tree->stack[sp++] = 0;
+  while (sp > 0) {
+    node = &tree->nodes[tree->stack[--sp]];
+    if (node->children >= 0) {
+      for (j = (1 << dim) - 1; j >= 0; j--)
+        tree->stack[sp++] = node->children + j;
+    } else {
+      for (u = node->body; u >= 0; u = tree->next[u])
+        tree->order[k++] = u;
+    }
+  }
+
+  return 0;
+}
+
+/**
+ * \ingroup python_interface_forcelayout
+ * \brief Small deterministic offset used to separate coincident vertices
+ *        and the vertices that were merged on a coarser level
+ */
+static double igraphmodule_i_layout_jitter(long int v, int d) {
+  double x = (v + 1) * 0.6180339887498949 + d * 0.4142135623730950;
+  return x - floor(x) - 0.5;
+}
+
+/**
+ * \ingroup python_interface_forcelayout
+ * \brief Adds the repulsive force exerted by a point of the given mass at
+ *        \c pu on the vertex at \c pv to \c disp
+ */
+static void igraphmodule_i_layout_repulse(const double *pv, const double *pu,
+    double mass, double *disp, int dim, long int v, long int u) {
+  double delta[3], d2 = 0;
+  int d;
+
+  for (d = 0; d < dim; d++) {
+    delta[d] = pv[d] - pu[d];
+    d2 += delta[d] * delta[d];
+  }
+  if (d2 < 1e-12) {
+    /* Coincident vertices are pushed apart in a direction that depends
+     * on their indices only, so the layout stays reproducible. The
+     * direction is different for every vertex (u < 0 means a center of
+     * mass), otherwise vertices stacked in the same leaf of the tree would
+     * be pushed together and never separate */
+    for (d = 0; d < dim; d++) {
+      disp[d] += mass * 0.02 * (igraphmodule_i_layout_jitter(v, d) -
+          (u >= 0 ? igraphmodule_i_layout_jitter(u, d) : 0));
+    }
+    return;
+  }
+  for (d = 0; d < dim; d++)
+    disp[d] += mass * delta[d] / d2;
+}
+
+/**
+ * \ingroup python_interface_forcelayout
+ * \brief Adds the repulsive forces acting on vertex \c v to \c disp using
+ *        the Barnes-Hut tree
+ *
+ * A node of the tree is treated as a single point at its center of mass if
+ * its side length divided by its distance from the vertex is less than
+ * \c theta and the vertex is outside the node. \c in_tree tells whether
+ * the vertex itself is in the tree.
+ */
+static void igraphmodule_i_layout_bhtree_repulse(
+    igraphmodule_i_layout_bhtree_t *tree, const double *coords, long int v,
+    int dim, double theta, igraph_bool_t in_tree, double *disp) {
+  const igraphmodule_i_layout_bhnode_t *node;
+  const double *pv = coords + v * dim;
+  double centroid[3], delta, d2, mass, size;
+  long int sp = 0, i;
+  igraph_bool_t inside;
+  int d;
+
+  tree->stack[sp++] = 0;
+  while (sp > 0) {
+    node = &tree->nodes[tree->stack[--sp]];
+    if (node->mass == 0 || (node->mass == 1 && node->body == v))
+      continue;
+    if (node->mass == 1 && node->body >= 0) {
+      igraphmodule_i_layout_repulse(pv, coords + node->body * dim, 1, disp,
+          dim, v, node->body);
+      continue;
+    }
+
+    inside = 1;
+    for (d = 0, d2 = 0; d < dim; d++) {
+      if (fabs(pv[d] - node->center[d]) > node->half)
+        inside = 0;
+    }
+    mass = node->mass;
+    for (d = 0; d < dim; d++)
+      centroid[d] = node->sum[d];
+    if (in_tree && inside && node->children < 0) {
+      /* Leaf with several vertices, one of which may be v itself */
+      mass -= 1;
+      for (d = 0; d < dim; d++)
+        centroid[d] -= pv[d];
+    }
+    if (mass <= 0)
+      continue;
+    for (d = 0; d < dim; d++) {
+      centroid[d] /= mass;
+      delta = pv[d] - centroid[d];
+      d2 += delta * delta;
+    }
+
+    size = 2 * node->half;
+    if (node->children < 0 || (!inside && size * size < theta * theta * d2)) {
+      igraphmodule_i_layout_repulse(pv, centroid, mass, disp, dim, v, -1);
+    } else {
+      for (i = 0; i < (1 << dim); i++)
+        tree->stack[sp++] = node->children + i;
+    }
+  }
+}
+
+/**
+ * \ingroup python_interface_forcelayout
+ * \brief Refines a layout with a few iterations of a force-directed
+ *        algorithm
+ *
+ * The repulsive forces are approximated with the Barnes-Hut algorithm, so
+ * an iteration takes O(n log n + m) time. The displacement of the vertices
+ * is limited by a temperature that decreases linearly from \p start_temp
+ * to zero.
+ *
+ * \param graph the graph
+ * \param weights edge weights multiplying the attractive forces; \c NULL
+ *        means that all the edges have unit weight
+ * \param coords the coordinates of the vertices in row-major order; they
+ *        are updated in-place
+ * \param dim the number of dimensions (2 or 3)
+ * \param niter the number of iterations
+ * \param start_temp the initial temperature
+ * \param theta the opening angle of the Barnes-Hut algorithm. Larger values
+ *        are faster but less accurate. Zero or negative numbers mean that
+ *        the forces are calculated exactly in O(n^2) time.
+ * \param fixed if not \c NULL, the vertices for which this vector is true
+ *        are not moved; they still exert forces on the other vertices
+ * \param deadline the deadline as returned by \ref
+ *        igraphmodule_layout_deadline(); the iteration stops when it is
+ *        reached
+ * \return error code
+ */
+int igraphmodule_layout_refine(const igraph_t *graph,
+    const igraph_vector_t *weights, double *coords, int dim,
+    long int niter, double start_temp, double theta,
+    const igraph_vector_bool_t *fixed, double deadline) {
+  long int n = igraph_vcount(graph), m = igraph_ecount(graph);
+  long int it, e, u, v, k, no_of_movable, no_of_edges;
+  double *disp, *pv, *pu, *dv, delta[3], dist, len, temp, factor;
+  igraphmodule_i_layout_bhtree_t tree, fixed_tree;
+  igraph_vector_t movable, still, edges;
+  igraph_bool_t use_fixed_tree = 0;
+  int d;
+
+  if (n == 0 || niter <= 0)
+    return 0;
+
+  /* With fixed vertices, only the movable vertices and the edges incident
+   * on them are visited in the iterations and the fixed vertices are put
+   * in a separate tree that is built only once */
+  IGRAPH_VECTOR_INIT_FINALLY(&movable, 0);
+  IGRAPH_VECTOR_INIT_FINALLY(&still, 0);
+  IGRAPH_VECTOR_INIT_FINALLY(&edges, 0);
+  no_of_movable = n; no_of_edges = m;
+  if (fixed) {
+    for (v = 0; v < n; v++) {
+      IGRAPH_CHECK(igraph_vector_push_back(VECTOR(*fixed)[v] ? &still : &movable, v));
+    }
+    for (e = 0; e < m; e++) {
+      if (!VECTOR(*fixed)[(long int) IGRAPH_FROM(graph, e)] ||
+          !VECTOR(*fixed)[(long int) IGRAPH_TO(graph, e)]) {
+        IGRAPH_CHECK(igraph_vector_push_back(&edges, e));
+      }
+    }
+    no_of_movable = igraph_vector_size(&movable);
+    no_of_edges = igraph_vector_size(&edges);
+  }
+
+  disp = (double*) calloc(n * dim, sizeof(double));
+  if (disp == 0) {
+    IGRAPH_ERROR("cannot refine layout", IGRAPH_ENOMEM);
+  }
+  IGRAPH_FINALLY(free, disp);
+
+  if (theta > 0) {
+    IGRAPH_CHECK(igraphmodule_i_layout_bhtree_init(&tree, n));
+    IGRAPH_FINALLY(igraphmodule_i_layout_bhtree_destroy, &tree);
+    if (fixed && igraph_vector_size(&still) > 0 && no_of_movable > 0) {
+      IGRAPH_CHECK(igraphmodule_i_layout_bhtree_init(&fixed_tree, n));
+      IGRAPH_FINALLY(igraphmodule_i_layout_bhtree_destroy, &fixed_tree);
+      IGRAPH_CHECK(igraphmodule_i_layout_bhtree_build(&fixed_tree, coords,
+            &still, n, dim));
+      use_fixed_tree = 1;
+    }
+  }
+
+  for (it = 0; it < niter && no_of_movable > 0; it++) {
+    if (igraphmodule_i_layout_time_is_up(deadline))
+      break;
+
+    temp = start_temp * (niter - it) / niter;
+    for (k = 0; k < no_of_movable; k++) {
+      v = fixed ? (long int) VECTOR(movable)[k] : k;
+      for (d = 0; d < dim; d++)
+        disp[v * dim + d] = 0;
+    }
+
+    /* Repulsive forces */
+    if (theta > 0) {
+      IGRAPH_CHECK(igraphmodule_i_layout_bhtree_build(&tree, coords,
+            fixed ? &movable : 0, n, dim));
+      for (k = 0; k < no_of_movable; k++) {
+        v = tree.order[k];
+        igraphmodule_i_layout_bhtree_repulse(&tree, coords, v, dim, theta, 1,
+            disp + v * dim);
+        if (use_fixed_tree) {
+          igraphmodule_i_layout_bhtree_repulse(&fixed_tree, coords, v, dim,
+              theta, 0, disp + v * dim);
+        }
+      }
+    } else {
+      for (k = 0; k < no_of_movable; k++) {
+        v = fixed ? (long int) VECTOR(movable)[k] : k;
+        for (u = 0; u < n; u++) {
+          if (u != v)
+            igraphmodule_i_layout_repulse(coords + v * dim, coords + u * dim,
+                1, disp + v * dim, dim, v, u);
+        }
+      }
+    }
+
+    /* Attractive forces */
+    for (k = 0; k < no_of_edges; k++) {
+      e = fixed ? (long int) VECTOR(edges)[k] : k;
+      v = IGRAPH_FROM(graph, e); u = IGRAPH_TO(graph, e);
+      if (u == v)
+        continue;
+      pv = coords + v * dim; pu = coords + u * dim;
+      for (d = 0, dist = 0; d < dim; d++) {
+        delta[d] = pv[d] - pu[d];
+        dist += delta[d] * delta[d];
+      }
+      dist = sqrt(dist);
+      if (weights)
+        dist *= VECTOR(*weights)[e];
+      for (d = 0; d < dim; d++) {
+        disp[v * dim + d] -= delta[d] * dist;
+        disp[u * dim + d] += delta[d] * dist;
+      }
+    }
+
+    /* Displacement limited by the temperature */
+    for (k = 0; k < no_of_movable; k++) {
+      v = fixed ? (long int) VECTOR(movable)[k] : k;
+      dv = disp + v * dim; pv = coords + v * dim;
+      for (d = 0, len = 0; d < dim; d++)
+        len += dv[d] * dv[d];
+      len = sqrt(len);
+      if (len <= 0)
+        continue;
+      factor = len > temp ? temp / len : 1;
+      for (d = 0; d < dim; d++)
+        pv[d] += dv[d] * factor;
+    }
+  }
+
+  if (use_fixed_tree) {
+    igraphmodule_i_layout_bhtree_destroy(&fixed_tree);
+    IGRAPH_FINALLY_CLEAN(1);
+  }
+  if (theta > 0) {
+    igraphmodule_i_layout_bhtree_destroy(&tree);
+    IGRAPH_FINALLY_CLEAN(1);
+  }
+  free(disp);
+  igraph_vector_destroy(&edges);
+  igraph_vector_destroy(&still);
+  igraph_vector_destroy(&movable);
+  IGRAPH_FINALLY_CLEAN(4);
+
+  return 0;
+}
+
+/**
+ * \ingroup python_interface_forcelayout
+ * \brief Merges the vertices of a graph into groups of (mostly) two
+ *
+ * The vertices are visited in increasing order of their degrees and each
+ * unmatched vertex is matched with the unmatched neighbor connected to it
+ * by the heaviest edge (heavy edge matching). If this leaves most of the
+ * vertices unmatched (e.g. in star-like graphs), the unmatched vertices
+ * join the group of a matched neighbor.
+ *
+ * \param membership initialized vector; the group index of each vertex
+ *        will be stored here
+ * \param no_of_groups the number of groups is stored here
+ */
+static int igraphmodule_i_layout_coarsen(const igraph_t *graph,
+    const igraph_vector_t *weights, igraph_vector_t *membership,
+    long int *no_of_groups) {
+  long int n = igraph_vcount(graph);
+  long int i, j, v, u, e, best, nc = 0, max_degree;
+  double w, best_weight;
+  igraph_inclist_t inclist;
+  igraph_vector_int_t *incs;
+  igraph_vector_t order, degrees, group_sizes, relabel;
+
+  IGRAPH_CHECK(igraph_inclist_init(graph, &inclist, IGRAPH_ALL));
+  IGRAPH_FINALLY(igraph_inclist_destroy, &inclist);
+  IGRAPH_VECTOR_INIT_FINALLY(&order, 0);
+  IGRAPH_VECTOR_INIT_FINALLY(&degrees, n);
+  IGRAPH_VECTOR_INIT_FINALLY(&group_sizes, 0);
+
+  for (v = 0, max_degree = 0; v < n; v++) {
+    VECTOR(degrees)[v] = igraph_vector_int_size(igraph_inclist_get(&inclist, v));
+    if (VECTOR(degrees)[v] > max_degree)
+      max_degree = (long int) VECTOR(degrees)[v];
+  }
+  IGRAPH_CHECK(igraph_vector_order1(&degrees, &order, max_degree + 1));
+
+  IGRAPH_CHECK(igraph_vector_resize(membership, n));
+  igraph_vector_fill(membership, -1);
+
+  /* Heavy edge matching */
+  for (i = 0; i < n; i++) {
+    v = (long int) VECTOR(order)[i];
+    if (VECTOR(*membership)[v] >= 0)
+      continue;
+    incs = igraph_inclist_get(&inclist, v);
+    best = -1; best_weight = 0;
+    for (j = 0; j < igraph_vector_int_size(incs); j++) {
+      e = VECTOR(*incs)[j];
+      u = IGRAPH_OTHER(graph, e, v);
+      if (u == v || VECTOR(*membership)[u] >= 0)
+        continue;
+      w = weights ? VECTOR(*weights)[e] : 1;
+      if (best < 0 || w > best_weight ||
+          (w == best_weight && VECTOR(degrees)[u] < VECTOR(degrees)[best])) {
+        best = u; best_weight = w;
+      }
+    }
+    VECTOR(*membership)[v] = nc;
+    if (best >= 0)
+      VECTOR(*membership)[best] = nc;
+    IGRAPH_CHECK(igraph_vector_push_back(&group_sizes, best >= 0 ? 2 : 1));
+    nc++;
+  }
+
+  /* Unmatched vertices join a matched neighbor if the matching was poor */
+  if (nc > 0.75 * n) {
+    for (v = 0; v < n; v++) {
+      long int group = (long int) VECTOR(*membership)[v];
+      if (VECTOR(group_sizes)[group] != 1)
+        continue;
+      incs = igraph_inclist_get(&inclist, v);
+      best = -1; best_weight = 0;
+      for (j = 0; j < igraph_vector_int_size(incs); j++) {
+        e = VECTOR(*incs)[j];
+        u = IGRAPH_OTHER(graph, e, v);
+        if (u == v || VECTOR(group_sizes)[(long int) VECTOR(*membership)[u]] < 2)
+          continue;
+        w = weights ? VECTOR(*weights)[e] : 1;
+        if (best < 0 || w > best_weight) {
+          best = u; best_weight = w;
+        }
+      }
+      if (best >= 0) {
+        VECTOR(group_sizes)[group] = 0;
+        VECTOR(*membership)[v] = VECTOR(*membership)[best];
+        VECTOR(group_sizes)[(long int) VECTOR(*membership)[best]]++;
+      }
+    }
+
+    IGRAPH_VECTOR_INIT_FINALLY(&relabel, nc);
+    for (i = 0, j = 0; i < nc; i++) {
+      if (VECTOR(group_sizes)[i] > 0)
+        VECTOR(relabel)[i] = j++;
+    }
+    for (v = 0; v < n; v++)
+      VECTOR(*membership)[v] = VECTOR(relabel)[(long int) VECTOR(*membership)[v]];
+    nc = j;
+    igraph_vector_destroy(&relabel);
+    IGRAPH_FINALLY_CLEAN(1);
+  }
+
+  igraph_vector_destroy(&group_sizes);
+  igraph_vector_destroy(&degrees);
+  igraph_vector_destroy(&order);
+  igraph_inclist_destroy(&inclist);
+  IGRAPH_FINALLY_CLEAN(4);
+
+  *no_of_groups = nc;
+  return 0;
+}
+
+/**
+ * \ingroup python_interface_forcelayout
+ * \brief Creates the quotient graph of a vertex grouping
+ *
+ * Multiple edges between two groups are merged into a single edge whose
+ * weight is the sum of their weights; edges within a group are dropped.
+ *
+ * \param result an uninitialized graph; the quotient graph is created here
+ * \param result_weights an initialized vector; the weights of the edges of
+ *        the quotient graph are stored here
+ */
+static int igraphmodule_i_layout_quotient(const igraph_t *graph,
+    const igraph_vector_t *weights, const igraph_vector_t *membership,
+    long int no_of_groups, igraph_t *result, igraph_vector_t *result_weights) {
+  long int m = igraph_ecount(graph);
+  long int e, i, j, cu, cv, last_u = -1, last_v = -1, count = 0;
+  igraph_vector_t from, to, w, idx, edges;
+
+  IGRAPH_VECTOR_INIT_FINALLY(&from, 0);
+  IGRAPH_VECTOR_INIT_FINALLY(&to, 0);
+  IGRAPH_VECTOR_INIT_FINALLY(&w, 0);
+  IGRAPH_VECTOR_INIT_FINALLY(&idx, 0);
+  IGRAPH_VECTOR_INIT_FINALLY(&edges, 0);
+
+  for (e = 0; e < m; e++) {
+    cu = (long int) VECTOR(*membership)[(long int) IGRAPH_FROM(graph, e)];
+    cv = (long int) VECTOR(*membership)[(long int) IGRAPH_TO(graph, e)];
+    if (cu == cv)
+      continue;
+    if (cu > cv) {
+      i = cu; cu = cv; cv = i;
+    }
+    IGRAPH_CHECK(igraph_vector_push_back(&from, cu));
+    IGRAPH_CHECK(igraph_vector_push_back(&to, cv));
+    IGRAPH_CHECK(igraph_vector_push_back(&w, weights ? VECTOR(*weights)[e] : 1));
+  }
+
+  IGRAPH_CHECK(igraph_vector_order(&from, &to, &idx, no_of_groups));
+
+  igraph_vector_clear(result_weights);
+  for (i = 0; i < igraph_vector_size(&idx); i++) {
+    j = (long int) VECTOR(idx)[i];
+    cu = (long int) VECTOR(from)[j]; cv = (long int) VECTOR(to)[j];
+    if (cu == last_u && cv == last_v) {
+      VECTOR(*result_weights)[igraph_vector_size(result_weights) - 1] += VECTOR(w)[j];
+      count++;
+      continue;
+    }
+    if (count > 1)
+      VECTOR(*result_weights)[igraph_vector_size(result_weights) - 1] /= count;
+    IGRAPH_CHECK(igraph_vector_push_back(&edges, cu));
+    IGRAPH_CHECK(igraph_vector_push_back(&edges, cv));
+    IGRAPH_CHECK(igraph_vector_push_back(result_weights, VECTOR(w)[j]));
+    last_u = cu; last_v = cv; count = 1;
+  }
+  if (count > 1)
+    VECTOR(*result_weights)[igraph_vector_size(result_weights) - 1] /= count;
+
+  IGRAPH_CHECK(igraph_create(result, &edges, (igraph_integer_t) no_of_groups,
+        IGRAPH_UNDIRECTED));
+
+  igraph_vector_destroy(&edges);
+  igraph_vector_destroy(&idx);
+  igraph_vector_destroy(&w);
+  igraph_vector_destroy(&to);
+  igraph_vector_destroy(&from);
+  IGRAPH_FINALLY_CLEAN(5);
+
+  return 0;
+}
+
+/**
+ * \ingroup python_interface_forcelayout
+ * \brief The hierarchy of coarsened graphs used by the multilevel layout
+ *
+ * Level 0 is the original graph; \c graphs[i] and \c weights[i] belong to
+ * level i >= 1 and \c memberships[i] maps the vertices of level i to the
+ * vertices of level i+1. The counters record how many of the items were
+ * initialized so far (graphs and weights are counted from index 1).
+ */
+typedef struct {
+  igraph_t graphs[IGRAPHMODULE_LAYOUT_MAX_LEVELS];
+  igraph_vector_t weights[IGRAPHMODULE_LAYOUT_MAX_LEVELS];
+  igraph_vector_t memberships[IGRAPHMODULE_LAYOUT_MAX_LEVELS];
+  long int no_of_graphs;
+  long int no_of_weights;
+  long int no_of_memberships;
+} igraphmodule_i_layout_hierarchy_t;
+
+static void igraphmodule_i_layout_hierarchy_destroy(
+    igraphmodule_i_layout_hierarchy_t *h) {
+  long int i;
+  for (i = 1; i <= h->no_of_graphs; i++)
+    igraph_destroy(&h->graphs[i]);
+  for (i = 1; i <= h->no_of_weights; i++)
+    igraph_vector_destroy(&h->weights[i]);
+  for (i = 0; i < h->no_of_memberships; i++)
+    igraph_vector_destroy(&h->memberships[i]);
+  free(h);
+}
+
+/**
+ * \ingroup python_interface_forcelayout
+ * \brief Places the vertices randomly in a square or cube whose side is
+ *        proportional to the n-th root of the number of vertices
+ *
+ * \return the side of the square or cube
+ */
+static double igraphmodule_i_layout_random(double *coords, long int n,
+    int dim) {
+  double side = pow(n > 0 ? n : 1, 1.0 / dim);
+  long int i;
+
+  RNG_BEGIN();
+  for (i = 0; i < n * dim; i++)
+    coords[i] = RNG_UNIF(0, side);
+  RNG_END();
+
+  return side;
+}
+
+/**
+ * \ingroup python_interface_forcelayout
+ * \brief Force-directed layout with Barnes-Hut approximation of the
+ *        repulsive forces
+ *
+ * \param coords the result is stored here in row-major order; must have
+ *        room for <code>n*dim</code> doubles. If \p use_seed is true, it
+ *        must contain the initial layout.
+ * \param niter the number of iterations
+ * \param theta the opening angle of the Barnes-Hut algorithm; see \ref
+ *        igraphmodule_layout_refine()
+ * \param start_temp the initial temperature; negative numbers mean a
+ *        default that depends on the number of vertices
+ * \param fixed if not \c NULL, the vertices for which this vector is true
+ *        are not moved
+ * \param use_seed whether to start from the layout in \p coords instead of
+ *        a random one
+ * \return error code
+ */
+int igraphmodule_layout_barnes_hut(const igraph_t *graph,
+    const igraph_vector_t *weights, double *coords, int dim,
+    long int niter, double theta, double start_temp,
+    const igraph_vector_bool_t *fixed, igraph_bool_t use_seed) {
+  long int n = igraph_vcount(graph);
+  double side = pow(n > 0 ? n : 1, 1.0 / dim);
+
+  if (dim != 2 && dim != 3) {
+    IGRAPH_ERROR("dimension must be 2 or 3", IGRAPH_EINVAL);
+  }
+  if (weights && igraph_vector_size(weights) != igraph_ecount(graph)) {
+    IGRAPH_ERROR("weight vector length must match the number of edges",
+        IGRAPH_EINVAL);
+  }
+  if (fixed && igraph_vector_bool_size(fixed) != n) {
+    IGRAPH_ERROR("fixed vector length must match the number of vertices",
+        IGRAPH_EINVAL);
+  }
+
+  if (!use_seed)
+    igraphmodule_i_layout_random(coords, n, dim);
+  if (start_temp < 0)
+    start_temp = side / 10 + 1;
+
+  return igraphmodule_layout_refine(graph, weights, coords, dim, niter,
+      start_temp, theta, fixed, -1);
+}
+
+/**
+ * \ingroup python_interface_forcelayout
+ * \brief Updates a layout after some vertices were added or changed
+ *
+ * The vertices that are not in the previous layout are placed first: each
+ * of them is put at the center of its neighbors that are already placed,
+ * visiting the new vertices in breadth-first order from the old ones. New
+ * vertices that cannot be reached from the old ones are placed randomly
+ * within the bounding box of the old layout. Then the new vertices, the
+ * vertices in \p changed and all the vertices at most \p hops steps away
+ * from them are refined with \p niter iterations of \ref
+ * igraphmodule_layout_refine() while the rest of the layout is kept
+ * fixed, so the running time depends mostly on the size of the touched
+ * region.
+ *
+ * \param coords the layout in row-major order; must have room for
+ *        <code>n*dim</code> doubles where the first \p no_of_placed rows
+ *        hold the previous layout. It is updated in-place.
+ * \param no_of_placed the number of vertices in the previous layout; these
+ *        must be vertices 0, 1, ..., no_of_placed-1
+ * \param changed the IDs of the vertices whose edges changed; may be
+ *        \c NULL
+ * \param hops the radius of the touched region around the new and changed
+ *        vertices
+ * \param displacement if not \c NULL, the largest distance between the
+ *        position of a vertex before and after the refinement is stored
+ *        here. It is close to zero if the touched region did not change
+ *        much, i.e. it is close to an equilibrium.
+ * \return error code
+ */
+int igraphmodule_layout_incremental(const igraph_t *graph,
+    const igraph_vector_t *weights, double *coords, int dim,
+    long int no_of_placed, const igraph_vector_t *changed, long int hops,
+    long int niter, double theta, double start_temp, double *displacement) {
+  long int n = igraph_vcount(graph);
+  long int i, j, u, v, count;
+  double mins[3], maxs[3], delta, dist;
+  igraph_adjlist_t adjlist;
+  igraph_vector_int_t *neis;
+  igraph_vector_bool_t placed, fixed;
+  igraph_vector_t distance, movable, start;
+  igraph_dqueue_t queue;
+  int d;
+
+  if (displacement)
+    *displacement = 0;
+  if (dim != 2 && dim != 3) {
+    IGRAPH_ERROR("dimension must be 2 or 3", IGRAPH_EINVAL);
+  }
+  if (no_of_placed < 0 || no_of_placed > n) {
+    IGRAPH_ERROR("previous layout has too many vertices", IGRAPH_EINVAL);
+  }
+  if (weights && igraph_vector_size(weights) != igraph_ecount(graph)) {
+    IGRAPH_ERROR("weight vector length must match the number of edges",
+        IGRAPH_EINVAL);
+  }
+
+  IGRAPH_CHECK(igraph_adjlist_init(graph, &adjlist, IGRAPH_ALL));
+  IGRAPH_FINALLY(igraph_adjlist_destroy, &adjlist);
+  IGRAPH_CHECK(igraph_vector_bool_init(&placed, n));
+  IGRAPH_FINALLY(igraph_vector_bool_destroy, &placed);
+  IGRAPH_CHECK(igraph_vector_bool_init(&fixed, n));
+  IGRAPH_FINALLY(igraph_vector_bool_destroy, &fixed);
+  IGRAPH_VECTOR_INIT_FINALLY(&distance, n);
+  IGRAPH_CHECK(igraph_dqueue_init(&queue, 100));
+  IGRAPH_FINALLY(igraph_dqueue_destroy, &queue);
+
+  /* Placement of the new vertices */
+  for (v = 0; v < no_of_placed; v++)
+    VECTOR(placed)[v] = 1;
+  for (v = no_of_placed; v < n; v++) {
+    neis = igraph_adjlist_get(&adjlist, v);
+    for (j = 0; j < igraph_vector_int_size(neis); j++) {
+      if (VECTOR(*neis)[j] < no_of_placed) {
+        IGRAPH_CHECK(igraph_dqueue_push(&queue, v));
+        break;
+      }
+    }
+  }
+  while (!igraph_dqueue_empty(&queue)) {
+    v = (long int) igraph_dqueue_pop(&queue);
+    if (VECTOR(placed)[v])
+      continue;
+    neis = igraph_adjlist_get(&adjlist, v);
+    for (d = 0; d < dim; d++)
+      coords[v * dim + d] = 0;
+    for (j = 0, count = 0; j < igraph_vector_int_size(neis); j++) {
+      u = VECTOR(*neis)[j];
+      if (VECTOR(placed)[u]) {
+        for (d = 0; d < dim; d++)
+          coords[v * dim + d] += coords[u * dim + d];
+        count++;
+      } else {
+        IGRAPH_CHECK(igraph_dqueue_push(&queue, u));
+      }
+    }
+    for (d = 0; d < dim; d++) {
+      coords[v * dim + d] = coords[v * dim + d] / count +
+        igraphmodule_i_layout_jitter(v, d);
+    }
+    VECTOR(placed)[v] = 1;
+  }
+
+  for (d = 0; d < dim; d++) {
+    mins[d] = 0; maxs[d] = pow(n > 0 ? n : 1, 1.0 / dim);
+  }
+  for (v = 0; v < no_of_placed; v++) {
+    for (d = 0; d < dim; d++) {
+      if (v == 0 || coords[v * dim + d] < mins[d]) mins[d] = coords[v * dim + d];
+      if (v == 0 || coords[v * dim + d] > maxs[d]) maxs[d] = coords[v * dim + d];
+    }
+  }
+  RNG_BEGIN();
+  for (v = no_of_placed; v < n; v++) {
+    if (VECTOR(placed)[v])
+      continue;
+    for (d = 0; d < dim; d++)
+      coords[v * dim + d] = RNG_UNIF(mins[d], maxs[d]);
+  }
+  RNG_END();
+
+  /* The touched region: vertices at most 'hops' steps away from the new
+   * and the changed vertices */
+  igraph_vector_fill(&distance, -1);
+  for (v = no_of_placed; v < n; v++) {
+    VECTOR(distance)[v] = 0;
+    IGRAPH_CHECK(igraph_dqueue_push(&queue, v));
+  }
+  for (i = 0; changed && i < igraph_vector_size(changed); i++) {
+    v = (long int) VECTOR(*changed)[i];
+    if (v < 0 || v >= n) {
+      IGRAPH_ERROR("invalid vertex ID", IGRAPH_EINVVID);
+    }
+    if (VECTOR(distance)[v] < 0) {
+      VECTOR(distance)[v] = 0;
+      IGRAPH_CHECK(igraph_dqueue_push(&queue, v));
+    }
+  }
+  while (!igraph_dqueue_empty(&queue)) {
+    v = (long int) igraph_dqueue_pop(&queue);
+    if (VECTOR(distance)[v] >= hops)
+      continue;
+    neis = igraph_adjlist_get(&adjlist, v);
+    for (j = 0; j < igraph_vector_int_size(neis); j++) {
+      u = VECTOR(*neis)[j];
+      if (VECTOR(distance)[u] < 0) {
+        VECTOR(distance)[u] = VECTOR(distance)[v] + 1;
+        IGRAPH_CHECK(igraph_dqueue_push(&queue, u));
+      }
+    }
+  }
+  IGRAPH_VECTOR_INIT_FINALLY(&movable, 0);
+  IGRAPH_VECTOR_INIT_FINALLY(&start, 0);
+  for (v = 0; v < n; v++) {
+    VECTOR(fixed)[v] = VECTOR(distance)[v] < 0;
+    if (!VECTOR(fixed)[v]) {
+      IGRAPH_CHECK(igraph_vector_push_back(&movable, v));
+      for (d = 0; d < dim; d++)
+        IGRAPH_CHECK(igraph_vector_push_back(&start, coords[v * dim + d]));
+    }
+  }
+
+  IGRAPH_CHECK(igraphmodule_layout_refine(graph, weights, coords, dim, niter,
+        start_temp, theta, &fixed, -1));
+
+  if (displacement) {
+    for (i = 0; i < igraph_vector_size(&movable); i++) {
+      v = (long int) VECTOR(movable)[i];
+      for (d = 0, dist = 0; d < dim; d++) {
+        delta = coords[v * dim + d] - VECTOR(start)[i * dim + d];
+        dist += delta * delta;
+      }
+      dist = sqrt(dist);
+      if (dist > *displacement)
+        *displacement = dist;
+    }
+  }
+
+  igraph_vector_destroy(&start);
+  igraph_vector_destroy(&movable);
+  IGRAPH_FINALLY_CLEAN(2);
+
+  igraph_dqueue_destroy(&queue);
+  igraph_vector_destroy(&distance);
+  igraph_vector_bool_destroy(&fixed);
+  igraph_vector_bool_destroy(&placed);
+  igraph_adjlist_destroy(&adjlist);
+  IGRAPH_FINALLY_CLEAN(5);
+
+  return 0;
+}
+
+/**
+ * \ingroup python_interface_forcelayout
+ * \brief Multilevel force-directed layout
+ *
+ * The graph is coarsened repeatedly by heavy edge matching until it has at
+ * most \p min_size vertices or the coarsening does not make progress any
+ * more. The coarsest graph is laid out from a random initial layout, then
+ * the layout is interpolated to the finer levels one by one and refined
+ * with \p niter iterations of \ref igraphmodule_layout_refine() on each
+ * level. Since the number of vertices roughly halves on each level, there
+ * are O(log n) levels and the whole algorithm takes O((n + m) log n) time
+ * for a fixed number of iterations.
+ *
+ * \param coords the result is stored here in row-major order; must have
+ *        room for <code>n*dim</code> doubles
+ * \param time_limit the maximum CPU time to spend in seconds; negative
+ *        numbers mean no limit. When the time is up, the remaining levels
+ *        are interpolated without refinement.
+ * \return error code
+ */
+int igraphmodule_layout_multilevel(const igraph_t *graph,
+    const igraph_vector_t *weights, double *coords, int dim,
+    long int niter, long int min_size, double time_limit) {
+  igraphmodule_i_layout_hierarchy_t *h;
+  const igraph_t *level_graph;
+  const igraph_vector_t *level_weights;
+  long int level, no_of_groups, n, nc, v, i;
+  double deadline = igraphmodule_layout_deadline(time_limit);
+  double *coarse, *fine, side, scale;
+  int d;
+
+  if (dim != 2 && dim != 3) {
+    IGRAPH_ERROR("dimension must be 2 or 3", IGRAPH_EINVAL);
+  }
+  if (weights && igraph_vector_size(weights) != igraph_ecount(graph)) {
+    IGRAPH_ERROR("weight vector length must match the number of edges",
+        IGRAPH_EINVAL);
+  }
+
+  h = (igraphmodule_i_layout_hierarchy_t*) calloc(1, sizeof(*h));
+  if (h == 0) {
+    IGRAPH_ERROR("cannot run multilevel layout", IGRAPH_ENOMEM);
+  }
+  IGRAPH_FINALLY(igraphmodule_i_layout_hierarchy_destroy, h);
+
+  /* Coarsening */
+  level_graph = graph; level_weights = weights;
+  for (level = 0; level < IGRAPHMODULE_LAYOUT_MAX_LEVELS - 1; level++) {
+    n = igraph_vcount(level_graph);
+    if (n <= min_size)
+      break;
+
+    IGRAPH_CHECK(igraph_vector_init(&h->memberships[level], 0));
+    h->no_of_memberships++;
+    IGRAPH_CHECK(igraphmodule_i_layout_coarsen(level_graph, level_weights,
+          &h->memberships[level], &no_of_groups));
+    if (no_of_groups > 0.95 * n) {
+      igraph_vector_destroy(&h->memberships[level]);
+      h->no_of_memberships--;
+      break;
+    }
+
+    IGRAPH_CHECK(igraph_vector_init(&h->weights[level + 1], 0));
+    h->no_of_weights++;
+    IGRAPH_CHECK(igraphmodule_i_layout_quotient(level_graph, level_weights,
+          &h->memberships[level], no_of_groups, &h->graphs[level + 1],
+          &h->weights[level + 1]));
+    h->no_of_graphs++;
+
+    level_graph = &h->graphs[level + 1];
+    level_weights = &h->weights[level + 1];
+  }
+
+  /* Layout of the coarsest level */
+  n = igraph_vcount(level_graph);
+  if (level == 0) {
+    coarse = coords;
+  } else {
+    coarse = (double*) calloc(n > 0 ? n * dim : 1, sizeof(double));
+    if (coarse == 0) {
+      IGRAPH_ERROR("cannot run multilevel layout", IGRAPH_ENOMEM);
+    }
+  }
+  IGRAPH_FINALLY(free, level == 0 ? 0 : coarse);
+
+  side = igraphmodule_i_layout_random(coarse, n, dim);
+  IGRAPH_CHECK(igraphmodule_layout_refine(level_graph, level_weights, coarse,
+        dim, niter > 30 ? 10 * niter : 300, side / 10 + 1,
+        n <= 1000 ? 0 : IGRAPHMODULE_LAYOUT_THETA, 0, deadline));
+
+  /* Interpolation and refinement */
+  for (level--; level >= 0; level--) {
+    level_graph = level == 0 ? graph : &h->graphs[level];
+    level_weights = level == 0 ? weights : &h->weights[level];
+    n = igraph_vcount(level_graph);
+    nc = igraph_vcount(&h->graphs[level + 1]);
+
+    if (level == 0) {
+      fine = coords;
+    } else {
+      fine = (double*) calloc(n > 0 ? n * dim : 1, sizeof(double));
+      if (fine == 0) {
+        IGRAPH_ERROR("cannot run multilevel layout", IGRAPH_ENOMEM);
+      }
+    }
+
+    scale = pow(((double) n) / (nc > 0 ? nc : 1), 1.0 / dim);
+    for (v = 0; v < n; v++) {
+      i = (long int) VECTOR(h->memberships[level])[v];
+      for (d = 0; d < dim; d++)
+        fine[v * dim + d] = coarse[i * dim + d] * scale +
+          igraphmodule_i_layout_jitter(v, d);
+    }
+
+    free(coarse);
+    IGRAPH_FINALLY_CLEAN(1);
+    coarse = fine;
+    IGRAPH_FINALLY(free, level == 0 ? 0 : coarse);
+
+    IGRAPH_CHECK(igraphmodule_layout_refine(level_graph, level_weights, coarse,
+          dim, niter, 1, IGRAPHMODULE_LAYOUT_THETA, 0, deadline));
+  }
+
+  IGRAPH_FINALLY_CLEAN(1);
+
+  igraphmodule_i_layout_hierarchy_destroy(h);
+  IGRAPH_FINALLY_CLEAN(1);
+
+  return 0;
+}
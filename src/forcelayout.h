@@ -0,0 +1,53 @@
+/* -*- mode: C -*-  */
+/*
+   IGraph library.
+   Copyright (C) 2006-2012  Tamas Nepusz <ntamas@gmail.com>
+
+   This program is free software; you can redistribute it and/or modify
+   it under the terms of the GNU General Public License as published by
+   the Free Software Foundation; either version 2 of the License, or
+   (at your option) any later version.
+
+   This program is distributed in the hope that it will be useful,
+   but WITHOUT ANY WARRANTY; without even the implied warranty of
+   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+   GNU General Public License for more details.
+
+   You should have received a copy of the GNU General Public License
+   along with this program; if not, write to the Free Software
+   Foundation, Inc.,  51 Franklin Street, Fifth Floor, Boston, MA
+   02110-1301 USA
+
+*/
+
+#ifndef PYTHON_FORCELAYOUT_H
+#define PYTHON_FORCELAYOUT_H
+
+#include <igraph.h>
+
+/* Layout algorithms implemented in the Python interface. Coordinates are
+ * stored in row-major order, i.e. coordinate j of vertex i is at
+ * coords[i*dim+j], which is the layout of igraph.CoordinateArray. */
+
+double igraphmodule_layout_deadline(double time_limit);
+
+int igraphmodule_layout_refine(const igraph_t *graph,
+    const igraph_vector_t *weights, double *coords, int dim,
+    long int niter, double start_temp, double theta,
+    const igraph_vector_bool_t *fixed, double deadline);
+
+int igraphmodule_layout_barnes_hut(const igraph_t *graph,
+    const igraph_vector_t *weights, double *coords, int dim,
+    long int niter, double theta, double start_temp,
+    const igraph_vector_bool_t *fixed, igraph_bool_t use_seed);
+
+int igraphmodule_layout_incremental(const igraph_t *graph,
+    const igraph_vector_t *weights, double *coords, int dim,
+    long int no_of_placed, const igraph_vector_t *changed, long int hops,
+    long int niter, double theta, double start_temp, double *displacement);
+
+int igraphmodule_layout_multilevel(const igraph_t *graph,
+    const igraph_vector_t *weights, double *coords, int dim,
+    long int niter, long int min_size, double time_limit);
+
+#endif
@@ -24,10 +24,13 @@
 #include "arpackobject.h"
 #include "bfsiter.h"
 #include "common.h"
+#include "community.h"
 #include "convert.h"
+#include "coordarrayobject.h"
 #include "edgeseqobject.h"
 #include "error.h"
 #include "filehandle.h"
+#include "forcelayout.h"
 #include "graphobject.h"
 #include "indexing.h"
 #include "memory.h"
@@ -1062,6 +1065,124 @@ PyObject *igraphmodule_Graph_count_multiple(igraphmodule_GraphObject *self,
   return list;
 }
 
+/** \ingroup python_interface_graph
+ * \brief Calculates curvature values for the edges of a graph so that
+ * multiple edges between the same pair of vertices can be told apart on a
+ * plot. Edge directions are ignored when grouping the edges.
+ */
+PyObject *igraphmodule_Graph_autocurve(igraphmodule_GraphObject *self,
+                                       PyObject *args, PyObject *kwds) {
+  static char *kwlist[] = { "default", NULL };
+  PyObject *default_o = NULL, *list, *item;
+  igraph_vector_t lo = IGRAPH_VECTOR_NULL, hi = IGRAPH_VECTOR_NULL;
+  igraph_vector_t order = IGRAPH_VECTOR_NULL, group;
+  igraph_integer_t from, to;
+  long int i, j, k, n, no_of_edges = igraph_ecount(&self->g);
+  long int eid, count;
+  double curve, dcurve, sign;
+
+  if (!PyArg_ParseTupleAndKeywords(args, kwds, "|O", kwlist, &default_o))
+    return NULL;
+
+  if (default_o == NULL) {
+    default_o = PyInt_FromLong(0);
+    if (default_o == NULL)
+      return NULL;
+  } else {
+    Py_INCREF(default_o);
+  }
+
+  list = PyList_New(no_of_edges);
+  if (list == NULL) {
+    Py_DECREF(default_o);
+    return NULL;
+  }
+
+  /* Sort the edges by their unordered endpoint pairs so that parallel
+   * edges end up next to each other */
+  if (igraph_vector_init(&lo, no_of_edges) ||
+      igraph_vector_init(&hi, no_of_edges) ||
+      igraph_vector_init(&order, 0)) {
+    igraphmodule_handle_igraph_error();
+    igraph_vector_destroy(&lo);
+    igraph_vector_destroy(&hi);
+    Py_DECREF(default_o);
+    Py_DECREF(list);
+    return NULL;
+  }
+  for (i = 0; i < no_of_edges; i++) {
+    igraph_edge(&self->g, (igraph_integer_t)i, &from, &to);
+    VECTOR(lo)[i] = from < to ? from : to;
+    VECTOR(hi)[i] = from < to ? to : from;
+  }
+  if (igraph_vector_order(&lo, &hi, &order, igraph_vcount(&self->g))) {
+    igraphmodule_handle_igraph_error();
+    igraph_vector_destroy(&order);
+    igraph_vector_destroy(&hi);
+    igraph_vector_destroy(&lo);
+    Py_DECREF(default_o);
+    Py_DECREF(list);
+    return NULL;
+  }
+
+  for (i = 0; i < no_of_edges; i = j) {
+    eid = (long int)VECTOR(order)[i];
+    for (j = i + 1; j < no_of_edges; j++) {
+      k = (long int)VECTOR(order)[j];
+      if (VECTOR(lo)[k] != VECTOR(lo)[eid] || VECTOR(hi)[k] != VECTOR(hi)[eid])
+        break;
+    }
+
+    count = j - i;
+    if (count < 2) {
+      /* Single edge */
+      Py_INCREF(default_o);
+      PyList_SET_ITEM(list, eid, default_o);
+      continue;
+    }
+
+    /* Parallel edges are processed in the order of their IDs */
+    igraph_vector_view(&group, VECTOR(order) + i, count);
+    igraph_vector_sort(&group);
+
+    n = j;
+    if (count % 2 == 1) {
+      /* Odd number of edges; the last will be straight */
+      n--;
+      PyList_SET_ITEM(list, (long int)VECTOR(order)[n], PyInt_FromLong(0));
+      count--;
+    }
+
+    /* Arrange the remaining edges */
+    curve = dcurve = 2.0 / (count + 2);
+    sign = 1;
+    for (k = i; k < n; k++) {
+      eid = (long int)VECTOR(order)[k];
+      igraph_edge(&self->g, (igraph_integer_t)eid, &from, &to);
+      item = PyFloat_FromDouble(from > to ? -sign * curve : sign * curve);
+      PyList_SET_ITEM(list, eid, item);
+      if ((k - i) % 2 == 1)
+        curve += dcurve;
+      sign = -sign;
+    }
+  }
+
+  igraph_vector_destroy(&order);
+  igraph_vector_destroy(&hi);
+  igraph_vector_destroy(&lo);
+  Py_DECREF(default_o);
+
+  /* Check whether all the items were created successfully */
+  for (i = 0; i < no_of_edges; i++) {
+    if (PyList_GET_ITEM(list, i) == NULL) {
+      Py_DECREF(list);
+      return NULL;
+    }
+  }
+
+  return list;
+}
+
 /** \ingroup python_interface_graph
  * \brief The neighbors of a given vertex in an \c igraph.Graph
  * This method accepts a single vertex ID as a parameter, and returns the
@@ -6129,7 +6250,7 @@ PyObject *igraphmodule_Graph_triad_census(igraphmodule_GraphObject *self) {
 
 /** \ingroup python_interface_graph
  * \brief Places the vertices of a graph uniformly on a circle.
- * \return the calculated coordinates as a Python list of lists
+ * \return the calculated coordinates as an \c igraph.CoordinateArray
  * \sa igraph_layout_circle
  */
 PyObject *igraphmodule_Graph_layout_circle(igraphmodule_GraphObject * self,
@@ -6180,7 +6301,7 @@ PyObject *igraphmodule_Graph_layout_circle(igraphmodule_GraphObject * self,
     return NULL;
   }
 
-  result = igraphmodule_matrix_t_to_PyList(&m, IGRAPHMODULE_TYPE_FLOAT);
+  result = igraphmodule_CoordinateArray_from_matrix_t(&m);
 
   igraph_matrix_destroy(&m);
 
@@ -6189,7 +6310,7 @@ PyObject *igraphmodule_Graph_layout_circle(igraphmodule_GraphObject * self,
 
 /** \ingroup python_interface_graph
  * \brief Places the vertices of a graph randomly.
- * \return the calculated coordinates as a Python list of lists
+ * \return the calculated coordinates as an \c igraph.CoordinateArray
  * \sa igraph_layout_random
  */
 PyObject *igraphmodule_Graph_layout_random(igraphmodule_GraphObject * self,
@@ -6225,7 +6346,7 @@ PyObject *igraphmodule_Graph_layout_random(igraphmodule_GraphObject * self,
     return NULL;
   }
 
-  result = igraphmodule_matrix_t_to_PyList(&m, IGRAPHMODULE_TYPE_FLOAT);
+  result = igraphmodule_CoordinateArray_from_matrix_t(&m);
   igraph_matrix_destroy(&m);
   return (PyObject *) result;
 }
@@ -6273,7 +6394,7 @@ PyObject *igraphmodule_Graph_layout_grid(igraphmodule_GraphObject* self,
     return NULL;
   }
 
-  result = igraphmodule_matrix_t_to_PyList(&m, IGRAPHMODULE_TYPE_FLOAT);
+  result = igraphmodule_CoordinateArray_from_matrix_t(&m);
   igraph_matrix_destroy(&m);
 
   return (PyObject *) result;
@@ -6329,14 +6450,14 @@ PyObject *igraphmodule_Graph_layout_star(igraphmodule_GraphObject* self,
     return NULL;
   }
 
-  result = igraphmodule_matrix_t_to_PyList(&m, IGRAPHMODULE_TYPE_FLOAT);
+  result = igraphmodule_CoordinateArray_from_matrix_t(&m);
   igraph_matrix_destroy(&m);
   return (PyObject *) result;
 }
 
 /** \ingroup python_interface_graph
  * \brief Places the vertices on a plane according to the Kamada-Kawai algorithm.
- * \return the calculated coordinates as a Python list of lists
+ * \return the calculated coordinates as an \c igraph.CoordinateArray
  * \sa igraph_layout_kamada_kawai
  */
 PyObject *igraphmodule_Graph_layout_kamada_kawai(igraphmodule_GraphObject *
@@ -6451,14 +6572,14 @@ PyObject *igraphmodule_Graph_layout_kamada_kawai(igraphmodule_GraphObject *
     return NULL;
   }
 
-  result = igraphmodule_matrix_t_to_PyList(&m, IGRAPHMODULE_TYPE_FLOAT);
+  result = igraphmodule_CoordinateArray_from_matrix_t(&m);
   igraph_matrix_destroy(&m);
   return (PyObject *) result;
 }
 
 /** \ingroup python_interface_graph
  * \brief Places the vertices on a plane according to the Davidson-Harel algorithm.
- * \return the calculated coordinates as a Python list of lists
+ * \return the calculated coordinates as an \c igraph.CoordinateArray
  * \sa igraph_layout_davidson_harel
  */
 PyObject* igraphmodule_Graph_layout_davidson_harel(igraphmodule_GraphObject *self,
@@ -6543,14 +6664,14 @@ PyObject* igraphmodule_Graph_layout_davidson_harel(igraphmodule_GraphObject *sel
     return NULL;
   }
 
-  result = igraphmodule_matrix_t_to_PyList(&m, IGRAPHMODULE_TYPE_FLOAT);
+  result = igraphmodule_CoordinateArray_from_matrix_t(&m);
   igraph_matrix_destroy(&m);
   return (PyObject *) result;
 }
 
 /** \ingroup python_interface_graph
  * \brief Places the vertices on a plane according to the DrL algorithm.
- * \return the calculated coordinates as a Python list of lists
+ * \return the calculated coordinates as an \c igraph.CoordinateArray
  * \sa igraph_layout_drl
  */
 PyObject* igraphmodule_Graph_layout_drl(igraphmodule_GraphObject *self,
@@ -6630,14 +6751,14 @@ PyObject* igraphmodule_Graph_layout_drl(igraphmodule_GraphObject *self,
 
   if (weights) { igraph_vector_destroy(weights); free(weights); }
   if (fixed) { igraph_vector_bool_destroy(fixed); free(fixed); }
-  result = igraphmodule_matrix_t_to_PyList(&m, IGRAPHMODULE_TYPE_FLOAT);
+  result = igraphmodule_CoordinateArray_from_matrix_t(&m);
   igraph_matrix_destroy(&m);
   return (PyObject *) result;
 }
 
 /** \ingroup python_interface_graph
  * \brief Places the vertices on a plane according to the Fruchterman-Reingold algorithm.
- * \return the calculated coordinates as a Python list of lists
+ * \return the calculated coordinates as an \c igraph.CoordinateArray
  * \sa igraph_layout_fruchterman_reingold
  */
 PyObject
@@ -6770,7 +6891,7 @@ PyObject
 
 #undef DESTROY_VECTORS
 
-  result = igraphmodule_matrix_t_to_PyList(&m, IGRAPHMODULE_TYPE_FLOAT);
+  result = igraphmodule_CoordinateArray_from_matrix_t(&m);
   igraph_matrix_destroy(&m);
 
   return (PyObject *) result;
@@ -6779,7 +6900,7 @@ PyObject
 /** \ingroup python_interface_graph
  * \brief Places the vertices on a plane according to the layout algorithm in
  * graphopt 0.4.1
- * \return the calculated coordinates as a Python list of lists
+ * \return the calculated coordinates as an \c igraph.CoordinateArray
  * \sa igraph_layout_graphopt
  */
 PyObject *igraphmodule_Graph_layout_graphopt(igraphmodule_GraphObject *self,
@@ -6820,14 +6941,374 @@ PyObject *igraphmodule_Graph_layout_graphopt(igraphmodule_GraphObject *self,
     return NULL;
   }
 
-  result = igraphmodule_matrix_t_to_PyList(&m, IGRAPHMODULE_TYPE_FLOAT);
+  result = igraphmodule_CoordinateArray_from_matrix_t(&m);
   igraph_matrix_destroy(&m);
   return (PyObject *) result;
 }
 
+/**
+ * \ingroup python_interface_graph
+ * \brief Checks that all the edge weights of a force-directed layout are
+ *        finite, raising a \c ValueError if they are not
+ * \param weights the edge weights; \c NULL means unweighted edges
+ * \return zero if all the weights are finite, nonzero otherwise
+ */
+static int igraphmodule_i_layout_check_weights(const igraph_vector_t *weights) {
+  long int i, n;
+
+  if (weights == 0)
+    return 0;
+
+  n = igraph_vector_size(weights);
+  for (i = 0; i < n; i++) {
+    if (!igraph_finite(VECTOR(*weights)[i])) {
+      PyErr_SetString(PyExc_ValueError, "weights must be finite");
+      return 1;
+    }
+  }
+
+  return 0;
+}
+
+/**
+ * \ingroup python_interface_graph
+ * \brief Checks that all the coordinates of the seed layout of a
+ *        force-directed layout are finite, raising a \c ValueError if they
+ *        are not
+ * \param seed the seed layout
+ * \return zero if all the coordinates are finite, nonzero otherwise
+ */
+static int igraphmodule_i_layout_check_seed(const igraph_matrix_t *seed) {
+  long int i, n = igraph_matrix_size(seed);
+
+  for (i = 0; i < n; i++) {
+    if (!igraph_finite(VECTOR(seed->data)[i])) {
+      PyErr_SetString(PyExc_ValueError, "seed layout must have finite "
+          "coordinates");
+      return 1;
+    }
+  }
+
+  return 0;
+}
+
+/** \ingroup python_interface_graph
+ * \brief Places the vertices of a graph with a force-directed layout
+ *        algorithm that uses the Barnes-Hut approximation
+ * \return the calculated coordinates as an \c igraph.CoordinateArray
+ * \sa igraphmodule_layout_barnes_hut
+ */
+PyObject *igraphmodule_Graph_layout_barnes_hut(igraphmodule_GraphObject *self,
+                                               PyObject *args, PyObject *kwds)
+{
+  static char *kwlist[] =
+    { "weights", "niter", "theta", "seed", "fixed", "start_temp", "dim", NULL };
+  PyObject *result, *weights_o = Py_None, *seed_o = Py_None, *fixed_o = Py_None;
+  PyObject *start_temp_o = Py_None;
+  igraph_vector_t *weights = 0;
+  igraph_vector_bool_t *fixed = 0;
+  igraph_matrix_t m;
+  igraph_bool_t use_seed = 0;
+  long int niter = 500, dim = 2;
+  double theta = 1.2, start_temp = -1;
+
+  if (!PyArg_ParseTupleAndKeywords(args, kwds, "|OldOOOl", kwlist, &weights_o,
+                                   &niter, &theta, &seed_o, &fixed_o,
+                                   &start_temp_o, &dim))
+    return NULL;
+
+  if (dim != 2 && dim != 3) {
+    PyErr_SetString(PyExc_ValueError, "number of dimensions must be either 2 or 3");
+    return NULL;
+  }
+
+  if (niter < 0) {
+    PyErr_SetString(PyExc_ValueError, "number of iterations must be non-negative");
+    return NULL;
+  }
+
+  if (theta < 0) {
+    PyErr_SetString(PyExc_ValueError, "theta must be non-negative");
+    return NULL;
+  }
+
+  if (start_temp_o != Py_None) {
+    start_temp = PyFloat_AsDouble(start_temp_o);
+    if (start_temp == -1 && PyErr_Occurred())
+      return NULL;
+    if (start_temp < 0) {
+      PyErr_SetString(PyExc_ValueError, "start_temp must be non-negative");
+      return NULL;
+    }
+  }
+
+  if (seed_o == Py_None) {
+    result = igraphmodule_CoordinateArray_new_empty(igraph_vcount(&self->g), dim);
+  } else {
+    if (igraphmodule_PyList_to_matrix_t(seed_o, &m))
+      return NULL;
+    if (igraph_matrix_nrow(&m) != igraph_vcount(&self->g) ||
+        igraph_matrix_ncol(&m) != dim) {
+      PyErr_SetString(PyExc_ValueError, "seed layout must have one row per "
+          "vertex and one column per dimension");
+      igraph_matrix_destroy(&m);
+      return NULL;
+    }
+    if (igraphmodule_i_layout_check_seed(&m)) {
+      igraph_matrix_destroy(&m);
+      return NULL;
+    }
+    result = igraphmodule_CoordinateArray_from_matrix_t(&m);
+    igraph_matrix_destroy(&m);
+    use_seed = 1;
+  }
+  if (result == NULL)
+    return NULL;
+
+  if (fixed_o != Py_None) {
+    fixed = (igraph_vector_bool_t*)malloc(sizeof(igraph_vector_bool_t));
+    if (!fixed) {
+      Py_DECREF(result);
+      PyErr_NoMemory();
+      return NULL;
+    }
+    if (igraphmodule_PyObject_to_vector_bool_t(fixed_o, fixed)) {
+      free(fixed);
+      Py_DECREF(result);
+      return NULL;
+    }
+    if (igraph_vector_bool_size(fixed) != igraph_vcount(&self->g)) {
+      PyErr_SetString(PyExc_ValueError, "fixed must have one item per vertex");
+      igraph_vector_bool_destroy(fixed); free(fixed);
+      Py_DECREF(result);
+      return NULL;
+    }
+  }
+
+  if (igraphmodule_attrib_to_vector_t(weights_o, self, &weights,
+      ATTRIBUTE_TYPE_EDGE)) {
+    if (fixed) { igraph_vector_bool_destroy(fixed); free(fixed); }
+    Py_DECREF(result);
+    return NULL;
+  }
+
+  if (igraphmodule_i_layout_check_weights(weights)) {
+    if (weights) { igraph_vector_destroy(weights); free(weights); }
+    if (fixed) { igraph_vector_bool_destroy(fixed); free(fixed); }
+    Py_DECREF(result);
+    return NULL;
+  }
+
+  if (igraphmodule_layout_barnes_hut(&self->g, weights,
+        ((igraphmodule_CoordinateArrayObject*)result)->data, (int) dim,
+        niter, theta, start_temp, fixed, use_seed)) {
+    if (weights) { igraph_vector_destroy(weights); free(weights); }
+    if (fixed) { igraph_vector_bool_destroy(fixed); free(fixed); }
+    Py_DECREF(result);
+    igraphmodule_handle_igraph_error();
+    return NULL;
+  }
+
+  if (weights) { igraph_vector_destroy(weights); free(weights); }
+  if (fixed) { igraph_vector_bool_destroy(fixed); free(fixed); }
+
+  return result;
+}
+
+/** \ingroup python_interface_graph
+ * \brief Updates a layout after vertices were added to the graph or the
+ *        edges of some vertices changed
+ * \return a tuple containing the new coordinates as an
+ *         \c igraph.CoordinateArray and the largest distance a vertex moved
+ * \sa igraphmodule_layout_incremental
+ */
+PyObject *igraphmodule_Graph_layout_incremental(igraphmodule_GraphObject *self,
+                                                PyObject *args, PyObject *kwds)
+{
+  static char *kwlist[] = { "layout", "vertices", "weights", "niter", "hops",
+    "theta", "start_temp", NULL };
+  PyObject *result, *layout_o, *vertices_o = Py_None, *weights_o = Py_None;
+  igraph_vector_t *weights = 0, changed;
+  igraph_matrix_t m;
+  igraph_vs_t vs;
+  long int niter = 20, hops = 1, no_of_placed, dim, i;
+  double theta = 1.2, start_temp = 1.0, displacement;
+  double *data;
+  int d;
+
+  if (!PyArg_ParseTupleAndKeywords(args, kwds, "O|OOlldd", kwlist, &layout_o,
+                                   &vertices_o, &weights_o, &niter, &hops,
+                                   &theta, &start_temp))
+    return NULL;
+
+  if (niter < 0) {
+    PyErr_SetString(PyExc_ValueError, "number of iterations must be non-negative");
+    return NULL;
+  }
+
+  if (hops < 0) {
+    PyErr_SetString(PyExc_ValueError, "hops must be non-negative");
+    return NULL;
+  }
+
+  if (theta < 0) {
+    PyErr_SetString(PyExc_ValueError, "theta must be non-negative");
+    return NULL;
+  }
+
+  if (start_temp < 0) {
+    PyErr_SetString(PyExc_ValueError, "start_temp must be non-negative");
+    return NULL;
+  }
+
+  if (igraphmodule_PyList_to_matrix_t(layout_o, &m))
+    return NULL;
+
+  no_of_placed = igraph_matrix_nrow(&m);
+  dim = igraph_matrix_ncol(&m);
+  if (no_of_placed == 0 && dim == 0)
+    dim = 2;
+  if (dim != 2 && dim != 3) {
+    PyErr_SetString(PyExc_ValueError, "number of dimensions must be either 2 or 3");
+    igraph_matrix_destroy(&m);
+    return NULL;
+  }
+  if (no_of_placed > igraph_vcount(&self->g)) {
+    PyErr_SetString(PyExc_ValueError, "layout has more rows than the number of vertices");
+    igraph_matrix_destroy(&m);
+    return NULL;
+  }
+
+  result = igraphmodule_CoordinateArray_new_empty(igraph_vcount(&self->g), dim);
+  if (result == NULL) {
+    igraph_matrix_destroy(&m);
+    return NULL;
+  }
+  data = ((igraphmodule_CoordinateArrayObject*)result)->data;
+  for (i = 0; i < no_of_placed; i++) {
+    for (d = 0; d < dim; d++)
+      data[i * dim + d] = MATRIX(m, i, d);
+  }
+  igraph_matrix_destroy(&m);
+
+  if (igraph_vector_init(&changed, 0)) {
+    Py_DECREF(result);
+    return igraphmodule_handle_igraph_error();
+  }
+
+  if (vertices_o != Py_None) {
+    if (igraphmodule_PyObject_to_vs_t(vertices_o, &vs, &self->g, 0, 0)) {
+      igraph_vector_destroy(&changed);
+      Py_DECREF(result);
+      return NULL;
+    }
+    if (igraph_vs_as_vector(&self->g, vs, &changed)) {
+      igraph_vs_destroy(&vs);
+      igraph_vector_destroy(&changed);
+      Py_DECREF(result);
+      return igraphmodule_handle_igraph_error();
+    }
+    igraph_vs_destroy(&vs);
+  }
+
+  if (igraphmodule_attrib_to_vector_t(weights_o, self, &weights,
+      ATTRIBUTE_TYPE_EDGE)) {
+    igraph_vector_destroy(&changed);
+    Py_DECREF(result);
+    return NULL;
+  }
+
+  if (igraphmodule_layout_incremental(&self->g, weights, data, (int) dim,
+        no_of_placed, &changed, hops, niter, theta, start_temp,
+        &displacement)) {
+    if (weights) { igraph_vector_destroy(weights); free(weights); }
+    igraph_vector_destroy(&changed);
+    Py_DECREF(result);
+    return igraphmodule_handle_igraph_error();
+  }
+
+  if (weights) { igraph_vector_destroy(weights); free(weights); }
+  igraph_vector_destroy(&changed);
+
+  return Py_BuildValue("Nd", result, displacement);
+}
+
+/** \ingroup python_interface_graph
+ * \brief Places the vertices of a graph with a multilevel force-directed
+ *        layout algorithm
+ * \return the calculated coordinates as an \c igraph.CoordinateArray
+ * \sa igraphmodule_layout_multilevel
+ */
+PyObject *igraphmodule_Graph_layout_multilevel(igraphmodule_GraphObject *self,
+                                               PyObject *args, PyObject *kwds)
+{
+  static char *kwlist[] =
+    { "weights", "dim", "niter", "min_size", "time_limit", NULL };
+  PyObject *result, *weights_o = Py_None, *time_limit_o = Py_None;
+  igraph_vector_t *weights = 0;
+  long int dim = 2, niter = 20, min_size = 50;
+  double time_limit = -1;
+
+  if (!PyArg_ParseTupleAndKeywords(args, kwds, "|OlllO", kwlist, &weights_o,
+                                   &dim, &niter, &min_size, &time_limit_o))
+    return NULL;
+
+  if (dim != 2 && dim != 3) {
+    PyErr_SetString(PyExc_ValueError, "number of dimensions must be either 2 or 3");
+    return NULL;
+  }
+
+  if (niter < 0) {
+    PyErr_SetString(PyExc_ValueError, "number of iterations must be non-negative");
+    return NULL;
+  }
+
+  if (min_size < 1) {
+    PyErr_SetString(PyExc_ValueError, "min_size must be positive");
+    return NULL;
+  }
+
+  if (time_limit_o != Py_None) {
+    time_limit = PyFloat_AsDouble(time_limit_o);
+    if (time_limit == -1 && PyErr_Occurred())
+      return NULL;
+    if (time_limit < 0) {
+      PyErr_SetString(PyExc_ValueError, "time limit must be non-negative");
+      return NULL;
+    }
+  }
+
+  if (igraphmodule_attrib_to_vector_t(weights_o, self, &weights,
+      ATTRIBUTE_TYPE_EDGE)) return NULL;
+
+  if (igraphmodule_i_layout_check_weights(weights)) {
+    if (weights) { igraph_vector_destroy(weights); free(weights); }
+    return NULL;
+  }
+
+  result = igraphmodule_CoordinateArray_new_empty(igraph_vcount(&self->g), dim);
+  if (result == NULL) {
+    if (weights) { igraph_vector_destroy(weights); free(weights); }
+    return NULL;
+  }
+
+  if (igraphmodule_layout_multilevel(&self->g, weights,
+        ((igraphmodule_CoordinateArrayObject*)result)->data, (int) dim,
+        niter, min_size, time_limit)) {
+    if (weights) { igraph_vector_destroy(weights); free(weights); }
+    Py_DECREF(result);
+    igraphmodule_handle_igraph_error();
+    return NULL;
+  }
+
+  if (weights) { igraph_vector_destroy(weights); free(weights); }
+
+  return result;
+}
+
 /** \ingroup python_interface_graph
  * \brief Places the vertices of a graph according to the Large Graph Layout
- * \return the calculated coordinates as a Python list of lists
+ * \return the calculated coordinates as an \c igraph.CoordinateArray
  * \sa igraph_layout_lgl
  */
 PyObject *igraphmodule_Graph_layout_lgl(igraphmodule_GraphObject * self,
@@ -6875,14 +7356,14 @@ PyObject *igraphmodule_Graph_layout_lgl(igraphmodule_GraphObject * self,
     return NULL;
   }
 
-  result = igraphmodule_matrix_t_to_PyList(&m, IGRAPHMODULE_TYPE_FLOAT);
+  result = igraphmodule_CoordinateArray_from_matrix_t(&m);
   igraph_matrix_destroy(&m);
   return (PyObject *) result;
 }
 
 /** \ingroup python_interface_graph
  * \brief Places the vertices of a graph using multidimensional scaling
- * \return the calculated coordinates as a Python list of lists
+ * \return the calculated coordinates as an \c igraph.CoordinateArray
  * \sa igraph_layout_mds
  */
 PyObject *igraphmodule_Graph_layout_mds(igraphmodule_GraphObject * self,
@@ -6938,7 +7419,7 @@ PyObject *igraphmodule_Graph_layout_mds(igraphmodule_GraphObject * self,
     igraph_matrix_destroy(dist); free(dist);
   }
 
-  result = igraphmodule_matrix_t_to_PyList(&m, IGRAPHMODULE_TYPE_FLOAT);
+  result = igraphmodule_CoordinateArray_from_matrix_t(&m);
   igraph_matrix_destroy(&m);
   return (PyObject *) result;
 }
@@ -6946,7 +7427,7 @@ PyObject *igraphmodule_Graph_layout_mds(igraphmodule_GraphObject * self,
 /** \ingroup python_interface_graph
  * \brief Places the vertices of a graph according to the Reingold-Tilford
  * tree layout algorithm
- * \return the calculated coordinates as a Python list of lists
+ * \return the calculated coordinates as an \c igraph.CoordinateArray
  * \sa igraph_layout_reingold_tilford
  */
 PyObject *igraphmodule_Graph_layout_reingold_tilford(igraphmodule_GraphObject
@@ -6997,7 +7478,7 @@ PyObject *igraphmodule_Graph_layout_reingold_tilford(igraphmodule_GraphObject
   if (roots_p) igraph_vector_destroy(roots_p);
   if (rootlevels_p) igraph_vector_destroy(rootlevels_p);
 
-  result = igraphmodule_matrix_t_to_PyList(&m, IGRAPHMODULE_TYPE_FLOAT);
+  result = igraphmodule_CoordinateArray_from_matrix_t(&m);
   igraph_matrix_destroy(&m);
   return (PyObject *) result;
 }
@@ -7005,7 +7486,7 @@ PyObject *igraphmodule_Graph_layout_reingold_tilford(igraphmodule_GraphObject
 /** \ingroup python_interface_graph
  * \brief Places the vertices of a graph according to the Reingold-Tilford
  * tree layout algorithm in a polar coordinate system
- * \return the calculated coordinates as a Python list of lists
+ * \return the calculated coordinates as an \c igraph.CoordinateArray
  * \sa igraph_layout_reingold_tilford
  */
 PyObject *igraphmodule_Graph_layout_reingold_tilford_circular(
@@ -7055,14 +7536,14 @@ PyObject *igraphmodule_Graph_layout_reingold_tilford_circular(
   if (roots_p) igraph_vector_destroy(roots_p);
   if (rootlevels_p) igraph_vector_destroy(rootlevels_p);
 
-  result = igraphmodule_matrix_t_to_PyList(&m, IGRAPHMODULE_TYPE_FLOAT);
+  result = igraphmodule_CoordinateArray_from_matrix_t(&m);
   igraph_matrix_destroy(&m);
   return (PyObject *) result;
 }
 
 /** \ingroup python_interface_graph
  * \brief Places the vertices of a graph according to the Sugiyama layout.
- * \return the calculated coordinates as a Python list of lists
+ * \return the calculated coordinates as an \c igraph.CoordinateArray
  * \sa igraph_layout_sugiyama
  */
 PyObject *igraphmodule_Graph_layout_sugiyama(
@@ -7126,7 +7607,7 @@ PyObject *igraphmodule_Graph_layout_sugiyama(
   if (layers != 0) { igraph_vector_destroy(layers); free(layers); }
   if (weights != 0) { igraph_vector_destroy(weights); free(weights); }
 
-  result = igraphmodule_matrix_t_to_PyList(&m, IGRAPHMODULE_TYPE_FLOAT);
+  result = igraphmodule_CoordinateArray_from_matrix_t(&m);
   igraph_matrix_destroy(&m);
 
   if (PyObject_IsTrue(return_extended_graph)) {
@@ -7143,7 +7624,7 @@ PyObject *igraphmodule_Graph_layout_sugiyama(
 /** \ingroup python_interface_graph
  * \brief Places the vertices of a bipartite graph according to a simple two-layer
  * Sugiyama layout.
- * \return the calculated coordinates as a Python list of lists
+ * \return the calculated coordinates as an \c igraph.CoordinateArray
  * \sa igraph_layout_bipartite
  */
 PyObject *igraphmodule_Graph_layout_bipartite(
@@ -7189,7 +7670,7 @@ PyObject *igraphmodule_Graph_layout_bipartite(
 
   if (types != 0) { igraph_vector_bool_destroy(types); free(types); }
 
-  result = igraphmodule_matrix_t_to_PyList(&m, IGRAPHMODULE_TYPE_FLOAT);
+  result = igraphmodule_CoordinateArray_from_matrix_t(&m);
   igraph_matrix_destroy(&m);
   return (PyObject *) result;
 }
@@ -11652,15 +12133,569 @@ PyObject *igraphmodule_Graph___register_destructor__(igraphmodule_GraphObject
   return result;
 }
 
-/** \ingroup python_interface
- * \brief Member list of the \c igraph.Graph object type
+/** \ingroup python_interface_internal
+ * \brief Checks whether a line segment intersects an axis-aligned box
+ *
+ * Uses the Liang-Barsky clipping algorithm.
  */
-#define OFF(x) offsetof(igraphmodule_GraphObject, x)
+static int igraphmodule_i_segment_in_box(double x1, double y1, double x2,
+    double y2, const double* lower, const double* upper) {
+  double p[4], q[4], t0 = 0, t1 = 1, t;
+  int i;
+
+  p[0] = x1 - x2; q[0] = x1 - lower[0];
+  p[1] = x2 - x1; q[1] = upper[0] - x1;
+  p[2] = y1 - y2; q[2] = y1 - lower[1];
+  p[3] = y2 - y1; q[3] = upper[1] - y1;
+
+  for (i = 0; i < 4; i++) {
+    if (p[i] == 0) {
+      if (q[i] < 0)
+        return 0;
+      continue;
+    }
+    t = q[i] / p[i];
+    if (p[i] < 0) {
+      if (t > t1) return 0;
+      if (t > t0) t0 = t;
+    } else {
+      if (t < t0) return 0;
+      if (t < t1) t1 = t;
+    }
+  }
 
-/** \ingroup python_interface
- * \brief Method list of the \c igraph.Graph object type
- */
-struct PyMethodDef igraphmodule_Graph_methods[] = {
+  return 1;
+}
+
+/** \ingroup python_interface_internal
+ * \brief Returns the IDs of the edges that may intersect an axis-aligned box
+ *
+ * An edge is selected if the line segment between its endpoints intersects
+ * the box grown by \c margin plus \c bend times the length of the edge on
+ * each side. This is used by the graph drawer to skip the edges that lie
+ * outside the visible area; \c margin accounts for the width of the edges
+ * and \c bend for curved edges.
+ */
+PyObject *igraphmodule_Graph__edges_in_box(igraphmodule_GraphObject *self,
+    PyObject *args, PyObject *kwds) {
+  static char *kwlist[] = { "coords", "lower", "upper", "margin", "bend", NULL };
+  PyObject *lower_o, *upper_o, *result, *item;
+  igraphmodule_CoordinateArrayObject *coords;
+  igraph_integer_t from, to;
+  double lower[2], upper[2], grown_lower[2], grown_upper[2];
+  double margin = 0, bend = 0, pad, *p, *q, x;
+  long int i, no_of_edges = igraph_ecount(&self->g);
+  int d;
+
+  if (!PyArg_ParseTupleAndKeywords(args, kwds, "O!OO|dd", kwlist,
+        &igraphmodule_CoordinateArrayType, &coords, &lower_o, &upper_o,
+        &margin, &bend))
+    return NULL;
+
+  if (coords->dim != 2) {
+    PyErr_SetString(PyExc_ValueError, "coordinates must be two-dimensional");
+    return NULL;
+  }
+
+  if (coords->n < igraph_vcount(&self->g)) {
+    PyErr_SetString(PyExc_ValueError, "coordinates must be given for all the vertices");
+    return NULL;
+  }
+
+  if (igraphmodule_CoordinateArray_read_point(lower_o, 2, lower) ||
+      igraphmodule_CoordinateArray_read_point(upper_o, 2, upper))
+    return NULL;
+
+  for (d = 0; d < 2; d++) {
+    if (lower[d] > upper[d]) {
+      x = lower[d]; lower[d] = upper[d]; upper[d] = x;
+    }
+  }
+
+  result = PyList_New(0);
+  if (result == NULL)
+    return NULL;
+
+  for (i = 0; i < no_of_edges; i++) {
+    igraph_edge(&self->g, (igraph_integer_t) i, &from, &to);
+    p = coords->data + 2 * (long int) from;
+    q = coords->data + 2 * (long int) to;
+    pad = margin;
+    if (bend > 0)
+      pad += bend * hypot(q[0] - p[0], q[1] - p[1]);
+    for (d = 0; d < 2; d++) {
+      grown_lower[d] = lower[d] - pad;
+      grown_upper[d] = upper[d] + pad;
+    }
+    if (!igraphmodule_i_segment_in_box(p[0], p[1], q[0], q[1],
+          grown_lower, grown_upper))
+      continue;
+    item = PyInt_FromLong(i);
+    if (item == NULL || PyList_Append(result, item)) {
+      Py_XDECREF(item);
+      Py_DECREF(result);
+      return NULL;
+    }
+    Py_DECREF(item);
+  }
+
+  return result;
+}
+
+/** \ingroup python_interface_internal
+ * \brief Counts the edges whose endpoints are in the same cluster
+ *
+ * Adds one to the count of every edge whose endpoints are in the same
+ * cluster of the given membership vector. The counts are kept in a list
+ * that is updated in place, so the co-membership counts of many clusterings
+ * can be accumulated without storing the clusterings. This is used by
+ * \c Graph.community_consensus.
+ */
+PyObject *igraphmodule_Graph__co_membership_counts(
+    igraphmodule_GraphObject *self, PyObject *args, PyObject *kwds) {
+  static char *kwlist[] = { "membership", "counts", NULL };
+  PyObject *membership_o, *counts_o = Py_None, *item;
+  igraph_vector_t membership;
+  igraph_integer_t from, to;
+  long int i, count, no_of_edges = igraph_ecount(&self->g);
+
+  if (!PyArg_ParseTupleAndKeywords(args, kwds, "O|O", kwlist,
+        &membership_o, &counts_o))
+    return NULL;
+
+  if (counts_o == Py_None) {
+    counts_o = PyList_New(no_of_edges);
+    if (counts_o == NULL)
+      return NULL;
+    for (i = 0; i < no_of_edges; i++) {
+      item = PyInt_FromLong(0);
+      if (item == NULL) {
+        Py_DECREF(counts_o);
+        return NULL;
+      }
+      PyList_SET_ITEM(counts_o, i, item);
+    }
+  } else if (!PyList_Check(counts_o) || PyList_GET_SIZE(counts_o) != no_of_edges) {
+    PyErr_SetString(PyExc_ValueError, "counts must be a list with one item per edge");
+    return NULL;
+  } else {
+    Py_INCREF(counts_o);
+  }
+
+  if (igraphmodule_PyObject_to_vector_t(membership_o, &membership, 0)) {
+    Py_DECREF(counts_o);
+    return NULL;
+  }
+
+  if (igraph_vector_size(&membership) != igraph_vcount(&self->g)) {
+    PyErr_SetString(PyExc_ValueError, "membership list must have one item per vertex");
+    igraph_vector_destroy(&membership);
+    Py_DECREF(counts_o);
+    return NULL;
+  }
+
+  for (i = 0; i < no_of_edges; i++) {
+    igraph_edge(&self->g, (igraph_integer_t) i, &from, &to);
+    if (VECTOR(membership)[(long int) from] != VECTOR(membership)[(long int) to])
+      continue;
+    count = PyInt_AsLong(PyList_GET_ITEM(counts_o, i));
+    if (count == -1 && PyErr_Occurred())
+      item = NULL;
+    else
+      item = PyInt_FromLong(count + 1);
+    if (item == NULL) {
+      igraph_vector_destroy(&membership);
+      Py_DECREF(counts_o);
+      return NULL;
+    }
+    PyList_SetItem(counts_o, i, item);
+  }
+
+  igraph_vector_destroy(&membership);
+
+  return counts_o;
+}
+
+/** \ingroup python_interface_internal
+ * \brief Updates a community structure after some edges changed
+ *
+ * Returns the updated membership list and its modularity.
+ * \sa igraphmodule_community_multilevel_update
+ */
+PyObject *igraphmodule_Graph__community_multilevel_update(
+    igraphmodule_GraphObject *self, PyObject *args, PyObject *kwds) {
+  static char *kwlist[] = { "membership", "seeds", "isolated", "weights", NULL };
+  PyObject *membership_o, *seeds_o, *isolated_o, *weights_o = Py_None, *result_o;
+  igraph_vector_t membership, seeds, isolated, *weights = 0;
+  igraph_real_t modularity;
+
+  if (!PyArg_ParseTupleAndKeywords(args, kwds, "OOO|O", kwlist,
+        &membership_o, &seeds_o, &isolated_o, &weights_o))
+    return NULL;
+
+  if (igraphmodule_attrib_to_vector_t(weights_o, self, &weights, ATTRIBUTE_TYPE_EDGE))
+    return NULL;
+
+  if (igraphmodule_PyObject_to_vector_t(membership_o, &membership, 1)) {
+    if (weights) { igraph_vector_destroy(weights); free(weights); }
+    return NULL;
+  }
+
+  if (igraphmodule_PyObject_to_vector_t(seeds_o, &seeds, 1)) {
+    igraph_vector_destroy(&membership);
+    if (weights) { igraph_vector_destroy(weights); free(weights); }
+    return NULL;
+  }
+
+  if (igraphmodule_PyObject_to_vector_t(isolated_o, &isolated, 1)) {
+    igraph_vector_destroy(&seeds);
+    igraph_vector_destroy(&membership);
+    if (weights) { igraph_vector_destroy(weights); free(weights); }
+    return NULL;
+  }
+
+  if (igraphmodule_community_multilevel_update(&self->g, weights, &membership,
+        &seeds, &isolated, &modularity)) {
+    igraphmodule_handle_igraph_error();
+    result_o = NULL;
+  } else {
+    result_o = igraphmodule_vector_t_to_PyList(&membership, IGRAPHMODULE_TYPE_INT);
+  }
+
+  igraph_vector_destroy(&isolated);
+  igraph_vector_destroy(&seeds);
+  igraph_vector_destroy(&membership);
+  if (weights) { igraph_vector_destroy(weights); free(weights); }
+
+  if (result_o == NULL)
+    return NULL;
+
+  return Py_BuildValue("Nd", result_o, (double) modularity);
+}
+
+/** \ingroup python_interface_internal
+ * \brief Calculates the modularity of every level of a dendrogram
+ * \sa igraphmodule_community_modularity_sweep
+ */
+PyObject *igraphmodule_Graph__modularity_sweep(
+    igraphmodule_GraphObject *self, PyObject *args, PyObject *kwds) {
+  static char *kwlist[] = { "merges", "weights", "resolution", NULL };
+  PyObject *merges_o, *weights_o = Py_None, *result_o;
+  igraph_matrix_t merges;
+  igraph_vector_t modularity, *weights = 0;
+  double resolution = 1;
+
+  if (!PyArg_ParseTupleAndKeywords(args, kwds, "O!|Od", kwlist,
+        &PyList_Type, &merges_o, &weights_o, &resolution))
+    return NULL;
+
+  if (igraphmodule_attrib_to_vector_t(weights_o, self, &weights, ATTRIBUTE_TYPE_EDGE))
+    return NULL;
+
+  if (igraphmodule_PyList_to_matrix_t(merges_o, &merges)) {
+    if (weights) { igraph_vector_destroy(weights); free(weights); }
+    return NULL;
+  }
+
+  if (igraph_vector_init(&modularity, 0)) {
+    igraphmodule_handle_igraph_error();
+    igraph_matrix_destroy(&merges);
+    if (weights) { igraph_vector_destroy(weights); free(weights); }
+    return NULL;
+  }
+
+  if (igraphmodule_community_modularity_sweep(&self->g, weights, &merges,
+        resolution, &modularity)) {
+    igraphmodule_handle_igraph_error();
+    result_o = NULL;
+  } else {
+    result_o = igraphmodule_vector_t_to_PyList(&modularity, IGRAPHMODULE_TYPE_FLOAT);
+  }
+
+  igraph_vector_destroy(&modularity);
+  igraph_matrix_destroy(&merges);
+  if (weights) { igraph_vector_destroy(weights); free(weights); }
+
+  return result_o;
+}
+
+/** \ingroup python_interface_internal
+ * \brief Constructs the graph of the clusters of a clustering
+ *
+ * \c combine_edges=False keeps every edge of the graph, like
+ * \c VertexClustering.cluster_graph() does.
+ * \sa igraphmodule_community_quotient_graph
+ */
+PyObject *igraphmodule_Graph__cluster_graph(
+    igraphmodule_GraphObject *self, PyObject *args, PyObject *kwds) {
+  static char *kwlist[] = { "membership", "combine_vertices", "combine_edges", NULL };
+  PyObject *membership_o, *vertex_comb_o = Py_None, *edge_comb_o = Py_None;
+  igraph_vector_t membership;
+  igraph_attribute_combination_t vertex_comb, edge_comb;
+  igraph_bool_t simplify, has_vertex_attrs, has_edge_attrs;
+  long int no_of_clusters = 0;
+  igraph_t g;
+  igraphmodule_GraphObject *result;
+
+  if (!PyArg_ParseTupleAndKeywords(args, kwds, "O|OO", kwlist,
+        &membership_o, &vertex_comb_o, &edge_comb_o))
+    return NULL;
+
+  simplify = edge_comb_o != Py_False;
+  if (!simplify)
+    edge_comb_o = Py_None;
+
+  if (igraphmodule_PyObject_to_vector_t(membership_o, &membership, 1))
+    return NULL;
+
+  if (igraph_vector_size(&membership) != igraph_vcount(&self->g)) {
+    PyErr_SetString(PyExc_ValueError, "membership list has invalid length");
+    igraph_vector_destroy(&membership);
+    return NULL;
+  }
+  if (igraph_vector_size(&membership) > 0)
+    no_of_clusters = (long int) igraph_vector_max(&membership) + 1;
+
+  if (igraphmodule_PyObject_to_attribute_combination_t(vertex_comb_o, &vertex_comb)) {
+    igraph_vector_destroy(&membership);
+    return NULL;
+  }
+  if (igraphmodule_PyObject_to_attribute_combination_t(edge_comb_o, &edge_comb)) {
+    igraph_attribute_combination_destroy(&vertex_comb);
+    igraph_vector_destroy(&membership);
+    return NULL;
+  }
+
+  /* Grouping the vertices and edges is not needed without attributes */
+  has_vertex_attrs = PyDict_Size(ATTR_STRUCT_DICT(&self->g)[ATTRHASH_IDX_VERTEX]) > 0;
+  has_edge_attrs = PyDict_Size(ATTR_STRUCT_DICT(&self->g)[ATTRHASH_IDX_EDGE]) > 0;
+
+  if (igraphmodule_community_quotient_graph(&self->g, &membership,
+        no_of_clusters, simplify, has_vertex_attrs ? &vertex_comb : 0,
+        has_edge_attrs ? &edge_comb : 0, &g)) {
+    igraphmodule_handle_igraph_error();
+    igraph_attribute_combination_destroy(&edge_comb);
+    igraph_attribute_combination_destroy(&vertex_comb);
+    igraph_vector_destroy(&membership);
+    return NULL;
+  }
+
+  igraph_attribute_combination_destroy(&edge_comb);
+  igraph_attribute_combination_destroy(&vertex_comb);
+  igraph_vector_destroy(&membership);
+
+  CREATE_GRAPH(result, g);
+
+  return (PyObject *) result;
+}
+
+/** \ingroup python_interface_internal
+ * \brief Finds the vertices and edges of a subgraph without copying it
+ *
+ * The vertices are given by \c vertices, or by the endpoints of \c edges if
+ * it is \c None. The edges are given by \c edges, restricted to the edges
+ * between the vertices, or all the edges between the vertices if \c edges is
+ * \c None. Both are sorted by their IDs, and the vertices are numbered in
+ * this order in the subgraph. Returns the vertex IDs, the edge IDs and the
+ * endpoints of the edges in the subgraph. The edges of the vertices are
+ * found from the incidence lists, so the time needed depends only on the
+ * size of the subgraph and the degrees of its vertices.
+ * \sa igraph.GraphView
+ */
+PyObject *igraphmodule_Graph__subgraph_view(
+    igraphmodule_GraphObject *self, PyObject *args, PyObject *kwds) {
+  static char *kwlist[] = { "vertices", "edges", NULL };
+  PyObject *vertices_o = Py_None, *edges_o = Py_None;
+  PyObject *vertices_list = NULL, *edges_list = NULL, *pairs_list = NULL;
+  igraph_vector_t vertices, edges, incident, pairs;
+  igraph_vs_t vs;
+  igraph_es_t es;
+  long int i, j, k, n, e, from, to;
+  long int no_of_nodes = igraph_vcount(&self->g);
+  long int no_of_edges = igraph_ecount(&self->g);
+  igraph_bool_t directed = igraph_is_directed(&self->g);
+
+  if (!PyArg_ParseTupleAndKeywords(args, kwds, "|OO", kwlist,
+        &vertices_o, &edges_o))
+    return NULL;
+
+  if (igraph_vector_init(&vertices, 0)) {
+    igraphmodule_handle_igraph_error();
+    return NULL;
+  }
+  if (vertices_o != Py_None) {
+    if (igraphmodule_PyObject_to_vs_t(vertices_o, &vs, &self->g, 0, 0)) {
+      igraph_vector_destroy(&vertices);
+      return NULL;
+    }
+    if (igraph_vs_as_vector(&self->g, vs, &vertices)) {
+      igraphmodule_handle_igraph_error();
+      igraph_vs_destroy(&vs);
+      igraph_vector_destroy(&vertices);
+      return NULL;
+    }
+    igraph_vs_destroy(&vs);
+  }
+
+  if (igraph_vector_init(&edges, 0)) {
+    igraphmodule_handle_igraph_error();
+    igraph_vector_destroy(&vertices);
+    return NULL;
+  }
+  if (edges_o != Py_None) {
+    if (igraphmodule_PyObject_to_es_t(edges_o, &es, &self->g, 0)) {
+      igraph_vector_destroy(&edges);
+      igraph_vector_destroy(&vertices);
+      return NULL;
+    }
+    if (igraph_es_as_vector(&self->g, es, &edges)) {
+      igraphmodule_handle_igraph_error();
+      igraph_es_destroy(&es);
+      igraph_vector_destroy(&edges);
+      igraph_vector_destroy(&vertices);
+      return NULL;
+    }
+    igraph_es_destroy(&es);
+  }
+
+  if (igraph_vector_init(&incident, 0)) {
+    igraphmodule_handle_igraph_error();
+    igraph_vector_destroy(&edges);
+    igraph_vector_destroy(&vertices);
+    return NULL;
+  }
+  if (igraph_vector_init(&pairs, 0)) {
+    igraphmodule_handle_igraph_error();
+    igraph_vector_destroy(&incident);
+    igraph_vector_destroy(&edges);
+    igraph_vector_destroy(&vertices);
+    return NULL;
+  }
+
+  if ((igraph_vector_size(&vertices) > 0 &&
+       igraph_vector_max(&vertices) >= no_of_nodes) ||
+      (igraph_vector_size(&edges) > 0 &&
+       igraph_vector_max(&edges) >= no_of_edges)) {
+    PyErr_SetString(PyExc_ValueError, "vertex or edge ID out of range");
+    goto cleanup;
+  }
+
+  /* Sorts the given edges and removes the duplicates */
+  igraph_vector_sort(&edges);
+  n = igraph_vector_size(&edges);
+  for (i = 0, k = 0; i < n; i++) {
+    if (k == 0 || VECTOR(edges)[i] != VECTOR(edges)[k - 1])
+      VECTOR(edges)[k++] = VECTOR(edges)[i];
+  }
+  igraph_vector_resize(&edges, k);    /* shrinking, cannot fail */
+
+  /* Collects the vertices */
+  if (vertices_o == Py_None && edges_o == Py_None) {
+    if (igraph_vector_resize(&vertices, no_of_nodes)) {
+      igraphmodule_handle_igraph_error();
+      goto cleanup;
+    }
+    for (i = 0; i < no_of_nodes; i++)
+      VECTOR(vertices)[i] = i;
+  } else if (vertices_o == Py_None) {
+    for (i = 0; i < k; i++) {
+      if (igraph_vector_push_back(&vertices, IGRAPH_FROM(&self->g, (long int) VECTOR(edges)[i])) ||
+          igraph_vector_push_back(&vertices, IGRAPH_TO(&self->g, (long int) VECTOR(edges)[i]))) {
+        igraphmodule_handle_igraph_error();
+        goto cleanup;
+      }
+    }
+  }
+  igraph_vector_sort(&vertices);
+  n = igraph_vector_size(&vertices);
+  for (i = 0, j = 0; i < n; i++) {
+    if (j == 0 || VECTOR(vertices)[i] != VECTOR(vertices)[j - 1])
+      VECTOR(vertices)[j++] = VECTOR(vertices)[i];
+  }
+  igraph_vector_resize(&vertices, j);    /* shrinking, cannot fail */
+  n = j;
+
+  if (edges_o == Py_None) {
+    /* Collects the edges between the vertices; every edge is taken from
+     * its source vertex in directed graphs and from its smaller endpoint
+     * in undirected ones, so only loops may be found twice */
+    for (i = 0; i < n; i++) {
+      from = (long int) VECTOR(vertices)[i];
+      if (igraph_incident(&self->g, &incident, from, IGRAPH_OUT)) {
+        igraphmodule_handle_igraph_error();
+        goto cleanup;
+      }
+      for (j = 0; j < igraph_vector_size(&incident); j++) {
+        e = (long int) VECTOR(incident)[j];
+        to = IGRAPH_OTHER(&self->g, e, from);
+        if (!directed && to < from)
+          continue;
+        if (!igraph_vector_binsearch(&vertices, to, 0))
+          continue;
+        if (igraph_vector_push_back(&edges, e)) {
+          igraphmodule_handle_igraph_error();
+          goto cleanup;
+        }
+      }
+    }
+    igraph_vector_sort(&edges);
+    k = igraph_vector_size(&edges);
+    for (i = 0, j = 0; i < k; i++) {
+      if (j == 0 || VECTOR(edges)[i] != VECTOR(edges)[j - 1])
+        VECTOR(edges)[j++] = VECTOR(edges)[i];
+    }
+    igraph_vector_resize(&edges, j);    /* shrinking, cannot fail */
+    k = j;
+  }
+
+  /* Maps the endpoints of the edges to the local vertex IDs, dropping the
+   * given edges that leave the vertex set */
+  for (i = 0, j = 0; i < k; i++) {
+    e = (long int) VECTOR(edges)[i];
+    if (!igraph_vector_binsearch(&vertices, IGRAPH_FROM(&self->g, e), &from) ||
+        !igraph_vector_binsearch(&vertices, IGRAPH_TO(&self->g, e), &to))
+      continue;
+    VECTOR(edges)[j++] = e;
+    if (!directed && from > to) {
+      e = from; from = to; to = e;
+    }
+    if (igraph_vector_push_back(&pairs, from) ||
+        igraph_vector_push_back(&pairs, to)) {
+      igraphmodule_handle_igraph_error();
+      goto cleanup;
+    }
+  }
+  igraph_vector_resize(&edges, j);    /* shrinking, cannot fail */
+
+  vertices_list = igraphmodule_vector_t_to_PyList(&vertices, IGRAPHMODULE_TYPE_INT);
+  edges_list = igraphmodule_vector_t_to_PyList(&edges, IGRAPHMODULE_TYPE_INT);
+  pairs_list = igraphmodule_vector_t_to_PyList_pairs(&pairs);
+
+cleanup:
+  igraph_vector_destroy(&pairs);
+  igraph_vector_destroy(&incident);
+  igraph_vector_destroy(&edges);
+  igraph_vector_destroy(&vertices);
+
+  if (vertices_list == NULL || edges_list == NULL || pairs_list == NULL) {
+    Py_XDECREF(vertices_list);
+    Py_XDECREF(edges_list);
+    Py_XDECREF(pairs_list);
+    return NULL;
+  }
+
+  return Py_BuildValue("NNN", vertices_list, edges_list, pairs_list);
+}
+
+/** \ingroup python_interface
+ * \brief Member list of the \c igraph.Graph object type
+ */
+#define OFF(x) offsetof(igraphmodule_GraphObject, x)
+
+/** \ingroup python_interface
+ * \brief Method list of the \c igraph.Graph object type
+ */
+struct PyMethodDef igraphmodule_Graph_methods[] = {
   ////////////////////////////
   // BASIC IGRAPH INTERFACE //
   ////////////////////////////
@@ -11835,6 +12870,12 @@ struct PyMethodDef igraphmodule_Graph_methods[] = {
    "  multiplicity. If C{None}, all edges are counted.\n"
    "@return: the multiplicities of the given edges as a list.\n"},
 
+  {"_autocurve", (PyCFunction) igraphmodule_Graph_autocurve,
+   METH_VARARGS | METH_KEYWORDS,
+   "_autocurve(default=0)\n\n"
+   "Internal function, undocumented.\n\n"
+   "@see: autocurve()"},
+
   /* interface to igraph_neighbors */
   {"neighbors", (PyCFunction) igraphmodule_Graph_neighbors,
    METH_VARARGS | METH_KEYWORDS,
@@ -12702,7 +13743,7 @@ struct PyMethodDef igraphmodule_Graph_methods[] = {
    "  be assigned to the single collapsed vertex. It can also be one of\n"
    "  the following string constants which define built-in collapsing\n"
    "  functions: C{sum}, C{prod}, C{mean}, C{median}, C{max}, C{min},\n"
-   "  C{first}, C{last}, C{random}. You can also specify different\n"
+   "  C{first}, C{last}, C{random}, C{count}. You can also specify different\n"
    "  combination functions for different attributes by passing a dict\n"
    "  here which maps attribute names to functions. See\n"
    "  L{Graph.simplify()} for more details.\n"
@@ -13383,6 +14424,8 @@ struct PyMethodDef igraphmodule_Graph_methods[] = {
    "    - C{\"last\"}: the attribute value of the last edge in the collapsed set\n"
    "      will be used for the new edge.\n\n"
    "    - C{\"random\"}: a randomly selected value will be used for the new edge\n\n"
+   "    - C{\"count\"}: the number of edges in the collapsed set will be used\n"
+   "      for the new edge.\n\n"
    "    - C{\"concat\"}: the attribute values will be concatenated for the new\n"
    "      edge.\n\n"
    "  You can also use a dict mapping edge attribute names to functions or\n"
@@ -14024,6 +15067,80 @@ struct PyMethodDef igraphmodule_Graph_methods[] = {
    "@return: the calculated layout."
   },
 
+  /* interface to igraphmodule_layout_barnes_hut */
+  {"layout_barnes_hut", (PyCFunction) igraphmodule_Graph_layout_barnes_hut,
+   METH_VARARGS | METH_KEYWORDS,
+   "layout_barnes_hut(weights=None, niter=500, theta=1.2, seed=None, fixed=None, start_temp=None, dim=2)\n\n"
+   "Places the vertices of a graph with a force-directed layout algorithm\n"
+   "that approximates the repulsive forces with the Barnes-Hut algorithm.\n\n"
+   "The vertices are stored in a quadtree (in 2D) or an octree (in 3D),\n"
+   "and the vertices in a cell of the tree that is far enough from a\n"
+   "vertex are treated as a single point at their center of mass when\n"
+   "calculating the forces acting on the vertex. An iteration therefore\n"
+   "takes O(n log n + m) time instead of the O(n^2) time of\n"
+   "L{layout_fruchterman_reingold()}.\n\n"
+   "@param weights: edge weights to be used. Can be a sequence or iterable\n"
+   "  or even an edge attribute name. Heavier edges pull their endpoints\n"
+   "  closer together. The weights must be finite.\n"
+   "@param niter: the number of iterations to perform.\n"
+   "@param theta: the opening angle of the Barnes-Hut approximation. A cell\n"
+   "  of the tree is treated as a single point if its side length divided\n"
+   "  by its distance from the vertex is less than this value. Larger\n"
+   "  values are faster but less accurate; zero means that the forces are\n"
+   "  calculated exactly in O(n^2) time per iteration.\n"
+   "@param seed: if C{None}, uses a random starting layout for the\n"
+   "  algorithm. If a matrix (list of lists) or a L{Layout}, uses the\n"
+   "  given layout as the starting position. The coordinates of the seed\n"
+   "  layout must be finite.\n"
+   "@param fixed: a list with one item for each vertex. Items that evaluate\n"
+   "  to C{True} denote vertices that will not be moved; it is mostly\n"
+   "  useful together with a seed layout.\n"
+   "@param start_temp: the maximum distance a vertex is allowed to move in\n"
+   "  the first iteration. It decreases linearly to zero during the\n"
+   "  iterations. C{None} means a default that depends on the number of\n"
+   "  vertices; use a small value when refining a seed layout.\n"
+   "@param dim: the desired number of dimensions for the layout. dim=2\n"
+   "  means a 2D layout, dim=3 means a 3D layout.\n"
+   "@return: the calculated layout."
+  },
+
+  /* interface to igraphmodule_layout_incremental */
+  {"_layout_incremental", (PyCFunction) igraphmodule_Graph_layout_incremental,
+   METH_VARARGS | METH_KEYWORDS,
+   "_layout_incremental(layout, vertices=None, weights=None, niter=20, hops=1, theta=1.2, start_temp=1.0)\n\n"
+   "Internal function, undocumented.\n\n"
+   "@see: Graph.layout_incremental()\n\n"},
+
+  /* interface to igraphmodule_layout_multilevel */
+  {"layout_multilevel", (PyCFunction) igraphmodule_Graph_layout_multilevel,
+   METH_VARARGS | METH_KEYWORDS,
+   "layout_multilevel(weights=None, dim=2, niter=20, min_size=50, time_limit=None)\n\n"
+   "Places the vertices of a graph with a multilevel force-directed\n"
+   "layout algorithm, suitable for graphs with millions of vertices.\n\n"
+   "The graph is coarsened repeatedly by merging the pairs of vertices\n"
+   "of a heavy edge matching until it has at most I{min_size} vertices.\n"
+   "The coarsest graph is laid out with a force-directed algorithm, then\n"
+   "the layout is interpolated to the finer graphs one level at a time\n"
+   "and refined with a bounded number of force-directed iterations on\n"
+   "each level. Repulsive forces are approximated with the Barnes-Hut\n"
+   "algorithm, so an iteration takes O(n log n + m) time. Since the\n"
+   "number of vertices roughly halves on each level, the total running\n"
+   "time is O((n + m) log n) for a fixed number of iterations.\n\n"
+   "@param weights: edge weights to be used. Can be a sequence or iterable\n"
+   "  or even an edge attribute name. Heavier edges pull their endpoints\n"
+   "  closer together and are preferred when merging vertices. The\n"
+   "  weights must be finite.\n"
+   "@param dim: the desired number of dimensions for the layout. dim=2\n"
+   "  means a 2D layout, dim=3 means a 3D layout.\n"
+   "@param niter: the number of force-directed iterations on each level.\n"
+   "@param min_size: the coarsening stops when the graph has at most this\n"
+   "  many vertices.\n"
+   "@param time_limit: the maximum CPU time to spend in seconds. When the\n"
+   "  time is up, the remaining levels are interpolated without further\n"
+   "  refinement. C{None} means no limit.\n"
+   "@return: the calculated layout."
+  },
+
   /* interface to igraph_layout_lgl */
   {"layout_lgl", (PyCFunction) igraphmodule_Graph_layout_lgl,
    METH_VARARGS | METH_KEYWORDS,
@@ -15557,6 +16674,48 @@ struct PyMethodDef igraphmodule_Graph_methods[] = {
    "only if you want to access some unwrapped function in the C core of igraph\n"
    "using the ctypes module.\n\n"},
 
+  {"_edges_in_box",
+   (PyCFunction) igraphmodule_Graph__edges_in_box,
+   METH_VARARGS | METH_KEYWORDS,
+   "_edges_in_box(coords, lower, upper, margin=0, bend=0)\n\n"
+   "Internal function, undocumented.\n\n"
+   "@see: DefaultGraphDrawer.draw()\n\n"},
+
+  {"_co_membership_counts",
+   (PyCFunction) igraphmodule_Graph__co_membership_counts,
+   METH_VARARGS | METH_KEYWORDS,
+   "_co_membership_counts(membership, counts=None)\n\n"
+   "Internal function, undocumented.\n\n"
+   "@see: Graph.community_consensus()\n\n"},
+
+  {"_community_multilevel_update",
+   (PyCFunction) igraphmodule_Graph__community_multilevel_update,
+   METH_VARARGS | METH_KEYWORDS,
+   "_community_multilevel_update(membership, seeds, isolated, weights=None)\n\n"
+   "Internal function, undocumented.\n\n"
+   "@see: Graph.community_multilevel_update()\n\n"},
+
+  {"_modularity_sweep",
+   (PyCFunction) igraphmodule_Graph__modularity_sweep,
+   METH_VARARGS | METH_KEYWORDS,
+   "_modularity_sweep(merges, weights=None, resolution=1)\n\n"
+   "Internal function, undocumented.\n\n"
+   "@see: VertexDendrogram.modularities()\n\n"},
+
+  {"_cluster_graph",
+   (PyCFunction) igraphmodule_Graph__cluster_graph,
+   METH_VARARGS | METH_KEYWORDS,
+   "_cluster_graph(membership, combine_vertices=None, combine_edges=None)\n\n"
+   "Internal function, undocumented.\n\n"
+   "@see: VertexClustering.cluster_graph()\n\n"},
+
+  {"_subgraph_view",
+   (PyCFunction) igraphmodule_Graph__subgraph_view,
+   METH_VARARGS | METH_KEYWORDS,
+   "_subgraph_view(vertices=None, edges=None)\n\n"
+   "Internal function, undocumented.\n\n"
+   "@see: GraphView\n\n"},
+
   {"__register_destructor",
    (PyCFunction) igraphmodule_Graph___register_destructor__,
    METH_VARARGS | METH_KEYWORDS,
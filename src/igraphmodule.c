@@ -25,15 +25,21 @@
 #include <igraph.h>
 #include "arpackobject.h"
 #include "attributes.h"
+#include "attrviewobject.h"
 #include "bfsiter.h"
+#include "commcmp.h"
 #include "common.h"
+#include "community.h"
 #include "convert.h"
+#include "coordarrayobject.h"
 #include "edgeobject.h"
 #include "edgeseqobject.h"
 #include "error.h"
 #include "graphobject.h"
 #include "py2compat.h"
 #include "random.h"
+#include "spatialindexobject.h"
+#include "tupleiter.h"
 #include "vertexobject.h"
 #include "vertexseqobject.h"
 
@@ -270,6 +276,28 @@ PyObject* igraphmodule_convex_hull(PyObject* self, PyObject* args, PyObject* kwd
 	    igraph_matrix_destroy(&mtrx);
 	    return NULL;
       }
+    } else if (PyObject_TypeCheck(o, &igraphmodule_CoordinateRowType)) {
+      /* points of a layout are read directly from the coordinate array */
+      if (PySequence_Size(o) < 2) {
+        PyErr_SetString(PyExc_TypeError, "vertex with less than 2 coordinates found");
+        igraph_matrix_destroy(&mtrx);
+        return NULL;
+      }
+      if (PySequence_Size(o) > 2)
+        PyErr_Warn(PyExc_Warning, "vertex with more than 2 coordinates found, considering only the first 2");
+      o1=PySequence_GetItem(o, 0);
+      o2=PySequence_GetItem(o, 1);
+      if (!o1 || !o2) {
+        Py_XDECREF(o1);
+        Py_XDECREF(o2);
+        igraph_matrix_destroy(&mtrx);
+        return NULL;
+      }
+      MATRIX(mtrx, i, 0)=(igraph_real_t)PyFloat_AsDouble(o1);
+      MATRIX(mtrx, i, 1)=(igraph_real_t)PyFloat_AsDouble(o2);
+      Py_DECREF(o1);
+      Py_DECREF(o2);
+      continue;
     }
     
     if (!PyNumber_Check(o1) || !PyNumber_Check(o2)) {
@@ -377,6 +405,49 @@ PyObject* igraphmodule_community_to_membership(PyObject *self,
 }
 
 
+PyObject* igraphmodule_dendrogram_cuts(PyObject *self,
+  PyObject *args, PyObject *kwds) {
+  static char* kwlist[] = { "merges", "nodes", "steps", NULL };
+  PyObject *merges_o, *steps_o, *result_o;
+  igraph_matrix_t merges, memberships;
+  igraph_vector_t steps;
+  long int nodes;
+
+  if (!PyArg_ParseTupleAndKeywords(args, kwds, "O!lO", kwlist,
+      &PyList_Type, &merges_o, &nodes, &steps_o)) return NULL;
+
+  if (igraphmodule_PyList_to_matrix_t(merges_o, &merges)) return NULL;
+
+  if (igraphmodule_PyObject_to_vector_t(steps_o, &steps, 1)) {
+    igraph_matrix_destroy(&merges);
+    return NULL;
+  }
+
+  if (igraph_matrix_init(&memberships, 0, 0)) {
+    igraphmodule_handle_igraph_error();
+    igraph_vector_destroy(&steps);
+    igraph_matrix_destroy(&merges);
+    return NULL;
+  }
+
+  if (igraphmodule_community_dendrogram_cuts(&merges, nodes, &steps,
+        &memberships)) {
+    igraphmodule_handle_igraph_error();
+    igraph_matrix_destroy(&memberships);
+    igraph_vector_destroy(&steps);
+    igraph_matrix_destroy(&merges);
+    return NULL;
+  }
+  igraph_vector_destroy(&steps);
+  igraph_matrix_destroy(&merges);
+
+  result_o = igraphmodule_matrix_t_to_PyList(&memberships, IGRAPHMODULE_TYPE_INT);
+  igraph_matrix_destroy(&memberships);
+
+  return result_o;
+}
+
+
 PyObject* igraphmodule_compare_communities(PyObject *self,
   PyObject *args, PyObject *kwds) {
   static char* kwlist[] = { "comm1", "comm2", "method", NULL };
@@ -412,6 +483,120 @@ PyObject* igraphmodule_compare_communities(PyObject *self,
 }
 
 
+PyObject* igraphmodule_compare_communities_matrix(PyObject *self,
+  PyObject *args, PyObject *kwds) {
+  static char* kwlist[] = { "partitions", "method", "threads", NULL };
+  PyObject *partitions_o, *method_o = Py_None, *seq, *result_o, *row_o, *item;
+  igraph_community_comparison_t method = IGRAPH_COMMCMP_VI;
+  igraphmodule_commcmp_t cmp;
+  igraph_vector_t membership;
+  long int i, j, n = 0, p;
+  int threads = 1, retval;
+  double *result;
+
+  if (!PyArg_ParseTupleAndKeywords(args, kwds, "O|Oi", kwlist,
+      &partitions_o, &method_o, &threads))
+    return NULL;
+
+  if (igraphmodule_PyObject_to_community_comparison_t(method_o, &method))
+    return NULL;
+
+  seq = PySequence_Fast(partitions_o, "partitions must be given in a sequence");
+  if (seq == NULL)
+    return NULL;
+
+  p = PySequence_Fast_GET_SIZE(seq);
+  if (p == 0) {
+    Py_DECREF(seq);
+    return PyList_New(0);
+  }
+
+  /* Convert every partition once to a compact membership array */
+  for (i = 0; i < p; i++) {
+    if (igraphmodule_PyObject_to_vector_t(PySequence_Fast_GET_ITEM(seq, i),
+          &membership, 0)) {
+      if (i > 0)
+        igraphmodule_commcmp_destroy(&cmp);
+      Py_DECREF(seq);
+      return NULL;
+    }
+    if (i == 0) {
+      n = igraph_vector_size(&membership);
+      if (igraphmodule_commcmp_init(&cmp, n, p)) {
+        igraphmodule_handle_igraph_error();
+        igraph_vector_destroy(&membership);
+        Py_DECREF(seq);
+        return NULL;
+      }
+    }
+    if (igraph_vector_size(&membership) != n) {
+      PyErr_SetString(PyExc_ValueError,
+          "the membership vectors must be equal in length");
+      retval = 1;
+    } else if (igraphmodule_commcmp_set(&cmp, i, &membership)) {
+      igraphmodule_handle_igraph_error();
+      retval = 1;
+    } else {
+      retval = 0;
+    }
+    igraph_vector_destroy(&membership);
+    if (retval) {
+      igraphmodule_commcmp_destroy(&cmp);
+      Py_DECREF(seq);
+      return NULL;
+    }
+  }
+  Py_DECREF(seq);
+
+  if ((method == IGRAPH_COMMCMP_RAND || method == IGRAPH_COMMCMP_ADJUSTED_RAND)
+      && n <= 1) {
+    PyErr_SetString(PyExc_ValueError,
+        "Rand indices are not defined for only zero or one elements");
+    igraphmodule_commcmp_destroy(&cmp);
+    return NULL;
+  }
+
+  result = (double*) calloc(p * p, sizeof(double));
+  if (result == 0) {
+    igraphmodule_commcmp_destroy(&cmp);
+    return PyErr_NoMemory();
+  }
+
+  Py_BEGIN_ALLOW_THREADS
+  retval = igraphmodule_commcmp_matrix(&cmp, method, threads, result);
+  Py_END_ALLOW_THREADS
+  igraphmodule_commcmp_destroy(&cmp);
+
+  if (retval) {
+    free(result);
+    return PyErr_NoMemory();
+  }
+
+  result_o = PyList_New(p);
+  for (i = 0; result_o != NULL && i < p; i++) {
+    row_o = PyList_New(p);
+    for (j = 0; row_o != NULL && j < p; j++) {
+      item = PyFloat_FromDouble(result[i * p + j]);
+      if (item == NULL) {
+        Py_DECREF(row_o);
+        row_o = NULL;
+      } else {
+        PyList_SET_ITEM(row_o, j, item);
+      }
+    }
+    if (row_o == NULL) {
+      Py_DECREF(result_o);
+      result_o = NULL;
+    } else {
+      PyList_SET_ITEM(result_o, i, row_o);
+    }
+  }
+  free(result);
+
+  return result_o;
+}
+
+
 PyObject* igraphmodule_is_degree_sequence(PyObject *self,
   PyObject *args, PyObject *kwds) {
   static char* kwlist[] = { "out_deg", "in_deg", NULL };
@@ -557,10 +742,19 @@ static PyMethodDef igraphmodule_methods[] =
     METH_VARARGS | METH_KEYWORDS,
     "community_to_membership(merges, nodes, steps, return_csize=False)"
   },
+  {"_dendrogram_cuts", (PyCFunction)igraphmodule_dendrogram_cuts,
+    METH_VARARGS | METH_KEYWORDS,
+    "_dendrogram_cuts(merges, nodes, steps)"
+  },
   {"_compare_communities", (PyCFunction)igraphmodule_compare_communities,
     METH_VARARGS | METH_KEYWORDS,
     "_compare_communities(comm1, comm2, method=\"vi\")"
   },
+  {"_compare_communities_matrix",
+    (PyCFunction)igraphmodule_compare_communities_matrix,
+    METH_VARARGS | METH_KEYWORDS,
+    "_compare_communities_matrix(partitions, method=\"vi\", threads=1)"
+  },
   {"_power_law_fit", (PyCFunction)igraphmodule_power_law_fit,
     METH_VARARGS | METH_KEYWORDS,
     "_power_law_fit(data, xmin=-1, force_continuous=False)"
@@ -656,7 +850,8 @@ static PyMethodDef igraphmodule_methods[] =
 #define MODULE_DOCS \
   "Low-level Python interface for the igraph library. " \
   "Should not be used directly.\n\n"                    \
-  "@undocumented: community_to_membership, _compare_communities, _power_law_fit, " \
+  "@undocumented: community_to_membership, _compare_communities, " \
+  "_compare_communities_matrix, _dendrogram_cuts, _power_law_fit, " \
   "_split_join_distance"
 
 /**
@@ -766,6 +961,16 @@ extern PyObject* igraphmodule_arpack_options_default;
     INITERROR;
   if (PyType_Ready(&igraphmodule_ARPACKOptionsType) < 0)
     INITERROR;
+  if (PyType_Ready(&igraphmodule_AttributeViewType) < 0)
+    INITERROR;
+  if (PyType_Ready(&igraphmodule_TupleIterType) < 0)
+    INITERROR;
+  if (PyType_Ready(&igraphmodule_CoordinateArrayType) < 0)
+    INITERROR;
+  if (PyType_Ready(&igraphmodule_CoordinateRowType) < 0)
+    INITERROR;
+  if (PyType_Ready(&igraphmodule_SpatialIndexType) < 0)
+    INITERROR;
 
   /* Initialize the core module */
 #ifdef IGRAPH_PYTHON3
@@ -784,6 +989,11 @@ extern PyObject* igraphmodule_arpack_options_default;
   PyModule_AddObject(m, "GraphBase", (PyObject*)&igraphmodule_GraphType);
   PyModule_AddObject(m, "BFSIter", (PyObject*)&igraphmodule_BFSIterType);
   PyModule_AddObject(m, "ARPACKOptions", (PyObject*)&igraphmodule_ARPACKOptionsType);
+  PyModule_AddObject(m, "AttributeView", (PyObject*)&igraphmodule_AttributeViewType);
+  PyModule_AddObject(m, "TupleIter", (PyObject*)&igraphmodule_TupleIterType);
+  PyModule_AddObject(m, "CoordinateArray", (PyObject*)&igraphmodule_CoordinateArrayType);
+  PyModule_AddObject(m, "CoordinateRow", (PyObject*)&igraphmodule_CoordinateRowType);
+  PyModule_AddObject(m, "SpatialIndex", (PyObject*)&igraphmodule_SpatialIndexType);
   PyModule_AddObject(m, "Edge", (PyObject*)&igraphmodule_EdgeType);
   PyModule_AddObject(m, "EdgeSeq", (PyObject*)&igraphmodule_EdgeSeqType);
   PyModule_AddObject(m, "Vertex", (PyObject*)&igraphmodule_VertexType);
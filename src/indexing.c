@@ -444,6 +444,9 @@ int igraphmodule_Graph_adjmatrix_set_index(igraph_t* graph,
     free(attr);
   }
 
+  /* The attribute values are modified directly below */
+  igraphmodule_invalidate_attribute_indexes(graph, ATTRHASH_IDX_EDGE, 0);
+
   if (vid1 >= 0 && vid2 >= 0) {
     /* Setting an edge between vid1 and vid2 */
     igraph_get_eid(graph, &eid, vid1, vid2, /* directed = */1, /* error = */0);
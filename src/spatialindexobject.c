@@ -0,0 +1,715 @@
+/* -*- mode: C -*-  */
+/*
+   IGraph library.
+   Copyright (C) 2006-2012  Tamas Nepusz <ntamas@gmail.com>
+
+   This program is free software; you can redistribute it and/or modify
+   it under the terms of the GNU General Public License as published by
+   the Free Software Foundation; either version 2 of the License, or
+   (at your option) any later version.
+
+   This program is distributed in the hope that it will be useful,
+   but WITHOUT ANY WARRANTY; without even the implied warranty of
+   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+   GNU General Public License for more details.
+
+   You should have received a copy of the GNU General Public License
+   along with this program; if not, write to the Free Software
+   Foundation, Inc.,  51 Franklin Street, Fifth Floor, Boston, MA
+   02110-1301 USA
+
+*/
+
+#include <math.h>
+#include <string.h>
+#include "common.h"
+#include "coordarrayobject.h"
+#include "py2compat.h"
+#include "spatialindexobject.h"
+
+#define IGRAPHMODULE_SPATIALINDEX_LEAF_SIZE 8
+
+/**
+ * \ingroup python_interface
+ * \defgroup python_interface_spatialindex Spatial index object
+ */
+
+PyTypeObject igraphmodule_SpatialIndexType;
+
+#define POINT(self, i) ((self)->points + (i) * (self)->dim)
+
+/**
+ * \ingroup python_interface_spatialindex
+ * \brief Swaps two points of the index
+ */
+static void igraphmodule_SpatialIndex_i_swap(igraphmodule_SpatialIndexObject* self,
+    Py_ssize_t i, Py_ssize_t j) {
+  double *p = POINT(self, i), *q = POINT(self, j), x;
+  Py_ssize_t d, id;
+
+  for (d = 0; d < self->dim; d++) {
+    x = p[d]; p[d] = q[d]; q[d] = x;
+  }
+  id = self->ids[i]; self->ids[i] = self->ids[j]; self->ids[j] = id;
+}
+
+/**
+ * \ingroup python_interface_spatialindex
+ * \brief Reorders the points in the range [lo, hi) so that the point at
+ *        position k is the one that would be there if the range was sorted
+ *        along the given axis (quickselect)
+ */
+static void igraphmodule_SpatialIndex_i_select(igraphmodule_SpatialIndexObject* self,
+    Py_ssize_t lo, Py_ssize_t hi, Py_ssize_t k, Py_ssize_t axis) {
+  Py_ssize_t i, j;
+  double a, b, c, pivot;
+
+  while (hi - lo > 1) {
+    /* Median of three as the pivot */
+    a = POINT(self, lo)[axis];
+    b = POINT(self, lo + (hi - lo) / 2)[axis];
+    c = POINT(self, hi - 1)[axis];
+    if (a > b) { pivot = a; a = b; b = pivot; }
+    pivot = c < a ? a : (c > b ? b : c);
+
+    i = lo; j = hi - 1;
+    while (i <= j) {
+      while (POINT(self, i)[axis] < pivot) i++;
+      while (POINT(self, j)[axis] > pivot) j--;
+      if (i <= j) {
+        igraphmodule_SpatialIndex_i_swap(self, i, j);
+        i++; j--;
+      }
+    }
+
+    if (k <= j)
+      hi = j + 1;
+    else if (k >= i)
+      lo = i;
+    else
+      break;
+  }
+}
+
+/**
+ * \ingroup python_interface_spatialindex
+ * \brief Builds the part of the tree that belongs to the range [lo, hi)
+ *
+ * The range is split along the axis in which the points are spread the
+ * most.
+ */
+static void igraphmodule_SpatialIndex_i_build(igraphmodule_SpatialIndexObject* self,
+    Py_ssize_t lo, Py_ssize_t hi) {
+  Py_ssize_t i, d, axis, mid;
+  double mins[3], maxs[3], x, spread, best;
+
+  while (hi - lo > IGRAPHMODULE_SPATIALINDEX_LEAF_SIZE) {
+    for (d = 0; d < self->dim; d++)
+      mins[d] = maxs[d] = POINT(self, lo)[d];
+    for (i = lo + 1; i < hi; i++) {
+      for (d = 0; d < self->dim; d++) {
+        x = POINT(self, i)[d];
+        if (x < mins[d]) mins[d] = x;
+        if (x > maxs[d]) maxs[d] = x;
+      }
+    }
+    for (d = 0, axis = 0, best = -1; d < self->dim; d++) {
+      spread = maxs[d] - mins[d];
+      if (spread > best) {
+        best = spread; axis = d;
+      }
+    }
+
+    mid = lo + (hi - lo) / 2;
+    igraphmodule_SpatialIndex_i_select(self, lo, hi, mid, axis);
+    self->axes[mid] = (unsigned char) axis;
+
+    /* Recursion on the smaller half, iteration on the larger one */
+    igraphmodule_SpatialIndex_i_build(self, lo, mid);
+    lo = mid + 1;
+  }
+}
+
+/**
+ * \ingroup python_interface_spatialindex
+ * \brief Creates a new spatial index from a set of points
+ */
+PyObject* igraphmodule_SpatialIndex_new(PyTypeObject* type, PyObject* args,
+    PyObject* kwds) {
+  static char* kwlist[] = { "coords", NULL };
+  PyObject *coords_o;
+  igraphmodule_CoordinateArrayObject *coords;
+  igraphmodule_SpatialIndexObject *self;
+  Py_ssize_t i, j, d;
+
+  if (!PyArg_ParseTupleAndKeywords(args, kwds, "O", kwlist, &coords_o))
+    return NULL;
+
+  if (PyObject_TypeCheck(coords_o, &igraphmodule_CoordinateArrayType)) {
+    Py_INCREF(coords_o);
+    coords = (igraphmodule_CoordinateArrayObject*)coords_o;
+  } else {
+    coords = (igraphmodule_CoordinateArrayObject*)PyObject_CallFunctionObjArgs(
+        (PyObject*)&igraphmodule_CoordinateArrayType, coords_o, NULL);
+    if (coords == NULL)
+      return NULL;
+  }
+
+  if (coords->dim < 1 || coords->dim > 3) {
+    PyErr_SetString(PyExc_ValueError, "spatial indices support 1 to 3 dimensions only");
+    Py_DECREF(coords);
+    return NULL;
+  }
+
+  self = (igraphmodule_SpatialIndexObject*)type->tp_alloc(type, 0);
+  if (self == NULL) {
+    Py_DECREF(coords);
+    return NULL;
+  }
+
+  self->n = coords->n;
+  self->dim = coords->dim;
+  self->points = (double*)calloc(self->n > 0 ? self->n * self->dim : 1, sizeof(double));
+  self->ids = (Py_ssize_t*)calloc(self->n > 0 ? self->n : 1, sizeof(Py_ssize_t));
+  self->axes = (unsigned char*)calloc(self->n > 0 ? self->n : 1, sizeof(unsigned char));
+  if (self->points == NULL || self->ids == NULL || self->axes == NULL) {
+    Py_DECREF(coords);
+    Py_DECREF(self);
+    PyErr_NoMemory();
+    return NULL;
+  }
+
+  /* Points with a non-finite coordinate are left out of the tree; they
+   * would break the ordering along the axes */
+  for (i = 0, j = 0; i < coords->n; i++) {
+    for (d = 0; d < self->dim; d++) {
+      if (!igraph_finite(coords->data[i * self->dim + d]))
+        break;
+    }
+    if (d < self->dim)
+      continue;
+    memcpy(POINT(self, j), coords->data + i * self->dim, self->dim * sizeof(double));
+    self->ids[j++] = i;
+  }
+  self->n = j;
+  Py_DECREF(coords);
+
+  igraphmodule_SpatialIndex_i_build(self, 0, self->n);
+
+  RC_ALLOC("SpatialIndex", self);
+
+  return (PyObject*)self;
+}
+
+/**
+ * \ingroup python_interface_spatialindex
+ * \brief Deallocates a spatial index
+ */
+void igraphmodule_SpatialIndex_dealloc(igraphmodule_SpatialIndexObject* self) {
+  free(self->points); self->points = NULL;
+  free(self->ids); self->ids = NULL;
+  free(self->axes); self->axes = NULL;
+
+  RC_DEALLOC("SpatialIndex", self);
+
+  Py_TYPE(self)->tp_free((PyObject*)self);
+}
+
+/**
+ * \ingroup python_interface_spatialindex
+ * \brief Returns the number of points in the index, not counting the
+ *        points with non-finite coordinates
+ */
+Py_ssize_t igraphmodule_SpatialIndex_sq_length(igraphmodule_SpatialIndexObject* self) {
+  return self->n;
+}
+
+/**
+ * \ingroup python_interface_spatialindex
+ * \brief Returns the squared distance of a point of the index from a
+ *        query point
+ */
+static double igraphmodule_SpatialIndex_i_dist2(igraphmodule_SpatialIndexObject* self,
+    Py_ssize_t i, const double* q) {
+  double *p = POINT(self, i), delta, result = 0;
+  Py_ssize_t d;
+  for (d = 0; d < self->dim; d++) {
+    delta = p[d] - q[d];
+    result += delta * delta;
+  }
+  return result;
+}
+
+/**
+ * \ingroup python_interface_spatialindex
+ * \brief State of a k-nearest neighbor query
+ *
+ * The best candidates found so far are kept in a binary max-heap ordered
+ * by distance and then by index, so the worst candidate is at the top.
+ */
+typedef struct {
+  const double* query;
+  double max_dist2;
+  Py_ssize_t k;
+  Py_ssize_t count;
+  double* dist2;
+  Py_ssize_t* ids;
+} igraphmodule_SpatialIndex_i_knn_t;
+
+#define KNN_LESS(knn, i, j) ((knn)->dist2[i] < (knn)->dist2[j] || \
+    ((knn)->dist2[i] == (knn)->dist2[j] && (knn)->ids[i] < (knn)->ids[j]))
+
+static void igraphmodule_SpatialIndex_i_knn_swap(igraphmodule_SpatialIndex_i_knn_t* knn,
+    Py_ssize_t i, Py_ssize_t j) {
+  double x = knn->dist2[i];
+  Py_ssize_t id = knn->ids[i];
+  knn->dist2[i] = knn->dist2[j]; knn->ids[i] = knn->ids[j];
+  knn->dist2[j] = x; knn->ids[j] = id;
+}
+
+static void igraphmodule_SpatialIndex_i_knn_sift_down(
+    igraphmodule_SpatialIndex_i_knn_t* knn, Py_ssize_t i, Py_ssize_t count) {
+  Py_ssize_t child;
+  while ((child = 2 * i + 1) < count) {
+    if (child + 1 < count && KNN_LESS(knn, child, child + 1))
+      child++;
+    if (!KNN_LESS(knn, i, child))
+      break;
+    igraphmodule_SpatialIndex_i_knn_swap(knn, i, child);
+    i = child;
+  }
+}
+
+static void igraphmodule_SpatialIndex_i_knn_consider(
+    igraphmodule_SpatialIndexObject* self, igraphmodule_SpatialIndex_i_knn_t* knn,
+    Py_ssize_t i) {
+  double d2 = igraphmodule_SpatialIndex_i_dist2(self, i, knn->query);
+  Py_ssize_t j, id = self->ids[i];
+
+  if (knn->max_dist2 >= 0 && d2 > knn->max_dist2)
+    return;
+
+  if (knn->count < knn->k) {
+    /* Sift up */
+    j = knn->count++;
+    knn->dist2[j] = d2; knn->ids[j] = id;
+    while (j > 0 && KNN_LESS(knn, (j - 1) / 2, j)) {
+      igraphmodule_SpatialIndex_i_knn_swap(knn, j, (j - 1) / 2);
+      j = (j - 1) / 2;
+    }
+  } else if (d2 < knn->dist2[0] || (d2 == knn->dist2[0] && id < knn->ids[0])) {
+    knn->dist2[0] = d2; knn->ids[0] = id;
+    igraphmodule_SpatialIndex_i_knn_sift_down(knn, 0, knn->count);
+  }
+}
+
+static void igraphmodule_SpatialIndex_i_knn(igraphmodule_SpatialIndexObject* self,
+    igraphmodule_SpatialIndex_i_knn_t* knn, Py_ssize_t lo, Py_ssize_t hi) {
+  Py_ssize_t i, mid;
+  double diff;
+
+  while (hi - lo > IGRAPHMODULE_SPATIALINDEX_LEAF_SIZE) {
+    mid = lo + (hi - lo) / 2;
+    igraphmodule_SpatialIndex_i_knn_consider(self, knn, mid);
+    diff = knn->query[self->axes[mid]] - POINT(self, mid)[self->axes[mid]];
+
+    /* Search the side of the query point first; the other side is
+     * searched only if it may contain a better candidate */
+    if (diff < 0) {
+      igraphmodule_SpatialIndex_i_knn(self, knn, lo, mid);
+      if (knn->count == knn->k && diff * diff > knn->dist2[0])
+        return;
+      if (knn->max_dist2 >= 0 && diff * diff > knn->max_dist2)
+        return;
+      lo = mid + 1;
+    } else {
+      igraphmodule_SpatialIndex_i_knn(self, knn, mid + 1, hi);
+      if (knn->count == knn->k && diff * diff > knn->dist2[0])
+        return;
+      if (knn->max_dist2 >= 0 && diff * diff > knn->max_dist2)
+        return;
+      hi = mid;
+    }
+  }
+
+  for (i = lo; i < hi; i++)
+    igraphmodule_SpatialIndex_i_knn_consider(self, knn, i);
+}
+
+/**
+ * \ingroup python_interface_spatialindex
+ * \brief Reads a query point of the dimension of the index
+ */
+static int igraphmodule_SpatialIndex_i_read_point(igraphmodule_SpatialIndexObject* self,
+    PyObject* point, double* dest) {
+  return igraphmodule_CoordinateArray_read_point(point, self->dim, dest);
+}
+
+/**
+ * \ingroup python_interface_spatialindex
+ * \brief Returns the indices of the points nearest to a query point
+ */
+PyObject* igraphmodule_SpatialIndex_nearest(igraphmodule_SpatialIndexObject* self,
+    PyObject* args, PyObject* kwds) {
+  static char* kwlist[] = { "point", "k", "max_distance", NULL };
+  PyObject *point_o, *max_distance_o = Py_None, *result, *item;
+  igraphmodule_SpatialIndex_i_knn_t knn;
+  Py_ssize_t k = 1, i, count;
+  double query[3], max_distance = -1;
+
+  if (!PyArg_ParseTupleAndKeywords(args, kwds, "O|nO", kwlist, &point_o, &k,
+        &max_distance_o))
+    return NULL;
+
+  if (k < 1) {
+    PyErr_SetString(PyExc_ValueError, "k must be positive");
+    return NULL;
+  }
+
+  if (max_distance_o != Py_None) {
+    max_distance = PyFloat_AsDouble(max_distance_o);
+    if (max_distance == -1 && PyErr_Occurred())
+      return NULL;
+    if (max_distance < 0) {
+      PyErr_SetString(PyExc_ValueError, "max_distance must be non-negative");
+      return NULL;
+    }
+  }
+
+  if (igraphmodule_SpatialIndex_i_read_point(self, point_o, query))
+    return NULL;
+
+  if (k > self->n)
+    k = self->n;
+
+  knn.query = query;
+  knn.max_dist2 = max_distance >= 0 ? max_distance * max_distance : -1;
+  knn.k = k;
+  knn.count = 0;
+  knn.dist2 = (double*)calloc(k > 0 ? k : 1, sizeof(double));
+  knn.ids = (Py_ssize_t*)calloc(k > 0 ? k : 1, sizeof(Py_ssize_t));
+  if (knn.dist2 == NULL || knn.ids == NULL) {
+    free(knn.dist2); free(knn.ids);
+    return PyErr_NoMemory();
+  }
+
+  if (k > 0)
+    igraphmodule_SpatialIndex_i_knn(self, &knn, 0, self->n);
+
+  /* Heap sort to get the candidates in increasing order of distance */
+  for (count = knn.count; count > 1; count--) {
+    igraphmodule_SpatialIndex_i_knn_swap(&knn, 0, count - 1);
+    igraphmodule_SpatialIndex_i_knn_sift_down(&knn, 0, count - 1);
+  }
+
+  result = PyList_New(knn.count);
+  if (result != NULL) {
+    for (i = 0; i < knn.count; i++) {
+      item = PyInt_FromLong((long)knn.ids[i]);
+      if (item == NULL) {
+        Py_DECREF(result);
+        result = NULL;
+        break;
+      }
+      PyList_SET_ITEM(result, i, item);
+    }
+  }
+
+  free(knn.dist2);
+  free(knn.ids);
+
+  return result;
+}
+
+/**
+ * \ingroup python_interface_spatialindex
+ * \brief Appends the index of a point to a Python list
+ */
+static int igraphmodule_SpatialIndex_i_append(igraphmodule_SpatialIndexObject* self,
+    PyObject* list, Py_ssize_t i) {
+  PyObject* item = PyInt_FromLong((long)self->ids[i]);
+  int retval;
+  if (item == NULL)
+    return 1;
+  retval = PyList_Append(list, item);
+  Py_DECREF(item);
+  return retval ? 1 : 0;
+}
+
+static int igraphmodule_SpatialIndex_i_radius(igraphmodule_SpatialIndexObject* self,
+    const double* query, double radius, PyObject* result, Py_ssize_t lo,
+    Py_ssize_t hi) {
+  Py_ssize_t i, mid, axis;
+  double split, r2 = radius * radius;
+
+  while (hi - lo > IGRAPHMODULE_SPATIALINDEX_LEAF_SIZE) {
+    mid = lo + (hi - lo) / 2;
+    axis = self->axes[mid];
+    split = POINT(self, mid)[axis];
+    if (igraphmodule_SpatialIndex_i_dist2(self, mid, query) <= r2 &&
+        igraphmodule_SpatialIndex_i_append(self, result, mid))
+      return 1;
+    if (query[axis] - radius <= split &&
+        igraphmodule_SpatialIndex_i_radius(self, query, radius, result, lo, mid))
+      return 1;
+    if (query[axis] + radius < split)
+      return 0;
+    lo = mid + 1;
+  }
+
+  for (i = lo; i < hi; i++) {
+    if (igraphmodule_SpatialIndex_i_dist2(self, i, query) <= r2 &&
+        igraphmodule_SpatialIndex_i_append(self, result, i))
+      return 1;
+  }
+
+  return 0;
+}
+
+/**
+ * \ingroup python_interface_spatialindex
+ * \brief Returns the indices of the points within a given distance from a
+ *        query point
+ */
+PyObject* igraphmodule_SpatialIndex_within_radius(igraphmodule_SpatialIndexObject* self,
+    PyObject* args, PyObject* kwds) {
+  static char* kwlist[] = { "point", "radius", NULL };
+  PyObject *point_o, *result;
+  double query[3], radius;
+
+  if (!PyArg_ParseTupleAndKeywords(args, kwds, "Od", kwlist, &point_o, &radius))
+    return NULL;
+
+  if (radius < 0) {
+    PyErr_SetString(PyExc_ValueError, "radius must be non-negative");
+    return NULL;
+  }
+
+  if (igraphmodule_SpatialIndex_i_read_point(self, point_o, query))
+    return NULL;
+
+  result = PyList_New(0);
+  if (result == NULL)
+    return NULL;
+
+  if (igraphmodule_SpatialIndex_i_radius(self, query, radius, result, 0, self->n) ||
+      PyList_Sort(result)) {
+    Py_DECREF(result);
+    return NULL;
+  }
+
+  return result;
+}
+
+/**
+ * \ingroup python_interface_spatialindex
+ * \brief Checks whether a point of the index is within a box
+ */
+static int igraphmodule_SpatialIndex_i_in_box(igraphmodule_SpatialIndexObject* self,
+    Py_ssize_t i, const double* lower, const double* upper) {
+  double *p = POINT(self, i);
+  Py_ssize_t d;
+  for (d = 0; d < self->dim; d++) {
+    if (p[d] < lower[d] || p[d] > upper[d])
+      return 0;
+  }
+  return 1;
+}
+
+static int igraphmodule_SpatialIndex_i_box(igraphmodule_SpatialIndexObject* self,
+    const double* lower, const double* upper, PyObject* result, Py_ssize_t lo,
+    Py_ssize_t hi) {
+  Py_ssize_t i, mid, axis;
+  double split;
+
+  while (hi - lo > IGRAPHMODULE_SPATIALINDEX_LEAF_SIZE) {
+    mid = lo + (hi - lo) / 2;
+    axis = self->axes[mid];
+    split = POINT(self, mid)[axis];
+    if (igraphmodule_SpatialIndex_i_in_box(self, mid, lower, upper) &&
+        igraphmodule_SpatialIndex_i_append(self, result, mid))
+      return 1;
+    if (lower[axis] <= split &&
+        igraphmodule_SpatialIndex_i_box(self, lower, upper, result, lo, mid))
+      return 1;
+    if (upper[axis] < split)
+      return 0;
+    lo = mid + 1;
+  }
+
+  for (i = lo; i < hi; i++) {
+    if (igraphmodule_SpatialIndex_i_in_box(self, i, lower, upper) &&
+        igraphmodule_SpatialIndex_i_append(self, result, i))
+      return 1;
+  }
+
+  return 0;
+}
+
+/**
+ * \ingroup python_interface_spatialindex
+ * \brief Returns the indices of the points within an axis-aligned box
+ */
+PyObject* igraphmodule_SpatialIndex_within_box(igraphmodule_SpatialIndexObject* self,
+    PyObject* args, PyObject* kwds) {
+  static char* kwlist[] = { "lower", "upper", NULL };
+  PyObject *lower_o, *upper_o, *result;
+  double lower[3], upper[3], x;
+  Py_ssize_t d;
+
+  if (!PyArg_ParseTupleAndKeywords(args, kwds, "OO", kwlist, &lower_o, &upper_o))
+    return NULL;
+
+  if (igraphmodule_SpatialIndex_i_read_point(self, lower_o, lower) ||
+      igraphmodule_SpatialIndex_i_read_point(self, upper_o, upper))
+    return NULL;
+
+  /* Corners may be given in any order */
+  for (d = 0; d < self->dim; d++) {
+    if (lower[d] > upper[d]) {
+      x = lower[d]; lower[d] = upper[d]; upper[d] = x;
+    }
+  }
+
+  result = PyList_New(0);
+  if (result == NULL)
+    return NULL;
+
+  if (igraphmodule_SpatialIndex_i_box(self, lower, upper, result, 0, self->n) ||
+      PyList_Sort(result)) {
+    Py_DECREF(result);
+    return NULL;
+  }
+
+  return result;
+}
+
+/**
+ * \ingroup python_interface_spatialindex
+ * \brief Returns the number of dimensions of the index
+ */
+PyObject* igraphmodule_SpatialIndex_get_dim(igraphmodule_SpatialIndexObject* self,
+    void* closure) {
+  return PyInt_FromLong((long)self->dim);
+}
+
+/**
+ * \ingroup python_interface_spatialindex
+ * Method table for the \c igraph.SpatialIndex object
+ */
+PyMethodDef igraphmodule_SpatialIndex_methods[] = {
+  {"nearest", (PyCFunction)igraphmodule_SpatialIndex_nearest,
+   METH_VARARGS | METH_KEYWORDS,
+   "nearest(point, k=1, max_distance=None)\n\n"
+   "Returns the indices of the points nearest to the given point.\n\n"
+   "@param point: the query point\n"
+   "@param k: the maximum number of points to return\n"
+   "@param max_distance: if not C{None}, points farther than this from\n"
+   "  the query point are ignored\n"
+   "@return: the indices of at most I{k} points in increasing order of\n"
+   "  their distance from the query point. Ties are broken by the index.\n"
+  },
+  {"within_box", (PyCFunction)igraphmodule_SpatialIndex_within_box,
+   METH_VARARGS | METH_KEYWORDS,
+   "within_box(lower, upper)\n\n"
+   "Returns the indices of the points within an axis-aligned box.\n\n"
+   "@param lower: one corner of the box\n"
+   "@param upper: the opposite corner of the box\n"
+   "@return: the indices of the points in the box (including its\n"
+   "  boundary) in increasing order\n"
+  },
+  {"within_radius", (PyCFunction)igraphmodule_SpatialIndex_within_radius,
+   METH_VARARGS | METH_KEYWORDS,
+   "within_radius(point, radius)\n\n"
+   "Returns the indices of the points within a given distance from a\n"
+   "query point.\n\n"
+   "@param point: the query point\n"
+   "@param radius: the maximum distance\n"
+   "@return: the indices of the points in increasing order\n"
+  },
+  {NULL}
+};
+
+/**
+ * \ingroup python_interface_spatialindex
+ * Getters and setters of the \c igraph.SpatialIndex object
+ */
+PyGetSetDef igraphmodule_SpatialIndex_getseters[] = {
+  {"dim", (getter)igraphmodule_SpatialIndex_get_dim, NULL,
+   "Number of dimensions", NULL},
+  {NULL}
+};
+
+/**
+ * \ingroup python_interface_spatialindex
+ * This is the collection of functions necessary to implement the
+ * spatial index as a sized container
+ */
+static PySequenceMethods igraphmodule_SpatialIndex_as_sequence = {
+  (lenfunc)igraphmodule_SpatialIndex_sq_length,
+  0,               /* sq_concat */
+  0,               /* sq_repeat */
+  0,               /* sq_item */
+  0,               /* sq_slice */
+  0,               /* sq_ass_item */
+  0,               /* sq_ass_slice */
+  0,               /* sq_contains */
+  0,               /* sq_inplace_concat */
+  0,               /* sq_inplace_repeat */
+};
+
+/** \ingroup python_interface_spatialindex
+ * Python type object referencing the methods Python calls when it performs
+ * various operations on a spatial index
+ */
+PyTypeObject igraphmodule_SpatialIndexType =
+{
+  PyVarObject_HEAD_INIT(0, 0)
+  "igraph.SpatialIndex",                    // tp_name
+  sizeof(igraphmodule_SpatialIndexObject),  // tp_basicsize
+  0,                                        // tp_itemsize
+  (destructor)igraphmodule_SpatialIndex_dealloc, // tp_dealloc
+  0,                                        // tp_print
+  0,                                        // tp_getattr
+  0,                                        // tp_setattr
+  0,                                        /* tp_compare (2.x) / tp_reserved (3.x) */
+  0,                                        // tp_repr
+  0,                                        // tp_as_number
+  &igraphmodule_SpatialIndex_as_sequence,   // tp_as_sequence
+  0,                                        // tp_as_mapping
+  0,                                        // tp_hash
+  0,                                        // tp_call
+  0,                                        // tp_str
+  0,                                        // tp_getattro
+  0,                                        // tp_setattro
+  0,                                        // tp_as_buffer
+  Py_TPFLAGS_DEFAULT,                       // tp_flags
+  "SpatialIndex(coords)\n\n"
+  "k-d tree of a set of points in 1, 2 or 3 dimensions that answers\n"
+  "nearest neighbor, radius and box queries.\n\n"
+  "The index stores a copy of the coordinates; it does not change when\n"
+  "the original points are modified afterwards. The points are identified\n"
+  "by their indices in the original sequence, so an index built from a\n"
+  "layout returns vertex IDs. Points with an infinite or NaN coordinate\n"
+  "are left out of the index and are never returned by the queries.\n\n"
+  "@param coords: the coordinates of the points as a L{CoordinateArray}\n"
+  "  or a sequence of sequences.\n", // tp_doc
+  0,                                        /* tp_traverse */
+  0,                                        /* tp_clear */
+  0,                                        /* tp_richcompare */
+  0,                                        // tp_weaklistoffset
+  0,                                        /* tp_iter */
+  0,                                        /* tp_iternext */
+  igraphmodule_SpatialIndex_methods,        /* tp_methods */
+  0,                                        /* tp_members */
+  igraphmodule_SpatialIndex_getseters,      /* tp_getset */
+  0,                                        /* tp_base */
+  0,                                        /* tp_dict */
+  0,                                        /* tp_descr_get */
+  0,                                        /* tp_descr_set */
+  0,                                        /* tp_dictoffset */
+  0,                                        /* tp_init */
+  0,                                        /* tp_alloc */
+  (newfunc)igraphmodule_SpatialIndex_new,   /* tp_new */
+  0,                                        /* tp_free */
+};
@@ -0,0 +1,49 @@
+/* -*- mode: C -*-  */
+/*
+   IGraph library.
+   Copyright (C) 2006-2012  Tamas Nepusz <ntamas@gmail.com>
+
+   This program is free software; you can redistribute it and/or modify
+   it under the terms of the GNU General Public License as published by
+   the Free Software Foundation; either version 2 of the License, or
+   (at your option) any later version.
+
+   This program is distributed in the hope that it will be useful,
+   but WITHOUT ANY WARRANTY; without even the implied warranty of
+   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+   GNU General Public License for more details.
+
+   You should have received a copy of the GNU General Public License
+   along with this program; if not, write to the Free Software
+   Foundation, Inc.,  51 Franklin Street, Fifth Floor, Boston, MA
+   02110-1301 USA
+
+*/
+
+#ifndef PYTHON_SPATIALINDEXOBJECT_H
+#define PYTHON_SPATIALINDEXOBJECT_H
+
+#include <Python.h>
+
+/**
+ * \ingroup python_interface_spatialindex
+ * \brief A k-d tree of a set of points in a space of fixed dimension
+ *
+ * The tree is stored implicitly: the points are reordered so that the
+ * point in the middle of each range of positions splits the rest of the
+ * range along the axis stored in \c axes at the same position. Ranges of
+ * at most \c IGRAPHMODULE_SPATIALINDEX_LEAF_SIZE points are leaves.
+ */
+typedef struct
+{
+  PyObject_HEAD
+  double* points;
+  Py_ssize_t* ids;
+  unsigned char* axes;
+  Py_ssize_t n;
+  Py_ssize_t dim;
+} igraphmodule_SpatialIndexObject;
+
+extern PyTypeObject igraphmodule_SpatialIndexType;
+
+#endif
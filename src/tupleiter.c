@@ -0,0 +1,286 @@
+/* -*- mode: C -*-  */
+/* 
+   IGraph library.
+   Copyright (C) 2006-2012  Tamas Nepusz <ntamas@gmail.com>
+   
+   This program is free software; you can redistribute it and/or modify
+   it under the terms of the GNU General Public License as published by
+   the Free Software Foundation; either version 2 of the License, or
+   (at your option) any later version.
+   
+   This program is distributed in the hope that it will be useful,
+   but WITHOUT ANY WARRANTY; without even the implied warranty of
+   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+   GNU General Public License for more details.
+   
+   You should have received a copy of the GNU General Public License
+   along with this program; if not, write to the Free Software
+   Foundation, Inc.,  51 Franklin Street, Fifth Floor, Boston, MA 
+   02110-1301 USA
+
+*/
+
+
+#include "attributes.h"
+#include "common.h"
+#include "error.h"
+#include "py2compat.h"
+#include "tupleiter.h"
+
+/**
+ * \ingroup python_interface
+ * \defgroup python_interface_tupleiter Tuple iterator object
+ */
+
+PyTypeObject igraphmodule_TupleIterType;
+
+/**
+ * \ingroup python_interface_tupleiter
+ * \brief Allocates a new tuple iterator over vertices or edges of a graph
+ * \param g the graph object being referenced
+ * \param attrhash_idx \c ATTRHASH_IDX_VERTEX or \c ATTRHASH_IDX_EDGE
+ * \param attrnames a sequence containing the names of the attributes to
+ *        include in the tuples
+ * \param all whether to iterate over all the vertices or edges in the graph
+ * \param ids the vertex or edge IDs to iterate over if \c all is false
+ * \return the allocated PyObject
+ */
+PyObject* igraphmodule_TupleIter_new(igraphmodule_GraphObject *g,
+    int attrhash_idx, PyObject *attrnames, igraph_bool_t all,
+    const igraph_vector_t *ids) {
+  igraphmodule_TupleIterObject* o;
+  PyObject *columns, *name, *column;
+  Py_ssize_t i, n;
+
+  /* Validate the attribute names in advance; the attribute lists themselves
+   * are looked up in every step as the graph may be modified meanwhile */
+  columns=PySequence_Tuple(attrnames);
+  if (columns == NULL)
+    return NULL;
+  n=PyTuple_GET_SIZE(columns);
+  for (i=0; i<n; i++) {
+    name=PyTuple_GET_ITEM(columns, i);
+    if (!igraphmodule_attribute_name_check(name)) {
+      Py_DECREF(columns);
+      return NULL;
+    }
+    column=PyDict_GetItem(ATTR_STRUCT_DICT(&g->g)[attrhash_idx], name);
+    if (column == NULL || !PyList_Check(column)) {
+      PyErr_SetString(PyExc_KeyError, "Attribute does not exist");
+      Py_DECREF(columns);
+      return NULL;
+    }
+  }
+
+  o=PyObject_GC_New(igraphmodule_TupleIterObject, &igraphmodule_TupleIterType);
+  if (o == NULL) {
+    Py_DECREF(columns);
+    return NULL;
+  }
+
+  if (all) {
+    if (igraph_vector_init(&o->ids, 0)) {
+      igraphmodule_handle_igraph_error();
+      Py_DECREF(columns);
+      PyObject_GC_Del(o);
+      return NULL;
+    }
+  } else if (igraph_vector_copy(&o->ids, ids)) {
+    igraphmodule_handle_igraph_error();
+    Py_DECREF(columns);
+    PyObject_GC_Del(o);
+    return NULL;
+  }
+
+  Py_INCREF(g);
+  o->gref=g;
+  o->attrhash_idx=attrhash_idx;
+  o->columns=columns;
+  o->all=all;
+  o->pos=0;
+
+  PyObject_GC_Track(o);
+
+  RC_ALLOC("TupleIter", o);
+
+  return (PyObject*)o;
+}
+
+/**
+ * \ingroup python_interface_tupleiter
+ * \brief Support for cyclic garbage collection in Python
+ */
+int igraphmodule_TupleIter_traverse(igraphmodule_TupleIterObject *self,
+    visitproc visit, void *arg) {
+  RC_TRAVERSE("TupleIter", self);
+  Py_VISIT(self->gref);
+  Py_VISIT(self->columns);
+  return 0;
+}
+
+/**
+ * \ingroup python_interface_tupleiter
+ * \brief Clears the iterator's subobjects (before deallocation)
+ */
+int igraphmodule_TupleIter_clear(igraphmodule_TupleIterObject *self) {
+  PyObject *tmp;
+
+  PyObject_GC_UnTrack(self);
+
+  tmp=(PyObject*)self->gref;
+  self->gref=NULL;
+  Py_XDECREF(tmp);
+
+  tmp=self->columns;
+  self->columns=NULL;
+  Py_XDECREF(tmp);
+
+  return 0;
+}
+
+/**
+ * \ingroup python_interface_tupleiter
+ * \brief Deallocates a Python representation of a given tuple iterator
+ */
+void igraphmodule_TupleIter_dealloc(igraphmodule_TupleIterObject* self) {
+  igraphmodule_TupleIter_clear(self);
+  igraph_vector_destroy(&self->ids);
+
+  RC_DEALLOC("TupleIter", self);
+
+  PyObject_GC_Del(self);
+}
+
+PyObject* igraphmodule_TupleIter_iter(igraphmodule_TupleIterObject* self) {
+  Py_INCREF(self);
+  return (PyObject*)self;
+}
+
+PyObject* igraphmodule_TupleIter_iternext(igraphmodule_TupleIterObject* self) {
+  PyObject *result, *column, *item;
+  igraph_integer_t from, to;
+  Py_ssize_t i, k, offset;
+  long int id, n;
+  igraph_bool_t edges;
+
+  if (self->gref == NULL)
+    return NULL;
+
+  edges=(self->attrhash_idx == ATTRHASH_IDX_EDGE);
+  n=edges ? igraph_ecount(&self->gref->g) : igraph_vcount(&self->gref->g);
+
+  if (self->all) {
+    if (self->pos >= n)
+      return NULL;
+    id=self->pos;
+  } else {
+    if (self->pos >= igraph_vector_size(&self->ids))
+      return NULL;
+    id=(long int)VECTOR(self->ids)[self->pos];
+    if (id >= n) {
+      PyErr_SetString(PyExc_RuntimeError, "graph was modified during iteration");
+      return NULL;
+    }
+  }
+  self->pos++;
+
+  k=PyTuple_GET_SIZE(self->columns);
+  offset=edges ? 3 : 1;
+  result=PyTuple_New(k + offset);
+  if (result == NULL)
+    return NULL;
+
+  item=PyInt_FromLong(id);
+  if (item == NULL) {
+    Py_DECREF(result);
+    return NULL;
+  }
+  PyTuple_SET_ITEM(result, 0, item);
+
+  if (edges) {
+    if (igraph_edge(&self->gref->g, (igraph_integer_t)id, &from, &to)) {
+      igraphmodule_handle_igraph_error();
+      Py_DECREF(result);
+      return NULL;
+    }
+    item=PyInt_FromLong((long int)from);
+    if (item == NULL) {
+      Py_DECREF(result);
+      return NULL;
+    }
+    PyTuple_SET_ITEM(result, 1, item);
+    item=PyInt_FromLong((long int)to);
+    if (item == NULL) {
+      Py_DECREF(result);
+      return NULL;
+    }
+    PyTuple_SET_ITEM(result, 2, item);
+  }
+
+  for (i=0; i<k; i++) {
+    column=PyDict_GetItem(ATTR_STRUCT_DICT(&self->gref->g)[self->attrhash_idx],
+        PyTuple_GET_ITEM(self->columns, i));
+    if (column == NULL || !PyList_Check(column)) {
+      PyErr_SetString(PyExc_KeyError, "Attribute does not exist");
+      Py_DECREF(result);
+      return NULL;
+    }
+    if (id >= PyList_GET_SIZE(column)) {
+      PyErr_SetString(PyExc_RuntimeError, "graph was modified during iteration");
+      Py_DECREF(result);
+      return NULL;
+    }
+    item=PyList_GET_ITEM(column, id);
+    Py_INCREF(item);
+    PyTuple_SET_ITEM(result, i + offset, item);
+  }
+
+  return result;
+}
+
+/** \ingroup python_interface_tupleiter
+ * Python type object referencing the methods Python calls when it performs
+ * various operations on a tuple iterator
+ */
+PyTypeObject igraphmodule_TupleIterType =
+{
+  PyVarObject_HEAD_INIT(0, 0)
+  "igraph.TupleIter",                       // tp_name
+  sizeof(igraphmodule_TupleIterObject),     // tp_basicsize
+  0,                                        // tp_itemsize
+  (destructor)igraphmodule_TupleIter_dealloc, // tp_dealloc
+  0,                                        // tp_print
+  0,                                        // tp_getattr
+  0,                                        // tp_setattr
+  0,                                        /* tp_compare (2.x) / tp_reserved (3.x) */
+  0,                                        // tp_repr
+  0,                                        // tp_as_number
+  0,                                        // tp_as_sequence
+  0,                                        // tp_as_mapping
+  0,                                        // tp_hash
+  0,                                        // tp_call
+  0,                                        // tp_str
+  0,                                        // tp_getattro
+  0,                                        // tp_setattro
+  0,                                        // tp_as_buffer
+  Py_TPFLAGS_DEFAULT | Py_TPFLAGS_HAVE_GC,  // tp_flags
+  "igraph tuple iterator object",           // tp_doc
+  (traverseproc) igraphmodule_TupleIter_traverse, /* tp_traverse */
+  (inquiry) igraphmodule_TupleIter_clear,   /* tp_clear */
+  0,                                        // tp_richcompare
+  0,                                        // tp_weaklistoffset
+  (getiterfunc)igraphmodule_TupleIter_iter, /* tp_iter */
+  (iternextfunc)igraphmodule_TupleIter_iternext, /* tp_iternext */
+  0,                                        /* tp_methods */
+  0,                                        /* tp_members */
+  0,                                        /* tp_getset */
+  0,                                        /* tp_base */
+  0,                                        /* tp_dict */
+  0,                                        /* tp_descr_get */
+  0,                                        /* tp_descr_set */
+  0,                                        /* tp_dictoffset */
+  0,                                        /* tp_init */
+  0,                                        /* tp_alloc */
+  0,                                        /* tp_new */
+  0,                                        /* tp_free */
+};
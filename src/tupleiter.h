@@ -0,0 +1,56 @@
+/* -*- mode: C -*-  */
+/* 
+   IGraph library.
+   Copyright (C) 2006-2012  Tamas Nepusz <ntamas@gmail.com>
+   
+   This program is free software; you can redistribute it and/or modify
+   it under the terms of the GNU General Public License as published by
+   the Free Software Foundation; either version 2 of the License, or
+   (at your option) any later version.
+   
+   This program is distributed in the hope that it will be useful,
+   but WITHOUT ANY WARRANTY; without even the implied warranty of
+   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+   GNU General Public License for more details.
+   
+   You should have received a copy of the GNU General Public License
+   along with this program; if not, write to the Free Software
+   Foundation, Inc.,  51 Franklin Street, Fifth Floor, Boston, MA 
+   02110-1301 USA
+
+*/
+
+
+#ifndef PYTHON_TUPLEITER_H
+#define PYTHON_TUPLEITER_H
+
+#include <Python.h>
+#include "graphobject.h"
+
+/**
+ * \ingroup python_interface_tupleiter
+ * \brief An iterator yielding the IDs, endpoints and attribute values of
+ * the vertices or edges of a graph as plain tuples
+ */
+typedef struct
+{
+  PyObject_HEAD
+  igraphmodule_GraphObject* gref;
+  int attrhash_idx;
+  PyObject* columns;        /* names of the attributes to yield */
+  igraph_bool_t all;
+  igraph_vector_t ids;
+  long int pos;
+} igraphmodule_TupleIterObject;
+
+PyObject* igraphmodule_TupleIter_new(igraphmodule_GraphObject *g,
+    int attrhash_idx, PyObject *attrnames, igraph_bool_t all,
+    const igraph_vector_t *ids);
+int igraphmodule_TupleIter_traverse(igraphmodule_TupleIterObject *self,
+    visitproc visit, void *arg);
+int igraphmodule_TupleIter_clear(igraphmodule_TupleIterObject *self);
+void igraphmodule_TupleIter_dealloc(igraphmodule_TupleIterObject* self);
+
+extern PyTypeObject igraphmodule_TupleIterType;
+
+#endif
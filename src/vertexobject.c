@@ -508,9 +508,10 @@ int igraphmodule_Vertex_set_attribute(igraphmodule_VertexObject* self, PyObject*
   if (PyString_IsEqualToASCIIString(k, "name"))
     igraphmodule_invalidate_vertex_name_index(&o->g);
 
-  if (v==NULL)
+  if (v==NULL) {
     // we are deleting attribute
-    return PyDict_DelItem(((PyObject**)o->g.attr)[ATTRHASH_IDX_VERTEX], k);
+    return igraphmodule_delete_attribute(&o->g, ATTRHASH_IDX_VERTEX, k);
+  }
   
   result=PyDict_GetItem(((PyObject**)o->g.attr)[ATTRHASH_IDX_VERTEX], k);
   if (result) {
@@ -519,6 +520,8 @@ int igraphmodule_Vertex_set_attribute(igraphmodule_VertexObject* self, PyObject*
       PyErr_SetString(igraphmodule_InternalError, "Vertex attribute dict member is not a list");
       return -1;
     }
+    igraphmodule_update_attribute_indexes(&o->g, ATTRHASH_IDX_VERTEX, k,
+        self->idx, PyList_GET_ITEM(result, self->idx), v);
     /* we actually don't own a reference here to v, so we must increase
      * its reference count, because PyList_SetItem will "steal" a reference!
      * It took me 1.5 hours between London and Manchester to figure it out */
@@ -24,10 +24,12 @@
 
 #include <Python.h>
 #include "attributes.h"
+#include "attrviewobject.h"
 #include "common.h"
 #include "convert.h"
 #include "error.h"
 #include "py2compat.h"
+#include "tupleiter.h"
 #include "pyhelpers.h"
 #include "vertexseqobject.h"
 #include "vertexobject.h"
@@ -97,6 +99,34 @@ igraphmodule_VertexSeq_copy(igraphmodule_VertexSeqObject* o) {
   return copy;
 }
 
+/**
+ * \ingroup python_interface_vertexseq
+ * \brief Creates a vertex sequence of the same graph containing the given IDs
+ *
+ * The type of the new object will be the same as the type of \c o.
+ * \return the new PyObject
+ */
+igraphmodule_VertexSeqObject*
+igraphmodule_VertexSeq_new_from_vector(igraphmodule_VertexSeqObject* o,
+  const igraph_vector_t* v) {
+  igraphmodule_VertexSeqObject *result;
+
+  result=(igraphmodule_VertexSeqObject*)PyType_GenericNew(Py_TYPE(o), 0, 0);
+  if (result == NULL) return NULL;
+
+  if (igraph_vs_vector_copy(&result->vs, v)) {
+    igraphmodule_handle_igraph_error();
+    Py_DECREF(result);
+    return NULL;
+  }
+
+  result->gref = o->gref;
+  if (o->gref) Py_INCREF(o->gref);
+  RC_ALLOC("VertexSeq(from vector)", result);
+
+  return result;
+}
+
 /**
  * \ingroup python_interface_vertexseq
  * \brief Initialize a new vertex sequence object for a given graph
@@ -338,6 +368,73 @@ PyObject* igraphmodule_VertexSeq_get_attribute_values_mapping(igraphmodule_Verte
   return igraphmodule_VertexSeq_get_attribute_values(self, o);
 }
 
+/**
+ * \ingroup python_interface_vertexseq
+ * \brief Returns a read-only view of the values of a given vertex attribute
+ */
+PyObject* igraphmodule_VertexSeq_get_attribute_view(igraphmodule_VertexSeqObject* self,
+    PyObject* attrname) {
+  igraphmodule_GraphObject *gr = self->gref;
+  igraph_vector_t ids;
+  PyObject *result;
+
+  if (!igraphmodule_attribute_name_check(attrname))
+    return NULL;
+
+  if (PyDict_GetItem(ATTR_STRUCT_DICT(&gr->g)[ATTRHASH_IDX_VERTEX], attrname) == NULL) {
+    PyErr_SetString(PyExc_KeyError, "Attribute does not exist");
+    return NULL;
+  }
+
+  if (igraph_vs_type(&self->vs) == IGRAPH_VS_ALL)
+    return igraphmodule_AttributeView_new(gr, ATTRHASH_IDX_VERTEX, attrname, 1, 0);
+
+  if (igraph_vector_init(&ids, 0)) {
+    igraphmodule_handle_igraph_error();
+    return NULL;
+  }
+  if (igraph_vs_as_vector(&gr->g, self->vs, &ids)) {
+    igraphmodule_handle_igraph_error();
+    igraph_vector_destroy(&ids);
+    return NULL;
+  }
+
+  result = igraphmodule_AttributeView_new(gr, ATTRHASH_IDX_VERTEX, attrname, 0, &ids);
+  igraph_vector_destroy(&ids);
+
+  return result;
+}
+
+/**
+ * \ingroup python_interface_vertexseq
+ * \brief Returns an iterator yielding the IDs and some attribute
+ * values of the vertices in the sequence as tuples
+ */
+PyObject* igraphmodule_VertexSeq_iter_tuples(igraphmodule_VertexSeqObject* self,
+    PyObject* args) {
+  igraphmodule_GraphObject *gr = self->gref;
+  igraph_vector_t ids;
+  PyObject *result;
+
+  if (igraph_vs_type(&self->vs) == IGRAPH_VS_ALL)
+    return igraphmodule_TupleIter_new(gr, ATTRHASH_IDX_VERTEX, args, 1, 0);
+
+  if (igraph_vector_init(&ids, 0)) {
+    igraphmodule_handle_igraph_error();
+    return NULL;
+  }
+  if (igraph_vs_as_vector(&gr->g, self->vs, &ids)) {
+    igraphmodule_handle_igraph_error();
+    igraph_vector_destroy(&ids);
+    return NULL;
+  }
+
+  result = igraphmodule_TupleIter_new(gr, ATTRHASH_IDX_VERTEX, args, 0, &ids);
+  igraph_vector_destroy(&ids);
+
+  return result;
+}
+
 /** \ingroup python_interface_vertexseq
  * \brief Sets the list of values for a given attribute
  */
@@ -355,10 +452,11 @@ int igraphmodule_VertexSeq_set_attribute_values_mapping(igraphmodule_VertexSeqOb
 
   if (PyString_IsEqualToASCIIString(attrname, "name"))
     igraphmodule_invalidate_vertex_name_index(&gr->g);
+  igraphmodule_invalidate_attribute_indexes(&gr->g, ATTRHASH_IDX_VERTEX, attrname);
 
   if (values == 0) {
     if (igraph_vs_type(&self->vs) == IGRAPH_VS_ALL)
-      return PyDict_DelItem(dict, attrname);
+      return igraphmodule_delete_attribute(&gr->g, ATTRHASH_IDX_VERTEX, attrname);
     PyErr_SetString(PyExc_TypeError, "can't delete attribute from a vertex sequence not representing the whole graph");
     return -1;
   }
@@ -822,6 +920,49 @@ PyObject* igraphmodule_VertexSeq_select(igraphmodule_VertexSeqObject *self,
   return (PyObject*)result;
 }
 
+/**
+ * \ingroup python_interface_vertexseq
+ * \brief Selects a subset of the vertex sequence based on attribute criteria
+ *
+ * All the criteria are evaluated in a single pass over the vertices; see
+ * \ref igraphmodule_filter_by_attribute_criteria for their format.
+ */
+PyObject* igraphmodule_VertexSeq__select_by_criteria(
+  igraphmodule_VertexSeqObject *self, PyObject *criteria) {
+  igraphmodule_VertexSeqObject *result;
+  igraphmodule_GraphObject *gr = self->gref;
+  igraph_vector_t ids, filtered;
+
+  if (igraph_vector_init(&ids, 0)) {
+    igraphmodule_handle_igraph_error();
+    return NULL;
+  }
+  if (igraph_vs_as_vector(&gr->g, self->vs, &ids)) {
+    igraphmodule_handle_igraph_error();
+    igraph_vector_destroy(&ids);
+    return NULL;
+  }
+  if (igraph_vector_init(&filtered, 0)) {
+    igraphmodule_handle_igraph_error();
+    igraph_vector_destroy(&ids);
+    return NULL;
+  }
+
+  if (igraphmodule_filter_by_attribute_criteria(
+        &gr->g, ATTRHASH_IDX_VERTEX, &ids,
+        igraph_vs_type(&self->vs) == IGRAPH_VS_ALL, criteria, &filtered)) {
+    igraph_vector_destroy(&ids);
+    igraph_vector_destroy(&filtered);
+    return NULL;
+  }
+  igraph_vector_destroy(&ids);
+
+  result = igraphmodule_VertexSeq_new_from_vector(self, &filtered);
+  igraph_vector_destroy(&filtered);
+
+  return (PyObject*)result;
+}
+
 /**
  * \ingroup python_interface_vertexseq
  * Converts a vertex sequence to an igraph vector containing the corresponding
@@ -892,6 +1033,45 @@ PyObject* igraphmodule_VertexSeq__reindex_names(igraphmodule_VertexSeqObject* se
   Py_RETURN_NONE;
 }
 
+/**
+ * \ingroup python_interface_vertexseq
+ * Creates an index on a vertex attribute
+ */
+PyObject* igraphmodule_VertexSeq_create_index(igraphmodule_VertexSeqObject *self,
+    PyObject *args, PyObject *kwds) {
+  static char* kwlist[] = { "attrname", "kind", NULL };
+  PyObject *attrname, *kind = Py_None;
+
+  if (!PyArg_ParseTupleAndKeywords(args, kwds, "O|O", kwlist, &attrname, &kind))
+    return NULL;
+
+  if (igraphmodule_create_attribute_index(&self->gref->g, ATTRHASH_IDX_VERTEX,
+        attrname, kind))
+    return NULL;
+
+  Py_RETURN_NONE;
+}
+
+/**
+ * \ingroup python_interface_vertexseq
+ * Drops the index on a vertex attribute
+ */
+PyObject* igraphmodule_VertexSeq_drop_index(igraphmodule_VertexSeqObject *self,
+    PyObject *attrname) {
+  if (igraphmodule_drop_attribute_index(&self->gref->g, ATTRHASH_IDX_VERTEX, attrname))
+    return NULL;
+
+  Py_RETURN_NONE;
+}
+
+/**
+ * \ingroup python_interface_vertexseq
+ * Describes the indexes on the vertex attributes
+ */
+PyObject* igraphmodule_VertexSeq_index_info(igraphmodule_VertexSeqObject *self) {
+  return igraphmodule_describe_attribute_indexes(&self->gref->g, ATTRHASH_IDX_VERTEX);
+}
+
 /**
  * \ingroup python_interface_vertexseq
  * Method table for the \c igraph.VertexSeq object
@@ -902,6 +1082,39 @@ PyMethodDef igraphmodule_VertexSeq_methods[] = {
    "attribute_names() -> list\n\n"
    "Returns the attribute name list of the graph's vertices\n"
   },
+  {"create_index", (PyCFunction)igraphmodule_VertexSeq_create_index,
+   METH_VARARGS | METH_KEYWORDS,
+   "create_index(attrname, kind=\"hash\")\n\n"
+   "Creates an index on the given vertex attribute of the graph.\n\n"
+   "Indexed attributes are used automatically by L{select()} and L{find()}\n"
+   "for the C{eq} and C{in} operators, and also for C{lt}, C{le}, C{gt} and\n"
+   "C{ge} in case of sorted indexes. The index belongs to the graph, not to\n"
+   "the vertex sequence, and it is kept up-to-date when vertices are added\n"
+   "or the attribute of a single vertex is modified. Other modifications\n"
+   "cause the index to be rebuilt the next time it is used. The index is\n"
+   "dropped when the attribute is deleted.\n\n"
+   "@param attrname: the name of the attribute\n"
+   "@param kind: C{\"hash\"} for a hash-based index (equality and membership\n"
+   "  tests only, the attribute values must be hashable) or C{\"sorted\"}\n"
+   "  for a sorted index that also supports range queries (the attribute\n"
+   "  values must be mutually comparable).\n"
+  },
+  {"drop_index", (PyCFunction)igraphmodule_VertexSeq_drop_index,
+   METH_O,
+   "drop_index(attrname)\n\n"
+   "Drops the index on the given vertex attribute.\n\n"
+   "@param attrname: the name of the attribute\n"
+  },
+  {"index_info", (PyCFunction)igraphmodule_VertexSeq_index_info,
+   METH_NOARGS,
+   "index_info() -> dict\n\n"
+   "Returns information about the indexes on the vertex attributes.\n\n"
+   "@return: a dict mapping the names of the indexed attributes to dicts\n"
+   "  with the following keys: C{kind} is the kind of the index, C{built}\n"
+   "  tells whether the index is up-to-date and C{memory} is the approximate\n"
+   "  number of bytes used by the index (not counting the attribute values,\n"
+   "  which are shared with the graph).\n"
+  },
   {"find", (PyCFunction)igraphmodule_VertexSeq_find,
    METH_VARARGS,
    "find(condition) -> Vertex\n\n"
@@ -918,6 +1131,31 @@ PyMethodDef igraphmodule_VertexSeq_methods[] = {
    "does not affect the attribute values.\n\n"
    "@param attrname: the name of the attribute\n"
   },
+  {"get_attribute_view", (PyCFunction)igraphmodule_VertexSeq_get_attribute_view,
+   METH_O,
+   "get_attribute_view(attrname) -> AttributeView\n\n"
+   "Returns a read-only view of the values of a given vertex attribute for\n"
+   "all vertices in the sequence.\n\n"
+   "Unlike L{get_attribute_values()}, the view does not copy the values into\n"
+   "a new list; it always reflects the current values of the attribute. Use\n"
+   "C{tolist()} on the view if you need a list.\n\n"
+   "@param attrname: the name of the attribute\n"
+  },
+  {"iter_tuples", (PyCFunction)igraphmodule_VertexSeq_iter_tuples,
+   METH_VARARGS,
+   "iter_tuples(*attrnames) -> iterator\n\n"
+   "Iterates over the vertices in the sequence, yielding a tuple for each\n"
+   "vertex that contains the ID of the vertex and the values of the given\n"
+   "attributes, in the order they were specified.\n\n"
+   "This is considerably faster than iterating over the sequence itself as\n"
+   "no L{Vertex} object has to be constructed for each vertex. For instance,\n"
+   "the following snippet prints the names of all the vertices:\n\n"
+   "  >>> for index, name in g.vs.iter_tuples(\"name\"):\n"
+   "  ...     print index, name\n\n"
+   "@param attrnames: the names of the attributes to include in the tuples\n"
+   "@return: an iterator yielding tuples of the form C{(index, attr1,\n"
+   "  attr2, ...)}\n"
+  },
   {"set_attribute_values", (PyCFunction)igraphmodule_VertexSeq_set_attribute_values,
    METH_VARARGS | METH_KEYWORDS,
    "set_attribute_values(attrname, values) -> list\n"
@@ -930,6 +1168,15 @@ PyMethodDef igraphmodule_VertexSeq_methods[] = {
    "select(...) -> VertexSeq\n\n"
    "For internal use only.\n"
   },
+  {"_select_by_criteria", (PyCFunction)igraphmodule_VertexSeq__select_by_criteria,
+   METH_O,
+   "_select_by_criteria(criteria) -> VertexSeq\n\n"
+   "Selects the vertices satisfying all the given attribute criteria in a\n"
+   "single pass. Each criterion is an (attribute, operator, value) tuple,\n"
+   "where attribute is either an attribute name or a list of precalculated\n"
+   "values, one for each vertex in the sequence.\n\n"
+   "For internal use only.\n"
+  },
   {"_reindex_names", (PyCFunction)igraphmodule_VertexSeq__reindex_names, METH_NOARGS,
    "Re-creates the dictionary that maps vertex names to IDs.\n\n"
    "For internal use only.\n"
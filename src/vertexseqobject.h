@@ -42,6 +42,8 @@ PyObject* igraphmodule_VertexSeq_new(PyTypeObject *subtype,
 int igraphmodule_VertexSeq_init(igraphmodule_VertexSeqObject* self,
   PyObject* args, PyObject* kwds);
 void igraphmodule_VertexSeq_dealloc(igraphmodule_VertexSeqObject* self);
+igraphmodule_VertexSeqObject* igraphmodule_VertexSeq_new_from_vector(
+  igraphmodule_VertexSeqObject *o, const igraph_vector_t *v);
 
 int igraphmodule_VertexSeq_sq_length(igraphmodule_VertexSeqObject *self);
 